@@ -1,7 +1,9 @@
 from .base_agent import BaseAgent
 from .farmer_agent import FarmerAgent
+from .variety_selection import VarietySelectionKernel
 
 __all__ = [
     "BaseAgent",
-    "FarmerAgent"
+    "FarmerAgent",
+    "VarietySelectionKernel"
 ]
@@ -5,6 +5,8 @@ class BaseAgent(ABC):
     """
     Abstract base class for all agents in the simulation.
     """
+    __slots__ = ("agent_id",) # Subclasses declare their own slots, so agents carry no per-instance __dict__
+
     def __init__(self, agent_id: str = None):
         self.agent_id = agent_id if agent_id else str(uuid4())
 
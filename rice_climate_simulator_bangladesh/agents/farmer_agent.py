@@ -1,17 +1,33 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence
 from uuid import uuid4
 
+import numpy as np
+
 from .base_agent import BaseAgent
+from .variety_selection import VarietySelectionKernel, DEFAULT_SALINITY_THRESHOLD_DS_M
 from agriculture.farm_plot import FarmPlot
-from agriculture.crops import RiceVariety, RiceSeason, VARIETIES_DATA # For variety selection
+from agriculture.crops import RiceVariety, RiceSeason, MATURITY_STAGE
+from agriculture.variety_catalog import VarietyCatalog, DEFAULT_VARIETY_CATALOG # For variety selection
+from utils.event_log import EventType
+from utils.logging_setup import get_logger
 # from ..economics.financial_model import HouseholdFinance # If a separate finance model exists
 
+logger = get_logger(__name__)
+
 class FarmerAgent(BaseAgent):
     """
     Represents a farmer household agent in the simulation.
     Manages farm plots, makes cultivation decisions, and responds to economic
     and environmental conditions.
     """
+    __slots__ = ("household_id", "capital_bdt", "farm_plots", "age", "education_years", "num_farm_plots",
+                 "farming_experience_years", "risk_aversion_factor", "land_holding_category", "location_id",
+                 "_variety_catalog", "_salinity_threshold_ds_m", "_expected_yields", "_expected_prices",
+                 "current_debt_bdt", "subsidy_received_bdt", "off_farm_income_bdt_per_year")
+
+    default_variety_catalog: VarietyCatalog = DEFAULT_VARIETY_CATALOG # Varieties to choose from, unless set per instance
+    default_salinity_threshold_ds_m: float = DEFAULT_SALINITY_THRESHOLD_DS_M # Same for the salinity threshold below
+
     def __init__(self, agent_id: str = None,
                  household_id: str = None,
                  initial_capital_bdt: float = 50000.0,
@@ -22,7 +38,9 @@ class FarmerAgent(BaseAgent):
                  risk_aversion_factor: float = 0.5, # 0 (risk-neutral) to 1 (highly risk-averse)
                  land_holding_category: str = "small", # e.g., marginal, small, medium, large
                  location_id: Optional[str] = None, # Link to an administrative unit ID
-                 num_farm_plots: int = 0 # Expected number of farm plots from schema
+                 num_farm_plots: int = 0, # Expected number of farm plots from schema
+                 variety_catalog: Optional[VarietyCatalog] = None,
+                 salinity_threshold_ds_m: Optional[float] = None
                  ):
         super().__init__(agent_id)
         self.household_id = household_id if household_id else f"HH_{self.agent_id}"
@@ -35,17 +53,62 @@ class FarmerAgent(BaseAgent):
         self.risk_aversion_factor = risk_aversion_factor
         self.land_holding_category = land_holding_category # Could be an Enum
         self.location_id = location_id # e.g., Upazila ID
+        self._variety_catalog: Optional[VarietyCatalog] = variety_catalog
+        self._salinity_threshold_ds_m: Optional[float] = salinity_threshold_ds_m
 
-        self.expected_yields: Dict[str, float] = {} # variety_id -> expected_yield_t_ha
-        self.expected_prices: Dict[str, float] = {} # rice_type -> expected_price_bdt_kg
+        # Optional containers are allocated on first use
+        self._expected_yields: Optional[Dict[str, float]] = None
+        self._expected_prices: Optional[Dict[str, float]] = None
         self.current_debt_bdt: float = 0.0
         self.subsidy_received_bdt: float = 0.0
         self.off_farm_income_bdt_per_year: float = 0.0 # Potential for diversification
 
+    @property
+    def variety_catalog(self) -> VarietyCatalog:
+        """Varieties this farmer chooses from (the class default unless set for the farmer)."""
+        return self._variety_catalog if self._variety_catalog is not None else self.default_variety_catalog
+
+    @variety_catalog.setter
+    def variety_catalog(self, catalog: Optional[VarietyCatalog]):
+        self._variety_catalog = catalog
+
+    @property
+    def salinity_threshold_ds_m(self) -> float:
+        """Predicted salinity above which salt-tolerant varieties are preferred."""
+        return (self._salinity_threshold_ds_m if self._salinity_threshold_ds_m is not None
+                else self.default_salinity_threshold_ds_m)
+
+    @salinity_threshold_ds_m.setter
+    def salinity_threshold_ds_m(self, threshold: Optional[float]):
+        self._salinity_threshold_ds_m = threshold
+
+    @property
+    def expected_yields(self) -> Dict[str, float]:
+        """variety_id -> expected_yield_t_ha."""
+        if self._expected_yields is None:
+            self._expected_yields = {}
+        return self._expected_yields
+
+    @expected_yields.setter
+    def expected_yields(self, expected_yields: Dict[str, float]):
+        self._expected_yields = expected_yields or None
+
+    @property
+    def expected_prices(self) -> Dict[str, float]:
+        """rice_type -> expected_price_bdt_kg."""
+        if self._expected_prices is None:
+            self._expected_prices = {}
+        return self._expected_prices
+
+    @expected_prices.setter
+    def expected_prices(self, expected_prices: Dict[str, float]):
+        self._expected_prices = expected_prices or None
+
     def add_farm_plot(self, plot: FarmPlot):
         if plot.owner_agent_id != self.agent_id:
             # Or assign it if it's being transferred
-            print(f"Warning: Plot {plot.plot_id} owner mismatch. Assigning to {self.agent_id}.")
+            logger.warning("Plot %s owner mismatch. Assigning to %s.", plot.plot_id, self.agent_id)
+            plot.event_log.record(EventType.OWNER_MISMATCH, self.agent_id, plot.plot_id, detail=plot.owner_agent_id)
             plot.owner_agent_id = self.agent_id
         self.farm_plots.append(plot)
 
@@ -54,35 +117,37 @@ class FarmerAgent(BaseAgent):
         Decision logic for selecting a rice variety for a given plot and season.
         This is a placeholder for a more complex decision model.
         """
-        available_varieties = [v for v_id, v in VARIETIES_DATA.items() if v.season == season]
-        if not available_varieties:
+        catalog = self.variety_catalog
+        best_in_season = catalog.best_in_season(season)
+        if best_in_season < 0:
             return None
 
         predicted_salinity = climate_outlook.get('avg_salinity_ds_m', 0)
-        if predicted_salinity > 4: # Arbitrary threshold
-            salt_tolerant_options = [v for v in available_varieties if v.is_salt_tolerant and v.attributes.get('salinity_tolerance_ds_m', 0) >= predicted_salinity]
-            if salt_tolerant_options:
-                return max(salt_tolerant_options, key=lambda v: v.potential_yield_t_ha)
-        
-        hyv_options = [v for v in available_varieties if v.is_hyv and v.input_costs_bdt_ha <= (self.capital_bdt / len(self.farm_plots) if self.farm_plots else self.capital_bdt)]
-        if hyv_options:
-            return max(hyv_options, key=lambda v: v.potential_yield_t_ha)
-        
-        if available_varieties:
-            return max(available_varieties, key=lambda v: v.potential_yield_t_ha)
-            
-        return None
-
-    def _make_cultivation_decisions(self, current_simulation_step: int, climate_conditions: dict, market_conditions: dict):
-        """Decide what to plant on each plot for the upcoming season(s)."""
-        if current_simulation_step % 3 == 0:
-            current_season = RiceSeason.AUS
-        elif current_simulation_step % 3 == 1:
-            current_season = RiceSeason.AMAN
-        else:
-            current_season = RiceSeason.BORO
-        
-        print(f"Farmer {self.agent_id} making decisions for {current_season.name} at step {current_simulation_step}.")
+        if predicted_salinity > self.salinity_threshold_ds_m:
+            salt_tolerant_choice = catalog.best_salt_tolerant(season, predicted_salinity)
+            if salt_tolerant_choice >= 0:
+                return catalog.variety(salt_tolerant_choice)
+
+        capital_share = self.capital_bdt / len(self.farm_plots) if self.farm_plots else self.capital_bdt
+        hyv_choice = catalog.best_affordable_hyv(season, capital_share)
+        if hyv_choice >= 0:
+            return catalog.variety(hyv_choice)
+
+        return catalog.variety(best_in_season)
+
+    def _make_cultivation_decisions(self, current_simulation_step: int, climate_conditions: dict, market_conditions: dict,
+                                    batch_mode: bool = False):
+        """Decide what to plant on each plot for the upcoming season(s).
+
+        With batch_mode the choices come from the vectorized VarietySelectionKernel
+        (see make_cultivation_decisions_batch); the outcome is the same.
+        """
+        if batch_mode:
+            FarmerAgent.make_cultivation_decisions_batch([self], current_simulation_step, climate_conditions, market_conditions)
+            return
+
+        current_season = season_for_step(current_simulation_step)
+        logger.debug("Farmer %s making decisions for %s at step %s.", self.agent_id, current_season.name, current_simulation_step)
 
         for plot in self.farm_plots:
             if plot.current_crop is None:
@@ -92,56 +157,130 @@ class FarmerAgent(BaseAgent):
                 
                 if selected_variety:
                     if self.capital_bdt >= selected_variety.input_costs_bdt_ha * plot.size_ha:
-                        planting_date_str = f"Day {current_simulation_step*10}"
-                        plot.plant_crop(selected_variety, planting_date_str, current_season)
-                        self.capital_bdt -= selected_variety.input_costs_bdt_ha * plot.size_ha
-                        print(f"  Farmer {self.agent_id} planted {selected_variety.name} on plot {plot.plot_id}. Capital left: {self.capital_bdt:.2f} BDT")
+                        self._plant(plot, selected_variety, current_simulation_step, current_season)
                     else:
-                        print(f"  Farmer {self.agent_id} cannot afford to plant {selected_variety.name} on plot {plot.plot_id}.")
+                        self._record_unaffordable(plot, selected_variety)
                 else:
-                    print(f"  Farmer {self.agent_id} could not select a suitable variety for plot {plot.plot_id} for {current_season.name}.")
+                    self._record_no_suitable_variety(plot, current_season)
             else:
                 pass
 
+    def _plant(self, plot: FarmPlot, variety: RiceVariety, current_simulation_step: int, season: RiceSeason):
+        planting_date_str = f"Day {current_simulation_step*10}"
+        plot.plant_crop(variety, planting_date_str, season)
+        self.capital_bdt -= variety.input_costs_bdt_ha * plot.size_ha
+        logger.debug("  Farmer %s planted %s on plot %s. Capital left: %.2f BDT", self.agent_id, variety.name, plot.plot_id, self.capital_bdt)
+
+    def _record_unaffordable(self, plot: FarmPlot, variety: RiceVariety):
+        logger.debug("  Farmer %s cannot afford to plant %s on plot %s.", self.agent_id, variety.name, plot.plot_id)
+        plot.event_log.record(EventType.UNAFFORDABLE, self.agent_id, plot.plot_id,
+                               value=variety.input_costs_bdt_ha * plot.size_ha, detail=variety.variety_id)
+
+    def _record_no_suitable_variety(self, plot: FarmPlot, season: RiceSeason):
+        logger.debug("  Farmer %s could not select a suitable variety for plot %s for %s.", self.agent_id, plot.plot_id, season.name)
+        plot.event_log.record(EventType.NO_SUITABLE_VARIETY, self.agent_id, plot.plot_id, detail=season.name)
+
+    @staticmethod
+    def make_cultivation_decisions_batch(farmers: Sequence["FarmerAgent"], current_simulation_step: int,
+                                         climate_conditions: dict, market_conditions: dict,
+                                         kernel: Optional[VarietySelectionKernel] = None):
+        """
+        Makes the cultivation decisions of many farmers with one kernel call per round.
+
+        Round k handles the k-th empty plot of every farmer, so a farmer's capital share
+        for a plot reflects the plantings on its earlier plots, exactly as in the
+        sequential per-farmer loop.
+        """
+        if kernel is None:
+            kernel = VarietySelectionKernel(farmers[0].variety_catalog if farmers else DEFAULT_VARIETY_CATALOG,
+                                            farmers[0].salinity_threshold_ds_m if farmers else DEFAULT_SALINITY_THRESHOLD_DS_M)
+        current_season = season_for_step(current_simulation_step)
+        empty_plots = []
+        for farmer in farmers:
+            logger.debug("Farmer %s making decisions for %s at step %s.", farmer.agent_id, current_season.name, current_simulation_step)
+            empty_plots.append([plot for plot in farmer.farm_plots if plot.current_crop is None])
+
+        num_rounds = max((len(plots) for plots in empty_plots), default=0)
+        for round_index in range(num_rounds):
+            active = [i for i, plots in enumerate(empty_plots) if len(plots) > round_index]
+            plots = [empty_plots[i][round_index] for i in active]
+            capital = np.array([farmers[i].capital_bdt for i in active], dtype=np.float64)
+            num_plots = np.array([len(farmers[i].farm_plots) for i in active], dtype=np.float64)
+            salinity_outlook = np.array(
+                [climate_conditions.get(plot.plot_id, {}).get('avg_salinity_ds_m', 0) for plot in plots], dtype=np.float64)
+            choices = kernel.select(current_season, salinity_outlook, capital / num_plots)
+
+            plot_sizes = np.array([plot.size_ha for plot in plots], dtype=np.float64)
+            has_choice = choices >= 0
+            costs = np.zeros(len(plots), dtype=np.float64)
+            costs[has_choice] = kernel.input_costs_bdt_ha[choices[has_choice]] * plot_sizes[has_choice]
+            affordable = has_choice & (capital >= costs)
+            for j, i in enumerate(active):
+                farmer, plot = farmers[i], plots[j]
+                if choices[j] < 0:
+                    farmer._record_no_suitable_variety(plot, current_season)
+                elif affordable[j]:
+                    farmer._plant(plot, kernel.varieties[choices[j]], current_simulation_step, current_season)
+                else:
+                    farmer._record_unaffordable(plot, kernel.varieties[choices[j]])
+
     def _manage_finances(self, market_conditions: dict):
         pass
 
     def _adapt_strategies(self, climate_trends: dict, policy_changes: dict):
         pass
 
-    def step(self, current_simulation_step: int, climate_conditions: dict, market_conditions: dict):
-        print(f"--- Farmer Agent {self.agent_id} (Step {current_simulation_step}) ---")
-        for plot in self.farm_plots:
-            plot.update_plot_conditions(
-                daily_weather=climate_conditions.get('weather', {}).get(plot.plot_id),
-                hydrological_conditions=climate_conditions.get('hydrology', {}).get(plot.plot_id)
-            )
+    def step(self, current_simulation_step: int, climate_conditions: dict, market_conditions: dict,
+             make_decisions: bool = True):
+        """Runs one step for the farmer; make_decisions=False when the engine already decided in batch."""
+        logger.debug("--- Farmer Agent %s (Step %s) ---", self.agent_id, current_simulation_step)
+        # Per-plot conditions are only passed in when the engine has not already applied
+        # them to every plot through PlotStateStore.update_all_plot_conditions.
+        plot_weather = climate_conditions.get('weather')
+        plot_hydrology = climate_conditions.get('hydrology')
+        if plot_weather is not None or plot_hydrology is not None:
+            for plot in self.farm_plots:
+                plot.update_plot_conditions(
+                    daily_weather=(plot_weather or {}).get(plot.plot_id),
+                    hydrological_conditions=(plot_hydrology or {}).get(plot.plot_id)
+                )
 
-        self._make_cultivation_decisions(current_simulation_step, climate_conditions, market_conditions)
+        if make_decisions:
+            self._make_cultivation_decisions(current_simulation_step, climate_conditions, market_conditions)
 
         total_harvest_value = 0
         for plot in self.farm_plots:
-            if plot.current_crop and plot.current_crop.current_growth_stage == "maturity_reached_placeholder":
+            if plot.current_crop and plot.current_crop.current_growth_stage == MATURITY_STAGE:
+                # The crop model's yield already reflects water and salinity stress; other applied stresses reduce it further
                 stress_impact = sum(plot.current_crop.stress_factors.values())
                 yield_reduction_factor = max(0, 1 - stress_impact)
-                actual_yield_t_ha = plot.current_crop.variety.potential_yield_t_ha * yield_reduction_factor
+                actual_yield_t_ha = plot.current_crop.expected_yield_t_ha * yield_reduction_factor
                 harvested_crop_obj = plot.harvest_crop(f"Day {current_simulation_step*10 + 100}", actual_yield_t_ha)
                 if harvested_crop_obj:
                     price_per_ton_bdt = market_conditions.get('rice_price_bdt_ton', {}).get(harvested_crop_obj.variety.variety_id, 30000)
                     revenue = harvested_crop_obj.actual_yield_t_ha * plot.size_ha * price_per_ton_bdt
                     self.capital_bdt += revenue
                     total_harvest_value += revenue
-                    print(f"  Farmer {self.agent_id} sold {harvested_crop_obj.variety.name} from plot {plot.plot_id}. Revenue: {revenue:.2f} BDT. Capital: {self.capital_bdt:.2f} BDT")
+                    logger.debug("  Farmer %s sold %s from plot %s. Revenue: %.2f BDT. Capital: %.2f BDT",
+                                 self.agent_id, harvested_crop_obj.variety.name, plot.plot_id, revenue, self.capital_bdt)
         
         if total_harvest_value > 0:
-            print(f"  Farmer {self.agent_id} total harvest income this step: {total_harvest_value:.2f} BDT")
+            logger.debug("  Farmer %s total harvest income this step: %.2f BDT", self.agent_id, total_harvest_value)
 
         self._manage_finances(market_conditions)
 
         if current_simulation_step % 10 == 0:
              self._adapt_strategies(climate_conditions.get('trends',{}), market_conditions.get('policy_changes',{}))
         
-        print(f"--- End Farmer Agent {self.agent_id} (Step {current_simulation_step}) ---")
+        logger.debug("--- End Farmer Agent %s (Step %s) ---", self.agent_id, current_simulation_step)
 
     def __repr__(self):
         return f"FarmerAgent(id='{self.agent_id}', plots={len(self.farm_plots)}, capital={self.capital_bdt:.2f} BDT)"
+
+def season_for_step(current_simulation_step: int) -> RiceSeason:
+    """Seasons cycle Aus -> Aman -> Boro, one per simulation step."""
+    if current_simulation_step % 3 == 0:
+        return RiceSeason.AUS
+    elif current_simulation_step % 3 == 1:
+        return RiceSeason.AMAN
+    return RiceSeason.BORO
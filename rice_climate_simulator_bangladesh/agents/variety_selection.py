@@ -0,0 +1,63 @@
+from typing import Sequence, Union
+
+import numpy as np
+
+from agriculture.crops import RiceVariety, RiceSeason
+from agriculture.variety_catalog import VarietyCatalog
+
+DEFAULT_SALINITY_THRESHOLD_DS_M = 4.0 # Above this predicted salinity farmers look for salt-tolerant varieties
+
+class VarietySelectionKernel:
+    """
+    Vectorized form of FarmerAgent._select_rice_variety.
+
+    Chooses a variety for many plots in one call and returns variety codes of the
+    underlying VarietyCatalog (-1 where no variety is available). The rules are the
+    same as the per-plot logic:
+      1. If predicted salinity exceeds the threshold, the highest-yielding salt-tolerant
+         variety whose tolerance covers the predicted salinity.
+      2. Otherwise the highest-yielding HYV whose input cost fits the plot's capital share.
+      3. Otherwise the highest-yielding variety of the season.
+    Ties on yield resolve to the earliest variety, as `max()` does in the per-plot code.
+    """
+    def __init__(self, varieties: Union[VarietyCatalog, Sequence[RiceVariety]],
+                 salinity_threshold_ds_m: float = DEFAULT_SALINITY_THRESHOLD_DS_M):
+        self.catalog = varieties if isinstance(varieties, VarietyCatalog) else VarietyCatalog(varieties)
+        self.salinity_threshold_ds_m = salinity_threshold_ds_m
+
+    @property
+    def varieties(self):
+        """Variety code -> RiceVariety."""
+        return self.catalog.varieties
+
+    @property
+    def input_costs_bdt_ha(self) -> np.ndarray:
+        return self.catalog.input_costs_bdt_ha
+
+    def select(self, season: RiceSeason, salinity_outlook_ds_m: np.ndarray,
+               capital_share_bdt: np.ndarray) -> np.ndarray:
+        """
+        Chooses a variety for every plot.
+
+        Args:
+            season (RiceSeason): Season being planted.
+            salinity_outlook_ds_m (np.ndarray): Predicted salinity per plot.
+            capital_share_bdt (np.ndarray): Farmer capital available per plot.
+
+        Returns:
+            np.ndarray: Variety code per plot, -1 if none is available.
+        """
+        salinity_outlook_ds_m = np.asarray(salinity_outlook_ds_m, dtype=np.float64)
+        capital_share_bdt = np.asarray(capital_share_bdt, dtype=np.float64)
+        choice = np.full(salinity_outlook_ds_m.shape, self.catalog.best_in_season(season), dtype=np.int64)
+
+        hyv_choice = self.catalog.best_affordable_hyv(season, capital_share_bdt)
+        np.copyto(choice, hyv_choice, where=hyv_choice >= 0)
+
+        salt_choice = self.catalog.best_salt_tolerant(season, salinity_outlook_ds_m)
+        np.copyto(choice, salt_choice,
+                  where=(salinity_outlook_ds_m > self.salinity_threshold_ds_m) & (salt_choice >= 0))
+        return choice
+
+    def __repr__(self):
+        return f"VarietySelectionKernel(varieties={len(self.varieties)})"
@@ -1,12 +1,20 @@
-from .crops import RiceSeason, AmanSubVariety, RiceVariety, Crop, VARIETIES_DATA
+from .crops import RiceSeason, AmanSubVariety, RiceVariety, Crop
+from .variety_catalog import VarietyCatalog, DEFAULT_VARIETY_CATALOG, VARIETIES_DATA
 from .farm_plot import SoilProperties, FarmPlot
+from .plot_store import PlotStateStore
+from .cultivation_history import CultivationHistory, PlotHistory
 
 __all__ = [
     "RiceSeason",
     "AmanSubVariety",
     "RiceVariety",
     "Crop",
+    "VarietyCatalog",
+    "DEFAULT_VARIETY_CATALOG",
     "VARIETIES_DATA",
     "SoilProperties",
-    "FarmPlot"
+    "FarmPlot",
+    "PlotStateStore",
+    "CultivationHistory",
+    "PlotHistory"
 ]
@@ -0,0 +1,172 @@
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .crops import GROWTH_STAGES, HARVEST_INDEX, MATURITY_STAGE
+from .plot_store import PlotStateStore
+from .variety_catalog import VarietyCatalog
+
+# Thermal-time fraction at which each stage after the first begins (seedling -> ... -> mature)
+STAGE_THRESHOLDS = np.array([0.10, 0.45, 0.70, 1.00])
+MATURITY_CODE = GROWTH_STAGES.index(MATURITY_STAGE)
+
+_CHUNK_SIZE = 32768 # Crops whose daily water balance is run together; small enough to stay in cache
+
+class CropGrowthModel:
+    """
+    Daily rice growth and root-zone water balance for every growing crop of a PlotStateStore.
+
+    Each day a crop accumulates thermal time, clip(T - base, 0, optimum - base) degree
+    days, and reaches maturity at the thermal time its variety needs in `maturity_days`
+    at the reference temperature; its stage (GROWTH_STAGES) follows the fraction
+    reached. Crop water demand is the variety's `water_requirement_mm` spread over
+    `maturity_days`. Rain and, on irrigated plots, irrigation (demand scaled by water
+    source reliability) enter the soil, evapotranspiration is the demand limited by the
+    water available, and moisture is clipped to the holding capacity
+    (SoilProperties.update_soil_moisture). Water stress is the unmet share of demand;
+    salinity stress follows Maas-Hoffman, a linear loss above the variety's
+    `salinity_tolerance_ds_m` attribute (or the default threshold). Biomass grows with
+    thermal time at the rate that gives the variety's potential yield at HARVEST_INDEX
+    when unstressed, reduced by both stresses.
+
+    `advance` runs a block of days for all plots at once: growing crops are gathered
+    into contiguous arrays, their soil water is stepped day by day and the results
+    written back; plots without a growing crop only take up the block's rain. Weather is given per block (total
+    precipitation and mean temperature per plot), as the engine's climate forcing
+    provides it per step.
+    """
+    def __init__(self, catalog: VarietyCatalog, base_temp_c: float = 8.0, optimum_temp_c: float = 30.0,
+                 reference_temp_c: float = 28.0, salinity_slope_per_ds_m: float = 0.12,
+                 default_salinity_tolerance_ds_m: float = 3.0):
+        self.catalog = catalog
+        self.base_temp_c = base_temp_c
+        self.optimum_temp_c = optimum_temp_c
+        self.reference_temp_c = reference_temp_c
+        self.salinity_slope_per_ds_m = salinity_slope_per_ds_m
+        self.default_salinity_tolerance_ds_m = default_salinity_tolerance_ds_m
+        self._params: Dict[str, np.ndarray] = {}
+        self._params_size = -1
+
+    @classmethod
+    def from_config(cls, catalog: VarietyCatalog, crop_model_config: Optional[Dict[str, Any]] = None) -> "CropGrowthModel":
+        return cls(catalog, **(crop_model_config or {}))
+
+    def _variety_params(self) -> Dict[str, np.ndarray]:
+        """Per-variety-code model parameters, rebuilt when varieties are added to the catalog."""
+        catalog = self.catalog
+        if self._params_size != len(catalog):
+            maturity_days = np.maximum(catalog.maturity_days.astype(np.float64), 1.0)
+            required = maturity_days * (self.reference_temp_c - self.base_temp_c)
+            tolerance = catalog.salinity_tolerance_ds_m
+            self._params = {
+                "required_thermal_time_cd": required,
+                "daily_demand_mm": catalog.water_requirement_mm / maturity_days,
+                "biomass_per_cd": catalog.potential_yield_t_ha / HARVEST_INDEX / required,
+                "salinity_tolerance_ds_m": np.where(tolerance > 0, tolerance, self.default_salinity_tolerance_ds_m),
+            }
+            self._params_size = len(catalog)
+        return self._params
+
+    def advance(self, store: PlotStateStore, precipitation_mm: np.ndarray, mean_temp_c: np.ndarray,
+                num_days: int, rows: Optional[np.ndarray] = None):
+        """
+        Advances the plots (all store rows, or `rows`) by `num_days` days. Weather arrays
+        are indexed like the rows: block precipitation totals and mean temperatures; NaN
+        precipitation counts as none and NaN temperature as the reference temperature.
+        """
+        n = store.size
+        if rows is None:
+            rows = np.arange(n)
+            precipitation, temperature = np.asarray(precipitation_mm)[:n], np.asarray(mean_temp_c)[:n]
+        else:
+            rows = np.asarray(rows, dtype=np.intp)
+            precipitation, temperature = np.asarray(precipitation_mm), np.asarray(mean_temp_c)
+        rain = np.nan_to_num(precipitation, nan=0.0)
+        growing = store.has_crop[rows] & (store.growth_stage[rows] < MATURITY_CODE)
+
+        # Plots without a growing crop: no uptake, so the block's rain enters the soil at once
+        idle = rows[~growing]
+        moisture = store.soil_moisture_mm
+        moisture[idle] = np.clip(moisture[idle] + rain[~growing], 0, store.water_holding_capacity_mm[idle])
+        if num_days <= 0 or not growing.any():
+            return
+
+        crop_rows = rows[growing]
+        params = self._variety_params()
+        codes = store.crop_variety_code[crop_rows]
+        required = params["required_thermal_time_cd"][codes]
+        demand = params["daily_demand_mm"][codes]
+        growth_rate = params["biomass_per_cd"][codes]
+        daily_rain = rain[growing] / num_days
+        temp = np.where(np.isnan(temperature[growing]), self.reference_temp_c, temperature[growing])
+        degree_days = np.clip(temp - self.base_temp_c, 0, self.optimum_temp_c - self.base_temp_c)
+        salinity_stress = np.clip(self.salinity_slope_per_ds_m
+                                  * (store.salinity_ds_m[crop_rows] - params["salinity_tolerance_ds_m"][codes]), 0, 1)
+        irrigation = np.where(store.is_irrigated[crop_rows], demand * store.water_source_reliability[crop_rows], 0.0)
+        capacity = store.water_holding_capacity_mm[crop_rows]
+
+        # Weather and salinity are constant over the block, so a crop develops by the same
+        # degree days every day and is active (not yet mature) for its first `active_days`
+        thermal_time = store.thermal_time_cd[crop_rows]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            days_to_maturity = np.ceil((required - thermal_time) / degree_days)
+        active_days = np.clip(np.nan_to_num(days_to_maturity, nan=num_days, posinf=num_days), 0, num_days)
+
+        soil = moisture[crop_rows]
+        total_uptake = np.empty(len(crop_rows))
+        for chunk_start in range(0, len(crop_rows), _CHUNK_SIZE):
+            chunk = slice(chunk_start, chunk_start + _CHUNK_SIZE)
+            total_uptake[chunk] = _water_balance(soil[chunk], daily_rain[chunk], irrigation[chunk], demand[chunk],
+                                                 capacity[chunk], active_days[chunk], num_days)
+
+        # Water stress of a day is its unmet share of demand; summed over active days weighted by degree days
+        water_stress_days = active_days - total_uptake / np.maximum(demand, 1e-9)
+        moisture[crop_rows] = soil
+        thermal_time += degree_days * active_days
+        matured = days_to_maturity <= num_days
+        thermal_time[matured] = np.maximum(thermal_time[matured], required[matured]) # No rounding shortfall at maturity
+        store.thermal_time_cd[crop_rows] = thermal_time
+        store.biomass_t_ha[crop_rows] += (growth_rate * (1 - salinity_stress) * degree_days
+                                          * (active_days - water_stress_days))
+        store.water_stress_sum[crop_rows] += degree_days * water_stress_days
+        store.salinity_stress_sum[crop_rows] += salinity_stress * degree_days * active_days
+        store.crop_days[crop_rows] += active_days.astype(np.int32)
+        store.growth_stage[crop_rows] = np.searchsorted(STAGE_THRESHOLDS, thermal_time / required, side="right")
+
+    def minimum_days_to_maturity(self, codes: np.ndarray) -> np.ndarray:
+        """Fewest days in which crops of the given variety codes can mature (at or above the optimum temperature)."""
+        required = self._variety_params()["required_thermal_time_cd"][codes]
+        return np.ceil(required / (self.optimum_temp_c - self.base_temp_c)).astype(np.int64)
+
+    def crop_yield_t_ha(self, store: PlotStateStore, rows: np.ndarray) -> np.ndarray:
+        """Grain yield of the crops in `rows` so far: biomass times the harvest index."""
+        return store.biomass_t_ha[rows] * HARVEST_INDEX
+
+    def __repr__(self):
+        return (f"CropGrowthModel(varieties={len(self.catalog)}, base={self.base_temp_c}C, "
+                f"optimum={self.optimum_temp_c}C, reference={self.reference_temp_c}C)")
+
+def _water_balance(soil: np.ndarray, daily_rain: np.ndarray, irrigation: np.ndarray, demand: np.ndarray,
+                   capacity: np.ndarray, active_days: np.ndarray, num_days: int) -> np.ndarray:
+    """
+    Steps the soil water of some crops (`soil` is updated in place) through `num_days`
+    days and returns each crop's total evapotranspiration. A crop draws `demand` and
+    receives `irrigation` only on its first `active_days` days.
+    """
+    total_uptake = np.zeros(len(soil))
+    active = np.empty(len(soil), dtype=bool)
+    uptake, inflow = np.empty(len(soil)), np.empty(len(soil))
+    last_active_day = int(active_days.max()) if len(soil) else 0
+    for day in range(last_active_day):
+        np.greater(active_days, day, out=active)
+        np.multiply(demand, active, out=uptake)
+        np.multiply(irrigation, active, out=inflow)
+        inflow += daily_rain
+        soil += inflow
+        np.minimum(uptake, soil, out=uptake) # Actual evapotranspiration
+        soil -= uptake
+        np.minimum(soil, capacity, out=soil)
+        total_uptake += uptake
+    # Once every crop is mature the remaining days' rain only fills the soil
+    np.minimum(soil + daily_rain * (num_days - last_active_day), capacity, out=soil)
+    return total_uptake
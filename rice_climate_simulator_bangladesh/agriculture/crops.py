@@ -1,6 +1,8 @@
 from enum import Enum
 from typing import Optional, Dict, List
 
+import numpy as np
+
 class RiceSeason(Enum):
     AUS = "Aus (March-June, Pre-Monsoon)"
     AMAN = "Aman (July-November, Monsoon)"
@@ -12,6 +14,9 @@ class AmanSubVariety(Enum):
 
 class RiceVariety:
     """Represents a specific rice variety with its characteristics."""
+    __slots__ = ("variety_id", "name", "season", "is_hyv", "is_salt_tolerant", "is_drought_tolerant", "is_flood_tolerant",
+                 "maturity_days", "potential_yield_t_ha", "water_requirement_mm", "input_costs_bdt_ha", "attributes")
+
     def __init__(self, variety_id: str, name: str, season: RiceSeason,
                  is_hyv: bool = False, # High Yielding Variety
                  is_salt_tolerant: bool = False,
@@ -41,47 +46,122 @@ class RiceVariety:
     def __repr__(self):
         return f"RiceVariety(id='{self.variety_id}', name='{self.name}', season='{self.season.name}')"
 
-# Example Varieties (to be expanded and loaded from data)
-VARIETIES_DATA = {
-    "brri_dhan28": RiceVariety(
-        variety_id="brri_dhan28", name="BRRI dhan28", season=RiceSeason.BORO, 
-        is_hyv=True, potential_yield_t_ha=6.0, maturity_days=140
-    ),
-    "brri_dhan29": RiceVariety(
-        variety_id="brri_dhan29", name="BRRI dhan29", season=RiceSeason.BORO, 
-        is_hyv=True, potential_yield_t_ha=7.0, maturity_days=160
-    ),
-    "brri_dhan47": RiceVariety(
-        variety_id="brri_dhan47", name="BRRI dhan47", season=RiceSeason.BORO, 
-        is_hyv=True, is_salt_tolerant=True, potential_yield_t_ha=5.5, maturity_days=150,
-        attributes={"salinity_tolerance_ds_m": 8}
-    ),
-    "swarna": RiceVariety(
-        variety_id="swarna", name="Swarna (MTU7029)", season=RiceSeason.AMAN, 
-        is_hyv=True, potential_yield_t_ha=5.0, maturity_days=145
-    ),
-    "pajam": RiceVariety(
-        variety_id="pajam", name="Pajam", season=RiceSeason.AMAN, 
-        is_hyv=False, potential_yield_t_ha=3.5, maturity_days=150 # Traditional
-    )
+# Example varieties are loaded from data/rice_varieties.csv into a VarietyCatalog
+# (see variety_catalog.py, which also exposes them as VARIETIES_DATA).
+
+GROWTH_STAGES = ("seedling", "vegetative", "reproductive", "ripening", "mature") # Crop.current_growth_stage values, in order
+MATURITY_STAGE = "mature" # Stage at which a crop is harvested
+HARVEST_INDEX = 0.45 # Grain share of above-ground biomass
+
+# PlotStateStore columns holding a crop's growth state -> value for a crop not on a plot
+CROP_STATE_DEFAULTS: Dict[str, float] = {
+    "growth_stage": -1, # Index into GROWTH_STAGES; -1 before the crop is planted
+    "crop_days": 0, # Days the crop has been growing
+    "thermal_time_cd": 0.0, # Accumulated degree days
+    "biomass_t_ha": 0.0,
+    "water_stress_sum": 0.0, # Water stress (0-1) summed over degree days
+    "salinity_stress_sum": 0.0, # Salinity stress (0-1) summed over degree days
 }
 
 class Crop:
-    """Represents a specific crop being grown on a plot in a given season."""
+    """Represents a specific crop being grown on a plot in a given season.
+
+    Growth state (stage, thermal time, biomass, stresses) lives in the plot's
+    PlotStateStore row while the crop is on a plot, where agriculture.crop_model
+    updates every crop at once; a crop that is not on a plot keeps its own copy.
+    """
+    __slots__ = ("variety", "planting_date", "harvest_date", "_store", "_index", "_state", "health_status",
+                 "actual_yield_t_ha", "_stress_factors")
+
     def __init__(self, variety: RiceVariety, planting_date: Optional[str] = None, 
-                 harvest_date: Optional[str] = None, actual_yield_t_ha: Optional[float] = None):
+                 harvest_date: Optional[str] = None, actual_yield_t_ha: Optional[float] = None,
+                 store=None, index: Optional[int] = None):
         self.variety = variety
         self.planting_date = planting_date # Should be datetime object eventually
         self.harvest_date = harvest_date   # Should be datetime object eventually
-        self.current_growth_stage: Optional[str] = None # e.g., seedling, vegetative, flowering, maturity
+        self._store = store # PlotStateStore of the plot the crop grows on, or None
+        self._index = index
+        # Growth state while not on a plot; allocated only for crops off a plot
+        self._state: Optional[Dict[str, float]] = dict(CROP_STATE_DEFAULTS) if store is None else None
         self.health_status: float = 1.0 # 0.0 (dead) to 1.0 (perfect health)
         self.actual_yield_t_ha = actual_yield_t_ha
-        self.stress_factors: Dict[str, float] = {} # e.g., {'water_stress': 0.2, 'salinity_stress': 0.1}
+        self._stress_factors: Optional[Dict[str, float]] = None # Allocated by the first stress applied
 
-    def update_growth(self, weather_conditions, soil_conditions, water_availability):
-        """Placeholder for updating crop growth based on environmental factors."""
-        # This will be a complex model involving crop growth simulation
-        pass
+    @property
+    def stress_factors(self) -> Dict[str, float]:
+        """Stresses applied with apply_stress, e.g. {'pest_stress': 0.1}."""
+        if self._stress_factors is None:
+            self._stress_factors = {}
+        return self._stress_factors
+
+    @stress_factors.setter
+    def stress_factors(self, stress_factors: Dict[str, float]):
+        self._stress_factors = stress_factors or None
+
+    def _get(self, column: str):
+        if self._store is None:
+            return self._state[column]
+        return getattr(self._store, column)[self._index]
+
+    @property
+    def current_growth_stage(self) -> Optional[str]:
+        """One of GROWTH_STAGES, or None before the crop is planted."""
+        code = int(self._get("growth_stage"))
+        return GROWTH_STAGES[code] if code >= 0 else None
+
+    @current_growth_stage.setter
+    def current_growth_stage(self, stage: Optional[str]):
+        code = GROWTH_STAGES.index(stage) if stage in GROWTH_STAGES else -1
+        if self._store is None:
+            self._state["growth_stage"] = code
+        else:
+            self._store.growth_stage[self._index] = code
+
+    @property
+    def thermal_time_cd(self) -> float:
+        return float(self._get("thermal_time_cd"))
+
+    @property
+    def biomass_t_ha(self) -> float:
+        return float(self._get("biomass_t_ha"))
+
+    @property
+    def expected_yield_t_ha(self) -> float:
+        """Grain yield of the biomass grown so far."""
+        return self.biomass_t_ha * HARVEST_INDEX
+
+    @property
+    def water_stress(self) -> float:
+        """Mean water stress (0-1) over the crop's thermal time so far."""
+        thermal_time = self.thermal_time_cd
+        return float(self._get("water_stress_sum")) / thermal_time if thermal_time > 0 else 0.0
+
+    @property
+    def salinity_stress(self) -> float:
+        """Mean salinity stress (0-1) over the crop's thermal time so far."""
+        thermal_time = self.thermal_time_cd
+        return float(self._get("salinity_stress_sum")) / thermal_time if thermal_time > 0 else 0.0
+
+    def detach(self):
+        """Copies the growth state out of the plot's store row (e.g. at harvest, before the row is reused)."""
+        if self._store is not None:
+            self._state = {column: self._get(column).item() for column in CROP_STATE_DEFAULTS}
+            self._store, self._index = None, None
+
+    def update_growth(self, weather_conditions, soil_conditions, water_availability, model=None):
+        """
+        Grows the crop by one day of `weather_conditions` (precipitation_mm and mean
+        temperature) with `model` (an agriculture.crop_model.CropGrowthModel; the plot
+        store's growth_model if omitted), updating its plot's soil moisture. Crops not on a plot do
+        not grow. `soil_conditions` and `water_availability` are read from the plot's
+        store row.
+        """
+        if self._store is None:
+            return
+        model = model if model is not None else self._store.growth_model()
+        model.advance(
+            self._store, np.array([_weather_value(weather_conditions, "precipitation_mm")]),
+            np.array([_weather_value(weather_conditions, "mean_temp_c")]), num_days=1, rows=np.array([self._index]))
 
     def apply_stress(self, stress_type: str, stress_level: float):
         """Applies a stress factor to the crop, potentially affecting health and yield."""
@@ -91,3 +171,13 @@ class Crop:
 
     def __repr__(self):
         return f"Crop(variety='{self.variety.name}', stage='{self.current_growth_stage}')"
+
+def _weather_value(conditions, key: str) -> float:
+    """A weather value from a dict or an object such as WeatherParameters; NaN when missing."""
+    if conditions is None:
+        return np.nan
+    value = conditions.get(key) if isinstance(conditions, dict) else getattr(conditions, key, None)
+    if value is None and key == "mean_temp_c":
+        max_temp, min_temp = _weather_value(conditions, "max_temp_c"), _weather_value(conditions, "min_temp_c")
+        return (max_temp + min_temp) / 2
+    return np.nan if value is None else value
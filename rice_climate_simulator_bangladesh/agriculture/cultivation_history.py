@@ -0,0 +1,282 @@
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from .variety_catalog import SEASONS, VarietyCatalog
+
+# Stress columns every record has; other stress types (Crop.apply_stress) get a column when first recorded
+HISTORY_STRESS_COLUMNS = ("water_stress", "salinity_stress")
+
+class CultivationHistory:
+    """
+    Append-only log of the harvested crops of every plot of a PlotStateStore.
+
+    One record per harvest is a row of fixed-width columns: the plot row, the variety's
+    VarietyCatalog code, the season code, interned planting and harvest date strings,
+    the yield and one float32 column per stress type. Records of a plot are chained
+    from newest to oldest through `previous`, and `last`/`count` (indexed by plot row)
+    give each plot's newest record and history length.
+
+    With `retention` > 0 only a plot's `retention` most recent records are kept: older
+    ones drop out of its history and their rows are reclaimed when the log is full,
+    so memory stays bounded by the number of plots times the retention window. Per-plot
+    access goes through PlotHistory views (FarmPlot.cultivation_history), which read
+    records as the dicts plots used to keep.
+    """
+    COLUMNS: Dict[str, tuple] = {
+        "plot_row": (np.int32, -1),
+        "previous": (np.int64, -1), # Record before this one on the same plot; -1 for the oldest
+        "variety_code": (np.int32, -1),
+        "season_code": (np.int8, -1),
+        "planting_date_code": (np.int32, -1),
+        "harvest_date_code": (np.int32, -1),
+        "yield_t_ha": (np.float64, np.nan),
+    }
+
+    def __init__(self, catalog: VarietyCatalog, retention: int = 0, capacity: int = 0):
+        self.catalog = catalog
+        self.retention = max(0, retention or 0)
+        self.size = 0 # Number of record rows in use (including ones no longer reachable)
+        self._capacity = max(1, capacity)
+        for name, (dtype, default) in self.COLUMNS.items():
+            setattr(self, name, np.full(self._capacity, default, dtype=dtype))
+        self.stress: Dict[str, np.ndarray] = {name: np.full(self._capacity, np.nan, dtype=np.float32)
+                                              for name in HISTORY_STRESS_COLUMNS}
+        self.last = np.full(0, -1, dtype=np.int64) # Newest record of each plot row
+        self.count = np.zeros(0, dtype=np.int32) # Records in each plot row's history
+        self._strings: List[Optional[str]] = [] # Interned date strings, by code
+        self._string_codes: Dict[Optional[str], int] = {}
+
+    def __len__(self):
+        return int(self.count.sum())
+
+    @property
+    def nbytes(self) -> int:
+        columns = [getattr(self, name) for name in self.COLUMNS] + list(self.stress.values())
+        return sum(column.nbytes for column in columns) + self.last.nbytes + self.count.nbytes
+
+    def _intern(self, value: Optional[str]) -> int:
+        code = self._string_codes.get(value)
+        if code is None:
+            code = self._string_codes[value] = len(self._strings)
+            self._strings.append(value)
+        return code
+
+    def _ensure_plot_rows(self, num_rows: int):
+        if num_rows > len(self.last):
+            new_size = max(num_rows, 2 * len(self.last))
+            self.last = np.concatenate([self.last, np.full(new_size - len(self.last), -1, dtype=np.int64)])
+            self.count = np.concatenate([self.count, np.zeros(new_size - len(self.count), dtype=np.int32)])
+
+    def _stress_column(self, name: str) -> np.ndarray:
+        column = self.stress.get(name)
+        if column is None:
+            column = self.stress[name] = np.full(self._capacity, np.nan, dtype=np.float32)
+        return column
+
+    def _reserve(self, num_records: int) -> int:
+        """Makes room for `num_records` new rows (reclaiming dropped records first) and returns the first row."""
+        if self.size + num_records > self._capacity:
+            if self.size - len(self) >= self.size // 2:
+                self._compact()
+            if self.size + num_records > self._capacity:
+                self._grow(max(self.size + num_records, 2 * self._capacity))
+        first = self.size
+        self.size += num_records
+        return first
+
+    def _grow(self, new_capacity: int):
+        for name, (dtype, default) in self.COLUMNS.items():
+            column = np.full(new_capacity, default, dtype=dtype)
+            column[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, column)
+        for name, values in self.stress.items():
+            column = np.full(new_capacity, np.nan, dtype=np.float32)
+            column[:self.size] = values[:self.size]
+            self.stress[name] = column
+        self._capacity = new_capacity
+
+    def _compact(self):
+        """Drops records outside their plot's history and relinks the rest, keeping their order."""
+        used = np.arange(self.size)
+        plot_rows = self.plot_row[:self.size].astype(np.int64)
+        # Newest first within each plot: a record is kept while its depth is below the plot's count
+        order = used[np.lexsort((-used, plot_rows))]
+        sorted_rows = plot_rows[order]
+        group_start = np.r_[0, np.flatnonzero(np.diff(sorted_rows)) + 1]
+        depth = np.arange(len(order)) - np.repeat(group_start, np.diff(np.r_[group_start, len(order)]))
+        keep_sorted = (sorted_rows >= 0) & (depth < self.count[np.maximum(sorted_rows, 0)])
+        kept = np.sort(order[keep_sorted])
+
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            column[:len(kept)] = column[kept]
+            column[len(kept):self.size] = self.COLUMNS[name][1]
+        for column in self.stress.values():
+            column[:len(kept)] = column[kept]
+            column[len(kept):self.size] = np.nan
+        self.size = len(kept)
+        self._link(np.arange(self.size), reset=True)
+
+    def _link(self, records: np.ndarray, reset: bool = False):
+        """
+        Chains `records` (ascending rows, oldest first per plot) after each plot's current
+        newest record, or from scratch with `reset`, and updates `last` and `count`.
+        """
+        plot_rows = self.plot_row[records].astype(np.int64)
+        order = np.lexsort((records, plot_rows))
+        records, plot_rows = records[order], plot_rows[order]
+        first_of_plot = np.r_[True, plot_rows[1:] != plot_rows[:-1]] if len(records) else np.zeros(0, dtype=bool)
+        if reset:
+            self.last[:] = -1
+            self.count[:] = 0
+        previous = np.empty(len(records), dtype=np.int64)
+        previous[1:] = records[:-1]
+        previous[first_of_plot] = self.last[plot_rows[first_of_plot]]
+        self.previous[records] = previous
+        last_of_plot = np.r_[first_of_plot[1:], True] if len(records) else first_of_plot
+        added = np.diff(np.r_[np.flatnonzero(first_of_plot), len(records)])
+        plots = plot_rows[last_of_plot]
+        self.last[plots] = records[last_of_plot]
+        count = self.count[plots].astype(np.int64) + added
+        self.count[plots] = np.minimum(count, self.retention) if self.retention else count
+
+    def append(self, plot_row: int, variety_code: int, planting_date: Optional[str], harvest_date: Optional[str],
+               yield_t_ha: float, stress_factors: Mapping[str, float], season_code: Optional[int] = None):
+        """Records one harvest of `plot_row`; the season defaults to the variety's."""
+        self._ensure_plot_rows(plot_row + 1)
+        record = self._reserve(1)
+        self.plot_row[record] = plot_row
+        self.variety_code[record] = variety_code
+        self.season_code[record] = self.catalog.season_codes[variety_code] if season_code is None else season_code
+        self.planting_date_code[record] = self._intern(planting_date)
+        self.harvest_date_code[record] = self._intern(harvest_date)
+        self.yield_t_ha[record] = yield_t_ha
+        for name, value in stress_factors.items():
+            self._stress_column(name)[record] = value
+        self.previous[record] = self.last[plot_row]
+        self.last[plot_row] = record
+        count = self.count[plot_row] + 1
+        self.count[plot_row] = min(count, self.retention) if self.retention else count
+
+    def extend(self, plot_rows: np.ndarray, variety_codes: np.ndarray, season_codes: np.ndarray,
+               planting_dates: Sequence[Optional[str]], harvest_dates: Sequence[Optional[str]],
+               yields_t_ha: np.ndarray, stress: Mapping[str, np.ndarray]):
+        """Appends many records at once, given oldest first for each plot (e.g. restored from a checkpoint)."""
+        num_records = len(plot_rows)
+        if num_records == 0:
+            return
+        self._ensure_plot_rows(int(np.max(plot_rows)) + 1)
+        first = self._reserve(num_records)
+        records = np.arange(first, first + num_records)
+        self.plot_row[records] = plot_rows
+        self.variety_code[records] = variety_codes
+        self.season_code[records] = season_codes
+        self.planting_date_code[records] = [self._intern(value) for value in planting_dates]
+        self.harvest_date_code[records] = [self._intern(value) for value in harvest_dates]
+        self.yield_t_ha[records] = yields_t_ha
+        for name, values in stress.items():
+            self._stress_column(name)[records] = values
+        self._link(records)
+
+    def clear_plot(self, plot_row: int):
+        """Empties a plot's history; its records are reclaimed at the next compaction."""
+        self._ensure_plot_rows(plot_row + 1)
+        self.last[plot_row] = -1
+        self.count[plot_row] = 0
+
+    def plot_records(self, plot_row: int) -> np.ndarray:
+        """Record rows of a plot's history, oldest first."""
+        count = int(self.count[plot_row]) if plot_row < len(self.count) else 0
+        records = np.empty(count, dtype=np.int64)
+        record = self.last[plot_row] if count else -1
+        for i in range(count - 1, -1, -1):
+            records[i] = record
+            record = self.previous[record]
+        return records
+
+    def ordered_records(self, num_plot_rows: int):
+        """(record rows grouped by plot row and oldest first, per-plot offsets into them): the whole history in plot order."""
+        self._ensure_plot_rows(num_plot_rows)
+        counts = self.count[:num_plot_rows].astype(np.int64)
+        offsets = np.r_[0, np.cumsum(counts)]
+        records = np.empty(offsets[-1], dtype=np.int64)
+        for depth in range(int(counts.max()) if len(counts) else 0): # Walk all chains together, newest first
+            plots = np.flatnonzero(counts > depth)
+            current = self.last[plots] if depth == 0 else self.previous[records[offsets[plots] + counts[plots] - depth]]
+            records[offsets[plots] + counts[plots] - 1 - depth] = current
+        return records, offsets
+
+    def strings(self, codes: np.ndarray) -> List[Optional[str]]:
+        return [self._strings[code] for code in codes.tolist()]
+
+    def record(self, record: int) -> dict:
+        """A record as the dict FarmPlot.harvest_crop used to append."""
+        stress_factors = {}
+        for name, column in self.stress.items():
+            value = column[record]
+            if name in HISTORY_STRESS_COLUMNS or not np.isnan(value):
+                stress_factors[name] = float(value)
+        return {
+            "variety_id": self.catalog.variety(int(self.variety_code[record])).variety_id,
+            "season": SEASONS[self.season_code[record]].name,
+            "planting_date": self._strings[self.planting_date_code[record]],
+            "harvest_date": self._strings[self.harvest_date_code[record]],
+            "yield_t_ha": float(self.yield_t_ha[record]),
+            "stress_factors": stress_factors,
+        }
+
+    def plot_view(self, plot_row: int) -> "PlotHistory":
+        return PlotHistory(self, plot_row)
+
+    def __repr__(self):
+        return (f"CultivationHistory(records={len(self)}, rows={self.size}, retention={self.retention or None}, "
+                f"stress={list(self.stress)})")
+
+class PlotHistory(Sequence):
+    """
+    One plot's cultivation history as a read-mostly sequence of record dicts, oldest
+    first, e.g. `plot.cultivation_history[-1]['variety_id']`. Dicts are built on access.
+    """
+    __slots__ = ("history", "plot_row")
+
+    def __init__(self, history: CultivationHistory, plot_row: int):
+        self.history = history
+        self.plot_row = plot_row
+
+    def __len__(self):
+        count = self.history.count
+        return int(count[self.plot_row]) if self.plot_row < len(count) else 0
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self.history.record(record) for record in self.history.plot_records(self.plot_row)[index]]
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("cultivation history index out of range")
+        if index == length - 1:
+            return self.history.record(int(self.history.last[self.plot_row]))
+        return self.history.record(int(self.history.plot_records(self.plot_row)[index]))
+
+    def __iter__(self) -> Iterator[dict]:
+        return (self.history.record(record) for record in self.history.plot_records(self.plot_row))
+
+    def append(self, record: Mapping):
+        """Appends a record dict (keys as returned by indexing)."""
+        history = self.history
+        history.append(self.plot_row, history.catalog.code(record["variety_id"]), record.get("planting_date"),
+                       record.get("harvest_date"), record.get("yield_t_ha", np.nan), record.get("stress_factors", {}),
+                       season_code=SEASONS.index(_season(record["season"])) if record.get("season") else None)
+
+    def __eq__(self, other):
+        if isinstance(other, (PlotHistory, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"PlotHistory(plot_row={self.plot_row}, records={len(self)})"
+
+def _season(name: str):
+    return next(season for season in SEASONS if season.name == name)
@@ -1,26 +1,55 @@
-from typing import Optional, Dict, List
+from typing import Iterable, Mapping, Optional
 from uuid import uuid4
 
 # from ..geography.spatial_units import AdministrativeUnit # For location context
-from .crops import Crop, RiceVariety, RiceSeason
+from .crops import Crop, RiceVariety, RiceSeason, CROP_STATE_DEFAULTS
+from .cultivation_history import PlotHistory
+from .plot_store import PlotStateStore, column_property
+from utils.event_log import EventLog, EventType
+from utils.logging_setup import get_logger
+
+logger = get_logger(__name__)
 
 class SoilProperties:
-    """Represents soil characteristics of a farm plot."""
+    """Represents soil characteristics of a farm plot.
+
+    Salinity, moisture and water holding capacity live in a PlotStateStore row;
+    a standalone instance gets its own single-row store until it is attached to a plot.
+    """
+    __slots__ = ("_store", "_index", "soil_type", "organic_matter_percent", "ph", "available_nitrogen_kg_ha",
+                 "available_phosphorus_kg_ha", "available_potassium_kg_ha")
+    salinity_ds_m = column_property("salinity_ds_m") # Current soil salinity
+    initial_salinity_ds_m = column_property("initial_salinity_ds_m") # For tracking changes
+    water_holding_capacity_mm = column_property("water_holding_capacity_mm") # Example, depends on soil type
+    current_soil_moisture_mm = column_property("soil_moisture_mm") # Current available water in root zone
+
     def __init__(self, soil_type: str = "Loam", organic_matter_percent: float = 1.5,
                  ph: float = 6.5, salinity_ds_m: float = 1.0, # dS/m (deciSiemens per meter)
                  available_nitrogen_kg_ha: float = 100.0,
                  available_phosphorus_kg_ha: float = 20.0,
-                 available_potassium_kg_ha: float = 150.0):
+                 available_potassium_kg_ha: float = 150.0,
+                 store: Optional[PlotStateStore] = None, index: Optional[int] = None):
+        self._store = store if store is not None else PlotStateStore(capacity=1)
+        self._index = index if index is not None else self._store.allocate()
         self.soil_type = soil_type
         self.organic_matter_percent = organic_matter_percent
         self.ph = ph
-        self.salinity_ds_m = salinity_ds_m # Current soil salinity
-        self.initial_salinity_ds_m = salinity_ds_m # For tracking changes
+        self.salinity_ds_m = salinity_ds_m
+        self.initial_salinity_ds_m = salinity_ds_m
         self.available_nitrogen_kg_ha = available_nitrogen_kg_ha
         self.available_phosphorus_kg_ha = available_phosphorus_kg_ha
         self.available_potassium_kg_ha = available_potassium_kg_ha
-        self.water_holding_capacity_mm: float = 150 # Example, depends on soil type
-        self.current_soil_moisture_mm: float = 100 # Current available water in root zone
+        self.water_holding_capacity_mm = 150
+        self.current_soil_moisture_mm = 100
+
+    def attach(self, store: PlotStateStore, index: int):
+        """Moves this soil's stored state into row `index` of `store` and rebinds the view to it."""
+        if store is self._store and index == self._index:
+            return
+        for name in ("salinity_ds_m", "initial_salinity_ds_m", "soil_moisture_mm", "water_holding_capacity_mm"):
+            getattr(store, name)[index] = getattr(self._store, name)[self._index]
+        self._store = store
+        self._index = index
 
     def update_salinity(self, change_ds_m: float):
         self.salinity_ds_m += change_ds_m
@@ -35,83 +64,136 @@ class SoilProperties:
         return f"SoilProperties(type='{self.soil_type}', salinity={self.salinity_ds_m:.2f} dS/m)"
 
 class FarmPlot:
-    """Represents an individual farm plot with specific characteristics."""
+    """Represents an individual farm plot with specific characteristics.
+
+    Numeric state is held in a row of a shared PlotStateStore so that the engine
+    can update all plots at once; this object is a thin view over that row.
+    """
+    __slots__ = ("_store", "_index", "plot_id", "owner_agent_id", "soil", "current_crop", "irrigation_type")
+    size_ha = column_property("size_ha") # Size of the plot in hectares
+    land_quality = column_property("land_quality") # Can degrade or improve over time
+    is_irrigated = column_property("is_irrigated", bool) # Whether the plot has access to irrigation
+    water_source_reliability = column_property("water_source_reliability") # 0 to 1, higher is more reliable
+
     def __init__(self, plot_id: str, owner_agent_id: str, size_ha: float,
                  # location: AdministrativeUnit, # Link to geographic unit
                  soil_properties: Optional[SoilProperties] = None,
-                 initial_land_quality: float = 1.0 # 0 to 1, higher is better
+                 initial_land_quality: float = 1.0, # 0 to 1, higher is better
+                 store: Optional[PlotStateStore] = None, # Shared columnar state; a private one is created if omitted
+                 index: Optional[int] = None # Row already reserved in `store` (bulk construction); allocated if omitted
                  ):
+        self._store = store if store is not None else PlotStateStore(capacity=1)
+        self._index = index if index is not None else self._store.allocate()
         self.plot_id = plot_id if plot_id else str(uuid4())
         self.owner_agent_id = owner_agent_id # ID of the FarmerAgent who owns/manages this plot
-        self.size_ha = size_ha # Size of the plot in hectares
+        self.size_ha = size_ha
         # self.location = location # Geographic context
-        self.soil = soil_properties if soil_properties else SoilProperties()
-        self.land_quality = initial_land_quality # Can degrade or improve over time
+        self.soil = soil_properties if soil_properties else SoilProperties(store=self._store, index=self._index)
+        self.soil.attach(self._store, self._index)
+        self.land_quality = initial_land_quality
         self.current_crop: Optional[Crop] = None
-        self.cultivation_history: List[Dict] = [] # Record of past crops, yields, inputs
-        self.is_irrigated: bool = False # Whether the plot has access to irrigation
+        self.is_irrigated = False
         self.irrigation_type: Optional[str] = None # e.g., 'groundwater_stw', 'surface_canal'
-        self.water_source_reliability: float = 1.0 # 0 to 1, higher is more reliable
+        self.water_source_reliability = 1.0
+
+    @property
+    def cultivation_history(self) -> PlotHistory:
+        """Record of past crops and yields, kept in the store's shared CultivationHistory."""
+        return self._store.history.plot_view(self._index)
+
+    @cultivation_history.setter
+    def cultivation_history(self, records: Iterable[Mapping]):
+        history = self._store.history.plot_view(self._index)
+        records = list(records) # May be this plot's own history
+        self._store.history.clear_plot(self._index)
+        for record in records:
+            history.append(record)
+
+    @property
+    def event_log(self) -> EventLog:
+        """Log this plot's events (and its owner's decisions about it) are recorded into."""
+        return self._store.events()
+
+    @property
+    def store_index(self) -> int:
+        """Row of this plot in its PlotStateStore."""
+        return self._index
 
     def plant_crop(self, variety: RiceVariety, planting_date: str, season: RiceSeason):
         if self.current_crop:
-            print(f"Warning: Plot {self.plot_id} already has a crop: {self.current_crop.variety.name}. Cannot plant new crop.")
+            logger.warning("Plot %s already has a crop: %s. Cannot plant new crop.", self.plot_id, self.current_crop.variety.name)
             return False
         if variety.season != season:
-            print(f"Warning: Variety {variety.name} is for {variety.season.name}, not suitable for current {season.name}.")
+            logger.warning("Variety %s is for %s, not suitable for current %s.", variety.name, variety.season.name, season.name)
             return False
         
-        self.current_crop = Crop(variety=variety, planting_date=planting_date)
-        print(f"Plot {self.plot_id}: Planted {variety.name} for {season.name} season on {planting_date}.")
+        for column, value in CROP_STATE_DEFAULTS.items():
+            getattr(self._store, column)[self._index] = value
+        self.current_crop = Crop(variety=variety, planting_date=planting_date, store=self._store, index=self._index)
+        self.current_crop.current_growth_stage = "seedling"
+        self._store.has_crop[self._index] = True
+        self._store.crop_variety_code[self._index] = self._store.variety_code(variety)
+        if self._store.changed_rows is not None:
+            self._store.changed_rows.append(self._index)
+        logger.debug("Plot %s: Planted %s for %s season on %s.", self.plot_id, variety.name, season.name, planting_date)
+        self._store.events().record(EventType.PLANTED, self.owner_agent_id, self.plot_id, value=self.size_ha, detail=variety.variety_id)
         return True
 
     def harvest_crop(self, harvest_date: str, actual_yield_t_ha: float) -> Optional[Crop]:
         if not self.current_crop:
-            print(f"Warning: No crop to harvest on plot {self.plot_id}.")
+            logger.warning("No crop to harvest on plot %s.", self.plot_id)
             return None
         
         harvested_crop = self.current_crop
         harvested_crop.harvest_date = harvest_date
         harvested_crop.actual_yield_t_ha = actual_yield_t_ha
+        harvested_crop.detach()
         
-        self.cultivation_history.append({
-            'variety_id': harvested_crop.variety.variety_id,
-            'season': harvested_crop.variety.season.name,
-            'planting_date': harvested_crop.planting_date,
-            'harvest_date': harvest_date,
-            'yield_t_ha': actual_yield_t_ha,
-            'stress_factors': harvested_crop.stress_factors.copy()
-        })
+        self._store.history.append(
+            self._index, self._store.variety_code(harvested_crop.variety), harvested_crop.planting_date, harvest_date,
+            actual_yield_t_ha, {'water_stress': harvested_crop.water_stress,
+                                'salinity_stress': harvested_crop.salinity_stress, **harvested_crop.stress_factors})
         self.current_crop = None
-        print(f"Plot {self.plot_id}: Harvested {harvested_crop.variety.name}, yield: {actual_yield_t_ha:.2f} t/ha.")
+        self._store.has_crop[self._index] = False
+        self._store.crop_variety_code[self._index] = -1
+        self._store.harvest_t[self._index] += actual_yield_t_ha * self.size_ha
+        if self._store.changed_rows is not None:
+            self._store.changed_rows.append(self._index)
+        logger.debug("Plot %s: Harvested %s, yield: %.2f t/ha.", self.plot_id, harvested_crop.variety.name, actual_yield_t_ha)
+        self._store.events().record(EventType.HARVESTED, self.owner_agent_id, self.plot_id, value=actual_yield_t_ha,
+                               detail=harvested_crop.variety.variety_id)
         return harvested_crop
 
     def apply_irrigation(self, amount_mm: float):
         if self.is_irrigated and self.current_crop:
             self.soil.update_soil_moisture(rainfall_mm=0, irrigation_mm=amount_mm, et_crop_mm=0) # ET handled separately
-            print(f"Plot {self.plot_id}: Applied {amount_mm}mm of irrigation.")
+            logger.debug("Plot %s: Applied %smm of irrigation.", self.plot_id, amount_mm)
         elif not self.is_irrigated:
-            print(f"Plot {self.plot_id}: Cannot irrigate, plot is not set up for irrigation.")
+            logger.debug("Plot %s: Cannot irrigate, plot is not set up for irrigation.", self.plot_id)
         elif not self.current_crop:
-            print(f"Plot {self.plot_id}: No crop to irrigate.")
+            logger.debug("Plot %s: No crop to irrigate.", self.plot_id)
 
-    def update_plot_conditions(self, daily_weather, hydrological_conditions):
-        """Update soil conditions, crop growth based on external factors."""
-        # Update soil moisture from rainfall (ET will be part of crop model)
-        # rainfall = daily_weather.precipitation_mm if daily_weather else 0
-        # self.soil.update_soil_moisture(rainfall_mm=rainfall, irrigation_mm=0, et_crop_mm=0) 
-        
+    def update_plot_conditions(self, daily_weather, hydrological_conditions, crop_model=None):
+        """Update soil conditions and grow the crop by one day of external conditions.
+
+        PlotStateStore.update_all_plot_conditions and CropGrowthModel.advance apply the
+        same updates to every plot at once.
+        """
         # Update soil salinity based on hydrological conditions (e.g., river salinity, groundwater)
-        # self.soil.update_salinity(change_ds_m=hydrological_conditions.get('salinity_change', 0))
-        
+        if hydrological_conditions is not None:
+            self.soil.update_salinity(change_ds_m=_condition_value(hydrological_conditions, 'salinity_change'))
+
         if self.current_crop:
-            # self.current_crop.update_growth(daily_weather, self.soil, self.water_source_reliability)
-            # Apply stresses based on conditions
-            # if self.soil.current_soil_moisture_mm < some_threshold:
-            #     self.current_crop.apply_stress('water_stress', 0.1)
-            # if self.soil.salinity_ds_m > self.current_crop.variety.attributes.get('salinity_tolerance_ds_m', 100):
-            #     self.current_crop.apply_stress('salinity_stress', 0.2)
-            pass
+            # The crop model runs the day's water balance, including crop evapotranspiration
+            self.current_crop.update_growth(daily_weather, self.soil, self.water_source_reliability, model=crop_model)
+        elif daily_weather is not None:
+            rainfall = _condition_value(daily_weather, 'precipitation_mm')
+            self.soil.update_soil_moisture(rainfall_mm=rainfall, irrigation_mm=0, et_crop_mm=0)
 
     def __repr__(self):
         return f"FarmPlot(id='{self.plot_id}', size={self.size_ha}ha, owner='{self.owner_agent_id}')"
+
+def _condition_value(conditions, key: str) -> float:
+    """Reads a value from either a dict of conditions or an object such as WeatherParameters."""
+    value = conditions.get(key) if isinstance(conditions, dict) else getattr(conditions, key, None)
+    return value if value is not None else 0
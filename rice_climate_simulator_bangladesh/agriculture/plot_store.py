@@ -0,0 +1,143 @@
+from typing import Dict, List, Mapping, Optional
+
+import numpy as np
+
+from .crops import RiceVariety
+from .cultivation_history import CultivationHistory
+from .variety_catalog import VarietyCatalog, DEFAULT_VARIETY_CATALOG
+from utils.event_log import EventLog, get_event_log
+
+class PlotStateStore:
+    """
+    Columnar (structure-of-arrays) store for the mutable state of many farm plots.
+
+    Each plot owns one row, addressed by an integer index. FarmPlot and
+    SoilProperties objects are thin views over a row, so per-plot code keeps
+    working while engine-level code can update every plot in one array pass.
+    """
+    # column name -> (dtype, default value for newly allocated rows)
+    COLUMNS: Dict[str, tuple] = {
+        "salinity_ds_m": (np.float64, 1.0),
+        "initial_salinity_ds_m": (np.float64, 1.0),
+        "soil_moisture_mm": (np.float64, 100.0),
+        "water_holding_capacity_mm": (np.float64, 150.0),
+        "land_quality": (np.float64, 1.0),
+        "size_ha": (np.float64, 0.0),
+        "is_irrigated": (np.bool_, False),
+        "water_source_reliability": (np.float64, 1.0),
+        "has_crop": (np.bool_, False),
+        "crop_variety_code": (np.int32, -1), # VarietyCatalog code; -1 means no crop on the plot
+        "harvest_t": (np.float64, 0.0), # Tonnes harvested on the plot in the current step
+        # Growth state of the plot's crop (see crops.CROP_STATE_DEFAULTS and crop_model)
+        "growth_stage": (np.int8, -1),
+        "crop_days": (np.int32, 0),
+        "thermal_time_cd": (np.float64, 0.0),
+        "biomass_t_ha": (np.float64, 0.0),
+        "water_stress_sum": (np.float64, 0.0),
+        "salinity_stress_sum": (np.float64, 0.0),
+    }
+
+    def __init__(self, capacity: int = 0, catalog: Optional[VarietyCatalog] = None, history_retention: int = 0,
+                 event_log: Optional[EventLog] = None, crop_model=None):
+        self.size = 0 # Number of allocated rows
+        self._capacity = max(1, capacity)
+        for name, (dtype, default) in self.COLUMNS.items():
+            setattr(self, name, np.full(self._capacity, default, dtype=dtype))
+        self.catalog = catalog if catalog is not None else DEFAULT_VARIETY_CATALOG
+        # Harvest records of every row; history_retention > 0 keeps only each plot's most recent ones
+        self.history = CultivationHistory(self.catalog, retention=history_retention)
+        self.changed_rows: Optional[List[int]] = None # Rows planted or harvested since take_changed_rows, when tracked
+        # Log the store's plots and their farmers record events into (an engine's); None uses utils.event_log's default
+        self.event_log: Optional[EventLog] = event_log
+        # CropGrowthModel of per-plot growth (Crop.update_growth without a model); see growth_model
+        self.crop_model = crop_model
+
+    def __len__(self):
+        return self.size
+
+    def growth_model(self):
+        """The store's crop_model (an engine's), or a default-parameter CropGrowthModel of its catalog built once."""
+        if self.crop_model is None:
+            from .crop_model import CropGrowthModel # crop_model imports this module
+            self.crop_model = CropGrowthModel(self.catalog)
+        return self.crop_model
+
+    def _grow(self, min_capacity: int):
+        new_capacity = max(min_capacity, 2 * self._capacity)
+        for name, (dtype, default) in self.COLUMNS.items():
+            column = np.full(new_capacity, default, dtype=dtype)
+            column[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, column)
+        self._capacity = new_capacity
+
+    def allocate(self, count: int = 1) -> int:
+        """Reserves `count` new rows initialised to column defaults and returns the first index."""
+        if self.size + count > self._capacity:
+            self._grow(self.size + count)
+        first_index = self.size
+        self.size += count
+        return first_index
+
+    def track_changes(self, enabled: bool = True):
+        """Starts (or stops) collecting the rows that FarmPlot.plant_crop and harvest_crop change."""
+        self.changed_rows = [] if enabled else None
+
+    def take_changed_rows(self) -> np.ndarray:
+        """Rows planted or harvested since the previous call (sorted, unique), and starts a new collection."""
+        rows = np.unique(np.array(self.changed_rows or (), dtype=np.int64))
+        if self.changed_rows is not None:
+            self.changed_rows = []
+        return rows
+
+    def events(self) -> EventLog:
+        """The log events of the store's plots go to: its own, or the default log when it has none."""
+        return self.event_log if self.event_log is not None else get_event_log()
+
+    def column(self, name: str) -> np.ndarray:
+        """Returns a view of the allocated part of a column."""
+        return getattr(self, name)[:self.size]
+
+    def variety_code(self, variety: RiceVariety) -> int:
+        """
+        Catalog code of a variety for the crop_variety_code column. Raises KeyError for
+        a variety not in the store's catalog (and ValueError for one that differs from
+        the catalog's under the same id); a store that plants other varieties needs a
+        catalog holding them, e.g. DEFAULT_VARIETY_CATALOG.copy(extra_varieties).
+        """
+        return self.catalog.code_of(variety)
+
+    def update_all_plot_conditions(self, weather: Optional[Mapping[str, np.ndarray]] = None,
+                                   hydrology: Optional[Mapping[str, np.ndarray]] = None):
+        """
+        Vectorized equivalent of the soil updates of FarmPlot.update_plot_conditions for
+        plots without a crop; crop_model.CropGrowthModel.advance grows the crops and runs
+        their water balance.
+
+        Args:
+            weather (Mapping): Per-plot arrays indexed by row, e.g. {'precipitation_mm': ...}.
+            hydrology (Mapping): Per-plot arrays indexed by row, e.g. {'salinity_change': ...}.
+        """
+        n = self.size
+        if weather is not None and "precipitation_mm" in weather:
+            # Same semantics as SoilProperties.update_soil_moisture with no irrigation or ET
+            moisture = self.soil_moisture_mm[:n]
+            np.add(moisture, weather["precipitation_mm"], out=moisture)
+            np.clip(moisture, 0, self.water_holding_capacity_mm[:n], out=moisture)
+        if hydrology is not None and "salinity_change" in hydrology:
+            # Same semantics as SoilProperties.update_salinity
+            salinity = self.salinity_ds_m[:n]
+            np.add(salinity, hydrology["salinity_change"], out=salinity)
+            np.maximum(salinity, 0, out=salinity)
+
+    def __repr__(self):
+        return f"PlotStateStore(plots={self.size})"
+
+def column_property(column_name: str, cast=float):
+    """Builds a property that reads/writes one store column at the view's row index."""
+    def getter(self):
+        return cast(getattr(self._store, column_name)[self._index])
+
+    def setter(self, value):
+        getattr(self._store, column_name)[self._index] = value
+
+    return property(getter, setter)
@@ -0,0 +1,278 @@
+import csv
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from .crops import RiceVariety, RiceSeason
+
+DEFAULT_VARIETIES_PATH = os.path.join(os.path.dirname(__file__), "data", "rice_varieties.csv")
+
+SEASONS: List[RiceSeason] = list(RiceSeason) # season code -> RiceSeason
+TOLERANCE_FLAGS = ("is_hyv", "is_salt_tolerant", "is_drought_tolerant", "is_flood_tolerant")
+_NUMERIC_FIELDS = {
+    "maturity_days": int,
+    "potential_yield_t_ha": float,
+    "water_requirement_mm": int,
+    "input_costs_bdt_ha": float,
+}
+
+class VarietyCatalog(Mapping[str, RiceVariety]):
+    """
+    Indexed collection of rice varieties.
+
+    Behaves as a read-only mapping of variety_id -> RiceVariety (in catalog order) and
+    assigns each variety an integer code, its position in that order, for array-based
+    engines. Variety attributes are also kept as columns (numpy arrays indexed by code)
+    together with precomputed indexes:
+      * codes per season and per tolerance flag,
+      * salt-tolerant codes sorted by salinity tolerance, so "tolerant to >= X dS/m"
+        is a binary search,
+      * codes ranked by yield per season,
+      * running-best tables so the decision rules of FarmerAgent._select_rice_variety
+        resolve with one binary search whatever the catalog size.
+    """
+    def __init__(self, varieties: Iterable[RiceVariety] = ()):
+        self.varieties: List[RiceVariety] = []
+        self._codes: Dict[str, int] = {}
+        for variety in varieties:
+            if variety.variety_id in self._codes:
+                raise ValueError(f"Duplicate variety id in catalog: {variety.variety_id}")
+            self._codes[variety.variety_id] = len(self.varieties)
+            self.varieties.append(variety)
+        self._build_indexes()
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping[str, object]]) -> "VarietyCatalog":
+        """Builds a catalog from flat records (CSV rows or JSON objects).
+
+        Known RiceVariety fields are parsed; `season` may be an enum name (e.g. "BORO")
+        or value; empty cells fall back to RiceVariety defaults; any other column,
+        including salinity_tolerance_ds_m, goes into the variety's attributes.
+        """
+        varieties = []
+        for record in records:
+            kwargs = {"variety_id": str(record["variety_id"]), "name": str(record.get("name") or record["variety_id"]),
+                      "season": _parse_season(record["season"])}
+            attributes = {}
+            for key, value in record.items():
+                if key in ("variety_id", "name", "season") or value is None or value == "":
+                    continue
+                if key in TOLERANCE_FLAGS:
+                    kwargs[key] = _parse_bool(value)
+                elif key in _NUMERIC_FIELDS:
+                    kwargs[key] = _NUMERIC_FIELDS[key](float(value))
+                else:
+                    attributes[key] = _parse_number(value)
+            varieties.append(RiceVariety(attributes=attributes, **kwargs))
+        return cls(varieties)
+
+    @classmethod
+    def from_csv(cls, file_path: str) -> "VarietyCatalog":
+        """Loads a catalog from a CSV file with one variety per row."""
+        with open(file_path, newline="") as f:
+            return cls.from_records(csv.DictReader(f))
+
+    @classmethod
+    def from_json(cls, file_path: str) -> "VarietyCatalog":
+        """Loads a catalog from a JSON list of variety objects (or {"varieties": [...]})."""
+        with open(file_path, "r") as f:
+            data = json.load(f)
+        return cls.from_records(data["varieties"] if isinstance(data, dict) else data)
+
+    @classmethod
+    def load(cls, file_path: str) -> "VarietyCatalog":
+        """Loads a catalog from a .csv or .json file."""
+        if file_path.lower().endswith(".json"):
+            return cls.from_json(file_path)
+        return cls.from_csv(file_path)
+
+    def copy(self, extra_varieties: Iterable[RiceVariety] = ()) -> "VarietyCatalog":
+        """A separate catalog with this one's varieties followed by `extra_varieties`."""
+        return VarietyCatalog(list(self.varieties) + list(extra_varieties))
+
+    def add(self, variety: RiceVariety) -> int:
+        """
+        Adds a variety to this catalog (or returns the code of an identical one) and
+        refreshes the indexes. Raises ValueError for a different variety under an id
+        already in the catalog, and for DEFAULT_VARIETY_CATALOG, which every engine
+        shares: add to a `copy()` of it instead.
+        """
+        code = self._codes.get(variety.variety_id)
+        if code is not None:
+            self._check_same(code, variety)
+            return code
+        if self is DEFAULT_VARIETY_CATALOG:
+            raise ValueError(f"Cannot add variety '{variety.variety_id}' to the shared default catalog; "
+                             "add it to DEFAULT_VARIETY_CATALOG.copy() instead.")
+        code = len(self.varieties)
+        self._codes[variety.variety_id] = code
+        self.varieties.append(variety)
+        self._build_indexes()
+        return code
+
+    def _check_same(self, code: int, variety: RiceVariety):
+        known = self.varieties[code]
+        if known is not variety and _variety_fields(known) != _variety_fields(variety):
+            raise ValueError(f"Variety '{variety.variety_id}' differs from the catalog's variety with that id.")
+
+    def _build_indexes(self):
+        varieties = self.varieties
+        self.season_codes = np.array([SEASONS.index(v.season) for v in varieties], dtype=np.int8)
+        for flag in TOLERANCE_FLAGS:
+            setattr(self, flag, np.array([getattr(v, flag) for v in varieties], dtype=bool))
+        self.maturity_days = np.array([v.maturity_days for v in varieties], dtype=np.int32)
+        self.potential_yield_t_ha = np.array([v.potential_yield_t_ha for v in varieties], dtype=np.float64)
+        self.water_requirement_mm = np.array([v.water_requirement_mm for v in varieties], dtype=np.float64)
+        self.input_costs_bdt_ha = np.array([v.input_costs_bdt_ha for v in varieties], dtype=np.float64)
+        self.salinity_tolerance_ds_m = np.array(
+            [v.attributes.get("salinity_tolerance_ds_m", 0) for v in varieties], dtype=np.float64)
+
+        all_codes = np.arange(len(varieties), dtype=np.int64)
+        self._flag_codes = {flag: all_codes[getattr(self, flag)] for flag in TOLERANCE_FLAGS}
+        self._tolerance_order, self._tolerance_sorted = self._sorted_by(self._flag_codes["is_salt_tolerant"],
+                                                                        self.salinity_tolerance_ds_m)
+        self._season_codes: Dict[RiceSeason, np.ndarray] = {}
+        self._yield_ranked: Dict[RiceSeason, np.ndarray] = {}
+        self._best_in_season: Dict[RiceSeason, int] = {}
+        self._season_tolerance: Dict[RiceSeason, tuple] = {}
+        self._salt_suffix_best: Dict[RiceSeason, np.ndarray] = {}
+        self._hyv_cost_sorted: Dict[RiceSeason, np.ndarray] = {}
+        self._hyv_prefix_best: Dict[RiceSeason, np.ndarray] = {}
+        for season_code, season in enumerate(SEASONS):
+            in_season = all_codes[self.season_codes == season_code]
+            self._season_codes[season] = in_season
+            # Highest yield first; lexsort is stable so equal yields keep catalog order
+            self._yield_ranked[season] = in_season[np.lexsort((in_season, -self.potential_yield_t_ha[in_season]))]
+            self._best_in_season[season] = int(self._yield_ranked[season][0]) if len(in_season) else -1
+
+            salt_tolerant = in_season[self.is_salt_tolerant[in_season]]
+            order, tolerance = self._sorted_by(salt_tolerant, self.salinity_tolerance_ds_m)
+            self._season_tolerance[season] = (order, tolerance)
+            # suffix_best[j]: best variety among the salt-tolerant ones from the j-th lowest tolerance upwards
+            suffix = _running_best(order[::-1], self.potential_yield_t_ha)[::-1]
+            self._salt_suffix_best[season] = np.array(suffix + [-1], dtype=np.int64)
+
+            hyv = in_season[self.is_hyv[in_season]]
+            order, costs = self._sorted_by(hyv, self.input_costs_bdt_ha)
+            self._hyv_cost_sorted[season] = costs
+            # prefix_best[j]: best variety among the j cheapest HYVs
+            self._hyv_prefix_best[season] = np.array([-1] + _running_best(order, self.potential_yield_t_ha),
+                                                     dtype=np.int64)
+
+    @staticmethod
+    def _sorted_by(codes: np.ndarray, column: np.ndarray):
+        order = codes[np.argsort(column[codes], kind="stable")]
+        return order, column[order]
+
+    # --- Mapping interface (variety_id -> RiceVariety) ---
+    def __getitem__(self, variety_id: str) -> RiceVariety:
+        return self.varieties[self._codes[variety_id]]
+
+    def __iter__(self) -> Iterator[str]:
+        return (v.variety_id for v in self.varieties)
+
+    def __len__(self) -> int:
+        return len(self.varieties)
+
+    def __setitem__(self, variety_id: str, variety: RiceVariety):
+        # VARIETIES_DATA used to be a plain dict; say how to register varieties now
+        raise TypeError("VarietyCatalog is read-only; build a catalog with extra varieties using "
+                        "DEFAULT_VARIETY_CATALOG.copy([...]) (or VarietyCatalog.add on your own catalog).")
+
+    # --- Integer codes ---
+    def code(self, variety_id: str) -> int:
+        """Integer code of a variety (its position in the catalog)."""
+        return self._codes[variety_id]
+
+    def code_of(self, variety: RiceVariety) -> int:
+        """
+        Code of a catalog variety. Raises KeyError for an id not in the catalog and
+        ValueError for a variety whose parameters differ from the catalog's.
+        """
+        code = self._codes.get(variety.variety_id)
+        if code is None:
+            raise KeyError(f"Variety '{variety.variety_id}' is not in the catalog.")
+        self._check_same(code, variety)
+        return code
+
+    def variety(self, code: int) -> RiceVariety:
+        return self.varieties[code]
+
+    def season_code(self, season: RiceSeason) -> int:
+        return SEASONS.index(season)
+
+    # --- Index queries; all return arrays of variety codes ---
+    def by_season(self, season: RiceSeason) -> np.ndarray:
+        return self._season_codes[season]
+
+    def with_flag(self, flag: str) -> np.ndarray:
+        """Codes of varieties with a tolerance flag set, e.g. 'is_salt_tolerant'."""
+        return self._flag_codes[flag]
+
+    def tolerant_to(self, salinity_ds_m: float, season: Optional[RiceSeason] = None) -> np.ndarray:
+        """Salt-tolerant varieties whose tolerance is >= salinity_ds_m, in increasing tolerance order."""
+        order, tolerance = self._season_tolerance[season] if season is not None else (self._tolerance_order, self._tolerance_sorted)
+        return order[np.searchsorted(tolerance, salinity_ds_m, side="left"):]
+
+    def yield_ranked(self, season: RiceSeason) -> np.ndarray:
+        """Varieties of a season, highest potential yield first."""
+        return self._yield_ranked[season]
+
+    # --- Decision-rule lookups; accept scalars or arrays, return codes (-1 where none) ---
+    def best_in_season(self, season: RiceSeason) -> int:
+        return self._best_in_season[season]
+
+    def best_salt_tolerant(self, season: RiceSeason, salinity_ds_m: Union[float, np.ndarray]):
+        """Highest-yielding salt-tolerant variety of the season with tolerance >= salinity_ds_m."""
+        _, tolerance = self._season_tolerance[season]
+        return self._salt_suffix_best[season][np.searchsorted(tolerance, salinity_ds_m, side="left")]
+
+    def best_affordable_hyv(self, season: RiceSeason, budget_bdt_ha: Union[float, np.ndarray]):
+        """Highest-yielding HYV of the season whose input cost per hectare is <= budget_bdt_ha."""
+        return self._hyv_prefix_best[season][np.searchsorted(self._hyv_cost_sorted[season], budget_bdt_ha, side="right")]
+
+    def __repr__(self):
+        return f"VarietyCatalog(varieties={len(self.varieties)})"
+
+def _variety_fields(variety: RiceVariety) -> tuple:
+    return tuple(getattr(variety, field) for field in RiceVariety.__slots__)
+
+def _running_best(codes: Sequence[int], yields: np.ndarray) -> List[int]:
+    """Running argmax of yield over `codes`; ties keep the lower code, as max() over catalog order does."""
+    best: List[int] = []
+    current = -1
+    for code in codes:
+        code = int(code)
+        if current < 0 or yields[code] > yields[current] or (yields[code] == yields[current] and code < current):
+            current = code
+        best.append(current)
+    return best
+
+def _parse_season(value) -> RiceSeason:
+    if isinstance(value, RiceSeason):
+        return value
+    text = str(value).strip()
+    if text.upper() in RiceSeason.__members__:
+        return RiceSeason[text.upper()]
+    return RiceSeason(text)
+
+def _parse_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes", "y")
+    return bool(value)
+
+def _parse_number(value):
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+# Default catalog of example varieties (to be expanded with the full BRRI/BINA list)
+DEFAULT_VARIETY_CATALOG = VarietyCatalog.from_csv(DEFAULT_VARIETIES_PATH)
+# Old name of the default varieties. It is now the read-only catalog, no longer a dict:
+# item assignment and update() are not supported (see VarietyCatalog.copy)
+VARIETIES_DATA = DEFAULT_VARIETY_CATALOG
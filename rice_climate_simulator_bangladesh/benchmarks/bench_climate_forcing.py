@@ -0,0 +1,52 @@
+"""Benchmark: per-plot climate forcing, whole run up front vs. lazily in windows of steps.
+
+Builds ClimateForcing for a synthetic station climate and N plots, then reads every
+step as the engine does. Reports build time, time to read all steps (window
+recomputation included), resident forcing memory, and whether the windowed forcing
+matches the eager one. Run from the rice_climate_simulator_bangladesh directory:
+    python -m benchmarks.bench_climate_forcing --plots 1000000 --steps 20 --windows 0 1 5
+"""
+import argparse
+import time
+
+import numpy as np
+
+from climate.forcing import ClimateForcing
+
+def make_station_climate(num_steps: int, num_stations: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    return {"precipitation_mm": rng.gamma(2.0, 300.0, (num_steps, num_stations)),
+            "mean_temp_c": rng.normal(27.0, 3.0, (num_steps, num_stations))}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--plots", type=int, default=1_000_000)
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--stations", type=int, default=35)
+    parser.add_argument("--windows", type=int, nargs="+", default=[0, 1, 5], help="0 = whole run")
+    args = parser.parse_args()
+    station_climate = make_station_climate(args.steps, args.stations)
+    plot_station = np.random.default_rng(1).integers(0, args.stations, args.plots)
+
+    print(f"{args.plots} plots, {args.steps} steps, {args.stations} stations")
+    print(f"{'window':>8} {'build (s)':>10} {'read (s)':>10} {'MiB':>8} {'matches eager':>14}")
+    eager_checksum = None
+    for window_steps in args.windows:
+        start = time.perf_counter()
+        forcing = ClimateForcing(42, args.steps, args.plots, station_climate, plot_station,
+                                 window_steps=window_steps or None)
+        build_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        checksum = 0.0
+        for step in range(args.steps):
+            views = forcing.step(step)
+            checksum += float(views["precipitation_mm"][::997].sum() + views["salinity_change"][::997].sum())
+        read_seconds = time.perf_counter() - start
+        if eager_checksum is None:
+            eager_checksum = checksum
+        print(f"{window_steps or 'run':>8} {build_seconds:>10.3f} {read_seconds:>10.3f} "
+              f"{forcing.nbytes / 2**20:>8.1f} {str(checksum == eager_checksum):>14}")
+        del forcing
+
+if __name__ == "__main__":
+    main()
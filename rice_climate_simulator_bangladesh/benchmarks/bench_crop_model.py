@@ -0,0 +1,49 @@
+"""Benchmark: daily CropGrowthModel over a whole season for every plot of a PlotStateStore.
+
+Plants every plot with a catalog variety, then advances the store one season of days
+in one `advance` call (as the engine does per step) and reports plot-days per second
+and the share of crops that reached maturity. Run from the rice_climate_simulator_bangladesh
+directory:
+    python -m benchmarks.bench_crop_model --plots 5000000 --days 365
+"""
+import argparse
+import time
+
+import numpy as np
+
+from agriculture.crop_model import CropGrowthModel, MATURITY_CODE
+from agriculture.plot_store import PlotStateStore
+from agriculture.variety_catalog import DEFAULT_VARIETY_CATALOG
+
+def build_store(num_plots: int, rng: np.random.Generator) -> PlotStateStore:
+    store = PlotStateStore(capacity=num_plots)
+    store.allocate(num_plots)
+    store.size_ha[:num_plots] = rng.uniform(0.1, 2.5, num_plots)
+    store.salinity_ds_m[:num_plots] = rng.uniform(0.5, 8.0, num_plots)
+    store.is_irrigated[:num_plots] = rng.random(num_plots) < 0.4
+    store.has_crop[:num_plots] = True
+    store.crop_variety_code[:num_plots] = rng.integers(0, len(DEFAULT_VARIETY_CATALOG), num_plots)
+    store.growth_stage[:num_plots] = 0
+    return store
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--plots", type=int, default=5_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+    rng = np.random.default_rng(42)
+    store = build_store(args.plots, rng)
+    precipitation = rng.gamma(2.0, 600.0, args.plots)
+    mean_temp = rng.normal(27.0, 2.0, args.plots)
+    model = CropGrowthModel(DEFAULT_VARIETY_CATALOG)
+
+    start = time.perf_counter()
+    model.advance(store, precipitation, mean_temp, args.days)
+    seconds = time.perf_counter() - start
+    mature = np.mean(store.column("growth_stage") == MATURITY_CODE)
+    yields = model.crop_yield_t_ha(store, np.arange(store.size))
+    print(f"{args.plots} plots x {args.days} days: {seconds:.2f} s, {args.plots * args.days / seconds:.3g} plot-days/s")
+    print(f"mature: {mature:.1%}, mean yield {yields.mean():.2f} t/ha")
+
+if __name__ == "__main__":
+    main()
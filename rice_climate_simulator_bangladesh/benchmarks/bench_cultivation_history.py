@@ -0,0 +1,66 @@
+"""Benchmark: memory of per-plot history dicts vs. the shared CultivationHistory log.
+
+Appends `--seasons` harvests to each of `--plots` plots, once as the per-plot lists of
+dicts FarmPlot used to keep (measured with tracemalloc) and once into a
+CultivationHistory with and without a retention window, and reports bytes per
+record and append throughput. Run from the rice_climate_simulator_bangladesh directory:
+    python -m benchmarks.bench_cultivation_history --plots 100000 --seasons 30 --retention 10
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from agriculture.cultivation_history import CultivationHistory
+from agriculture.variety_catalog import DEFAULT_VARIETY_CATALOG
+
+def harvests(num_plots: int, num_seasons: int, rng: np.random.Generator):
+    codes = rng.integers(0, len(DEFAULT_VARIETY_CATALOG), (num_seasons, num_plots))
+    yields = rng.uniform(1.0, 6.0, (num_seasons, num_plots))
+    for season in range(num_seasons):
+        planting, harvest = f"Day {season * 10}", f"Day {season * 10 + 100}"
+        for row in range(num_plots):
+            yield row, int(codes[season, row]), planting, harvest, float(yields[season, row])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--plots", type=int, default=100_000)
+    parser.add_argument("--seasons", type=int, default=30)
+    parser.add_argument("--retention", type=int, default=10)
+    args = parser.parse_args()
+    num_records = args.plots * args.seasons
+    catalog = DEFAULT_VARIETY_CATALOG
+    stress = {"water_stress": 0.1, "salinity_stress": 0.2}
+
+    def build_lists():
+        lists = [[] for _ in range(args.plots)]
+        for row, code, planting, harvest, yield_t_ha in harvests(args.plots, args.seasons, np.random.default_rng(0)):
+            variety = catalog.variety(code)
+            lists[row].append({"variety_id": variety.variety_id, "season": variety.season.name, "planting_date": planting,
+                               "harvest_date": harvest, "yield_t_ha": yield_t_ha, "stress_factors": dict(stress)})
+        return lists
+
+    start = time.perf_counter()
+    build_lists()
+    seconds = time.perf_counter() - start
+    tracemalloc.start() # Memory is measured in a second pass, as tracing slows appends down
+    lists = build_lists()
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del lists
+    print(f"{args.plots} plots x {args.seasons} seasons = {num_records} records")
+    print(f"{'history':>22} {'MB':>9} {'bytes/record':>13} {'appends/s':>11}")
+    print(f"{'list of dicts':>22} {dict_bytes / 1e6:>9.1f} {dict_bytes / num_records:>13.1f} {num_records / seconds:>11.3g}")
+
+    for retention in (0, args.retention):
+        history = CultivationHistory(catalog, retention=retention)
+        start = time.perf_counter()
+        for row, code, planting, harvest, yield_t_ha in harvests(args.plots, args.seasons, np.random.default_rng(0)):
+            history.append(row, code, planting, harvest, yield_t_ha, stress)
+        seconds = time.perf_counter() - start
+        label = f"CultivationHistory({retention or 'all'})"
+        print(f"{label:>22} {history.nbytes / 1e6:>9.1f} {history.nbytes / num_records:>13.1f} {num_records / seconds:>11.3g}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark: column-validated bulk loaders vs. one pydantic object per row via iterrows().
+
+Writes synthetic farmers (CSV), farm plots (JSON) and weather (CSV) of the requested size
+to a temporary directory, then times both ways of loading them. The row-by-row path is
+timed on a prefix of each file and reported as rows per second.
+Run from the rice_climate_simulator_bangladesh directory:
+    python -m benchmarks.bench_data_loaders --rows 1000000
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from data_management.data_loaders import load_farmers_from_csv, load_farm_plots_from_json, load_weather_data_from_csv
+from data_management.schemas import FarmerProfileSchema, FarmPlotSchema, SoilPropertiesSchema, WeatherRecordSchema
+from data_management.columnar import SOIL_COLUMNS
+from data_management.synthetic_data_generator import SyntheticDataGenerator
+
+def write_inputs(work_dir: str, num_rows: int):
+    generator = SyntheticDataGenerator(random_seed=42)
+    farmers = generator.generate_farmer_columns(num_rows)
+    farmers.to_csv(os.path.join(work_dir, "farmers.csv"), index=False)
+    plots = generator.generate_plot_columns(farmers["agent_id"].to_numpy())
+    plots.to_json(os.path.join(work_dir, "farm_plots.json"), orient="records")
+    stations = 100
+    weather = generator.generate_weather_columns(pd.Timestamp("2020-01-01").date(), num_rows // stations, stations)
+    weather.to_csv(os.path.join(work_dir, "weather.csv"), index=False, date_format="%Y-%m-%d")
+
+def row_by_row_farmers(path: str, limit: int):
+    df = pd.read_csv(path, nrows=limit)
+    return [FarmerProfileSchema(**row.to_dict()) for index, row in df.iterrows()]
+
+def row_by_row_plots(path: str, limit: int):
+    with open(path) as f:
+        data = json.load(f)[:limit]
+    plots = []
+    for item in data:
+        soil = {column: item.pop(column) for column in SOIL_COLUMNS}
+        plots.append(FarmPlotSchema(soil_properties=SoilPropertiesSchema(**soil), **item))
+    return plots
+
+def row_by_row_weather(path: str, limit: int):
+    df = pd.read_csv(path, nrows=limit, parse_dates=["record_date"])
+    return [WeatherRecordSchema(**row.to_dict()) for index, row in df.iterrows()]
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, len(result)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--row-path-rows", type=int, default=50_000,
+                        help="Rows loaded through the per-row pydantic path for its throughput estimate.")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_data_loaders_")
+    try:
+        write_inputs(work_dir, args.rows)
+        cases = [
+            ("farmers.csv", load_farmers_from_csv, row_by_row_farmers),
+            ("farm_plots.json", load_farm_plots_from_json, row_by_row_plots),
+            ("weather.csv", load_weather_data_from_csv, row_by_row_weather),
+        ]
+        print(f"{'file':>16} {'rows':>9} {'bulk (s)':>9} {'bulk rows/s':>12} {'per-row rows/s':>15} {'speedup':>9}")
+        for file_name, bulk_loader, row_loader in cases:
+            path = os.path.join(work_dir, file_name)
+            bulk_time, rows = timed(bulk_loader, path)
+            row_time, row_rows = timed(row_loader, path, args.row_path_rows)
+            bulk_rate, row_rate = rows / bulk_time, row_rows / row_time
+            print(f"{file_name:>16} {rows:>9} {bulk_time:>9.2f} {bulk_rate:>12.0f} {row_rate:>15.0f} {bulk_rate / row_rate:>8.1f}x")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
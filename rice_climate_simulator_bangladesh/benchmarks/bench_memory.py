@@ -0,0 +1,104 @@
+"""Benchmark: memory per farmer and per plot of the engine's domain objects.
+
+Builds `--farmers` FarmerAgents and their plots (FarmPlot views over a PlotStateStore)
+from synthetic input columns the way SimulationEngine does, measuring each phase with
+tracemalloc, and reports bytes per farmer and per plot (objects, their containers and
+store rows; the input strings they share with the input tables are counted
+separately) and the projection to `--project` farm households, for sizing the nodes
+of large runs. Run from the rice_climate_simulator_bangladesh directory:
+    python -m benchmarks.bench_memory --farmers 1000000 --project 16000000
+"""
+import argparse
+import sys
+import tracemalloc
+
+import numpy as np
+
+from agents.farmer_agent import FarmerAgent
+from agriculture.farm_plot import FarmPlot
+from agriculture.plot_store import PlotStateStore
+from agriculture.variety_catalog import DEFAULT_VARIETY_CATALOG
+from data_management.synthetic_data_generator import SyntheticDataGenerator
+
+STRING_COLUMNS = {"farmers": ("agent_id", "household_id", "land_holding_category", "location_admin_unit_id"),
+                  "plots": ("plot_id", "owner_agent_id", "soil_type", "irrigation_type")}
+
+def traced(build):
+    """Runs `build` and returns its result and the bytes it left allocated."""
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    return result, tracemalloc.get_traced_memory()[0] - before
+
+def string_bytes(frame, columns) -> int:
+    """Bytes of the distinct string objects of some input columns."""
+    strings = {id(value): value for column in columns for value in frame[column].tolist() if isinstance(value, str)}
+    return sum(sys.getsizeof(value) for value in strings.values())
+
+def build_farmers(farmers_df):
+    return [FarmerAgent(agent_id=agent_id, household_id=household_id, initial_capital_bdt=capital, age=age,
+                        education_years=education, farming_experience_years=experience,
+                        risk_aversion_factor=risk_aversion, land_holding_category=land_category,
+                        location_id=location_id, num_farm_plots=num_plots, variety_catalog=DEFAULT_VARIETY_CATALOG)
+            for agent_id, household_id, capital, age, education, experience, risk_aversion, land_category,
+            location_id, num_plots in zip(*(farmers_df[column].tolist() for column in (
+                "agent_id", "household_id", "initial_capital_bdt", "age", "education_years",
+                "farming_experience_years", "risk_aversion_factor", "land_holding_category",
+                "location_admin_unit_id", "num_farm_plots")))]
+
+def build_plots(plots_df, farmers):
+    store = PlotStateStore(capacity=len(plots_df), catalog=DEFAULT_VARIETY_CATALOG)
+    first_index = store.allocate(len(plots_df))
+    assignment = {farmer.agent_id: [] for farmer in farmers}
+    plots_map = {}
+    for offset, (plot_id, owner, soil_type, organic_matter, ph, irrigation_type) in enumerate(zip(*(
+            plots_df[column].tolist() for column in ("plot_id", "owner_agent_id", "soil_type",
+                                                     "organic_matter_percent", "ph", "irrigation_type")))):
+        plot = FarmPlot(plot_id=plot_id, owner_agent_id=owner, size_ha=0.0, store=store, index=first_index + offset)
+        plot.soil.soil_type = soil_type
+        plot.soil.organic_matter_percent = organic_matter
+        plot.soil.ph = ph
+        plot.irrigation_type = irrigation_type
+        plots_map[plot_id] = plot
+        assignment[owner].append(plot)
+    for farmer in farmers:
+        farmer.farm_plots = assignment[farmer.agent_id]
+    return store, plots_map
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--farmers", type=int, default=1_000_000)
+    parser.add_argument("--plots-per-farmer", type=int, default=2)
+    parser.add_argument("--project", type=int, default=16_000_000, help="Farm households to project memory to")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    generator = SyntheticDataGenerator(random_seed=args.seed)
+    farmers_df = generator.generate_farmer_columns(args.farmers, args.plots_per_farmer)
+    owners = np.repeat(farmers_df["agent_id"].to_numpy(), farmers_df["num_farm_plots"].to_numpy())
+    plots_df = generator.generate_plot_columns(owners)
+    num_plots = len(plots_df)
+
+    tracemalloc.start()
+    farmers, farmer_bytes = traced(lambda: build_farmers(farmers_df))
+    (store, plots_map), plot_bytes = traced(lambda: build_plots(plots_df, farmers))
+    tracemalloc.stop()
+    store_bytes = sum(getattr(store, name).nbytes for name in PlotStateStore.COLUMNS)
+    farmer_strings = string_bytes(farmers_df, STRING_COLUMNS["farmers"])
+    plot_strings = string_bytes(plots_df, STRING_COLUMNS["plots"])
+
+    farmer, plot = farmers[0], plots_map[plots_df["plot_id"].iat[0]]
+    print(f"{args.farmers} farmers, {num_plots} plots")
+    print(f"instance dicts: farmer {hasattr(farmer, '__dict__')}, plot {hasattr(plot, '__dict__')}, "
+          f"soil {hasattr(plot.soil, '__dict__')}; sizeof farmer {sys.getsizeof(farmer)} B, plot {sys.getsizeof(plot)} B")
+    print(f"{'':>8} {'objects MB':>11} {'B/object':>9} {'+ id strings B':>15} {'store B/row':>12}")
+    print(f"{'farmer':>8} {farmer_bytes / 1e6:>11.1f} {farmer_bytes / args.farmers:>9.1f} "
+          f"{farmer_strings / args.farmers:>15.1f} {'':>12}")
+    print(f"{'plot':>8} {plot_bytes / 1e6:>11.1f} {(plot_bytes - store_bytes) / num_plots:>9.1f} "
+          f"{plot_strings / num_plots:>15.1f} {store_bytes / num_plots:>12.1f}")
+
+    per_farmer = (farmer_bytes + farmer_strings + plot_bytes + plot_strings) / args.farmers
+    print(f"per farm household incl. its plots: {per_farmer:.0f} B; "
+          f"{args.project} households: {per_farmer * args.project / 2**30:.1f} GiB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark: per-object FarmPlot updates vs. the batched PlotStateStore update.
+
+Run from the rice_climate_simulator_bangladesh directory:
+    python -m benchmarks.bench_plot_store --sizes 10000 100000 1000000 5000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from agriculture.farm_plot import FarmPlot
+from agriculture.plot_store import PlotStateStore
+
+def build_plots(num_plots: int, rng: np.random.Generator):
+    store = PlotStateStore(capacity=num_plots)
+    sizes = rng.uniform(0.1, 2.5, num_plots)
+    salinity = rng.uniform(0.5, 8.0, num_plots)
+    plots = []
+    for i in range(num_plots):
+        plot = FarmPlot(plot_id=f"plot_{i}", owner_agent_id="farmer_0", size_ha=sizes[i], store=store)
+        plot.soil.salinity_ds_m = salinity[i]
+        plots.append(plot)
+    return store, plots
+
+def build_store(num_plots: int, rng: np.random.Generator) -> PlotStateStore:
+    store = PlotStateStore(capacity=num_plots)
+    store.allocate(num_plots)
+    store.size_ha[:num_plots] = rng.uniform(0.1, 2.5, num_plots)
+    store.salinity_ds_m[:num_plots] = rng.uniform(0.5, 8.0, num_plots)
+    return store
+
+def time_per_object(plots, rng: np.random.Generator) -> float:
+    """The pre-store engine path: per-plot condition dicts, then one update call per plot."""
+    start = time.perf_counter()
+    weather = {plot.plot_id: {"precipitation_mm": rng.uniform(0, 10)} for plot in plots}
+    hydrology = {plot.plot_id: {"salinity_change": rng.uniform(-0.1, 0.1)} for plot in plots}
+    for plot in plots:
+        plot.update_plot_conditions(weather.get(plot.plot_id), hydrology.get(plot.plot_id))
+    return time.perf_counter() - start
+
+def time_batched(store: PlotStateStore, rng: np.random.Generator) -> float:
+    start = time.perf_counter()
+    store.update_all_plot_conditions(
+        weather={"precipitation_mm": rng.uniform(0, 10, store.size)},
+        hydrology={"salinity_change": rng.uniform(-0.1, 0.1, store.size)}
+    )
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--max-object-plots", type=int, default=1_000_000,
+                        help="Skip the per-object path above this many plots (object graphs get very large).")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    print(f"{'plots':>10} {'per-object (s)':>15} {'batched (s)':>12} {'speedup':>9}")
+    for num_plots in args.sizes:
+        batched = min(time_batched(build_store(num_plots, rng), rng) for _ in range(args.repeats))
+        if num_plots <= args.max_object_plots:
+            _, plots = build_plots(num_plots, rng)
+            per_object = min(time_per_object(plots, rng) for _ in range(args.repeats))
+            del plots
+            print(f"{num_plots:>10} {per_object:>15.4f} {batched:>12.4f} {per_object / batched:>8.1f}x")
+        else:
+            print(f"{num_plots:>10} {'skipped':>15} {batched:>12.4f} {'-':>9}")
+
+if __name__ == "__main__":
+    main()
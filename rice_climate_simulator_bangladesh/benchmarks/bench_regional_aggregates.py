@@ -0,0 +1,71 @@
+"""Benchmark: RegionalAggregator incremental updates against full rebuilds.
+
+Spreads `--plots` plots over `--farmers` farmers in 495 upazilas (64 districts,
+8 divisions, 30 AEZs), then repeatedly changes the crop, harvest and owner capital of
+`--changed` random plots (as a step of event-driven scheduling does) and times
+`update` over just those rows against `rebuild` over every row, checking that both
+give the same state. Run from the rice_climate_simulator_bangladesh directory:
+    python -m benchmarks.bench_regional_aggregates --plots 1000000 --changed 10000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from agriculture.plot_store import PlotStateStore
+from agriculture.variety_catalog import DEFAULT_VARIETY_CATALOG
+from geography.spatial_units import SpatialScale
+from reporting_analytics.regional_aggregates import RegionalAggregator
+
+def region_codes(num_farmers: int, rng: np.random.Generator):
+    upazila = rng.integers(495, size=num_farmers)
+    district = rng.integers(64, size=495)[upazila]
+    codes = {SpatialScale.UPAZILA: upazila, SpatialScale.DISTRICT: district,
+             SpatialScale.DIVISION: district % 8, SpatialScale.AEZ: rng.integers(30, size=495)[upazila]}
+    labels = {SpatialScale.UPAZILA: [f"upz_{i}" for i in range(495)], SpatialScale.DISTRICT: [f"dist_{i}" for i in range(64)],
+              SpatialScale.DIVISION: [f"div_{i}" for i in range(8)], SpatialScale.AEZ: [f"aez_{i}" for i in range(30)]}
+    return labels, codes
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--plots", type=int, default=1_000_000)
+    parser.add_argument("--farmers", type=int, default=400_000)
+    parser.add_argument("--changed", type=int, default=10_000)
+    parser.add_argument("--steps", type=int, default=20)
+    args = parser.parse_args()
+    rng = np.random.default_rng(42)
+    store = PlotStateStore(capacity=args.plots)
+    store.allocate(args.plots)
+    store.size_ha[:args.plots] = rng.uniform(0.1, 2.5, args.plots)
+    store.crop_variety_code[:args.plots] = rng.integers(-1, len(DEFAULT_VARIETY_CATALOG), args.plots)
+    owners = rng.integers(args.farmers, size=args.plots)
+    capital = rng.lognormal(11.0, 0.8, args.farmers)
+    labels, farmer_codes = region_codes(args.farmers, rng)
+    plot_codes = {scale: codes[owners] for scale, codes in farmer_codes.items()}
+    aggregator = RegionalAggregator(labels, farmer_codes, plot_codes, owners, DEFAULT_VARIETY_CATALOG)
+
+    start = time.perf_counter()
+    aggregator.rebuild(store, capital)
+    rebuild_seconds = time.perf_counter() - start
+    update_seconds = 0.0
+    for _ in range(args.steps):
+        store.harvest_t[:args.plots] = 0.0
+        rows = np.unique(rng.integers(args.plots, size=args.changed))
+        store.crop_variety_code[rows] = rng.integers(-1, len(DEFAULT_VARIETY_CATALOG), len(rows))
+        store.harvest_t[rows] = rng.uniform(0.0, 10.0, len(rows))
+        capital[owners[rows]] *= rng.uniform(0.8, 1.25, len(rows))
+        start = time.perf_counter()
+        aggregator.update(store, rows, lambda indices: capital[indices])
+        update_seconds += time.perf_counter() - start
+
+    fresh = RegionalAggregator(labels, farmer_codes, plot_codes, owners, DEFAULT_VARIETY_CATALOG)
+    fresh.rebuild(store, capital)
+    same = all(np.allclose(aggregator.state[scale][name], fresh.state[scale][name])
+               for scale in aggregator.scales for name in aggregator.state[scale])
+    print(f"{aggregator}: {args.plots} plots, {args.farmers} farmers")
+    print(f"rebuild: {rebuild_seconds:.3f} s")
+    print(f" update: {update_seconds / args.steps:.4f} s per step of {args.changed} changed plots "
+          f"({rebuild_seconds * args.steps / update_seconds:.0f}x faster), same state as a rebuild: {same}")
+
+if __name__ == "__main__":
+    main()
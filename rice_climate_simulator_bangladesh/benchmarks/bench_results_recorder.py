@@ -0,0 +1,64 @@
+"""Benchmark: ResultsRecorder snapshot cost seen by the stepping thread vs. total write time.
+
+Records `--snapshots` plot-table snapshots of a PlotStateStore with `--plots` rows and
+reports the time each record call blocks (copying the columns and, when the queue of
+pending shards is full, waiting for the writer), the time to drain the background
+writer on close, the shard bytes written, and the time to read one column of one step
+back. Run from the rice_climate_simulator_bangladesh directory:
+    python -m benchmarks.bench_results_recorder --plots 1000000 --snapshots 10 --format npz
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from agriculture.plot_store import PlotStateStore
+from reporting_analytics.results_recorder import ResultsReader, ResultsRecorder
+
+def build_engine(num_plots: int, rng: np.random.Generator) -> SimpleNamespace:
+    """Stand-in with the attributes ResultsRecorder.record_plots reads from a SimulationEngine."""
+    store = PlotStateStore(capacity=num_plots)
+    store.allocate(num_plots)
+    store.size_ha[:num_plots] = rng.uniform(0.1, 2.5, num_plots)
+    store.salinity_ds_m[:num_plots] = rng.uniform(0.5, 8.0, num_plots)
+    plots = {f"plot_{row:09d}": SimpleNamespace(plot_id=f"plot_{row:09d}", store_index=row) for row in range(num_plots)}
+    return SimpleNamespace(plot_store=store, farm_plots_map=plots, farmer_agents=[])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--plots", type=int, default=1_000_000)
+    parser.add_argument("--snapshots", type=int, default=10)
+    parser.add_argument("--format", choices=("parquet", "npz"), default=None)
+    parser.add_argument("--buffer-rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    rng = np.random.default_rng(42)
+    engine = build_engine(args.plots, rng)
+    directory = tempfile.mkdtemp(prefix="bench_results_")
+    try:
+        recorder = ResultsRecorder(directory, shard_format=args.format, buffer_rows=args.buffer_rows)
+        blocked = []
+        for step in range(1, args.snapshots + 1):
+            engine.plot_store.salinity_ds_m[:args.plots] += 0.01
+            start = time.perf_counter()
+            recorder.record_plots(engine, step)
+            blocked.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        recorder.close()
+        drain = time.perf_counter() - start
+        written = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names)
+
+        start = time.perf_counter()
+        column = ResultsReader(directory).read("plots", ["salinity_ds_m"], steps=[args.snapshots // 2 or 1])
+        read_seconds = time.perf_counter() - start
+        print(f"{args.plots} plots x {args.snapshots} snapshots ({recorder.shard_format})")
+        print(f"record call: mean {np.mean(blocked):.3f} s, max {np.max(blocked):.3f} s; drain on close {drain:.3f} s")
+        print(f"written {written / 1e6:.1f} MB; read 1 column of 1 step ({len(column)} rows) in {read_seconds:.3f} s")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark: serial SimulationEngine vs. ShardedSimulationEngine with 1..N worker processes.
+
+Times the stepping phase only (input generation and agent construction are excluded),
+checks that every sharded run ends with exactly the serial farmers' capital, and
+reports speedup over the serial engine. Speedup is bounded by the number of CPUs.
+Run from the rice_climate_simulator_bangladesh directory:
+    python -m benchmarks.bench_sharded_engine --farmers 200000 --steps 6 --workers 1 2 4 8
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from simulation_core.config import get_default_config
+from simulation_core.engine import SimulationEngine
+from simulation_core.sharded_engine import ShardedSimulationEngine
+
+def make_config(num_farmers: int, num_steps: int) -> dict:
+    config = get_default_config()
+    config["max_simulation_steps"] = num_steps
+    config["synthetic_data_config"]["num_farmers"] = num_farmers
+    config["logging_config"]["verbosity"] = "quiet"
+    return config
+
+def time_steps(engine) -> float:
+    start = time.perf_counter()
+    while engine.run_step():
+        pass
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--farmers", type=int, default=200_000)
+    parser.add_argument("--steps", type=int, default=6)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    config = make_config(args.farmers, args.steps)
+
+    serial = SimulationEngine(config)
+    serial_seconds = time_steps(serial)
+    serial_capital = np.array([farmer.capital_bdt for farmer in serial.farmer_agents])
+    del serial
+
+    print(f"{args.farmers} farmers, {args.steps} steps, {os.cpu_count()} CPUs")
+    print(f"{'engine':>12} {'shards':>7} {'steps (s)':>10} {'speedup':>8} {'matches serial':>15}")
+    print(f"{'serial':>12} {'-':>7} {serial_seconds:>10.3f} {1.0:>7.2f}x {'-':>15}")
+    for num_workers in args.workers:
+        with ShardedSimulationEngine(config, num_workers=num_workers) as engine:
+            seconds = time_steps(engine)
+            matches = np.array_equal(engine.gather_farmer_column("capital_bdt"), serial_capital)
+            print(f"{'sharded':>12} {len(engine.farmer_rows_by_shard):>7} {seconds:>10.3f} "
+                  f"{serial_seconds / seconds:>7.2f}x {str(matches):>15}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark: SpatialHierarchy build, containment queries and unit codes of many farmers.
+
+Builds a national-sized hierarchy (8 divisions, 64 districts, 495 upazilas and
+`--villages-per-upazila` villages each) and times `is_within` and walking parent links
+in dicts, listing the villages of every district by `descendants` and by walking up
+from every village, and the codes at every level of `--farmers` farmers located in
+random villages. Run from the rice_climate_simulator_bangladesh directory:
+    python -m benchmarks.bench_spatial_hierarchy --farmers 1000000 --villages-per-upazila 150
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from geography.spatial_hierarchy import SpatialHierarchy, UNIT_COLUMNS
+from geography.spatial_units import SpatialScale
+
+def unit_table(villages_per_upazila: int, rng: np.random.Generator) -> pd.DataFrame:
+    rows = [("national", "Bangladesh", SpatialScale.NATIONAL.value, "", "")]
+    rows += [(f"div_{i}", f"Division {i}", SpatialScale.DIVISION.value, "national", "") for i in range(8)]
+    rows += [(f"dist_{i}", f"District {i}", SpatialScale.DISTRICT.value, f"div_{i % 8}", "") for i in range(64)]
+    rows += [(f"upz_{i}", f"Upazila {i}", SpatialScale.UPAZILA.value, f"dist_{rng.integers(64)}", f"aez_{rng.integers(30)}")
+             for i in range(495)]
+    rows += [(f"vil_{i}", f"Village {i}", SpatialScale.VILLAGE.value, f"upz_{i // villages_per_upazila}", "")
+             for i in range(495 * villages_per_upazila)]
+    return pd.DataFrame(rows, columns=list(UNIT_COLUMNS))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--farmers", type=int, default=1_000_000)
+    parser.add_argument("--villages-per-upazila", type=int, default=150)
+    parser.add_argument("--queries", type=int, default=100_000)
+    args = parser.parse_args()
+    rng = np.random.default_rng(42)
+    units = unit_table(args.villages_per_upazila, rng)
+
+    start = time.perf_counter()
+    hierarchy = SpatialHierarchy.from_frame(units)
+    print(f"{hierarchy}: built in {time.perf_counter() - start:.3f} s, {hierarchy.nbytes() / 2**20:.1f} MiB of index arrays")
+
+    parents = dict(zip(units["unit_id"], units["parent_id"]))
+    pairs = [(units["unit_id"].iat[i], units["unit_id"].iat[j])
+             for i, j in zip(rng.integers(len(units), size=args.queries), rng.integers(74, size=args.queries))]
+
+    def walk(unit_id: str, container_id: str) -> bool:
+        while unit_id:
+            if unit_id == container_id:
+                return True
+            unit_id = parents[unit_id]
+        return False
+
+    for name, query in (("parent walk", walk), ("is_within", hierarchy.is_within)):
+        start = time.perf_counter()
+        found = sum(query(unit_id, container_id) for unit_id, container_id in pairs)
+        seconds = time.perf_counter() - start
+        print(f"{name:>12}: {args.queries / seconds:.3g} queries/s ({found} inside)")
+
+    villages = hierarchy.labels(SpatialScale.VILLAGE)
+    districts = hierarchy.labels(SpatialScale.DISTRICT)
+    start = time.perf_counter()
+    walked = {district: [village for village in villages if walk(village, district)] for district in districts}
+    walk_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    ranged = {district: hierarchy.descendants(district, SpatialScale.VILLAGE) for district in districts}
+    range_seconds = time.perf_counter() - start
+    print(f"villages of every district: parent walk {walk_seconds:.3f} s, descendants {range_seconds:.4f} s, "
+          f"same: {all(sorted(walked[d]) == sorted(ranged[d]) for d in districts)}")
+
+    farmer_units = pd.Categorical.from_codes(rng.integers(len(villages), size=args.farmers), villages)
+    start = time.perf_counter()
+    codes = hierarchy.all_codes(farmer_units)
+    seconds = time.perf_counter() - start
+    print(f"codes of {args.farmers} farmers at {len(codes)} levels: {seconds:.3f} s")
+    start = time.perf_counter()
+    per_district = np.bincount(codes[SpatialScale.DISTRICT], minlength=hierarchy.num_units(SpatialScale.DISTRICT))
+    print(f"farmers per district by bincount: {time.perf_counter() - start:.4f} s (largest {per_district.max()})")
+
+if __name__ == "__main__":
+    main()
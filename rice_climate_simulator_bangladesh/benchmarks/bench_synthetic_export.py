@@ -0,0 +1,51 @@
+"""Benchmark: peak memory of in-memory columnar generation vs. streaming export to disk.
+
+Peak memory is measured with tracemalloc (numpy and pandas allocations are traced).
+Run from the rice_climate_simulator_bangladesh directory:
+    python -m benchmarks.bench_synthetic_export --farmers 100000 1000000 5000000 --chunk-size 100000
+"""
+import argparse
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from data_management.synthetic_data_generator import SyntheticDataGenerator
+
+def measure(function):
+    tracemalloc.start()
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--farmers", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--days", type=int, default=365 * 10)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--shard-format", choices=["parquet", "npz"], default=None)
+    parser.add_argument("--max-in-memory-farmers", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_synthetic_export_")
+    print(f"{'farmers':>10} {'in-memory (s)':>14} {'peak (MiB)':>11} {'streaming (s)':>14} {'peak (MiB)':>11}")
+    try:
+        for num_farmers in args.farmers:
+            generator = SyntheticDataGenerator(random_seed=42)
+            streaming, streaming_peak = measure(lambda: generator.export_columnar_dataset(
+                f"{work_dir}/dataset", num_farmers=num_farmers, sim_duration_days=args.days,
+                chunk_size=args.chunk_size, shard_format=args.shard_format))
+            if num_farmers <= args.max_in_memory_farmers:
+                in_memory, in_memory_peak = measure(lambda: generator.generate_columnar_simulation_data(
+                    num_farmers=num_farmers, sim_duration_days=args.days))
+                print(f"{num_farmers:>10} {in_memory:>14.3f} {in_memory_peak:>11.1f} {streaming:>14.3f} {streaming_peak:>11.1f}")
+            else:
+                print(f"{num_farmers:>10} {'skipped':>14} {'-':>11} {streaming:>14.3f} {streaming_peak:>11.1f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
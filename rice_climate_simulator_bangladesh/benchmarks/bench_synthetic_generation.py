@@ -0,0 +1,44 @@
+"""Benchmark: per-record (pydantic) synthetic data generation vs. the vectorized columnar generator.
+
+Run from the rice_climate_simulator_bangladesh directory:
+    python -m benchmarks.bench_synthetic_generation --farmers 1000 10000 100000 1000000
+"""
+import argparse
+import time
+
+from data_management.synthetic_data_generator import SyntheticDataGenerator
+
+def time_scalar(num_farmers: int, plots_per_farmer: int, num_days: int) -> float:
+    generator = SyntheticDataGenerator(random_seed=42)
+    start = time.perf_counter()
+    generator.generate_initial_simulation_data(num_farmers=num_farmers, num_plots_per_farmer_avg=plots_per_farmer,
+                                               sim_duration_days=num_days)
+    return time.perf_counter() - start
+
+def time_vectorized(num_farmers: int, plots_per_farmer: int, num_days: int) -> float:
+    generator = SyntheticDataGenerator(random_seed=42)
+    start = time.perf_counter()
+    generator.generate_columnar_simulation_data(num_farmers=num_farmers, num_plots_per_farmer_avg=plots_per_farmer,
+                                                sim_duration_days=num_days)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--farmers", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--plots-per-farmer", type=int, default=2)
+    parser.add_argument("--days", type=int, default=365 * 10)
+    parser.add_argument("--max-scalar-farmers", type=int, default=100_000,
+                        help="Skip the per-record path above this many farmers (it is slow and memory hungry).")
+    args = parser.parse_args()
+
+    print(f"{'farmers':>10} {'scalar (s)':>11} {'vectorized (s)':>15} {'speedup':>9}")
+    for num_farmers in args.farmers:
+        vectorized = time_vectorized(num_farmers, args.plots_per_farmer, args.days)
+        if num_farmers <= args.max_scalar_farmers:
+            scalar = time_scalar(num_farmers, args.plots_per_farmer, args.days)
+            print(f"{num_farmers:>10} {scalar:>11.3f} {vectorized:>15.3f} {scalar / vectorized:>8.1f}x")
+        else:
+            print(f"{num_farmers:>10} {'skipped':>11} {vectorized:>15.3f} {'-':>9}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Benchmark: WeatherGenerator fitting and (replicate, station, day) simulation throughput.
+
+Fits the generator to synthetic historical weather, simulates replicate batches and
+reports station-days per minute, plus a check of simulated against observed wet-day
+frequency, mean rainfall and mean maximum temperature. Run from the
+rice_climate_simulator_bangladesh directory:
+    python -m benchmarks.bench_weather_generator --stations 64 --days 3650 --replicates 1 16 128
+"""
+import argparse
+import time
+from datetime import date
+
+import numpy as np
+
+from climate.weather_cube import WeatherCube
+from climate.weather_generator import WeatherGenerator
+from data_management.synthetic_data_generator import SyntheticDataGenerator
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stations", type=int, default=64)
+    parser.add_argument("--history-days", type=int, default=3650)
+    parser.add_argument("--days", type=int, default=3650)
+    parser.add_argument("--replicates", type=int, nargs="+", default=[1, 16, 128])
+    args = parser.parse_args()
+    weather = SyntheticDataGenerator(random_seed=1).generate_weather_columns(
+        date(2000, 1, 1), args.history_days, args.stations)
+    cube = WeatherCube.from_frame(weather)
+
+    start = time.perf_counter()
+    generator = WeatherGenerator.fit(cube)
+    print(f"fit {args.stations} stations x {args.history_days} days: {time.perf_counter() - start:.3f} s")
+    print(f"{'replicates':>10} {'seconds':>8} {'station-days/min':>17}")
+    for num_replicates in args.replicates:
+        start = time.perf_counter()
+        arrays = generator.simulate(args.days, range(num_replicates))
+        seconds = time.perf_counter() - start
+        station_days = num_replicates * args.stations * args.days
+        print(f"{num_replicates:>10} {seconds:>8.3f} {station_days / seconds * 60:>17.3g}")
+
+    observed = cube.data["precipitation_mm"]
+    print(f"wet-day frequency   observed {np.nanmean(observed >= generator.wet_threshold_mm):.3f}"
+          f"  simulated {np.mean(arrays['precipitation_mm'] > 0):.3f}")
+    print(f"mean rainfall (mm)  observed {np.nanmean(observed):.2f}  simulated {arrays['precipitation_mm'].mean():.2f}")
+    print(f"mean max temp (C)   observed {np.nanmean(cube.data['max_temp_c']):.2f}"
+          f"  simulated {arrays['max_temp_c'].mean():.2f}")
+
+if __name__ == "__main__":
+    main()
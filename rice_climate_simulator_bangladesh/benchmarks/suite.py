@@ -0,0 +1,211 @@
+"""Benchmark suite: the engine's hot paths at scale tiers, with per-machine baselines.
+
+Cases (see CASES), each timed at every requested tier of TIERS farmers:
+    synthetic_scalar    SyntheticDataGenerator.generate_initial_simulation_data
+    synthetic_columnar  SyntheticDataGenerator.generate_columnar_simulation_data
+    create_agents       SimulationEngine._create_agents_and_plots from prepared tables
+    run_step            successive SimulationEngine.run_step calls from step 0
+    collect_results     SimulationEngine.collect_results over recorded snapshots
+    config              get_default_config + load_config_from_json + merge_configs (per 100 calls)
+
+`run` writes the timings (min, median and all samples in seconds) and a description of
+the machine to a JSON file; with --save-baseline it also stores them as the machine's
+baseline in benchmarks/baselines/<machine id>.json. `compare` checks a results file
+against a baseline (by default the current machine's) and exits with status 1 when a
+case's minimum time grew by more than --threshold. Everything runs offline with the
+repository's own dependencies. Run from the rice_climate_simulator_bangladesh directory:
+    python -m benchmarks.suite run --tiers 1k 100k --output bench.json --save-baseline
+    python -m benchmarks.suite compare bench.json --threshold 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_management.synthetic_data_generator import SyntheticDataGenerator
+from simulation_core.config import get_default_config, load_config_from_json, merge_configs
+from simulation_core.engine import SimulationEngine
+
+TIERS = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+BASELINE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+PLOTS_PER_FARMER = 2
+NUM_STEPS = 3 # Steps of the engines the cases build; run_step times at most this many
+CONFIG_CALLS = 100 # Config loads and merges per config sample
+
+def make_config(num_farmers: int, output_directory: str, save_interval: int = 0) -> dict:
+    config = get_default_config()
+    config["max_simulation_steps"] = NUM_STEPS
+    config["synthetic_data_config"]["num_farmers"] = num_farmers
+    config["synthetic_data_config"]["num_plots_per_farmer_avg"] = PLOTS_PER_FARMER
+    config["logging_config"]["verbosity"] = "quiet"
+    config["reporting_options"]["output_directory"] = output_directory
+    config["reporting_options"]["save_agent_data_interval"] = save_interval
+    config["reporting_options"]["save_plot_data_interval"] = save_interval
+    return config
+
+def input_frames(num_farmers: int) -> Dict[str, pd.DataFrame]:
+    return SyntheticDataGenerator(random_seed=42).generate_columnar_simulation_data(
+        num_farmers=num_farmers, num_plots_per_farmer_avg=PLOTS_PER_FARMER, sim_duration_days=365 * NUM_STEPS)
+
+# A case yields one timed sample per call of its timer; set-up between samples is not timed
+
+def case_synthetic_scalar(num_farmers: int, repeats: int, workdir: str, timer) -> Iterator[float]:
+    for _ in range(repeats):
+        generator = SyntheticDataGenerator(random_seed=42)
+        yield timer(lambda: generator.generate_initial_simulation_data(
+            num_farmers=num_farmers, num_plots_per_farmer_avg=PLOTS_PER_FARMER, sim_duration_days=365 * NUM_STEPS))
+
+def case_synthetic_columnar(num_farmers: int, repeats: int, workdir: str, timer) -> Iterator[float]:
+    for _ in range(repeats):
+        yield timer(lambda: input_frames(num_farmers))
+
+def case_create_agents(num_farmers: int, repeats: int, workdir: str, timer) -> Iterator[float]:
+    frames = input_frames(num_farmers)
+    for _ in range(repeats):
+        engine = SimulationEngine.__new__(SimulationEngine)
+        engine._setup(make_config(num_farmers, workdir))
+        engine.input_frames = frames
+        yield timer(engine._create_agents_and_plots)
+        del engine
+
+def case_run_step(num_farmers: int, repeats: int, workdir: str, timer) -> Iterator[float]:
+    engine = SimulationEngine.from_frames(make_config(num_farmers, workdir), input_frames(num_farmers))
+    for _ in range(min(repeats, NUM_STEPS)):
+        yield timer(engine.run_step)
+
+def case_collect_results(num_farmers: int, repeats: int, workdir: str, timer) -> Iterator[float]:
+    engine = SimulationEngine.from_frames(make_config(num_farmers, workdir, save_interval=1), input_frames(num_farmers))
+    engine.run_step()
+    engine.close_results_recorder()
+    for _ in range(repeats):
+        yield timer(engine.collect_results)
+
+def case_config(num_farmers: int, repeats: int, workdir: str, timer) -> Iterator[float]:
+    path = os.path.join(workdir, "config.json")
+    with open(path, "w") as f:
+        json.dump(make_config(num_farmers, workdir), f)
+
+    def load_and_merge():
+        for _ in range(CONFIG_CALLS):
+            merge_configs(get_default_config(), load_config_from_json(path))
+
+    for _ in range(repeats):
+        yield timer(load_and_merge)
+
+CASES: Dict[str, Callable[..., Iterator[float]]] = {
+    "synthetic_scalar": case_synthetic_scalar,
+    "synthetic_columnar": case_synthetic_columnar,
+    "create_agents": case_create_agents,
+    "run_step": case_run_step,
+    "collect_results": case_collect_results,
+    "config": case_config,
+}
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+def machine_info() -> dict:
+    return {"node": platform.node(), "system": platform.system(), "machine": platform.machine(),
+            "processor": platform.processor(), "cpu_count": os.cpu_count(), "python": platform.python_version(),
+            "numpy": np.__version__, "pandas": pd.__version__}
+
+def machine_id(info: Optional[dict] = None) -> str:
+    """Name of a machine's baseline file: its host name and architecture."""
+    info = info or machine_info()
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{info['node'] or 'unknown'}-{info['machine'] or 'unknown'}")
+
+def baseline_path(machine: Optional[str] = None) -> str:
+    return os.path.join(BASELINE_DIRECTORY, f"{machine or machine_id()}.json")
+
+def run_suite(tiers: List[str], cases: List[str], repeats: int) -> dict:
+    """Times the cases at the tiers; results are keyed "<case>/<tier>"."""
+    results = {}
+    for tier in tiers:
+        for case in cases:
+            with tempfile.TemporaryDirectory(prefix="bench-suite-") as workdir:
+                samples = list(CASES[case](TIERS[tier], repeats, workdir, timed))
+            results[f"{case}/{tier}"] = {"min_s": min(samples), "median_s": statistics.median(samples),
+                                         "samples_s": samples}
+            print(f"{case + '/' + tier:>28} {min(samples):>10.4f} {statistics.median(samples):>10.4f}", flush=True)
+    return {"machine": machine_info(), "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "repeats": repeats, "results": results}
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """Prints each shared case's change in minimum time and returns those slower than the baseline by over `threshold`."""
+    if machine_id(current["machine"]) != machine_id(baseline["machine"]):
+        print(f"warning: comparing results of {machine_id(current['machine'])} "
+              f"with a baseline of {machine_id(baseline['machine'])}")
+    regressions = []
+    print(f"{'case':>28} {'baseline s':>10} {'current s':>10} {'change':>8}")
+    for key, result in current["results"].items():
+        if key not in baseline["results"]:
+            print(f"{key:>28} {'-':>10} {result['min_s']:>10.4f} {'new':>8}")
+            continue
+        before, after = baseline["results"][key]["min_s"], result["min_s"]
+        change = after / before - 1 if before > 0 else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(f"{key:>28} {before:>10.4f} {after:>10.4f} {change:>+8.1%}{flag}")
+    return regressions
+
+def read_json(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+def write_json(data: dict, path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="Time the cases and write the results")
+    run.add_argument("--tiers", nargs="+", choices=list(TIERS), default=["1k", "100k"])
+    run.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    run.add_argument("--repeats", type=int, default=3)
+    run.add_argument("--output", help="Results file (default: print only)")
+    run.add_argument("--save-baseline", action="store_true", help="Store the results as this machine's baseline")
+    check = commands.add_parser("compare", help="Compare results with a baseline")
+    check.add_argument("results")
+    check.add_argument("--baseline", help="Baseline file (default: this machine's)")
+    check.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slow-down of a case's minimum time")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        print(f"{'case':>28} {'min s':>10} {'median s':>10}")
+        results = run_suite(args.tiers, args.cases, args.repeats)
+        if args.output:
+            write_json(results, args.output)
+        if args.save_baseline:
+            path = baseline_path(machine_id(results["machine"]))
+            if os.path.exists(path): # Keep the cases and tiers not run this time
+                results = {**results, "results": {**read_json(path)["results"], **results["results"]}}
+            write_json(results, path)
+            print(f"baseline saved to {path}")
+        return 0
+
+    path = args.baseline or baseline_path()
+    if not os.path.exists(path):
+        print(f"no baseline at {path}; create one with `run --save-baseline`")
+        return 2
+    regressions = compare(read_json(args.results), read_json(path), args.threshold)
+    print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}" + (f": {', '.join(regressions)}" if regressions else ""))
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
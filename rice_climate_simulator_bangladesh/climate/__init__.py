@@ -1,9 +1,19 @@
 from .climate_data import WeatherParameters, ClimateScenario, CMIP6Data
 from .climate_manager import ClimateManager
+from .weather_cube import WeatherCube, WEATHER_VARIABLES
+from .weather_generator import WeatherGenerator, GENERATED_VARIABLES
+from .forcing import ClimateForcing, FORCING_VARIABLES, station_for_admin_units
 
 __all__ = [
     "WeatherParameters",
     "ClimateScenario",
     "CMIP6Data",
-    "ClimateManager"
+    "ClimateManager",
+    "WeatherCube",
+    "WEATHER_VARIABLES",
+    "WeatherGenerator",
+    "GENERATED_VARIABLES",
+    "ClimateForcing",
+    "FORCING_VARIABLES",
+    "station_for_admin_units"
 ]
@@ -1,9 +1,18 @@
 from typing import Dict, List, Optional
 from datetime import date
+import os
+import numpy as np
 import pandas as pd # Placeholder, consider if pydantic is better for strict schemas
 
+from utils.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
 class WeatherParameters:
     """Represents daily weather parameters for a specific location and date."""
+    __slots__ = ("date", "max_temp_c", "min_temp_c", "precipitation_mm", "humidity_percent",
+                 "solar_radiation_mj_m2", "wind_speed_m_s", "station_id")
+
     def __init__(self,
                  record_date: date,
                  max_temp_c: Optional[float] = None, # Maximum temperature in Celsius
@@ -40,18 +49,69 @@ class ClimateScenario:
 # Example: Historical weather data might be stored as a list of WeatherParameters objects
 # or in a pandas DataFrame managed by ClimateManager.
 
-# Placeholder for downscaled CMIP6 model data structure
-# This could be a more complex object or a reference to a file path
-# to be loaded by the ClimateManager.
+# Downscaled CMIP6 model data is ingested once from CSV into an on-disk WeatherCube
+# (see weather_cube.py) and memory-mapped, so registering many model x scenario pairs
+# costs no RAM until a run reads a window of one of them.
 class CMIP6Data:
-    """Placeholder for CMIP6 model data."""
-    def __init__(self, model_name: str, scenario: ClimateScenario, data_path: str):
+    """CMIP6 model output for one scenario, read lazily from a memory-mapped cube."""
+    def __init__(self, model_name: str, scenario: ClimateScenario, data_path: str,
+                 cube_dir: Optional[str] = None):
         self.model_name = model_name
         self.scenario = scenario
-        self.data_path = data_path # Path to NetCDF, CSV, or other format
+        self.data_path = data_path # Path to a long-format CSV or to an already converted cube directory
+        # Where the converted cube lives; defaults to the data path with a .cube suffix
+        self.cube_dir = cube_dir if cube_dir else (data_path if data_path.endswith(".cube") else f"{os.path.splitext(data_path)[0]}.cube")
+        self._cube = None
+
+    def open_cube(self):
+        """Returns the memory-mapped WeatherCube, converting the CSV on first use (or when it is newer)."""
+        from .weather_cube import WeatherCube # weather_cube imports this module
+        if self._cube is None:
+            if not self._cube_is_current():
+                logger.info("Converting %s to cube format at %s (one-time ingest)", self.data_path, self.cube_dir)
+                WeatherCube.csv_to_cube(self.data_path, self.cube_dir)
+            self._cube = WeatherCube.open(self.cube_dir)
+        return self._cube
+
+    def _cube_is_current(self) -> bool:
+        from .weather_cube import WeatherCube
+        if not WeatherCube.is_cube_directory(self.cube_dir):
+            return False
+        if self.data_path == self.cube_dir or not os.path.exists(self.data_path):
+            return True
+        return os.path.getmtime(self.cube_dir) >= os.path.getmtime(self.data_path)
 
-    def load_data(self) -> Optional[pd.DataFrame]:
-        """Placeholder for loading data. Actual implementation will depend on data format."""
-        print(f"Loading data for {self.model_name} under {self.scenario.name} from {self.data_path}")
-        # Example: if pd.read_csv(self.data_path)
-        return None
+    def read_window(self, start_date: date, end_date: date, station_ids: Optional[List[str]] = None,
+                    variables: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """Reads only the requested date/station window, shape (stations, days) per variable."""
+        return self.open_cube().window(start_date, end_date, station_ids, variables)
+
+    def load_data(self, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                  station_ids: Optional[List[str]] = None, variables: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """Loads a window of the model data as a long table (date, station_id, variables).
+
+        Without arguments the whole cube is returned, so prefer passing the window a run needs.
+        """
+        logger.info("Loading data for %s under %s from %s", self.model_name, self.scenario.name, self.data_path)
+        cube = self.open_cube()
+        start_date = start_date if start_date else cube.start_date
+        end_date = end_date if end_date else cube.end_date
+        station_ids = station_ids if station_ids is not None else cube.station_ids
+        window = cube.window(start_date, end_date, station_ids, variables)
+        num_days = next(iter(window.values())).shape[1] if window else 0
+        first_day = max(start_date, cube.start_date)
+        frame = {
+            "date": np.tile(pd.date_range(first_day, periods=num_days, freq="D").date, len(station_ids)),
+            "station_id": np.repeat(np.asarray(station_ids, dtype=object), num_days),
+        }
+        frame.update({variable: values.ravel() for variable, values in window.items()})
+        return pd.DataFrame(frame)
+
+    def __getstate__(self):
+        # Memory maps are not pickled; each process re-opens the cube and shares the page cache
+        state = self.__dict__.copy()
+        state["_cube"] = None
+        return state
+
+    def __repr__(self):
+        return f"CMIP6Data(model='{self.model_name}', scenario='{self.scenario.scenario_id}')"
@@ -1,16 +1,23 @@
+import warnings
 from typing import List, Dict, Optional
 from datetime import date
 import pandas as pd # For handling tabular data
+import numpy as np
 
 from .climate_data import WeatherParameters, ClimateScenario, CMIP6Data
+from .weather_cube import WeatherCube
+from .weather_generator import WeatherGenerator
+from utils.logging_setup import get_logger
 # Assuming geography module is available for location context
 # from ..geography.spatial_units import AdministrativeUnit, AgroEcologicalZone
 
+logger = get_logger(__name__)
+
 class ClimateManager:
     """Manages climate data, including historical weather and future scenarios."""
     def __init__(self, historical_weather_data_path: Optional[str] = None,
                  climate_scenario_data_path: Optional[str] = None):
-        self.historical_weather: Dict[str, List[WeatherParameters]] = {} # Keyed by station_id or location_id
+        self.weather_cube: Optional[WeatherCube] = None # Historical weather as (station, day) arrays
         self.climate_scenarios: Dict[str, ClimateScenario] = {}
         self.cmip6_models: List[CMIP6Data] = []
 
@@ -20,93 +27,144 @@ class ClimateManager:
             self.load_climate_scenarios(climate_scenario_data_path)
 
     def load_historical_weather(self, file_path: str):
-        """Loads historical weather data from a file (e.g., CSV)."""
-        # Placeholder: Actual implementation depends on data format
-        # Example: Assume CSV with columns: date, station_id, max_temp, min_temp, precip, etc.
-        print(f"Loading historical weather data from {file_path}...")
-        # try:
-        #     df = pd.read_csv(file_path, parse_dates=['date'])
-        #     for _, row in df.iterrows():
-        #         wp = WeatherParameters(
-        #             record_date=row['date'].date(),
-        #             station_id=row['station_id'],
-        #             max_temp_c=row.get('max_temp_c'),
-        #             min_temp_c=row.get('min_temp_c'),
-        #             precipitation_mm=row.get('precipitation_mm')
-        #         )
-        #         if row['station_id'] not in self.historical_weather:
-        #             self.historical_weather[row['station_id']] = []
-        #         self.historical_weather[row['station_id']].append(wp)
-        #     print(f"Loaded historical weather for {len(self.historical_weather)} stations.")
-        # except Exception as e:
-        #     print(f"Error loading historical weather data: {e}")
-        pass
+        """Loads historical weather data from a CSV file.
+
+        Expected columns: date, station_id, max_temp_c, min_temp_c, precipitation_mm
+        (and optionally humidity_percent, solar_radiation_mj_m2, wind_speed_m_s).
+        """
+        logger.info("Loading historical weather data from %s...", file_path)
+        self.weather_cube = WeatherCube.from_csv(file_path)
+        logger.info("Loaded historical weather for %d stations.", len(self.weather_cube.station_ids))
+
+    def set_historical_weather(self, weather_cube: WeatherCube):
+        """Uses an already built cube (e.g. from synthetic weather records) as historical weather."""
+        self.weather_cube = weather_cube
 
     def load_climate_scenarios(self, file_path: str):
         """Loads climate scenario definitions (e.g., from a config file or CSV)."""
         # Placeholder: Actual implementation depends on data format
-        print(f"Loading climate scenarios from {file_path}...")
+        logger.info("Loading climate scenarios from %s...", file_path)
         # Example: SSP2-4.5, SSP5-8.5
         # self.climate_scenarios['ssp2_4_5'] = ClimateScenario('ssp2_4_5', 'SSP2-4.5', 'Medium emissions')
         pass
 
-    def add_cmip6_model_data(self, model_name: str, scenario_id: str, data_path: str):
-        """Adds a CMIP6 model dataset to the manager."""
+    def add_cmip6_model_data(self, model_name: str, scenario_id: str, data_path: str, cube_dir: Optional[str] = None):
+        """Registers a CMIP6 model dataset; nothing is read until a window of it is requested."""
         if scenario_id not in self.climate_scenarios:
-            print(f"Warning: Climate scenario '{scenario_id}' not defined. Please load scenarios first.")
+            logger.warning("Climate scenario '%s' not defined. Please load scenarios first.", scenario_id)
             # Or create a default one
             self.climate_scenarios[scenario_id] = ClimateScenario(scenario_id, scenario_id, "Auto-generated scenario")
         
         scenario = self.climate_scenarios[scenario_id]
-        cmip_data = CMIP6Data(model_name, scenario, data_path)
+        cmip_data = CMIP6Data(model_name, scenario, data_path, cube_dir=cube_dir)
         self.cmip6_models.append(cmip_data)
-        print(f"Added CMIP6 model: {model_name} for scenario {scenario.name}")
+        logger.info("Added CMIP6 model: %s for scenario %s", model_name, scenario.name)
+
+    def get_cmip6_model(self, model_name: str, scenario_id: str) -> Optional[CMIP6Data]:
+        """Finds a registered CMIP6 dataset by model name and scenario id."""
+        for cmip_data in self.cmip6_models:
+            if cmip_data.model_name == model_name and cmip_data.scenario.scenario_id == scenario_id:
+                return cmip_data
+        return None
 
     def get_weather_for_date(self, location_id: str, target_date: date, scenario_id: Optional[str] = None) -> Optional[WeatherParameters]:
         """Retrieves weather parameters for a specific location and date, optionally under a climate scenario."""
-        # Placeholder: This would involve looking up historical data and applying scenario adjustments
-        if scenario_id:
-            if scenario_id not in self.climate_scenarios:
-                print(f"Error: Scenario '{scenario_id}' not found.")
-                return None
-            # Apply scenario adjustments (complex logic, placeholder here)
-            print(f"Fetching weather for {location_id} on {target_date} under scenario {scenario_id} (logic TBD)")
-            # This might involve interpolating CMIP6 data or applying delta changes
-            # For now, return a dummy or historical if no scenario logic
-            base_weather = self.historical_weather.get(location_id, [])
-            for wp in base_weather:
-                if wp.date == target_date:
-                    # Dummy adjustment for demonstration
-                    adjusted_wp = WeatherParameters(
-                        record_date=wp.date,
-                        max_temp_c=wp.max_temp_c + 2 if wp.max_temp_c else None, # Example: +2C for scenario
-                        min_temp_c=wp.min_temp_c + 1 if wp.min_temp_c else None,
-                        precipitation_mm=wp.precipitation_mm,
-                        station_id=wp.station_id
-                    )
-                    return adjusted_wp
-            return None # Or some projected data
-        else:
-            # Retrieve historical data
-            location_weather = self.historical_weather.get(location_id, [])
-            for wp in location_weather:
-                if wp.date == target_date:
-                    return wp
+        if scenario_id and scenario_id not in self.climate_scenarios:
+            logger.error("Scenario '%s' not found.", scenario_id)
             return None
+        if self.weather_cube is None:
+            return None
+        wp = self.weather_cube.weather_parameters(location_id, target_date)
+        if wp is None or not scenario_id:
+            return wp
+        # Apply scenario adjustments (complex logic, placeholder here)
+        # This might involve interpolating CMIP6 data or applying delta changes
+        adjusted = self._apply_scenario_adjustments(
+            {"max_temp_c": np.float32(np.nan if wp.max_temp_c is None else wp.max_temp_c),
+             "min_temp_c": np.float32(np.nan if wp.min_temp_c is None else wp.min_temp_c)}, scenario_id)
+        wp.max_temp_c = None if np.isnan(adjusted["max_temp_c"]) else float(adjusted["max_temp_c"])
+        wp.min_temp_c = None if np.isnan(adjusted["min_temp_c"]) else float(adjusted["min_temp_c"])
+        return wp
+
+    def get_weather_arrays(self, location_id: str, start_date: date, end_date: date,
+                           scenario_id: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """Daily weather for a location over an inclusive date range, one array per variable.
+
+        Without a scenario the arrays are views into the weather cube; with one they are adjusted copies.
+        """
+        if self.weather_cube is None:
+            return {}
+        arrays = self.weather_cube.series(location_id, start_date, end_date)
+        return self._apply_scenario_adjustments(arrays, scenario_id) if scenario_id else arrays
+
+    def get_weather_for_all_stations(self, target_date: date, scenario_id: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """One day of weather for every station (in weather_cube.station_ids order)."""
+        if self.weather_cube is None:
+            return {}
+        arrays = self.weather_cube.day(target_date)
+        return self._apply_scenario_adjustments(arrays, scenario_id) if scenario_id else arrays
 
     def get_projected_weather_series(self, location_id: str, start_date: date, end_date: date, scenario_id: str) -> List[WeatherParameters]:
         """Retrieves a time series of projected weather data for a location under a scenario."""
         # Placeholder: This will be a more complex method involving CMIP6 data processing
-        print(f"Generating projected weather series for {location_id} from {start_date} to {end_date} under {scenario_id} (logic TBD)")
+        if scenario_id not in self.climate_scenarios or self.weather_cube is None:
+            return []
+        arrays = self.get_weather_arrays(location_id, start_date, end_date, scenario_id)
+        first_day = max(0, (start_date - self.weather_cube.start_date).days)
         series: List[WeatherParameters] = []
-        # current_date = start_date
-        # while current_date <= end_date:
-        #     wp = self.get_weather_for_date(location_id, current_date, scenario_id)
-        #     if wp:
-        #         series.append(wp)
-        #     current_date += timedelta(days=1)
+        for offset in range(len(next(iter(arrays.values()), []))):
+            values = {k: (None if np.isnan(v[offset]) else float(v[offset])) for k, v in arrays.items()}
+            if any(value is not None for value in values.values()):
+                series.append(WeatherParameters(record_date=self.weather_cube.date_for_index(first_day + offset),
+                                                station_id=location_id, **values))
         return series
 
+    def station_step_climate(self, num_steps: int, days_per_step: int,
+                             scenario_id: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """
+        Per-station climate of consecutive simulation steps of `days_per_step` days, the
+        first starting on the cube's first day; steps beyond the record wrap around it.
+
+        Returns (step, station) float64 arrays in weather_cube.station_ids order:
+        "precipitation_mm" (step total) and "mean_temp_c" (mean of daily max and min),
+        NaN where a station has no observations in a step.
+        """
+        cube = self.weather_cube
+        if cube is None or cube.num_days == 0:
+            return {}
+        days = np.arange(num_steps * days_per_step) % cube.num_days
+        arrays = {variable: cube.data[variable][:, days] for variable in ("precipitation_mm", "max_temp_c", "min_temp_c")
+                  if variable in cube.data}
+        if scenario_id and scenario_id in self.climate_scenarios:
+            arrays = self._apply_scenario_adjustments(arrays, scenario_id)
+        shape = (len(cube.station_ids), num_steps, days_per_step)
+        climate = {}
+        with np.errstate(invalid="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning) # All-NaN steps are expected for stations with gaps
+            if "precipitation_mm" in arrays:
+                precipitation = arrays["precipitation_mm"].reshape(shape).astype(np.float64)
+                observed = ~np.isnan(precipitation).all(axis=2)
+                climate["precipitation_mm"] = np.ascontiguousarray(np.where(observed, np.nansum(precipitation, axis=2), np.nan).T)
+            if "max_temp_c" in arrays and "min_temp_c" in arrays:
+                mean_temp = (arrays["max_temp_c"].astype(np.float64) + arrays["min_temp_c"]) / 2
+                climate["mean_temp_c"] = np.ascontiguousarray(np.nanmean(mean_temp.reshape(shape), axis=2).T)
+        return climate
+
+    def fit_weather_generator(self, wet_threshold_mm: float = 0.1) -> Optional[WeatherGenerator]:
+        """Fits a stochastic weather generator to the historical weather (None without weather data)."""
+        if self.weather_cube is None or self.weather_cube.num_days < 2:
+            return None
+        return WeatherGenerator.fit(self.weather_cube, wet_threshold_mm)
+
+    def _apply_scenario_adjustments(self, arrays: Dict[str, np.ndarray], scenario_id: str) -> Dict[str, np.ndarray]:
+        """Dummy delta adjustment for demonstration: +2C max and +1C min temperature."""
+        adjusted = dict(arrays)
+        if "max_temp_c" in arrays:
+            adjusted["max_temp_c"] = arrays["max_temp_c"] + np.float32(2) # Example: +2C for scenario
+        if "min_temp_c" in arrays:
+            adjusted["min_temp_c"] = arrays["min_temp_c"] + np.float32(1)
+        return adjusted
+
 # Example Usage:
 # climate_mgr = ClimateManager(historical_weather_data_path='path/to/historical_data.csv')
 # climate_mgr.load_climate_scenarios('path/to/scenario_definitions.cfg') # or some other format
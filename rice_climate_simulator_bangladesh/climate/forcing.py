@@ -0,0 +1,157 @@
+import zlib
+from typing import Dict, Mapping, Optional, Sequence
+
+import numpy as np
+
+FORCING_VARIABLES = ("precipitation_mm", "mean_temp_c", "salinity_change")
+# Streams of the stochastic placeholders (see counter_uniform)
+PLACEHOLDER_STREAMS = {"precipitation_mm": 0, "salinity_change": 1}
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+
+def stream_key(random_seed: int, step: int, stream: int) -> np.uint64:
+    """64-bit key of one placeholder stream of one step."""
+    return np.random.SeedSequence([random_seed, step, stream]).generate_state(1, np.uint64)[0]
+
+def row_counters(rows: np.ndarray) -> np.ndarray:
+    """Step-independent part of the counter_uniform state of each row."""
+    with np.errstate(over="ignore"):
+        counters = np.asarray(rows, dtype=np.uint64) + np.uint64(1)
+        counters *= _GOLDEN_GAMMA
+    return counters
+
+def counter_uniform(key: np.uint64, rows: np.ndarray, low: float, high: float,
+                    counters: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Uniform draws in [low, high) of a counter-based stream: the draw of row i is the
+    SplitMix64 output for counter i under `key`, so the draws of any set of rows are
+    computed directly and equal the same rows of a draw for every row. `counters`
+    (row_counters(rows)) saves recomputing them for every key.
+    """
+    with np.errstate(over="ignore"):
+        z = (counters if counters is not None else row_counters(rows)) + key
+        z ^= z >> np.uint64(30)
+        z *= np.uint64(0xBF58476D1CE4E5B9)
+        z ^= z >> np.uint64(27)
+        z *= np.uint64(0x94D049BB133111EB)
+        z ^= z >> np.uint64(31)
+    z >>= np.uint64(11)
+    values = z.astype(np.float64)
+    values *= (high - low) * 2.0**-53
+    values += low
+    return values
+
+def station_for_admin_units(admin_unit_ids: Sequence[Optional[str]], station_ids: Sequence[str],
+                            station_by_admin_unit: Optional[Mapping[str, str]] = None) -> np.ndarray:
+    """
+    Weather station index (into `station_ids`) of each admin unit; -1 where there is none.
+
+    Units listed in `station_by_admin_unit` use that station. Others get a station chosen
+    by a stable hash of the unit id, so a unit maps to the same station whichever
+    farmers a run (or a shard of it) holds.
+    """
+    station_index = {station_id: i for i, station_id in enumerate(station_ids)}
+    station_by_admin_unit = station_by_admin_unit or {}
+    stations = np.full(len(admin_unit_ids), -1, dtype=np.int64)
+    if not station_ids:
+        return stations
+    for i, unit in enumerate(admin_unit_ids):
+        if unit is None:
+            continue
+        if unit in station_by_admin_unit:
+            stations[i] = station_index.get(station_by_admin_unit[unit], -1)
+        else:
+            stations[i] = zlib.crc32(str(unit).encode("utf-8")) % len(station_ids)
+    return stations
+
+class ClimateForcing:
+    """
+    Per-plot climate forcing of a run as dense (step, plot) float64 arrays, one per
+    FORCING_VARIABLES entry, with plots in PlotStateStore row order.
+
+    Precipitation and mean temperature come from the station climate of each step
+    (ClimateManager.station_step_climate) at the plot's station. Salinity change, and
+    precipitation where the plot has no station data, are the stochastic placeholders
+    drawn per plot row from counter-based streams keyed by (random_seed, step);
+    temperature is NaN there.
+
+    `step(s)` returns row views of the arrays, so the engine reads a step's forcing
+    without copying. By default the whole run is computed up front. With
+    `window_steps`, only a window of that many steps is held and the next window is
+    computed when a step outside it is asked for, bounding memory for large
+    populations and long runs.
+
+    For one shard of a larger run, `plot_rows` gives the run-wide row of each local
+    plot: the stochastic draws are made for those rows only, and equal a serial run's.
+    """
+    def __init__(self, random_seed: int, num_steps: int, num_plots: int,
+                 station_climate: Optional[Mapping[str, np.ndarray]] = None,
+                 plot_station: Optional[np.ndarray] = None,
+                 window_steps: Optional[int] = None,
+                 plot_rows: Optional[np.ndarray] = None):
+        self.random_seed = random_seed
+        self.num_steps = num_steps
+        self.num_plots = num_plots
+        self.station_climate: Dict[str, np.ndarray] = dict(station_climate or {})
+        self.plot_station = (np.asarray(plot_station, dtype=np.int64) if plot_station is not None
+                             else np.full(num_plots, -1, dtype=np.int64))
+        self.window_steps = min(window_steps, num_steps) if window_steps else num_steps
+        # Run-wide row of each plot, the counter of its placeholder draws
+        self.plot_rows = (np.asarray(plot_rows, dtype=np.int64) if plot_rows is not None
+                          else np.arange(num_plots, dtype=np.int64))
+        self._row_counters = row_counters(self.plot_rows)
+        self.first_step = 0 # First step of the window held in `arrays`
+        self.arrays: Dict[str, np.ndarray] = {
+            variable: np.empty((max(self.window_steps, 1), num_plots), dtype=np.float64) for variable in FORCING_VARIABLES}
+        self._computed_steps = 0 # Steps of the current window that hold values
+        self._compute_window(0)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.arrays.values())
+
+    def step(self, step: int) -> Dict[str, np.ndarray]:
+        """
+        Forcing of every plot in `step`, as read-only views into the window arrays (valid
+        until a step outside the current window is requested).
+        """
+        offset = step - self.first_step
+        if not 0 <= offset < self._computed_steps:
+            self._compute_window(step)
+            offset = 0
+        views = {}
+        for variable, array in self.arrays.items():
+            view = array[offset]
+            view.flags.writeable = False
+            views[variable] = view
+        return views
+
+    def _compute_window(self, first_step: int):
+        self.first_step = first_step
+        count = min(len(next(iter(self.arrays.values()))), max(self.num_steps - first_step, 1))
+        has_station = self.plot_station >= 0
+        stations = self.plot_station[has_station]
+        for offset in range(count):
+            step = first_step + offset
+            self._draw_placeholders(step, offset)
+            precipitation, temperature = self.arrays["precipitation_mm"][offset], self.arrays["mean_temp_c"][offset]
+            temperature.fill(np.nan)
+            if step < self._station_steps():
+                if "precipitation_mm" in self.station_climate:
+                    station_values = self.station_climate["precipitation_mm"][step][stations]
+                    observed = ~np.isnan(station_values)
+                    precipitation[np.flatnonzero(has_station)[observed]] = station_values[observed]
+                if "mean_temp_c" in self.station_climate:
+                    temperature[has_station] = self.station_climate["mean_temp_c"][step][stations]
+        self._computed_steps = count
+
+    def _draw_placeholders(self, step: int, offset: int):
+        for variable, (low, high) in (("precipitation_mm", (0.0, 10.0)), ("salinity_change", (-0.1, 0.1))):
+            key = stream_key(self.random_seed, step, PLACEHOLDER_STREAMS[variable])
+            self.arrays[variable][offset] = counter_uniform(key, self.plot_rows, low, high, self._row_counters)
+
+    def _station_steps(self) -> int:
+        return min((len(values) for values in self.station_climate.values()), default=0)
+
+    def __repr__(self):
+        return (f"ClimateForcing(steps={self.num_steps}, plots={self.num_plots}, window_steps={self.window_steps}, "
+                f"stations={'yes' if self.station_climate else 'no'})")
@@ -0,0 +1,253 @@
+from datetime import date, timedelta
+import json
+import os
+import shutil
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .climate_data import WeatherParameters
+
+WEATHER_VARIABLES = (
+    "max_temp_c",
+    "min_temp_c",
+    "precipitation_mm",
+    "humidity_percent",
+    "solar_radiation_mj_m2",
+    "wind_speed_m_s",
+)
+
+CUBE_FORMAT_VERSION = 1
+CUBE_METADATA_FILE = "cube.json"
+
+class WeatherCube:
+    """
+    Dense daily weather store: one float32 array of shape (station, day) per variable.
+
+    Stations map to rows through a dict and dates map to columns by day offset from
+    `start_date`, so a lookup is O(1). Missing observations are NaN. Station series are
+    contiguous row slices; a day across all stations is a column view.
+
+    On disk a cube is a directory with a `cube.json` metadata file and one `.npy` file
+    per variable. `WeatherCube.open` memory-maps those files read-only, so only the
+    pages a run touches are read and processes opening the same cube share page cache.
+    """
+    def __init__(self, station_ids: Sequence[str], start_date: date, num_days: int,
+                 variables: Sequence[str] = WEATHER_VARIABLES,
+                 data: Optional[Dict[str, np.ndarray]] = None):
+        self.station_ids: List[str] = list(station_ids)
+        self.start_date = start_date
+        self.num_days = num_days
+        self.variables = tuple(variables)
+        self._station_index: Dict[str, int] = {station_id: i for i, station_id in enumerate(self.station_ids)}
+        shape = (len(self.station_ids), num_days)
+        self.data: Dict[str, np.ndarray] = {}
+        for variable in self.variables:
+            if data is not None and variable in data:
+                self.data[variable] = data[variable]
+            else:
+                self.data[variable] = np.full(shape, np.nan, dtype=np.float32)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "WeatherCube":
+        """
+        Builds a cube from a long table with one row per station and day.
+
+        The table needs a `date` (or `record_date`) column, a `station_id` column and any
+        of the WEATHER_VARIABLES columns.
+        """
+        if len(df) == 0:
+            return cls([], date.today(), 0)
+        date_column = "date" if "date" in df.columns else "record_date"
+        dates = pd.to_datetime(df[date_column]).dt.normalize()
+        station_codes, station_ids = pd.factorize(df["station_id"].astype(str), sort=True)
+        start = dates.min()
+        day_index = ((dates - start).dt.days).to_numpy()
+        cube = cls(list(station_ids), start.date(), int(day_index.max()) + 1,
+                   variables=[v for v in WEATHER_VARIABLES if v in df.columns])
+        for variable in cube.variables:
+            cube.data[variable][station_codes, day_index] = pd.to_numeric(df[variable], errors="coerce").to_numpy(np.float32)
+        return cube
+
+    @classmethod
+    def from_csv(cls, file_path: str) -> "WeatherCube":
+        """Loads a cube from a CSV with columns date, station_id, max_temp_c, min_temp_c, precipitation_mm, ..."""
+        return cls.from_frame(pd.read_csv(file_path))
+
+    @classmethod
+    def from_records(cls, records: Iterable) -> "WeatherCube":
+        """Builds a cube from WeatherRecordSchema-like objects (record_date, station_id, variables)."""
+        columns = ("record_date", "station_id") + WEATHER_VARIABLES
+        rows = [tuple(getattr(record, column, None) for column in columns) for record in records]
+        return cls.from_frame(pd.DataFrame.from_records(rows, columns=columns))
+
+    @classmethod
+    def csv_to_cube(cls, csv_path: str, cube_dir: str, chunksize: int = 1_000_000) -> "WeatherCube":
+        """
+        Converts a long-format weather CSV into an on-disk cube without loading it whole.
+
+        A first chunked pass finds the stations and date range; a second pass scatters
+        each chunk into memory-mapped output arrays. Returns the cube opened read-only.
+        """
+        station_ids, first_date, last_date, columns = set(), None, None, None
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            columns = chunk.columns
+            dates = pd.to_datetime(chunk["date" if "date" in chunk.columns else "record_date"])
+            station_ids.update(chunk["station_id"].astype(str).unique())
+            first_date = dates.min() if first_date is None else min(first_date, dates.min())
+            last_date = dates.max() if last_date is None else max(last_date, dates.max())
+        if first_date is None:
+            raise ValueError(f"No weather records in {csv_path}")
+
+        station_ids = sorted(station_ids)
+        station_index = pd.Index(station_ids)
+        start = first_date.normalize()
+        num_days = (last_date.normalize() - start).days + 1
+        variables = [v for v in WEATHER_VARIABLES if v in columns]
+        tmp_dir = cls._prepare_directory(cube_dir)
+        arrays = {variable: np.lib.format.open_memmap(os.path.join(tmp_dir, f"{variable}.npy"), mode="w+",
+                                                      dtype=np.float32, shape=(len(station_ids), num_days))
+                  for variable in variables}
+        for array in arrays.values():
+            array[:] = np.nan
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            dates = pd.to_datetime(chunk["date" if "date" in chunk.columns else "record_date"]).dt.normalize()
+            rows = station_index.get_indexer(chunk["station_id"].astype(str))
+            days = (dates - start).dt.days.to_numpy()
+            for variable, array in arrays.items():
+                array[rows, days] = pd.to_numeric(chunk[variable], errors="coerce").to_numpy(np.float32)
+        for array in arrays.values():
+            array.flush()
+        del arrays
+        cls._write_metadata(tmp_dir, station_ids, start.date(), num_days, variables)
+        cls._commit_directory(tmp_dir, cube_dir)
+        return cls.open(cube_dir)
+
+    def save(self, cube_dir: str):
+        """Writes the cube as a directory of .npy files plus cube.json metadata."""
+        tmp_dir = self._prepare_directory(cube_dir)
+        for variable in self.variables:
+            np.save(os.path.join(tmp_dir, f"{variable}.npy"), np.asarray(self.data[variable], dtype=np.float32))
+        self._write_metadata(tmp_dir, self.station_ids, self.start_date, self.num_days, self.variables)
+        self._commit_directory(tmp_dir, cube_dir)
+
+    @classmethod
+    def open(cls, cube_dir: str, mmap_mode: Optional[str] = "r") -> "WeatherCube":
+        """Opens a saved cube; by default the variable arrays are read-only memory maps."""
+        with open(os.path.join(cube_dir, CUBE_METADATA_FILE), "r") as f:
+            metadata = json.load(f)
+        if metadata.get("format_version") != CUBE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported weather cube format in {cube_dir}: {metadata.get('format_version')}")
+        data = {variable: np.load(os.path.join(cube_dir, f"{variable}.npy"), mmap_mode=mmap_mode)
+                for variable in metadata["variables"]}
+        return cls(metadata["station_ids"], date.fromisoformat(metadata["start_date"]), metadata["num_days"],
+                   variables=metadata["variables"], data=data)
+
+    @staticmethod
+    def is_cube_directory(path: str) -> bool:
+        return os.path.isfile(os.path.join(path, CUBE_METADATA_FILE))
+
+    @staticmethod
+    def _prepare_directory(cube_dir: str) -> str:
+        tmp_dir = f"{cube_dir.rstrip(os.sep)}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        return tmp_dir
+
+    @staticmethod
+    def _commit_directory(tmp_dir: str, cube_dir: str):
+        # Readers never see a half-written cube: the finished directory is swapped in at the end
+        shutil.rmtree(cube_dir, ignore_errors=True)
+        os.replace(tmp_dir, cube_dir)
+
+    @staticmethod
+    def _write_metadata(cube_dir: str, station_ids: Sequence[str], start_date: date, num_days: int,
+                        variables: Sequence[str]):
+        metadata = {"format_version": CUBE_FORMAT_VERSION, "station_ids": list(station_ids),
+                    "start_date": start_date.isoformat(), "num_days": num_days, "variables": list(variables)}
+        with open(os.path.join(cube_dir, CUBE_METADATA_FILE), "w") as f:
+            json.dump(metadata, f)
+
+    # --- Index arithmetic ---
+    def station_index(self, station_id: str) -> Optional[int]:
+        return self._station_index.get(station_id)
+
+    def day_index(self, target_date: date) -> Optional[int]:
+        offset = (target_date - self.start_date).days
+        return offset if 0 <= offset < self.num_days else None
+
+    def date_for_index(self, day_index: int) -> date:
+        return self.start_date + timedelta(days=day_index)
+
+    @property
+    def end_date(self) -> date:
+        """Last date covered by the cube."""
+        return self.date_for_index(self.num_days - 1)
+
+    # --- Lookups ---
+    def value(self, variable: str, station_id: str, target_date: date) -> Optional[float]:
+        """Scalar lookup; None when the station, date or observation is missing."""
+        station, day = self.station_index(station_id), self.day_index(target_date)
+        if station is None or day is None or variable not in self.data:
+            return None
+        value = self.data[variable][station, day]
+        return None if np.isnan(value) else float(value)
+
+    def weather_parameters(self, station_id: str, target_date: date) -> Optional[WeatherParameters]:
+        """The observation for one station and day as WeatherParameters, or None if absent."""
+        station, day = self.station_index(station_id), self.day_index(target_date)
+        if station is None or day is None:
+            return None
+        values = {variable: self.data[variable][station, day] for variable in self.variables}
+        if all(np.isnan(value) for value in values.values()):
+            return None
+        return WeatherParameters(record_date=target_date, station_id=station_id,
+                                 **{k: (None if np.isnan(v) else float(v)) for k, v in values.items()})
+
+    def series(self, station_id: str, start_date: date, end_date: date,
+               variables: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Inclusive date range for one station, clipped to the cube's coverage.
+        Returns views (no copies) of shape (days,) per variable.
+        """
+        station = self.station_index(station_id)
+        first = max(0, (start_date - self.start_date).days)
+        last = min(self.num_days, (end_date - self.start_date).days + 1)
+        variables = variables if variables is not None else self.variables
+        if station is None or last <= first:
+            return {variable: np.empty(0, dtype=np.float32) for variable in variables}
+        return {variable: self.data[variable][station, first:last] for variable in variables}
+
+    def day(self, target_date: date, variables: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """One day across all stations (in station_ids order), shape (stations,) per variable."""
+        day = self.day_index(target_date)
+        variables = variables if variables is not None else self.variables
+        if day is None:
+            return {variable: np.full(len(self.station_ids), np.nan, dtype=np.float32) for variable in variables}
+        return {variable: self.data[variable][:, day] for variable in variables}
+
+    def window(self, start_date: date, end_date: date, station_ids: Optional[Sequence[str]] = None,
+               variables: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Copies out an inclusive date range for selected stations, shape (stations, days)
+        per variable. On a memory-mapped cube only that window is read from disk.
+        Unknown stations come back as NaN rows.
+        """
+        first = max(0, (start_date - self.start_date).days)
+        last = max(first, min(self.num_days, (end_date - self.start_date).days + 1))
+        variables = variables if variables is not None else self.variables
+        if station_ids is None:
+            return {variable: np.array(self.data[variable][:, first:last]) for variable in variables}
+        rows = np.array([self._station_index.get(station_id, -1) for station_id in station_ids], dtype=np.int64)
+        known = rows >= 0
+        window = {}
+        for variable in variables:
+            values = np.full((len(rows), last - first), np.nan, dtype=np.float32)
+            values[known] = self.data[variable][rows[known], first:last]
+            window[variable] = values
+        return window
+
+    def __repr__(self):
+        return (f"WeatherCube(stations={len(self.station_ids)}, days={self.num_days}, "
+                f"start={self.start_date}, variables={len(self.variables)})")
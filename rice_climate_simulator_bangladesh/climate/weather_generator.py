@@ -0,0 +1,220 @@
+from datetime import date
+from statistics import NormalDist
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from .weather_cube import WeatherCube
+
+GENERATED_VARIABLES = ("precipitation_mm", "max_temp_c", "min_temp_c")
+
+_BLOCK_DAYS = 366 # Days drawn per replicate at a time; fixed so results do not depend on run length
+_MIN_OBSERVATIONS = 5 # Station-month cells with fewer observations fall back to the station's all-month value
+
+def month_of_days(start_date: date, num_days: int) -> np.ndarray:
+    """Calendar month (0-11) of each of `num_days` days from `start_date`."""
+    days = np.datetime64(start_date, "D") + np.arange(num_days)
+    return (days.astype("datetime64[M]").astype(np.int64) % 12).astype(np.intp)
+
+class WeatherGenerator:
+    """
+    Richardson-type stochastic daily weather generator for a set of stations.
+
+    Per station and calendar month it holds a first-order Markov chain of wet/dry days
+    (P(wet | dry), P(wet | wet)), gamma-distributed wet-day rainfall (shape, scale),
+    and daily mean temperature and diurnal range conditioned on the wet/dry state.
+    Standardized temperature anomalies follow an AR(1) process with a per-station lag-1
+    coefficient. Occurrence and temperature innovations are correlated across stations
+    (Wilks, 1998) through Cholesky factors of the observed station correlations; the
+    occurrence correlation is that of the wet/dry indicators, which slightly
+    understates the latent correlation. Rainfall amounts are independent across stations.
+
+    `fit` estimates the parameters from a WeatherCube (NaN observations are skipped);
+    `simulate` draws (replicate, station, day) arrays for a list of seeds in one
+    vectorized call, each replicate from its own generator so that a replicate's weather
+    depends only on its seed.
+    """
+    def __init__(self, station_ids: Sequence[str], p_wet_after_dry: np.ndarray, p_wet_after_wet: np.ndarray,
+                 gamma_shape: np.ndarray, gamma_scale: np.ndarray, temp_mean_c: np.ndarray, temp_std_c: np.ndarray,
+                 diurnal_range_c: np.ndarray, temp_lag1: np.ndarray, occurrence_correlation: np.ndarray,
+                 temp_correlation: np.ndarray, wet_threshold_mm: float = 0.1, start_date: Optional[date] = None):
+        self.station_ids = list(station_ids)
+        self.p_wet_after_dry = p_wet_after_dry # (station, month)
+        self.p_wet_after_wet = p_wet_after_wet # (station, month)
+        self.gamma_shape = gamma_shape # (station, month)
+        self.gamma_scale = gamma_scale # (station, month)
+        self.temp_mean_c = temp_mean_c # (station, month, dry/wet)
+        self.temp_std_c = temp_std_c # (station, month)
+        self.diurnal_range_c = diurnal_range_c # (station, month, dry/wet)
+        self.temp_lag1 = temp_lag1 # (station,)
+        self.occurrence_correlation = occurrence_correlation # (station, station)
+        self.temp_correlation = temp_correlation # (station, station)
+        self.wet_threshold_mm = wet_threshold_mm
+        self.start_date = start_date
+
+    @classmethod
+    def fit(cls, cube: WeatherCube, wet_threshold_mm: float = 0.1) -> "WeatherGenerator":
+        """Estimates the generator's parameters from the daily observations in `cube`."""
+        if cube.num_days < 2 or not cube.station_ids:
+            raise ValueError("Fitting a weather generator needs at least two days of weather for one station.")
+        for variable in GENERATED_VARIABLES:
+            if variable not in cube.data:
+                raise ValueError(f"Weather cube has no '{variable}' observations to fit a weather generator from.")
+        num_stations = len(cube.station_ids)
+        months = np.broadcast_to(month_of_days(cube.start_date, cube.num_days), (num_stations, cube.num_days))
+        cells = np.arange(num_stations)[:, None] * 12 + months # Station-month cell of each observation
+        precipitation = cube.data["precipitation_mm"].astype(np.float64)
+        observed = ~np.isnan(precipitation)
+        wet = observed & (precipitation >= wet_threshold_mm)
+
+        # Wet/dry transitions between consecutive observed days, by month of the second day
+        pairs = observed[:, :-1] & observed[:, 1:]
+        after_dry = pairs & ~wet[:, :-1]
+        after_wet = pairs & wet[:, :-1]
+        p_wet_after_dry = _cell_ratio(cells[:, 1:], wet[:, 1:] & after_dry, after_dry, num_stations)
+        p_wet_after_wet = _cell_ratio(cells[:, 1:], wet[:, 1:] & after_wet, after_wet, num_stations)
+
+        # Wet-day amounts: gamma shape from Thom's (1958) approximation to the maximum likelihood estimate
+        amounts = np.where(wet, precipitation, 1.0)
+        mean_amount = np.maximum(_cell_mean(cells, amounts, wet, num_stations), max(wet_threshold_mm, 1e-3))
+        mean_log_amount = _cell_mean(cells, np.log(amounts), wet, num_stations)
+        log_ratio = np.maximum(np.log(mean_amount) - mean_log_amount, 1e-6)
+        gamma_shape = np.clip((1 + np.sqrt(1 + 4 * log_ratio / 3)) / (4 * log_ratio), 0.1, 20.0)
+        gamma_scale = mean_amount / gamma_shape
+
+        # Temperature: mean and diurnal range by wet/dry state, anomalies standardized per month
+        max_temp, min_temp = cube.data["max_temp_c"].astype(np.float64), cube.data["min_temp_c"].astype(np.float64)
+        mean_temp, diurnal_range = (max_temp + min_temp) / 2, max_temp - min_temp
+        has_temp = ~np.isnan(mean_temp)
+        temp_mean_c = np.empty((num_stations, 12, 2))
+        diurnal_range_c = np.empty((num_stations, 12, 2))
+        all_days_mean = _cell_mean(cells, mean_temp, has_temp, num_stations)
+        all_days_range = _cell_mean(cells, diurnal_range, has_temp, num_stations)
+        for state, mask in enumerate((has_temp & ~wet, has_temp & wet)):
+            temp_mean_c[:, :, state] = _cell_mean(cells, mean_temp, mask, num_stations, fallback=all_days_mean)
+            diurnal_range_c[:, :, state] = _cell_mean(cells, diurnal_range, mask, num_stations, fallback=all_days_range)
+        expected = np.take_along_axis(temp_mean_c.reshape(num_stations, 24), cells % 12 * 2 + wet, axis=1)
+        residual = np.where(has_temp, mean_temp - expected, 0.0)
+        temp_std_c = np.sqrt(_cell_mean(cells, residual ** 2, has_temp, num_stations))
+        temp_std_c = np.maximum(np.nan_to_num(temp_std_c, nan=1.0), 1e-3)
+        anomaly = np.where(has_temp, residual / np.take_along_axis(temp_std_c, cells % 12, axis=1), 0.0)
+        lag_pairs = has_temp[:, :-1] & has_temp[:, 1:]
+        lag_products = np.where(lag_pairs, anomaly[:, :-1] * anomaly[:, 1:], 0.0).sum(axis=1)
+        temp_lag1 = np.clip(lag_products / np.maximum(np.where(lag_pairs, anomaly[:, :-1] ** 2, 0.0).sum(axis=1), 1e-12),
+                            0.0, 0.99)
+
+        occurrence = np.where(observed, wet.astype(np.float64) - _row_mean(wet, observed)[:, None], 0.0)
+        return cls(cube.station_ids, p_wet_after_dry, p_wet_after_wet, gamma_shape, gamma_scale, temp_mean_c,
+                   temp_std_c, diurnal_range_c, temp_lag1, _correlation(occurrence), _correlation(anomaly),
+                   wet_threshold_mm=wet_threshold_mm, start_date=cube.start_date)
+
+    def simulate(self, num_days: int, seeds: Sequence[int], start_date: Optional[date] = None,
+                 dtype=np.float32) -> Dict[str, np.ndarray]:
+        """
+        Daily weather of every station for `num_days` days from `start_date` (default: the
+        first day of the fitted record), one replicate per seed.
+
+        Returns GENERATED_VARIABLES arrays of shape (replicate, station, day).
+        """
+        start_date = start_date or self.start_date or date(2000, 1, 1)
+        num_replicates, num_stations = len(seeds), len(self.station_ids)
+        months = month_of_days(start_date, num_days)
+        generators = [np.random.default_rng([int(seed), 0x5EED]) for seed in seeds]
+        occurrence_factor = _cholesky(self.occurrence_correlation)
+        temp_factor = _cholesky(self.temp_correlation)
+        # Wet-day probabilities as standard normal thresholds: wet when the correlated normal draw is below
+        inverse_cdf = np.vectorize(lambda p: NormalDist().inv_cdf(min(max(p, 1e-9), 1 - 1e-9)))
+        thresholds = inverse_cdf(np.stack([self.p_wet_after_dry, self.p_wet_after_wet], axis=-1)) # (station, month, state)
+        stations = np.arange(num_stations)
+        innovation_scale = np.sqrt(1 - self.temp_lag1 ** 2)
+
+        output = {variable: np.empty((num_replicates, num_stations, num_days), dtype=dtype)
+                  for variable in GENERATED_VARIABLES}
+        # Initial state: wet with the stationary probability of the first month, anomaly from the AR(1) stationary law
+        first_month = months[0] if num_days else 0
+        p_wet_after_dry = self.p_wet_after_dry[:, first_month]
+        stationary_wet = p_wet_after_dry / np.maximum(1 - self.p_wet_after_wet[:, first_month] + p_wet_after_dry, 1e-9)
+        wet = np.empty((num_replicates, num_stations), dtype=np.intp)
+        anomaly = np.empty((num_replicates, num_stations))
+        for r, rng in enumerate(generators):
+            wet[r] = rng.random(num_stations) < stationary_wet
+            anomaly[r] = rng.standard_normal(num_stations) @ temp_factor.T
+
+        for block_start in range(0, num_days, _BLOCK_DAYS):
+            block_months = months[block_start:block_start + _BLOCK_DAYS]
+            block_days = len(block_months)
+            occurrence_normal = np.empty((num_replicates, block_days, num_stations))
+            temp_normal = np.empty((num_replicates, block_days, num_stations))
+            amounts = np.empty((num_replicates, block_days, num_stations))
+            shape = self.gamma_shape[:, block_months].T
+            for r, rng in enumerate(generators):
+                occurrence_normal[r] = rng.standard_normal((block_days, num_stations)) @ occurrence_factor.T
+                temp_normal[r] = rng.standard_normal((block_days, num_stations)) @ temp_factor.T
+                amounts[r] = rng.standard_gamma(shape)
+            amounts *= self.gamma_scale[:, block_months].T
+
+            wet_days = np.empty((num_replicates, block_days, num_stations), dtype=np.intp)
+            anomalies = np.empty((num_replicates, block_days, num_stations))
+            for day, month in enumerate(block_months):
+                wet = (occurrence_normal[:, day] < thresholds[stations, month, wet]).astype(np.intp)
+                anomaly *= self.temp_lag1
+                anomaly += innovation_scale * temp_normal[:, day]
+                wet_days[:, day] = wet
+                anomalies[:, day] = anomaly
+
+            cells = stations * 12 + block_months[:, None] # (day, station)
+            state = cells * 2 + wet_days
+            mean_temp = self.temp_mean_c.reshape(-1)[state] + self.temp_std_c.reshape(-1)[cells] * anomalies
+            half_range = self.diurnal_range_c.reshape(-1)[state] / 2
+            days = slice(block_start, block_start + block_days)
+            output["precipitation_mm"][:, :, days] = np.where(wet_days, amounts, 0.0).transpose(0, 2, 1)
+            output["max_temp_c"][:, :, days] = (mean_temp + half_range).transpose(0, 2, 1)
+            output["min_temp_c"][:, :, days] = (mean_temp - half_range).transpose(0, 2, 1)
+        return output
+
+    def weather_cube(self, arrays: Dict[str, np.ndarray], replicate: int = 0,
+                     start_date: Optional[date] = None) -> WeatherCube:
+        """A WeatherCube over one replicate of `simulate` output (views, no copy)."""
+        num_days = next(iter(arrays.values())).shape[2]
+        return WeatherCube(self.station_ids, start_date or self.start_date or date(2000, 1, 1), num_days,
+                           variables=GENERATED_VARIABLES,
+                           data={variable: arrays[variable][replicate] for variable in GENERATED_VARIABLES})
+
+    def __repr__(self):
+        return f"WeatherGenerator(stations={len(self.station_ids)}, wet_threshold_mm={self.wet_threshold_mm})"
+
+def _cell_sums(cells: np.ndarray, values: np.ndarray, mask: np.ndarray, num_stations: int):
+    size = num_stations * 12
+    counts = np.bincount(cells[mask], minlength=size).reshape(num_stations, 12)
+    sums = np.bincount(cells[mask], weights=values[mask], minlength=size).reshape(num_stations, 12)
+    return sums, counts
+
+def _cell_mean(cells, values, mask, num_stations, fallback: Optional[np.ndarray] = None) -> np.ndarray:
+    """Mean of `values` where `mask` per station-month; sparse cells use `fallback` or the station mean."""
+    sums, counts = _cell_sums(cells, values, mask, num_stations)
+    station_mean = sums.sum(axis=1) / np.maximum(counts.sum(axis=1), 1)
+    if fallback is None:
+        fallback = np.broadcast_to(station_mean[:, None], sums.shape)
+    return np.where(counts >= _MIN_OBSERVATIONS, sums / np.maximum(counts, 1), fallback)
+
+def _cell_ratio(cells, events, trials, num_stations) -> np.ndarray:
+    """Share of `trials` that are `events` per station-month, falling back to the station's overall share."""
+    return np.clip(_cell_mean(cells, events.astype(np.float64), trials, num_stations), 0.0, 1.0)
+
+def _row_mean(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    return np.where(mask, values, 0).sum(axis=1) / np.maximum(mask.sum(axis=1), 1)
+
+def _correlation(centered: np.ndarray) -> np.ndarray:
+    """Correlation between the rows of a (station, day) array of centered values (0 where missing)."""
+    covariance = centered @ centered.T
+    scale = np.sqrt(np.maximum(np.diag(covariance), 1e-12))
+    correlation = covariance / np.outer(scale, scale)
+    np.fill_diagonal(correlation, 1.0)
+    return np.clip(correlation, -1.0, 1.0)
+
+def _cholesky(correlation: np.ndarray) -> np.ndarray:
+    """Cholesky factor of the nearest positive definite matrix (eigenvalues floored, unit diagonal restored)."""
+    eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+    repaired = (eigenvectors * np.maximum(eigenvalues, 1e-6)) @ eigenvectors.T
+    scale = np.sqrt(np.diag(repaired))
+    return np.linalg.cholesky(repaired / np.outer(scale, scale))
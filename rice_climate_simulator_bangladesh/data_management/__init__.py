@@ -10,10 +10,15 @@ from .data_loaders import (
     load_farmers_from_csv,
     load_farm_plots_from_json,
     load_weather_data_from_csv,
+    load_market_prices_from_csv,
     load_market_prices_from_api,
     load_all_simulation_data
 )
+from .validation import DataValidationError
 from .synthetic_data_generator import SyntheticDataGenerator
+from .columnar import FRAME_COLUMNS, SchemaRecords, schema_to_frames, frames_to_schema
+from .columnar_dataset import ColumnarDataset, ColumnarDatasetWriter, write_dataset
+from .input_cache import InputCache, input_cache_key
 
 __all__ = [
     # Schemas
@@ -27,8 +32,21 @@ __all__ = [
     "load_farmers_from_csv",
     "load_farm_plots_from_json",
     "load_weather_data_from_csv",
+    "load_market_prices_from_csv",
     "load_market_prices_from_api",
     "load_all_simulation_data",
+    "DataValidationError",
     # Synthetic Data Generator
-    "SyntheticDataGenerator"
+    "SyntheticDataGenerator",
+    # Columnar layout
+    "FRAME_COLUMNS",
+    "SchemaRecords",
+    "schema_to_frames",
+    "frames_to_schema",
+    "ColumnarDataset",
+    "ColumnarDatasetWriter",
+    "write_dataset",
+    # Input cache
+    "InputCache",
+    "input_cache_key"
 ]
@@ -0,0 +1,118 @@
+from typing import Dict, Iterator, List, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .schemas import (
+    WeatherRecordSchema, FarmPlotSchema, FarmerProfileSchema,
+    SoilPropertiesSchema, MarketPriceSchema, SimulationInputDataSchema
+)
+
+# Columnar layout of simulation inputs: one DataFrame per SimulationInputDataSchema field,
+# with nested soil properties flattened into plot columns.
+FARMER_COLUMNS = (
+    "agent_id", "household_id", "initial_capital_bdt", "age", "education_years",
+    "farming_experience_years", "risk_aversion_factor", "land_holding_category",
+    "location_admin_unit_id", "num_farm_plots",
+)
+SOIL_COLUMNS = tuple(SoilPropertiesSchema.model_fields)
+PLOT_COLUMNS = (
+    "plot_id", "owner_agent_id", "size_ha",
+) + SOIL_COLUMNS + (
+    "is_irrigated", "irrigation_type", "initial_land_quality",
+)
+WEATHER_COLUMNS = tuple(WeatherRecordSchema.model_fields)
+MARKET_PRICE_COLUMNS = tuple(MarketPriceSchema.model_fields)
+
+FRAME_COLUMNS = {
+    "farmers": FARMER_COLUMNS,
+    "farm_plots": PLOT_COLUMNS,
+    "historical_weather": WEATHER_COLUMNS,
+    "market_prices": MARKET_PRICE_COLUMNS,
+}
+
+TABLE_SCHEMAS = {
+    "farmers": FarmerProfileSchema,
+    "farm_plots": FarmPlotSchema,
+    "historical_weather": WeatherRecordSchema,
+    "market_prices": MarketPriceSchema,
+}
+
+class SchemaRecords(Sequence):
+    """
+    Read-only sequence of schema objects backed by one columnar table.
+
+    Objects are built (and validated by pydantic) only when accessed, so loaders can
+    hand out a list-like result for millions of rows while columnar consumers use
+    `frame` directly.
+    """
+    def __init__(self, table: str, frame: pd.DataFrame):
+        self.table = table
+        self.frame = frame
+
+    def __len__(self):
+        return len(self.frame)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return list(_build_records(self.table, self.frame.iloc[index]))
+        if index < 0:
+            index += len(self.frame)
+        if not 0 <= index < len(self.frame):
+            raise IndexError(f"{self.table} record index out of range")
+        return next(_build_records(self.table, self.frame.iloc[[index]]))
+
+    def __iter__(self) -> Iterator:
+        return _build_records(self.table, self.frame)
+
+    def __repr__(self):
+        return f"SchemaRecords({self.table!r}, rows={len(self.frame)})"
+
+def _build_records(table: str, frame: pd.DataFrame) -> Iterator:
+    schema = TABLE_SCHEMAS[table]
+    columns = [column for column in frame.columns if column in FRAME_COLUMNS[table]]
+    values = [_column_values(frame[column]) for column in columns]
+    for row_values in zip(*values):
+        row = {column: value for column, value in zip(columns, row_values) if value is not None}
+        if table == "farm_plots":
+            soil = {column: row.pop(column) for column in SOIL_COLUMNS if column in row}
+            row["soil_properties"] = SoilPropertiesSchema(**soil)
+        yield schema(**row)
+
+def _column_values(column: pd.Series) -> List:
+    """Python values of a column with missing entries as None."""
+    values = column.astype(object).tolist()
+    if column.hasnans:
+        missing = column.isna().to_numpy()
+        for i in np.flatnonzero(missing):
+            values[i] = None
+    return values
+
+def schema_to_frames(sim_data: SimulationInputDataSchema) -> Dict[str, pd.DataFrame]:
+    """Converts schema objects into the columnar layout (one DataFrame per input table).
+
+    Tables already held as SchemaRecords (e.g. from the data loaders) are used as they are.
+    """
+    frames = {}
+    for table, columns in FRAME_COLUMNS.items():
+        records = getattr(sim_data, table)
+        if isinstance(records, SchemaRecords):
+            frames[table] = records.frame
+        elif table == "farm_plots":
+            plot_rows = []
+            for plot in records:
+                row = plot.model_dump(exclude={"soil_properties"})
+                row.update(plot.soil_properties.model_dump())
+                plot_rows.append(row)
+            frames[table] = pd.DataFrame(plot_rows, columns=list(columns))
+        else:
+            frames[table] = pd.DataFrame([record.model_dump(exclude={"attributes"}) for record in records],
+                                         columns=list(columns))
+    return frames
+
+def frames_to_schema(frames: Dict[str, pd.DataFrame]) -> SimulationInputDataSchema:
+    """Builds schema objects from the columnar layout (validating every row)."""
+    return SimulationInputDataSchema(**{
+        table: list(_build_records(table, frames[table])) if frames.get(table) is not None else []
+        for table in FRAME_COLUMNS
+    })
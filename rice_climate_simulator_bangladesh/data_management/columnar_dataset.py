@@ -0,0 +1,222 @@
+import errno
+import json
+import os
+import shutil
+import tempfile
+from datetime import date
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+try: # Optional: Parquet shards when pyarrow is installed, NPZ shards otherwise
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+from .columnar import FRAME_COLUMNS
+
+DATASET_FORMAT_VERSION = 1
+DATASET_MANIFEST_FILE = "manifest.json"
+TMP_DIR_MARKER = ".tmp-" # In the names of writers' unpublished directories: <dataset>.tmp-<pid>-<random>
+SHARD_FORMATS = ("parquet", "npz")
+
+def default_shard_format() -> str:
+    return "parquet" if pq is not None else "npz"
+
+class ColumnarDatasetWriter:
+    """
+    Writes input tables (data_management.columnar layout) to a directory chunk by chunk.
+
+    Each appended chunk becomes one shard file (`<table>/part-NNNNN.parquet` or `.npz`)
+    and is not kept in memory. `close()` writes `manifest.json`, which lists the shards,
+    row counts and any metadata, and then moves the finished directory into place, so
+    readers never see a half-written dataset. Each writer has its own temporary
+    directory, so several writers (threads or processes) may target the same dataset;
+    with `replace=False` the first to publish wins and the others return its dataset.
+    """
+    def __init__(self, dataset_dir: str, shard_format: Optional[str] = None, metadata: Optional[dict] = None,
+                 replace: bool = True):
+        shard_format = shard_format or default_shard_format()
+        if shard_format not in SHARD_FORMATS:
+            raise ValueError(f"Unknown shard format '{shard_format}'. Expected one of {SHARD_FORMATS}.")
+        if shard_format == "parquet" and pq is None:
+            raise ImportError("Parquet shards need pyarrow; install it or use shard_format='npz'.")
+        self.dataset_dir = dataset_dir
+        self.shard_format = shard_format
+        self.metadata = metadata or {}
+        self.replace = replace # False: never touch a complete dataset already at dataset_dir
+        dataset_dir = os.path.abspath(dataset_dir)
+        os.makedirs(os.path.dirname(dataset_dir), exist_ok=True)
+        self._tmp_dir = tempfile.mkdtemp(prefix=f"{os.path.basename(dataset_dir)}{TMP_DIR_MARKER}{os.getpid()}-",
+                                         dir=os.path.dirname(dataset_dir))
+        self._tables: Dict[str, dict] = {}
+
+    def append(self, table: str, frame: pd.DataFrame):
+        """Writes one chunk of `table` as a new shard."""
+        entry = self._tables.setdefault(table, {"columns": list(frame.columns), "num_rows": 0, "shards": []})
+        if len(frame) == 0:
+            return
+        os.makedirs(os.path.join(self._tmp_dir, table), exist_ok=True)
+        shard_file = os.path.join(table, f"part-{len(entry['shards']):05d}.{self.shard_format}")
+        shard_path = os.path.join(self._tmp_dir, shard_file)
+        if self.shard_format == "parquet":
+            pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), shard_path)
+        else:
+            np.savez(shard_path, **encode_frame_arrays(frame))
+        entry["shards"].append({"file": shard_file, "num_rows": len(frame)})
+        entry["num_rows"] += len(frame)
+
+    def close(self) -> "ColumnarDataset":
+        """
+        Writes the manifest, publishes the dataset directory and returns it opened.
+
+        Without `replace`, a complete dataset already at dataset_dir (e.g. published by a
+        concurrent writer meanwhile) is kept: this writer's shards are dropped and the
+        existing dataset is returned.
+        """
+        if not self.replace and ColumnarDataset.is_dataset_directory(self.dataset_dir):
+            self.abort()
+            return ColumnarDataset.open(self.dataset_dir)
+        manifest = {"format_version": DATASET_FORMAT_VERSION, "shard_format": self.shard_format,
+                    "metadata": self.metadata, "tables": self._tables}
+        with open(os.path.join(self._tmp_dir, DATASET_MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f, indent=2)
+        if self.replace:
+            shutil.rmtree(self.dataset_dir, ignore_errors=True)
+        try:
+            os.replace(self._tmp_dir, self.dataset_dir)
+        except OSError as e:
+            self.abort()
+            # Without replace, a non-empty directory there means another writer published first
+            if self.replace or e.errno not in (errno.ENOTEMPTY, errno.EEXIST) \
+                    or not ColumnarDataset.is_dataset_directory(self.dataset_dir):
+                raise
+        return ColumnarDataset.open(self.dataset_dir)
+
+    def abort(self):
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+class ColumnarDataset:
+    """
+    Read side of a dataset written by ColumnarDatasetWriter.
+
+    Opening only reads the manifest. Tables are read shard by shard through
+    `iter_chunks`, optionally restricted to some columns, so a table never has to
+    be in memory whole unless `read_table` is asked for it.
+    """
+    def __init__(self, dataset_dir: str, manifest: dict):
+        self.dataset_dir = dataset_dir
+        self.shard_format: str = manifest["shard_format"]
+        self.metadata: dict = manifest.get("metadata", {})
+        self.tables: Dict[str, dict] = manifest["tables"]
+
+    @classmethod
+    def open(cls, dataset_dir: str) -> "ColumnarDataset":
+        with open(os.path.join(dataset_dir, DATASET_MANIFEST_FILE), "r") as f:
+            manifest = json.load(f)
+        if manifest.get("format_version") != DATASET_FORMAT_VERSION:
+            raise ValueError(f"Unsupported dataset format in {dataset_dir}: {manifest.get('format_version')}")
+        if manifest["shard_format"] == "parquet" and pq is None:
+            raise ImportError(f"{dataset_dir} holds Parquet shards; reading them needs pyarrow.")
+        return cls(dataset_dir, manifest)
+
+    @staticmethod
+    def is_dataset_directory(path: str) -> bool:
+        return os.path.isfile(os.path.join(path, DATASET_MANIFEST_FILE))
+
+    def num_rows(self, table: str) -> int:
+        return self.tables[table]["num_rows"] if table in self.tables else 0
+
+    def columns(self, table: str) -> List[str]:
+        return list(self.tables[table]["columns"]) if table in self.tables else list(FRAME_COLUMNS.get(table, ()))
+
+    def iter_chunks(self, table: str, columns: Optional[Sequence[str]] = None,
+                    shard_filter: Optional[Callable[[dict], bool]] = None) -> Iterator[pd.DataFrame]:
+        """Yields the table one shard at a time, skipping shards whose manifest entry fails `shard_filter`."""
+        columns = list(columns) if columns is not None else self.columns(table)
+        for shard in self.tables.get(table, {}).get("shards", []):
+            if shard_filter is not None and not shard_filter(shard):
+                continue
+            shard_path = os.path.join(self.dataset_dir, shard["file"])
+            if self.shard_format == "parquet":
+                yield pq.read_table(shard_path, columns=columns).to_pandas()
+            else:
+                with np.load(shard_path, allow_pickle=False) as arrays:
+                    yield decode_frame_arrays(arrays, columns)
+
+    def read_table(self, table: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """The whole table as one DataFrame (empty with the expected columns if absent)."""
+        chunks = list(self.iter_chunks(table, columns))
+        if not chunks:
+            return pd.DataFrame(columns=list(columns) if columns is not None else self.columns(table))
+        return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+    def to_frames(self, tables: Iterable[str] = tuple(FRAME_COLUMNS)) -> Dict[str, pd.DataFrame]:
+        """Loads the given tables into the in-memory columnar layout."""
+        return {table: self.read_table(table) for table in tables}
+
+    def __repr__(self):
+        rows = ", ".join(f"{table}={entry['num_rows']}" for table, entry in self.tables.items())
+        return f"ColumnarDataset({self.dataset_dir!r}, {self.shard_format}, {rows})"
+
+# NPZ shards (and shared-memory copies of input tables) hold plain (non-object) arrays
+# only, so they load without pickle:
+#   categorical column -> "<col>" int codes + "<col>__categories" string array
+#   string column      -> "<col>" fixed-width unicode + "<col>__missing" mask when it has None values
+def encode_frame_arrays(frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+    arrays = {}
+    for column in frame.columns:
+        values = frame[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            arrays[column] = values.cat.codes.to_numpy()
+            arrays[f"{column}__categories"] = values.cat.categories.astype(str).to_numpy(dtype=str)
+        elif values.dtype == object and isinstance(values.dropna().head(1).tolist()[0] if values.notna().any() else None, date):
+            arrays[column] = pd.to_datetime(values).to_numpy() # datetime.date objects (e.g. from schema records)
+        elif values.dtype.kind not in "biufcmM": # object and pandas string columns
+            missing = values.isna().to_numpy()
+            arrays[column] = values.where(~missing, "").astype(str).to_numpy(dtype=str)
+            if missing.any():
+                arrays[f"{column}__missing"] = missing
+        else:
+            arrays[column] = values.to_numpy()
+    return arrays
+
+def decode_frame_arrays(arrays: Mapping[str, np.ndarray], columns: Sequence[str]) -> pd.DataFrame:
+    """Inverse of encode_frame_arrays; `arrays` is an opened .npz file or any mapping of arrays."""
+    data = {}
+    for column in columns:
+        values = arrays[column]
+        if f"{column}__categories" in arrays:
+            data[column] = pd.Categorical.from_codes(values, arrays[f"{column}__categories"])
+        elif values.dtype.kind == "U":
+            values = values.astype(object)
+            if f"{column}__missing" in arrays:
+                values[arrays[f"{column}__missing"]] = None
+            data[column] = values
+        else:
+            data[column] = values
+    return pd.DataFrame(data, columns=list(columns))
+
+def write_dataset(dataset_dir: str, chunks: Iterable[Tuple[str, pd.DataFrame]], shard_format: Optional[str] = None,
+                  metadata: Optional[dict] = None, replace: bool = True) -> ColumnarDataset:
+    """Writes (table, chunk) pairs as they are produced and returns the opened dataset (see ColumnarDatasetWriter)."""
+    writer = ColumnarDatasetWriter(dataset_dir, shard_format=shard_format, metadata=metadata, replace=replace)
+    try:
+        for table, frame in chunks:
+            writer.append(table, frame)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.close()
@@ -3,38 +3,73 @@ import json
 from typing import List, Dict, Optional
 from .schemas import (
     WeatherRecordSchema,
+    SoilPropertiesSchema,
     FarmPlotSchema,
     FarmerProfileSchema,
     MarketPriceSchema,
     SimulationInputDataSchema
 )
+from .columnar import FRAME_COLUMNS, SOIL_COLUMNS, SchemaRecords
+from .validation import DataValidationError, field_rules, validate_frame, finalize_dtypes, format_errors
+from utils.logging_setup import get_logger
 
-# Placeholder functions for loading data. These would eventually read from CSV, JSON, databases, APIs etc.
+logger = get_logger(__name__)
 
-def load_farmers_from_csv(file_path: str) -> List[FarmerProfileSchema]:
-    """Loads farmer profiles from a CSV file."""
-    # df = pd.read_csv(file_path)
-    # farmers = [FarmerProfileSchema(**row.to_dict()) for index, row in df.iterrows()]
-    # return farmers
-    print(f"Placeholder: Would load farmers from {file_path}")
-    return []
+# Loaders parse whole files into typed columns, check the constraints encoded in the
+# schemas (required fields, ge/gt/le/lt bounds) column by column, and return
+# SchemaRecords: list-like results that build pydantic objects only when accessed,
+# with the validated DataFrame available as `.frame`.
+#
+# on_error="raise" (default) raises DataValidationError listing the offending rows;
+# on_error="drop" logs them and drops those rows. Reported rows are 0-based data rows
+# (the CSV header is not counted).
 
-def load_farm_plots_from_json(file_path: str) -> List[FarmPlotSchema]:
-    """Loads farm plot data from a JSON file."""
-    # with open(file_path, 'r') as f:
-    #     data = json.load(f)
-    # farm_plots = [FarmPlotSchema(**item) for item in data]
-    # return farm_plots
-    print(f"Placeholder: Would load farm plots from {file_path}")
-    return []
+FARMER_RULES = field_rules(FarmerProfileSchema)
+PLOT_RULES = field_rules(FarmPlotSchema)
+SOIL_RULES = field_rules(SoilPropertiesSchema)
+WEATHER_RULES = field_rules(WeatherRecordSchema)
+MARKET_PRICE_RULES = field_rules(MarketPriceSchema)
 
-def load_weather_data_from_csv(file_path: str) -> List[WeatherRecordSchema]:
-    """Loads historical weather data from a CSV file."""
-    # df = pd.read_csv(file_path, parse_dates=['record_date'])
-    # weather_data = [WeatherRecordSchema(**row.to_dict()) for index, row in df.iterrows()]
-    # return weather_data
-    print(f"Placeholder: Would load weather data from {file_path}")
-    return []
+# Low-cardinality text columns kept as pandas categoricals (as the synthetic generator does)
+CATEGORICAL_COLUMNS = {
+    "farmers": ("land_holding_category", "location_admin_unit_id"),
+    "farm_plots": ("soil_type", "irrigation_type"),
+    "historical_weather": ("station_id",),
+    "market_prices": ("crop_variety_id", "market_location_id"),
+}
+
+def load_farmers_from_csv(file_path: str, on_error: str = "raise") -> SchemaRecords:
+    """Loads farmer profiles from a CSV file with one column per FarmerProfileSchema field."""
+    frame = pd.read_csv(file_path, dtype=_string_dtypes(FARMER_RULES))
+    return SchemaRecords("farmers", _validated_table("farmers", frame, FARMER_RULES, file_path, on_error))
+
+def load_farm_plots_from_json(file_path: str, on_error: str = "raise") -> SchemaRecords:
+    """
+    Loads farm plot data from a JSON file: a list of FarmPlotSchema-like objects, with soil
+    either nested under "soil_properties" or given as flat soil columns.
+    """
+    with open(file_path, 'r') as f:
+        data = json.load(f)
+    frame = pd.DataFrame.from_records(data)
+    if "soil_properties" in frame.columns:
+        soil = pd.DataFrame.from_records([item if isinstance(item, dict) else {} for item in frame.pop("soil_properties")],
+                                         index=frame.index)
+        for column in soil.columns.intersection(list(SOIL_COLUMNS)):
+            # Nested values where given, flat ones (if any) for plots without them
+            frame[column] = soil[column].combine_first(frame[column]) if column in frame.columns else soil[column]
+    return SchemaRecords("farm_plots", _validated_table("farm_plots", frame, {**PLOT_RULES, **SOIL_RULES}, file_path, on_error))
+
+def load_weather_data_from_csv(file_path: str, on_error: str = "raise") -> SchemaRecords:
+    """Loads historical weather data from a CSV file (`record_date` or `date`, `station_id`, variables)."""
+    frame = pd.read_csv(file_path, dtype=_string_dtypes(WEATHER_RULES))
+    if "record_date" not in frame.columns and "date" in frame.columns:
+        frame = frame.rename(columns={"date": "record_date"})
+    return SchemaRecords("historical_weather", _validated_table("historical_weather", frame, WEATHER_RULES, file_path, on_error))
+
+def load_market_prices_from_csv(file_path: str, on_error: str = "raise") -> SchemaRecords:
+    """Loads market prices from a CSV file with one column per MarketPriceSchema field."""
+    frame = pd.read_csv(file_path, dtype=_string_dtypes(MARKET_PRICE_RULES))
+    return SchemaRecords("market_prices", _validated_table("market_prices", frame, MARKET_PRICE_RULES, file_path, on_error))
 
 def load_market_prices_from_api(api_url: str, crop_type: str) -> List[MarketPriceSchema]:
     """Placeholder for loading market prices from an API."""
@@ -50,32 +85,63 @@ def load_all_simulation_data(
     farmers_file: Optional[str] = None,
     plots_file: Optional[str] = None,
     weather_file: Optional[str] = None,
-    # market_file: Optional[str] = None # etc.
+    market_price_file: Optional[str] = None,
+    on_error: str = "raise"
 ) -> SimulationInputDataSchema:
-    """Loads all necessary data for a simulation run from specified files."""
-    farmers = load_farmers_from_csv(farmers_file) if farmers_file else []
-    farm_plots = load_farm_plots_from_json(plots_file) if plots_file else []
-    weather = load_weather_data_from_csv(weather_file) if weather_file else []
-    
-    # In a real scenario, you might load synthetic data if files are not provided
-    # or raise an error if essential data is missing.
-    
-    return SimulationInputDataSchema(
-        farmers=farmers,
-        farm_plots=farm_plots,
-        historical_weather=weather,
-        market_prices=[] # Placeholder for market prices
-    )
+    """
+    Loads all necessary data for a simulation run from specified files.
+
+    The tables are validated column-wise by the loaders, so the returned schema is
+    assembled without re-validating each record; its fields are SchemaRecords.
+    """
+    tables = {
+        "farmers": load_farmers_from_csv(farmers_file, on_error) if farmers_file else None,
+        "farm_plots": load_farm_plots_from_json(plots_file, on_error) if plots_file else None,
+        "historical_weather": load_weather_data_from_csv(weather_file, on_error) if weather_file else None,
+        "market_prices": load_market_prices_from_csv(market_price_file, on_error) if market_price_file else None,
+    }
+    return SimulationInputDataSchema.model_construct(**{
+        table: records if records is not None else SchemaRecords(table, pd.DataFrame(columns=list(FRAME_COLUMNS[table])))
+        for table, records in tables.items()
+    })
+
+def _string_dtypes(rules) -> Dict[str, type]:
+    return {rule.name: str for rule in rules.values() if rule.kind == "str"}
+
+def _validated_table(table: str, frame: pd.DataFrame, rules, source: str, on_error: str) -> pd.DataFrame:
+    if on_error not in ("raise", "drop"):
+        raise ValueError(f"Unknown on_error '{on_error}'. Expected 'raise' or 'drop'.")
+    typed, errors = validate_frame(frame, rules, source=source)
+    if len(errors):
+        bad_rows = errors["row"].unique()
+        message = f"{source}: {len(errors)} constraint violation(s) in {len(bad_rows)} of {len(frame)} rows\n{format_errors(errors)}"
+        if on_error == "raise":
+            raise DataValidationError(message, errors)
+        logger.warning("%s\nDropping the invalid rows.", message)
+        typed = typed.drop(index=typed.index[bad_rows]).reset_index(drop=True)
+    typed = finalize_dtypes(typed, rules)
+    for column in CATEGORICAL_COLUMNS[table]:
+        typed[column] = typed[column].astype("category")
+    return typed[[column for column in FRAME_COLUMNS[table] if column in typed.columns]]
 
 # Example usage (for testing purposes within this file if run directly)
 if __name__ == '__main__':
     # This part would typically not be here but in a test script or main simulation setup
-    print("Testing data loader placeholders...")
+    import os
+    import tempfile
+    from .synthetic_data_generator import SyntheticDataGenerator
+
+    print("Testing data loaders on a small synthetic dataset...")
+    frames = SyntheticDataGenerator(random_seed=1).generate_columnar_simulation_data(num_farmers=5, sim_duration_days=30)
+    data_dir = tempfile.mkdtemp()
+    frames["farmers"].to_csv(os.path.join(data_dir, "farmers.csv"), index=False)
+    frames["farm_plots"].to_json(os.path.join(data_dir, "farm_plots.json"), orient="records")
+    frames["historical_weather"].to_csv(os.path.join(data_dir, "weather.csv"), index=False)
     sim_data = load_all_simulation_data(
-        farmers_file="dummy_farmers.csv", 
-        plots_file="dummy_plots.json", 
-        weather_file="dummy_weather.csv"
+        farmers_file=os.path.join(data_dir, "farmers.csv"),
+        plots_file=os.path.join(data_dir, "farm_plots.json"),
+        weather_file=os.path.join(data_dir, "weather.csv")
     )
     print(f"Loaded {len(sim_data.farmers)} farmers.")
     print(f"Loaded {len(sim_data.farm_plots)} farm plots.")
-    print(f"Loaded {len(sim_data.historical_weather)} weather records.")
+    print(f"First plot: {sim_data.farm_plots[0]}")
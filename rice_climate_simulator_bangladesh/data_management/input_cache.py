@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import shutil
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .columnar_dataset import TMP_DIR_MARKER, ColumnarDataset, write_dataset
+from .synthetic_data_generator import GENERATOR_VERSION
+from utils.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+INPUT_CACHE_VERSION = 1 # Bump when the cached layout or the loaders' output changes
+
+def file_fingerprint(file_path: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Path, size and modification time of an input file (None if it is not set or missing)."""
+    if not file_path or not os.path.isfile(file_path):
+        return None
+    stat = os.stat(file_path)
+    return {"path": os.path.abspath(file_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def input_cache_key(data_config: Dict[str, Any]) -> str:
+    """
+    Stable hash of everything that determines the prepared inputs.
+
+    `data_config` holds the data-relevant config sections (already resolved, e.g. with
+    defaults filled in); the generator and cache versions are mixed in so that changing
+    what the generator draws invalidates old entries.
+    """
+    payload = {"input_cache_version": INPUT_CACHE_VERSION, "generator_version": GENERATOR_VERSION,
+               "config": data_config}
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+class InputCache:
+    """
+    Directory of prepared simulation inputs keyed by input_cache_key.
+
+    Each entry is a ColumnarDataset (NPZ shards, no pickle) in `<cache_dir>/<key>/`.
+    Entries are touched on every hit; after a `put`, least recently used entries are
+    removed until the directory is within `max_size_bytes`. Several processes may share
+    the directory: when two fill the same key at once, the first complete entry wins and
+    is never overwritten, since other processes may be reading it lazily.
+    """
+    def __init__(self, cache_dir: str, max_size_bytes: int = 2 * 1024**3):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key: str) -> Optional[ColumnarDataset]:
+        """The cached dataset for `key`, opened lazily, or None on a miss."""
+        entry_dir = self._entry_dir(key)
+        if not ColumnarDataset.is_dataset_directory(entry_dir):
+            return None
+        try:
+            dataset = ColumnarDataset.open(entry_dir)
+        except (ValueError, OSError) as e:
+            logger.warning("Discarding unreadable input cache entry %s: %s", key, e)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+        os.utime(entry_dir) # Recency for LRU eviction
+        return dataset
+
+    def put(self, key: str, frames: Dict[str, pd.DataFrame], metadata: Optional[dict] = None) -> ColumnarDataset:
+        """
+        Stores prepared input frames under `key`, then evicts old entries over the size limit.
+
+        Returns the entry under `key`, which is another writer's if one published it first.
+        """
+        dataset = write_dataset(self._entry_dir(key), frames.items(), shard_format="npz",
+                                metadata=dict(metadata or {}, cache_key=key), replace=False)
+        self.evict(keep=key)
+        return dataset
+
+    def entries(self) -> List[Tuple[str, float, int]]:
+        """(key, last use time, size in bytes) of every complete entry."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            entry_dir = self._entry_dir(name)
+            # Another writer's directory holds a manifest just before it is published; it is not an entry yet
+            if TMP_DIR_MARKER in name or not ColumnarDataset.is_dataset_directory(entry_dir):
+                continue
+            try:
+                size = sum(os.path.getsize(os.path.join(root, file_name))
+                           for root, _, file_names in os.walk(entry_dir) for file_name in file_names)
+                entries.append((name, os.path.getmtime(entry_dir), size))
+            except FileNotFoundError:
+                continue # Evicted by another process meanwhile
+        return entries
+
+    def size_bytes(self) -> int:
+        return sum(size for _, _, size in self.entries())
+
+    def evict(self, keep: Optional[str] = None):
+        """Removes least recently used entries until the cache fits in max_size_bytes."""
+        entries = sorted(self.entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        for key, _, size in entries:
+            if total <= self.max_size_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            total -= size
+            logger.debug("Evicted input cache entry %s (%d bytes).", key, size)
+
+    def clear(self):
+        for key, _, _ in self.entries():
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def __repr__(self):
+        return f"InputCache({self.cache_dir!r}, max_size_bytes={self.max_size_bytes})"
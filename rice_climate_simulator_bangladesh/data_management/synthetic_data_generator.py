@@ -1,12 +1,26 @@
 import random
 from datetime import date, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional, Tuple
 from uuid import uuid4
 
+import numpy as np
+import pandas as pd
+
 from .schemas import (
     WeatherRecordSchema, FarmPlotSchema, FarmerProfileSchema, 
     SoilPropertiesSchema, MarketPriceSchema, SimulationInputDataSchema
 )
+from .columnar import FARMER_COLUMNS, PLOT_COLUMNS, WEATHER_COLUMNS, MARKET_PRICE_COLUMNS
+from .columnar_dataset import ColumnarDataset, write_dataset
+from geography.spatial_hierarchy import UNIT_COLUMNS
+from geography.spatial_units import SpatialScale
+
+GENERATOR_VERSION = 1 # Bump when the columnar generators change what they draw for a given seed
+
+LAND_HOLDING_CATEGORIES = ["marginal", "small", "medium", "large"]
+SOIL_TYPES = ["Clay Loam", "Sandy Loam", "Silty Clay", "Loam"]
+IRRIGATION_TYPES = [None, "groundwater_stw", "surface_canal", "llp"]
+MARKET_RICE_VARIETIES = ["brri_dhan28", "brri_dhan29", "swarna"]
 # Potentially use Faker for more realistic names, locations etc.
 # from faker import Faker
 # fake = Faker()
@@ -17,6 +31,7 @@ class SyntheticDataGenerator:
     def __init__(self, random_seed: Optional[int] = None):
         if random_seed:
             random.seed(random_seed)
+        self.rng = np.random.default_rng(random_seed) # Used by the vectorized (columnar) generators
         # self.fake = Faker() # if using Faker
 
     def generate_farmer_profile(self, agent_id: str, household_id: str, admin_unit_id: Optional[str] = None) -> FarmerProfileSchema:
@@ -28,7 +43,7 @@ class SyntheticDataGenerator:
             education_years=random.randint(0, 16),
             farming_experience_years=random.randint(5, 40),
             risk_aversion_factor=random.uniform(0.1, 0.9),
-            land_holding_category=random.choice(["marginal", "small", "medium", "large"]),
+            land_holding_category=random.choice(LAND_HOLDING_CATEGORIES),
             location_admin_unit_id=admin_unit_id if admin_unit_id else f"upazila_{random.randint(1,10)}",
             num_farm_plots=0 # Will be updated after plots are assigned
         )
@@ -40,13 +55,13 @@ class SyntheticDataGenerator:
             owner_agent_id=owner_agent_id,
             size_ha=random.uniform(0.1, 2.5),
             soil_properties=SoilPropertiesSchema(
-                soil_type=random.choice(["Clay Loam", "Sandy Loam", "Silty Clay", "Loam"]),
+                soil_type=random.choice(SOIL_TYPES),
                 organic_matter_percent=random.uniform(0.5, 3.0),
                 ph=random.uniform(5.5, 7.5),
                 salinity_ds_m=soil_salinity
             ),
             is_irrigated=random.choice([True, False]),
-            irrigation_type=random.choice([None, "groundwater_stw", "surface_canal", "llp"]) if True else None # Simplified
+            irrigation_type=random.choice(IRRIGATION_TYPES) if True else None # Simplified
         )
 
     def generate_weather_record(self, record_date: date, station_id: str) -> WeatherRecordSchema:
@@ -127,7 +142,7 @@ class SyntheticDataGenerator:
 
         market_prices: List[MarketPriceSchema] = []
         # Example: generate weekly prices for a few rice varieties
-        rice_varieties_for_market = ["brri_dhan28", "brri_dhan29", "swarna"]
+        rice_varieties_for_market = MARKET_RICE_VARIETIES
         for day_offset in range(0, sim_duration_days, 7): # Weekly prices
             current_date = sim_start_date + timedelta(days=day_offset)
             for variety_id in rice_varieties_for_market:
@@ -141,6 +156,216 @@ class SyntheticDataGenerator:
             market_prices=market_prices
         )
 
+    # --- Vectorized (columnar) generation ---
+    # Same distributions as the per-record functions above, but each column is drawn in one
+    # numpy call. Results are DataFrames in the layout of data_management.columnar.
+
+    def generate_farmer_columns(self, num_farmers: int, num_plots_per_farmer_avg: int = 2,
+                                first_index: int = 0) -> pd.DataFrame:
+        rng = self.rng
+        index = np.arange(first_index, first_index + num_farmers)
+        return pd.DataFrame({
+            "agent_id": [f"farmer_{i + 1:08d}" for i in index],
+            "household_id": [f"HH_{str(i + 1).zfill(4)}" for i in index],
+            "initial_capital_bdt": rng.uniform(20000, 200000, num_farmers),
+            "age": rng.integers(25, 66, num_farmers),
+            "education_years": rng.integers(0, 17, num_farmers),
+            "farming_experience_years": rng.integers(5, 41, num_farmers),
+            "risk_aversion_factor": rng.uniform(0.1, 0.9, num_farmers),
+            "land_holding_category": pd.Categorical.from_codes(
+                rng.integers(0, len(LAND_HOLDING_CATEGORIES), num_farmers), LAND_HOLDING_CATEGORIES),
+            "location_admin_unit_id": pd.Categorical.from_codes(
+                rng.integers(0, 10, num_farmers), [f"upazila_{i}" for i in range(1, 11)]),
+            "num_farm_plots": rng.integers(max(1, num_plots_per_farmer_avg - 1), num_plots_per_farmer_avg + 2, num_farmers),
+        }, columns=list(FARMER_COLUMNS))
+
+    def generate_plot_columns(self, owner_agent_ids: np.ndarray, first_index: int = 0) -> pd.DataFrame:
+        """One plot per entry of owner_agent_ids."""
+        rng = self.rng
+        num_plots = len(owner_agent_ids)
+        # Salinity is a mixture: 30% of plots drawn from the saline range, the rest from the normal range
+        saline = rng.random(num_plots) < 0.3
+        salinity = np.where(saline, rng.uniform(0.5, 8.0, num_plots), rng.uniform(0.5, 2.5, num_plots))
+        irrigation_codes = rng.integers(0, len(IRRIGATION_TYPES), num_plots) - 1 # -1 is the None option
+        return pd.DataFrame({
+            "plot_id": [f"plot_{i + 1:09d}" for i in range(first_index, first_index + num_plots)],
+            "owner_agent_id": owner_agent_ids,
+            "size_ha": rng.uniform(0.1, 2.5, num_plots),
+            "soil_type": pd.Categorical.from_codes(rng.integers(0, len(SOIL_TYPES), num_plots), SOIL_TYPES),
+            "organic_matter_percent": rng.uniform(0.5, 3.0, num_plots),
+            "ph": rng.uniform(5.5, 7.5, num_plots),
+            "salinity_ds_m": salinity,
+            "water_holding_capacity_mm": np.full(num_plots, SoilPropertiesSchema.model_fields["water_holding_capacity_mm"].default, dtype=np.float64),
+            "is_irrigated": rng.random(num_plots) < 0.5,
+            "irrigation_type": pd.Categorical.from_codes(irrigation_codes, IRRIGATION_TYPES[1:]),
+            "initial_land_quality": np.ones(num_plots),
+        }, columns=list(PLOT_COLUMNS))
+
+    def generate_weather_columns(self, sim_start_date: date, num_days: int, num_weather_stations: int = 3,
+                                 first_day: int = 0) -> pd.DataFrame:
+        """Daily weather for days [first_day, first_day + num_days) after sim_start_date, day-major like the scalar path."""
+        rng = self.rng
+        num_records = num_days * num_weather_stations
+        dates = np.datetime64(sim_start_date, "D") + np.arange(first_day, first_day + num_days)
+        record_dates = np.repeat(dates, num_weather_stations)
+        month = record_dates.astype("datetime64[M]").astype(np.int64) % 12 + 1
+
+        min_temp = 15 + 10 * (1 + rng.uniform(-0.1, 0.1, num_records))
+        max_temp = 25 + 10 * (1 + rng.uniform(-0.1, 0.1, num_records))
+        # generate_weather_record's winter branch (11 <= month <= 2) never matches, so every
+        # non-monsoon month uses the "other months" rainfall regime there as well.
+        monsoon = (month >= 5) & (month <= 9)
+        rain_chance = np.where(monsoon, 0.7, 0.3)
+        rain_max = np.where(monsoon, 50.0, 15.0)
+        rains = rng.random(num_records) < rain_chance
+        precipitation = np.where(rains, rng.uniform(0, 1, num_records) * rain_max, 0.0)
+        min_temp += np.where(monsoon, 5, 0)
+        max_temp += np.where(monsoon, 3, 0)
+        min_temp = np.maximum(5, min_temp)
+        max_temp = np.minimum(45, np.maximum(max_temp, min_temp + 2))
+        humidity = np.where(precipitation > 0, rng.uniform(60, 95, num_records), rng.uniform(40, 80, num_records))
+
+        station_ids = [f"station_{i + 1}" for i in range(num_weather_stations)]
+        return pd.DataFrame({
+            "record_date": record_dates,
+            "station_id": pd.Categorical.from_codes(np.tile(np.arange(num_weather_stations), num_days), station_ids),
+            "max_temp_c": max_temp.round(1),
+            "min_temp_c": min_temp.round(1),
+            "precipitation_mm": precipitation.round(1),
+            "humidity_percent": humidity.round(1),
+            "solar_radiation_mj_m2": rng.uniform(5, 25, num_records).round(1),
+            "wind_speed_m_s": rng.uniform(0.5, 5, num_records).round(1),
+        }, columns=list(WEATHER_COLUMNS))
+
+    def generate_market_price_columns(self, sim_start_date: date, sim_duration_days: int,
+                                      first_day: int = 0) -> pd.DataFrame:
+        """Weekly prices (every 7th day counted from day 0) within [first_day, sim_duration_days)."""
+        rng = self.rng
+        offsets = np.arange(first_day + (-first_day) % 7, sim_duration_days, 7)
+        num_varieties = len(MARKET_RICE_VARIETIES)
+        num_records = len(offsets) * num_varieties
+        base_price = 30 # BDT/kg
+        price = base_price + base_price * rng.uniform(-0.15, 0.15, num_records)
+        return pd.DataFrame({
+            "record_date": np.repeat(np.datetime64(sim_start_date, "D") + offsets, num_varieties),
+            "crop_variety_id": pd.Categorical.from_codes(np.tile(np.arange(num_varieties), len(offsets)), MARKET_RICE_VARIETIES),
+            "market_location_id": None,
+            "price_bdt_kg": price.round(2),
+            "price_bdt_ton": np.full(num_records, np.nan),
+        }, columns=list(MARKET_PRICE_COLUMNS))
+
+    def generate_admin_unit_columns(self, upazila_ids: List[str], upazilas_per_district: int = 3,
+                                    districts_per_division: int = 2, num_aezs: int = 4) -> pd.DataFrame:
+        """
+        Unit table (geography.spatial_hierarchy.UNIT_COLUMNS) placing the given upazilas
+        under synthetic districts and divisions and one national root: consecutive
+        upazilas share a district and consecutive districts a division. Upazilas are
+        assigned AEZs in rotation. The grouping depends only on the order of upazila_ids.
+        """
+        num_districts = -(-len(upazila_ids) // upazilas_per_district)
+        num_divisions = -(-num_districts // districts_per_division)
+        divisions = [f"division_{i + 1}" for i in range(num_divisions)]
+        districts = [f"district_{i + 1}" for i in range(num_districts)]
+        rows = [("national", "Bangladesh", SpatialScale.NATIONAL.value, "", "")]
+        rows += [(unit, f"Division {i + 1}", SpatialScale.DIVISION.value, "national", "") for i, unit in enumerate(divisions)]
+        rows += [(unit, f"District {i + 1}", SpatialScale.DISTRICT.value, divisions[i // districts_per_division], "")
+                 for i, unit in enumerate(districts)]
+        rows += [(unit, unit, SpatialScale.UPAZILA.value, districts[i // upazilas_per_district], f"aez_{i % num_aezs + 1}")
+                 for i, unit in enumerate(upazila_ids)]
+        return pd.DataFrame(rows, columns=list(UNIT_COLUMNS))
+
+    def generate_columnar_simulation_data(
+        self,
+        num_farmers: int = 100,
+        num_plots_per_farmer_avg: int = 2,
+        num_weather_stations: int = 3,
+        sim_start_date: date = date(2020, 1, 1),
+        sim_duration_days: int = 365 * 3
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Vectorized counterpart of generate_initial_simulation_data.
+
+        Returns a dict of DataFrames keyed like SimulationInputDataSchema fields
+        ("farmers", "farm_plots", "historical_weather", "market_prices"); use
+        columnar.frames_to_schema if schema objects are needed.
+        """
+        farmers = self.generate_farmer_columns(num_farmers, num_plots_per_farmer_avg)
+        owner_ids = np.repeat(farmers["agent_id"].to_numpy(), farmers["num_farm_plots"].to_numpy())
+        return {
+            "farmers": farmers,
+            "farm_plots": self.generate_plot_columns(owner_ids),
+            "historical_weather": self.generate_weather_columns(sim_start_date, sim_duration_days, num_weather_stations),
+            "market_prices": self.generate_market_price_columns(sim_start_date, sim_duration_days),
+        }
+
+    def iter_columnar_chunks(
+        self,
+        num_farmers: int = 100,
+        num_plots_per_farmer_avg: int = 2,
+        num_weather_stations: int = 3,
+        sim_start_date: date = date(2020, 1, 1),
+        sim_duration_days: int = 365 * 3,
+        chunk_size: int = 100_000
+    ) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Streaming form of generate_columnar_simulation_data.
+
+        Yields (table name, DataFrame) pairs of at most about `chunk_size` rows: farmers
+        `chunk_size` at a time (each followed by those farmers' plots), then weather in
+        blocks of whole days, then market prices. Only one chunk is alive at a time.
+        """
+        plots_written = 0
+        for first_farmer in range(0, num_farmers, chunk_size):
+            farmers = self.generate_farmer_columns(min(chunk_size, num_farmers - first_farmer),
+                                                   num_plots_per_farmer_avg, first_index=first_farmer)
+            owner_ids = np.repeat(farmers["agent_id"].to_numpy(), farmers["num_farm_plots"].to_numpy())
+            yield "farmers", farmers
+            del farmers
+            yield "farm_plots", self.generate_plot_columns(owner_ids, first_index=plots_written)
+            plots_written += len(owner_ids)
+
+        days_per_chunk = max(1, chunk_size // max(1, num_weather_stations))
+        for first_day in range(0, sim_duration_days, days_per_chunk):
+            num_days = min(days_per_chunk, sim_duration_days - first_day)
+            yield "historical_weather", self.generate_weather_columns(sim_start_date, num_days, num_weather_stations,
+                                                                      first_day=first_day)
+
+        days_per_chunk = max(7, 7 * (chunk_size // len(MARKET_RICE_VARIETIES)))
+        for first_day in range(0, sim_duration_days, days_per_chunk):
+            yield "market_prices", self.generate_market_price_columns(
+                sim_start_date, min(sim_duration_days, first_day + days_per_chunk), first_day=first_day)
+
+    def export_columnar_dataset(
+        self,
+        dataset_dir: str,
+        num_farmers: int = 100,
+        num_plots_per_farmer_avg: int = 2,
+        num_weather_stations: int = 3,
+        sim_start_date: date = date(2020, 1, 1),
+        sim_duration_days: int = 365 * 3,
+        chunk_size: int = 100_000,
+        shard_format: Optional[str] = None
+    ) -> ColumnarDataset:
+        """
+        Generates a synthetic population straight to disk, one chunk at a time.
+
+        Peak memory is set by `chunk_size`, not by num_farmers or sim_duration_days.
+        Shards are Parquet when pyarrow is installed and NPZ otherwise (see
+        data_management.columnar_dataset); the returned dataset is opened lazily.
+        """
+        metadata = {
+            "generator_version": GENERATOR_VERSION,
+            "num_farmers": num_farmers,
+            "num_plots_per_farmer_avg": num_plots_per_farmer_avg,
+            "num_weather_stations": num_weather_stations,
+            "sim_start_date": sim_start_date.isoformat(),
+            "sim_duration_days": sim_duration_days,
+            "chunk_size": chunk_size,
+        }
+        chunks = self.iter_columnar_chunks(num_farmers, num_plots_per_farmer_avg, num_weather_stations,
+                                           sim_start_date, sim_duration_days, chunk_size)
+        return write_dataset(dataset_dir, chunks, shard_format=shard_format, metadata=metadata)
+
 # Example usage:
 if __name__ == '__main__':
     generator = SyntheticDataGenerator(random_seed=42)
@@ -0,0 +1,150 @@
+import operator
+import typing
+from datetime import date
+from typing import Dict, List, NamedTuple, Optional, Tuple, Type
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+
+ERROR_COLUMNS = ("row", "column", "value", "message")
+
+# annotated_types constraint attribute -> (comparison that must hold, symbol for messages)
+_BOUND_CHECKS = {
+    "gt": (operator.gt, ">"),
+    "ge": (operator.ge, ">="),
+    "lt": (operator.lt, "<"),
+    "le": (operator.le, "<="),
+}
+
+class FieldRule(NamedTuple):
+    """Column-level form of one schema field's constraints."""
+    name: str
+    kind: str # "str", "float", "int", "bool" or "date"
+    required: bool
+    nullable: bool
+    default: object
+    bounds: Tuple[Tuple[str, float], ...] # e.g. (("ge", 0), ("le", 1))
+
+class DataValidationError(ValueError):
+    """Raised when input rows violate schema constraints; `errors` lists them (row, column, value, message)."""
+    def __init__(self, message: str, errors: Optional[pd.DataFrame] = None):
+        super().__init__(message)
+        self.errors = errors if errors is not None else pd.DataFrame(columns=list(ERROR_COLUMNS))
+
+def field_rules(schema: Type[BaseModel]) -> Dict[str, FieldRule]:
+    """
+    Reads the scalar fields of a pydantic schema into FieldRules: their type, whether
+    they are required or nullable, the default, and ge/gt/le/lt bounds from Field(...).
+    Nested-model and container fields (e.g. FarmPlotSchema.soil_properties) are skipped.
+    """
+    rules = {}
+    for name, field in schema.model_fields.items():
+        annotation = field.annotation
+        nullable = False
+        if typing.get_origin(annotation) is typing.Union:
+            args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+            nullable = len(args) < len(typing.get_args(annotation))
+            annotation = args[0] if len(args) == 1 else annotation
+        kind = {str: "str", float: "float", int: "int", bool: "bool", date: "date"}.get(annotation)
+        if kind is None:
+            continue
+        bounds = tuple((attr, getattr(constraint, attr)) for constraint in field.metadata
+                       for attr in _BOUND_CHECKS if hasattr(constraint, attr))
+        default = None if field.is_required() else field.get_default(call_default_factory=True)
+        rules[name] = FieldRule(name, kind, field.is_required(), nullable, default, bounds)
+    return rules
+
+def validate_frame(frame: pd.DataFrame, rules: Dict[str, FieldRule], source: str = "input") -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Checks and converts every rule's column of `frame` with whole-column operations.
+
+    Values are parsed to the rule's type, missing optional values take the schema default,
+    and type, required-field and bound violations are collected per row. Returns the typed
+    frame (all rows, invalid ones included) and an error table with ERROR_COLUMNS, where
+    `row` is the 0-based position of the row in `frame`.
+
+    Raises:
+        DataValidationError: If a required column is absent altogether.
+    """
+    missing_columns = [rule.name for rule in rules.values() if rule.required and rule.name not in frame.columns]
+    if missing_columns:
+        raise DataValidationError(f"{source}: missing required column(s) {missing_columns}")
+
+    typed = {}
+    error_parts: List[pd.DataFrame] = []
+
+    def add_errors(mask: np.ndarray, column: str, raw: pd.Series, message: str):
+        rows = np.flatnonzero(mask)
+        if len(rows):
+            error_parts.append(pd.DataFrame({"row": rows, "column": column,
+                                             "value": raw.iloc[rows].astype(object).to_numpy(), "message": message}))
+
+    for rule in rules.values():
+        if rule.name not in frame.columns:
+            typed[rule.name] = pd.Series([rule.default] * len(frame), index=frame.index, dtype=object if rule.default is None else None)
+            continue
+        raw = frame[rule.name]
+        values = _parse_column(raw, rule.kind)
+        absent = raw.isna().to_numpy()
+        add_errors(values.isna().to_numpy() & ~absent, rule.name, raw, f"not a valid {rule.kind}")
+        if rule.kind == "int":
+            fractional = (values.notna() & (values % 1 != 0)).to_numpy()
+            add_errors(fractional, rule.name, raw, "not a whole number")
+        if absent.any():
+            if rule.required:
+                add_errors(absent, rule.name, raw, "required value is missing")
+            elif rule.default is not None:
+                values = values.where(~absent, rule.default)
+        for attr, bound in rule.bounds:
+            compare, symbol = _BOUND_CHECKS[attr]
+            present = values.notna().to_numpy()
+            with np.errstate(invalid="ignore"):
+                holds = compare(values.to_numpy(dtype=np.float64, na_value=np.nan), bound)
+            add_errors(present & ~holds, rule.name, raw, f"must be {symbol} {bound}")
+        typed[rule.name] = values
+
+    result = pd.DataFrame(typed, index=frame.index)
+    errors = (pd.concat(error_parts, ignore_index=True).sort_values(["row", "column"], kind="stable", ignore_index=True)
+              if error_parts else pd.DataFrame(columns=list(ERROR_COLUMNS)))
+    return result, errors
+
+def finalize_dtypes(frame: pd.DataFrame, rules: Dict[str, FieldRule]) -> pd.DataFrame:
+    """Narrows validated columns to plain numpy dtypes where no values are missing (int64, bool)."""
+    for rule in rules.values():
+        if rule.name not in frame.columns:
+            continue
+        column = frame[rule.name]
+        if rule.kind == "int" and column.notna().all():
+            frame[rule.name] = column.astype(np.int64)
+        elif rule.kind == "bool" and column.notna().all():
+            frame[rule.name] = column.astype(bool)
+    return frame
+
+def format_errors(errors: pd.DataFrame, limit: int = 10) -> str:
+    lines = [f"  row {row}: {column}={value!r} {message}"
+             for row, column, value, message in errors.head(limit).itertuples(index=False)]
+    if len(errors) > limit:
+        lines.append(f"  ... and {len(errors) - limit} more")
+    return "\n".join(lines)
+
+_TRUE_STRINGS = {"true", "1", "yes", "y", "t"}
+_FALSE_STRINGS = {"false", "0", "no", "n", "f"}
+
+def _parse_column(raw: pd.Series, kind: str) -> pd.Series:
+    """Parses a column to its rule type; unparseable values become NaN/None."""
+    if kind in ("float", "int"):
+        if raw.dtype == bool:
+            return raw.astype(np.float64)
+        return pd.to_numeric(raw, errors="coerce").astype(np.float64)
+    if kind == "date":
+        return pd.to_datetime(raw, errors="coerce").dt.normalize()
+    if kind == "bool":
+        if raw.dtype == bool:
+            return raw.astype(object)
+        lowered = raw.astype(str).str.strip().str.lower()
+        parsed = pd.Series(None, index=raw.index, dtype=object)
+        parsed[lowered.isin(_TRUE_STRINGS).to_numpy()] = True
+        parsed[lowered.isin(_FALSE_STRINGS).to_numpy()] = False
+        return parsed.where(raw.notna(), None)
+    return raw.astype(object).where(raw.notna(), None)
@@ -1,7 +1,11 @@
 from .spatial_units import AdministrativeUnit, AgroEcologicalZone, SpatialScale
+from .spatial_hierarchy import SpatialHierarchy, ADMIN_LEVELS, UNIT_COLUMNS
 
 __all__ = [
     "AdministrativeUnit",
     "AgroEcologicalZone",
-    "SpatialScale"
+    "SpatialScale",
+    "SpatialHierarchy",
+    "ADMIN_LEVELS",
+    "UNIT_COLUMNS"
 ]
@@ -0,0 +1,246 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .spatial_units import AdministrativeUnit, SpatialScale
+
+# Administrative levels from the root down; a unit's level is its scale's position here
+ADMIN_LEVELS = (SpatialScale.NATIONAL, SpatialScale.DIVISION, SpatialScale.DISTRICT,
+                SpatialScale.UPAZILA, SpatialScale.VILLAGE)
+UNIT_COLUMNS = ("unit_id", "name", "scale", "parent_id", "aez_id") # Unit table layout (name and aez_id optional)
+
+UnitIds = Union[Sequence[Optional[str]], np.ndarray, pd.Series, pd.Categorical]
+
+def parse_scale(value: Union[str, SpatialScale]) -> SpatialScale:
+    """SpatialScale from an enum, its value ("Upazila") or its name ("UPAZILA", case-insensitive)."""
+    if isinstance(value, SpatialScale):
+        return value
+    for scale in SpatialScale:
+        if value == scale.value or str(value).upper() == scale.name:
+            return scale
+    raise ValueError(f"Unknown spatial scale '{value}'. Expected one of {[scale.value for scale in SpatialScale]}.")
+
+class SpatialHierarchy:
+    """
+    Index of the administrative hierarchy (national > division > district > upazila >
+    village) built once from a unit table, for constant-time containment and
+    ancestor queries and array group-bys by region.
+
+    Units are numbered 0..n-1 in table order and labelled with an Euler tour (preorder
+    entry `tin` and exit `tout`, the entry of the next unit outside the subtree), so X
+    is inside Y exactly when tin[Y] <= tin[X] < tout[Y]. Each unit also has a code
+    among the units of its level, assigned in tour order: the units of one level inside
+    Y are the consecutive codes `code_range(Y, level)`. `ancestors[level]` holds every
+    unit's ancestor (or itself) at each level, -1 where there is none.
+
+    `codes(unit_ids, level)` maps entity unit ids (e.g. the farmers'
+    location_admin_unit_id, usually upazilas) to integer codes at any level, in one
+    vectorized lookup; ids not in the hierarchy get -1. Agro-ecological zones are not
+    part of the administrative tree: a unit's AEZ is its own `aez_id` or, if it has
+    none, its nearest ancestor's, and SpatialScale.AEZ codes index `aez_ids`.
+    """
+    def __init__(self, unit_ids: Sequence[str], scales: Sequence[Union[str, SpatialScale]],
+                 parent_ids: Sequence[Optional[str]], names: Optional[Sequence[str]] = None,
+                 aez_ids: Optional[Sequence[Optional[str]]] = None):
+        self.unit_ids = np.asarray(list(unit_ids), dtype=object)
+        n = len(self.unit_ids)
+        self._index = pd.Index(self.unit_ids)
+        if not self._index.is_unique:
+            duplicates = self._index[self._index.duplicated()].unique().tolist()
+            raise ValueError(f"Duplicate unit ids in the unit table: {duplicates[:10]}")
+        self._positions: Dict[str, int] = {unit_id: i for i, unit_id in enumerate(self.unit_ids.tolist())} # Scalar lookups
+        self.names = np.asarray(list(names) if names is not None else self.unit_ids, dtype=object)
+        self.scales = [parse_scale(scale) for scale in scales]
+        for scale in set(self.scales):
+            if scale not in ADMIN_LEVELS:
+                raise ValueError(f"Unit scale {scale.value} is not an administrative level {[s.value for s in ADMIN_LEVELS]}.")
+        self.levels = np.array([ADMIN_LEVELS.index(scale) for scale in self.scales], dtype=np.int8)
+        parent_ids = list(parent_ids)
+        self.parents = self._index.get_indexer(pd.Index(parent_ids, dtype=object)).astype(np.int64) # -1: root
+        unknown = [parent for parent, index in zip(parent_ids, self.parents.tolist()) if parent is not None and index < 0]
+        if unknown:
+            raise ValueError(f"Parent ids not in the unit table: {sorted(set(unknown))[:10]}")
+
+        unit_aez = [aez if isinstance(aez, str) and aez else None for aez in (aez_ids if aez_ids is not None else [None] * n)]
+        self.tin = np.zeros(n, dtype=np.int64)
+        self.tout = np.zeros(n, dtype=np.int64)
+        self.depths = np.zeros(n, dtype=np.int64)
+        self.ancestors: Dict[SpatialScale, np.ndarray] = {scale: np.full(n, -1, dtype=np.int64) for scale in ADMIN_LEVELS}
+        self.level_codes = np.full(n, -1, dtype=np.int64) # Code of each unit among the units of its level
+        self.aez_ids: List[str] = []
+        self.aez_codes = np.full(n, -1, dtype=np.int64) # Own or inherited AEZ of each unit
+        self._euler_tour(unit_aez)
+        self._intervals = list(zip(self.tin.tolist(), self.tout.tolist())) # Python ints for scalar queries
+
+        # Units of each level in code order
+        self.level_units: Dict[SpatialScale, np.ndarray] = {}
+        for level, scale in enumerate(ADMIN_LEVELS):
+            units = np.flatnonzero(self.levels == level)
+            self.level_units[scale] = units[np.argsort(self.level_codes[units])]
+
+    def _euler_tour(self, unit_aez: List[Optional[str]]):
+        n = len(self.unit_ids)
+        children: List[List[int]] = [[] for _ in range(n)]
+        roots = []
+        for unit, parent in enumerate(self.parents.tolist()):
+            (children[parent] if parent >= 0 else roots).append(unit)
+        next_code = [0] * len(ADMIN_LEVELS)
+        aez_code: Dict[str, int] = {}
+        clock = 0
+        # Iterative depth-first tour; a negative entry marks the exit of unit ~entry
+        stack = [root for root in reversed(roots)]
+        path_aez: List[int] = []
+        path: List[int] = []
+        while stack:
+            unit = stack.pop()
+            if unit < 0:
+                unit = ~unit
+                self.tout[unit] = clock
+                path.pop()
+                path_aez.pop()
+                continue
+            parent = path[-1] if path else -1
+            self.tin[unit] = clock
+            clock += 1
+            self.depths[unit] = len(path)
+            level = self.levels[unit]
+            if parent >= 0 and self.levels[parent] >= level:
+                raise ValueError(f"Unit '{self.unit_ids[unit]}' ({ADMIN_LEVELS[level].value}) is not below its parent "
+                                 f"'{self.unit_ids[parent]}' ({ADMIN_LEVELS[self.levels[parent]].value}).")
+            self.level_codes[unit] = next_code[level]
+            next_code[level] += 1
+            if parent >= 0:
+                for ancestors in self.ancestors.values():
+                    ancestors[unit] = ancestors[parent]
+            self.ancestors[ADMIN_LEVELS[level]][unit] = unit
+            aez = unit_aez[unit]
+            self.aez_codes[unit] = aez_code.setdefault(aez, len(aez_code)) if aez else (path_aez[-1] if path_aez else -1)
+            path.append(unit)
+            path_aez.append(self.aez_codes[unit])
+            stack.append(~unit)
+            stack.extend(reversed(children[unit]))
+        if clock != n:
+            raise ValueError("The unit table's parent links form a cycle.")
+        self.aez_ids = list(aez_code)
+
+    @classmethod
+    def from_frame(cls, units: pd.DataFrame) -> "SpatialHierarchy":
+        """Builds the hierarchy from a unit table (UNIT_COLUMNS; parent_id empty for roots)."""
+        missing = {"unit_id", "scale", "parent_id"} - set(units.columns)
+        if missing:
+            raise ValueError(f"Unit table is missing columns {sorted(missing)}.")
+        parent_ids = [parent if isinstance(parent, str) and parent else None for parent in units["parent_id"].tolist()]
+        return cls(units["unit_id"].astype(str).tolist(), units["scale"].tolist(), parent_ids,
+                   names=units["name"].tolist() if "name" in units.columns else None,
+                   aez_ids=units["aez_id"].tolist() if "aez_id" in units.columns else None)
+
+    @classmethod
+    def from_csv(cls, file_path: str) -> "SpatialHierarchy":
+        return cls.from_frame(pd.read_csv(file_path, dtype=str, keep_default_na=False))
+
+    @classmethod
+    def from_units(cls, units: Iterable[AdministrativeUnit]) -> "SpatialHierarchy":
+        """Builds the hierarchy from AdministrativeUnit objects (AEZ from their "aez_id" attribute)."""
+        units = list(units)
+        return cls([unit.unit_id for unit in units], [unit.scale for unit in units], [unit.parent_id for unit in units],
+                   names=[unit.name for unit in units], aez_ids=[unit.attributes.get("aez_id") for unit in units])
+
+    @classmethod
+    def from_leaf_units(cls, unit_ids: Iterable[str], scale: SpatialScale = SpatialScale.UPAZILA,
+                        root_id: str = "national") -> "SpatialHierarchy":
+        """A two-level hierarchy: the given units directly under one national root (no intermediate levels)."""
+        unit_ids = list(unit_ids)
+        return cls([root_id] + unit_ids, [SpatialScale.NATIONAL] + [scale] * len(unit_ids),
+                   [None] + [root_id] * len(unit_ids))
+
+    def to_frame(self) -> pd.DataFrame:
+        """The unit table (UNIT_COLUMNS) the hierarchy can be rebuilt from."""
+        parents = np.where(self.parents >= 0, self.unit_ids[np.maximum(self.parents, 0)], "")
+        own_aez = [""] * len(self)
+        for unit in range(len(self)):
+            parent = self.parents[unit]
+            inherited = self.aez_codes[parent] if parent >= 0 else -1
+            if self.aez_codes[unit] >= 0 and self.aez_codes[unit] != inherited:
+                own_aez[unit] = self.aez_ids[self.aez_codes[unit]]
+        return pd.DataFrame({"unit_id": self.unit_ids, "name": self.names, "scale": [scale.value for scale in self.scales],
+                             "parent_id": parents, "aez_id": own_aez}, columns=list(UNIT_COLUMNS))
+
+    def __len__(self):
+        return len(self.unit_ids)
+
+    def index(self, unit_id: str) -> int:
+        """Position of a unit in the table; raises KeyError for unknown ids."""
+        return self._positions[unit_id]
+
+    def unit_indices(self, unit_ids: UnitIds) -> np.ndarray:
+        """Table positions of many unit ids at once (-1 for ids not in the hierarchy)."""
+        if isinstance(unit_ids, pd.Series) and isinstance(unit_ids.dtype, pd.CategoricalDtype):
+            unit_ids = unit_ids.array
+        if isinstance(unit_ids, pd.Categorical):
+            # Look up each category once, then gather by code
+            category_indices = self._index.get_indexer(pd.Index(unit_ids.categories.astype(object)))
+            codes = unit_ids.codes
+            return np.where(codes >= 0, category_indices[np.maximum(codes, 0)], -1).astype(np.int64)
+        return self._index.get_indexer(pd.Index(list(unit_ids) if not isinstance(unit_ids, np.ndarray) else unit_ids,
+                                                dtype=object)).astype(np.int64)
+
+    def num_units(self, scale: SpatialScale) -> int:
+        """Number of codes at a level (or of AEZs)."""
+        return len(self.aez_ids) if scale == SpatialScale.AEZ else len(self.level_units[scale])
+
+    def labels(self, scale: SpatialScale) -> List[str]:
+        """Unit (or AEZ) id of every code at a level, in code order."""
+        return list(self.aez_ids) if scale == SpatialScale.AEZ else self.unit_ids[self.level_units[scale]].tolist()
+
+    def codes(self, unit_ids: UnitIds, scale: SpatialScale) -> np.ndarray:
+        """Code at `scale` of the unit (or ancestor) of each id; -1 if unknown or without a unit at that level."""
+        return self._codes_of_indices(self.unit_indices(unit_ids), scale)
+
+    def all_codes(self, unit_ids: UnitIds) -> Dict[SpatialScale, np.ndarray]:
+        """Codes of the ids at every administrative level and their AEZ (int32 arrays)."""
+        indices = self.unit_indices(unit_ids)
+        return {scale: self._codes_of_indices(indices, scale).astype(np.int32) for scale in ADMIN_LEVELS + (SpatialScale.AEZ,)}
+
+    def _codes_of_indices(self, indices: np.ndarray, scale: SpatialScale) -> np.ndarray:
+        if not len(self):
+            return np.full(len(indices), -1, dtype=np.int64)
+        known = indices >= 0
+        safe = np.maximum(indices, 0)
+        if scale == SpatialScale.AEZ:
+            return np.where(known, self.aez_codes[safe], -1)
+        ancestor = np.where(known, self.ancestors[scale][safe], -1)
+        return np.where(ancestor >= 0, self.level_codes[np.maximum(ancestor, 0)], -1)
+
+    def ancestor(self, unit_id: str, scale: SpatialScale) -> Optional[str]:
+        """Id of the unit's ancestor (or itself) at `scale`, None if it has none at that level."""
+        ancestor = self.ancestors[scale][self.index(unit_id)]
+        return self.unit_ids[ancestor] if ancestor >= 0 else None
+
+    def is_within(self, unit_id: str, container_id: str) -> bool:
+        """Whether a unit is the container or lies inside it (constant time)."""
+        entry = self._intervals[self._positions[unit_id]][0]
+        container_entry, container_exit = self._intervals[self._positions[container_id]]
+        return container_entry <= entry < container_exit
+
+    def code_range(self, container_id: str, scale: SpatialScale) -> Tuple[int, int]:
+        """Half-open range of the codes at `scale` of the units inside a container (e.g. the upazilas of a division)."""
+        container = self.index(container_id)
+        units = self.level_units[scale]
+        entries = self.tin[units] # Increasing, as codes follow the tour
+        return (int(np.searchsorted(entries, self.tin[container], side="left")),
+                int(np.searchsorted(entries, self.tout[container], side="left")))
+
+    def descendants(self, container_id: str, scale: SpatialScale) -> List[str]:
+        """Ids of the units at `scale` inside a container, in code order."""
+        start, stop = self.code_range(container_id, scale)
+        return self.unit_ids[self.level_units[scale][start:stop]].tolist()
+
+    def nbytes(self) -> int:
+        arrays = [self.tin, self.tout, self.depths, self.levels, self.parents, self.level_codes, self.aez_codes,
+                  *self.ancestors.values(), *self.level_units.values()]
+        return sum(array.nbytes for array in arrays)
+
+    def __repr__(self):
+        counts = ", ".join(f"{scale.value}={len(self.level_units[scale])}" for scale in ADMIN_LEVELS if len(self.level_units[scale]))
+        return f"SpatialHierarchy({counts}, aez={len(self.aez_ids)})"
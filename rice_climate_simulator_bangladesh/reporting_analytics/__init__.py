@@ -1 +1,13 @@
+from .results_recorder import ResultsRecorder, ResultsReader, RESULT_TABLES, clear_results
+from .regional_aggregates import RegionalAggregator, REGION_SCALES, combine_snapshots, kpi_frame
 
+__all__ = [
+    "ResultsRecorder",
+    "ResultsReader",
+    "RESULT_TABLES",
+    "clear_results",
+    "RegionalAggregator",
+    "REGION_SCALES",
+    "combine_snapshots",
+    "kpi_frame"
+]
@@ -0,0 +1,202 @@
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from agriculture.plot_store import PlotStateStore
+from agriculture.variety_catalog import SEASONS, VarietyCatalog
+from geography.spatial_units import SpatialScale
+
+REGION_SCALES = (SpatialScale.UPAZILA, SpatialScale.DISTRICT, SpatialScale.DIVISION, SpatialScale.AEZ)
+# Capital histogram bin edges: below 0, [0, 100), then geometric bins up to 1e9 BDT (about 4% wide), then above
+CAPITAL_BIN_EDGES = np.concatenate(([0.0], np.geomspace(100.0, 1e9, 401)))
+# Additive per-region state of one scale (see RegionalAggregator.snapshot)
+STATE_FIELDS = ("production_t", "area_ha", "farmers", "capital_sum_bdt", "poor_farmers", "capital_histogram")
+
+def capital_bins(capital: np.ndarray) -> np.ndarray:
+    return np.searchsorted(CAPITAL_BIN_EDGES, capital, side="right")
+
+class RegionalAggregator:
+    """
+    Per-region production and welfare rollups (REGION_SCALES: upazila, district,
+    division and AEZ), kept up to date from only the plots and farmers that changed.
+
+    Per region and scale it keeps additive state: tonnes harvested in the step, cropped
+    area by variety code (seasons follow from the varieties), number of farmers, their
+    total capital, the number below `poverty_line_bdt` and a histogram of capital over
+    CAPITAL_BIN_EDGES. `rebuild` computes it from every plot and farmer; afterwards
+    `update` takes the plot store rows planted or harvested in the step
+    (PlotStateStore.take_changed_rows) and adjusts the state by the difference between
+    their previous and current crop, and between their owners' previous and current
+    capital (capital only changes when a farmer plants or harvests). Every group-by is
+    an np.bincount / np.add.at over the changed rows' integer region codes
+    (SpatialHierarchy codes), so the cost of a step's update grows with the number of
+    changes, not with the population.
+
+    State of several shards sums to the state of the whole run (combine_snapshots), and
+    `kpi_frame` derives the indicators from it: mean capital, capital quantiles
+    (interpolated within the histogram bins, so accurate to their width) and the
+    poverty share.
+    """
+    def __init__(self, region_labels: Dict[SpatialScale, Sequence[str]], farmer_codes: Dict[SpatialScale, np.ndarray],
+                 plot_codes: Dict[SpatialScale, np.ndarray], plot_owners: np.ndarray, catalog: VarietyCatalog,
+                 poverty_line_bdt: float = 30000.0, scales: Sequence[SpatialScale] = REGION_SCALES):
+        self.scales = list(scales)
+        self.catalog = catalog
+        self.poverty_line_bdt = poverty_line_bdt
+        self.region_labels = {scale: list(region_labels[scale]) for scale in self.scales}
+        # Unknown regions (code -1) are counted in an extra last slot that is never reported
+        self._farmer_codes = {scale: self._slot_codes(farmer_codes[scale], scale) for scale in self.scales}
+        self._plot_codes = {scale: self._slot_codes(plot_codes[scale], scale) for scale in self.scales}
+        self.plot_owners = plot_owners # Farmer index of every plot store row (-1: none)
+        self.state: Dict[SpatialScale, Dict[str, np.ndarray]] = {}
+        self._plot_variety = np.empty(0, dtype=np.int64) # Crop variety code of each row at the last update
+        self._capital = np.empty(0, dtype=np.float64) # Capital of each farmer at the last update
+
+    def _slot_codes(self, codes: np.ndarray, scale: SpatialScale) -> np.ndarray:
+        codes = np.asarray(codes, dtype=np.int64)
+        return np.where(codes >= 0, codes, len(self.region_labels[scale]))
+
+    def _num_slots(self, scale: SpatialScale) -> int:
+        return len(self.region_labels[scale]) + 1
+
+    def rebuild(self, store: PlotStateStore, capital: np.ndarray):
+        """Computes the state from every plot store row and every farmer's capital."""
+        num_varieties = len(self.catalog)
+        self._plot_variety = store.column("crop_variety_code").astype(np.int64)
+        self._capital = np.asarray(capital, dtype=np.float64).copy()
+        harvest, size = store.column("harvest_t"), store.column("size_ha")
+        cropped = self._plot_variety >= 0
+        bins = capital_bins(self._capital)
+        poor = self._capital < self.poverty_line_bdt
+        for scale in self.scales:
+            slots, plot_codes, farmer_codes = self._num_slots(scale), self._plot_codes[scale], self._farmer_codes[scale]
+            # Cast: np.bincount of no rows is int64 even with weights
+            area = np.bincount(plot_codes[cropped] * num_varieties + self._plot_variety[cropped],
+                               weights=size[cropped], minlength=slots * num_varieties).astype(np.float64)
+            histogram = np.bincount(farmer_codes * (len(CAPITAL_BIN_EDGES) + 1) + bins,
+                                    minlength=slots * (len(CAPITAL_BIN_EDGES) + 1))
+            self.state[scale] = {
+                "production_t": np.bincount(plot_codes, weights=harvest, minlength=slots).astype(np.float64),
+                "area_ha": area.reshape(slots, num_varieties),
+                "farmers": np.bincount(farmer_codes, minlength=slots),
+                "capital_sum_bdt": np.bincount(farmer_codes, weights=self._capital, minlength=slots).astype(np.float64),
+                "poor_farmers": np.bincount(farmer_codes, weights=poor, minlength=slots).astype(np.int64),
+                "capital_histogram": histogram.reshape(slots, len(CAPITAL_BIN_EDGES) + 1),
+            }
+
+    def update(self, store: PlotStateStore, changed_rows: np.ndarray, farmer_capital):
+        """
+        Applies a step's changes: `changed_rows` are the plot store rows planted or
+        harvested in it, and `farmer_capital(indices)` returns the current capital of
+        the given farmers (the changed rows' owners).
+        """
+        rows = np.asarray(changed_rows, dtype=np.int64)
+        self._grow_varieties()
+        size, harvest = store.size_ha[rows], store.harvest_t[rows]
+        old_variety, new_variety = self._plot_variety[rows], store.crop_variety_code[rows].astype(np.int64)
+        self._plot_variety[rows] = new_variety
+        owners = np.unique(self.plot_owners[rows])
+        owners = owners[owners >= 0]
+        old_capital = self._capital[owners]
+        new_capital = np.asarray(farmer_capital(owners), dtype=np.float64)
+        self._capital[owners] = new_capital
+        old_bins, new_bins = capital_bins(old_capital), capital_bins(new_capital)
+        poor_change = ((new_capital < self.poverty_line_bdt).astype(np.int64)
+                       - (old_capital < self.poverty_line_bdt).astype(np.int64))
+
+        for scale in self.scales:
+            state, plot_codes, farmer_codes = self.state[scale], self._plot_codes[scale][rows], self._farmer_codes[scale][owners]
+            state["production_t"][:] = 0.0 # Tonnes of this step; only changed rows were harvested
+            np.add.at(state["production_t"], plot_codes, harvest)
+            area = state["area_ha"]
+            was_cropped, is_cropped = old_variety >= 0, new_variety >= 0
+            np.subtract.at(area, (plot_codes[was_cropped], old_variety[was_cropped]), size[was_cropped])
+            np.add.at(area, (plot_codes[is_cropped], new_variety[is_cropped]), size[is_cropped])
+            np.add.at(state["capital_sum_bdt"], farmer_codes, new_capital - old_capital)
+            np.add.at(state["poor_farmers"], farmer_codes, poor_change)
+            np.subtract.at(state["capital_histogram"], (farmer_codes, old_bins), 1)
+            np.add.at(state["capital_histogram"], (farmer_codes, new_bins), 1)
+
+    def _grow_varieties(self):
+        """Widens the area arrays when varieties were added to the catalog since the last update."""
+        num_varieties = len(self.catalog)
+        for state in self.state.values():
+            area = state["area_ha"]
+            if area.shape[1] < num_varieties:
+                state["area_ha"] = np.pad(area, ((0, 0), (0, num_varieties - area.shape[1])))
+
+    def snapshot(self) -> Dict[SpatialScale, Dict[str, np.ndarray]]:
+        """Copy of the reported regions' state (unknown-region slots dropped)."""
+        return {scale: {name: values[:len(self.region_labels[scale])].copy() for name, values in state.items()}
+                for scale, state in self.state.items()}
+
+    def __repr__(self):
+        regions = ", ".join(f"{scale.value}={len(self.region_labels[scale])}" for scale in self.scales)
+        return f"RegionalAggregator({regions}, poverty_line={self.poverty_line_bdt:.0f} BDT)"
+
+def combine_snapshots(snapshots: List[Dict[SpatialScale, Dict[str, np.ndarray]]]) -> Dict[SpatialScale, Dict[str, np.ndarray]]:
+    """Sums the regional state of several shards (area arrays padded to the widest variety catalog)."""
+    combined: Dict[SpatialScale, Dict[str, np.ndarray]] = {}
+    for snapshot in snapshots:
+        for scale, state in snapshot.items():
+            if scale not in combined:
+                combined[scale] = {name: values.copy() for name, values in state.items()}
+                continue
+            for name, values in state.items():
+                total = combined[scale][name]
+                if name == "area_ha" and values.shape[1] != total.shape[1]:
+                    width = max(values.shape[1], total.shape[1])
+                    total = combined[scale][name] = np.pad(total, ((0, 0), (0, width - total.shape[1])))
+                    values = np.pad(values, ((0, 0), (0, width - values.shape[1])))
+                total += values
+    return combined
+
+def histogram_quantiles(histogram: np.ndarray, quantiles: Sequence[float]) -> np.ndarray:
+    """
+    (regions, quantiles) capital quantiles from per-region CAPITAL_BIN_EDGES
+    histograms, interpolated linearly within the bin holding each quantile (NaN for
+    regions without farmers).
+    """
+    counts = histogram.astype(np.float64)
+    totals = counts.sum(axis=1)
+    cumulative = np.cumsum(counts, axis=1)
+    # Bin i covers [lower[i], upper[i]); the open-ended first and last bins collapse onto their finite edge
+    lower = np.concatenate(([0.0], CAPITAL_BIN_EDGES))
+    upper = np.concatenate((CAPITAL_BIN_EDGES, [CAPITAL_BIN_EDGES[-1]]))
+    result = np.full((len(counts), len(quantiles)), np.nan)
+    for j, q in enumerate(quantiles):
+        target = q * totals
+        bins = np.minimum((cumulative < target[:, None]).sum(axis=1), counts.shape[1] - 1)
+        regions = np.arange(len(counts))
+        before = cumulative[regions, bins] - counts[regions, bins]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fraction = np.clip(np.nan_to_num((target - before) / counts[regions, bins]), 0.0, 1.0)
+        result[:, j] = np.where(totals > 0, lower[bins] + fraction * (upper[bins] - lower[bins]), np.nan)
+    return result
+
+def kpi_frame(step: int, scale: SpatialScale, state: Dict[str, np.ndarray], region_labels: Sequence[str],
+              catalog: VarietyCatalog, quantiles: Sequence[float] = (0.1, 0.5, 0.9)) -> pd.DataFrame:
+    """
+    One row per region of a scale with the step's indicators: production, cropped area
+    (total, per season and per variety), farmers, mean and quantile capital, and the
+    share of farmers below the poverty line.
+    """
+    area = np.maximum(state["area_ha"], 0.0) # Incremental updates leave rounding residue where all crops were harvested
+    season_codes = catalog.season_codes[:area.shape[1]]
+    farmers = state["farmers"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_capital = state["capital_sum_bdt"] / farmers
+        poverty_share = state["poor_farmers"] / farmers
+    columns = {"step": np.full(len(region_labels), step), "scale": scale.value, "region": list(region_labels),
+               "production_t": state["production_t"], "cropped_area_ha": area.sum(axis=1)}
+    for season_code, season in enumerate(SEASONS):
+        columns[f"area_ha_{season.name.lower()}"] = area[:, season_codes == season_code].sum(axis=1)
+    for code in range(area.shape[1]):
+        columns[f"area_ha_{catalog.variety(code).variety_id}"] = area[:, code]
+    columns["farmers"] = farmers
+    columns["mean_capital_bdt"] = mean_capital
+    for q, values in zip(quantiles, histogram_quantiles(state["capital_histogram"], quantiles).T):
+        columns[f"capital_p{round(q * 100):02d}_bdt"] = values
+    columns["poverty_share"] = poverty_share
+    return pd.DataFrame(columns)
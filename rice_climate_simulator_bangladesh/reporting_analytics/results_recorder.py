@@ -0,0 +1,261 @@
+import glob
+import json
+import os
+import queue
+import shutil
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from agriculture.plot_store import PlotStateStore
+from data_management.columnar_dataset import (
+    DATASET_FORMAT_VERSION, DATASET_MANIFEST_FILE, SHARD_FORMATS, ColumnarDataset, default_shard_format,
+    encode_frame_arrays, pa, pq
+)
+from utils.logging_setup import get_logger
+
+if TYPE_CHECKING:
+    from simulation_core.engine import SimulationEngine
+
+logger = get_logger(__name__)
+
+RESULT_TABLES = ("agents", "plots")
+# FarmerAgent attributes snapshotted into the "agents" table, besides step, agent_id and location_id
+AGENT_RESULT_FIELDS = ("capital_bdt", "current_debt_bdt", "subsidy_received_bdt")
+PART_PREFIX = "shard-" # Subdirectories holding the results of sharded runs' workers
+
+class ResultsRecorder:
+    """
+    Append-only columnar recorder of agent and plot state snapshots.
+
+    Each snapshot is one block of rows (one per farmer or plot, stamped with the step)
+    taken from the engine's columns. Blocks are buffered per table until `buffer_rows`
+    rows have accumulated, then handed to a background thread that writes them as one
+    shard (`<table>/part-NNNNN.parquet` or `.npz`) and rewrites the manifest, so the
+    step that filled a buffer does not wait for the disk. At most `max_pending_shards`
+    shards wait for the writer; beyond that a step blocks until one is written, which
+    bounds the memory held by the recorder.
+
+    The directory is a ColumnarDataset (same manifest and shard layout) whose manifest
+    entries also list the steps each shard holds; read it with ResultsReader. It is
+    complete after `close()`, and readable up to the last written shard before that.
+    """
+    def __init__(self, directory: str, shard_format: Optional[str] = None, buffer_rows: int = 1_000_000,
+                 max_pending_shards: int = 4, start_step: int = 0, metadata: Optional[dict] = None):
+        shard_format = shard_format or default_shard_format()
+        if shard_format not in SHARD_FORMATS:
+            raise ValueError(f"Unknown shard format '{shard_format}'. Expected one of {SHARD_FORMATS}.")
+        if shard_format == "parquet" and pq is None:
+            raise ImportError("Parquet shards need pyarrow; install it or use results_format='npz'.")
+        self.directory = directory
+        self.shard_format = shard_format
+        self.buffer_rows = max(1, buffer_rows)
+        self.metadata = metadata or {}
+        self._tables = self._open_manifest(start_step)
+        self._buffers: Dict[str, List[pd.DataFrame]] = {table: [] for table in RESULT_TABLES}
+        self._buffered_rows: Dict[str, int] = {table: 0 for table in RESULT_TABLES}
+        self._last_step: Dict[str, int] = {table: -1 for table in RESULT_TABLES}
+        self._id_cache: Dict[str, Tuple[Tuple[int, int], pd.Categorical]] = {}
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_pending_shards))
+        self._error: Optional[BaseException] = None
+        self._writer = threading.Thread(target=self._write_shards, name="results-writer", daemon=True)
+        self._writer.start()
+
+    def _open_manifest(self, start_step: int) -> Dict[str, dict]:
+        """
+        Table entries to append to. A run from step 0 starts empty; a run resumed at a
+        later step keeps the shards of steps up to it and drops any written past it.
+        """
+        manifest_path = os.path.join(self.directory, DATASET_MANIFEST_FILE)
+        tables = {table: {"columns": [], "num_rows": 0, "shards": []} for table in RESULT_TABLES}
+        if start_step == 0 or not os.path.isfile(manifest_path):
+            clear_results(self.directory, parts=False)
+            os.makedirs(self.directory, exist_ok=True)
+            return tables
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+        if manifest.get("shard_format") != self.shard_format:
+            raise ValueError(f"Results in {self.directory} are {manifest.get('shard_format')} shards; "
+                             f"cannot append {self.shard_format} shards.")
+        for table, entry in manifest.get("tables", {}).items():
+            kept = [shard for shard in entry["shards"] if max(shard["steps"]) <= start_step]
+            tables[table] = {"columns": entry["columns"], "num_rows": sum(shard["num_rows"] for shard in kept),
+                             "shards": kept}
+        return tables
+
+    def record_agents(self, engine: "SimulationEngine", step: int):
+        """Snapshots every farmer of `engine` as the agents table's rows for `step`."""
+        farmers = engine.farmer_agents
+        key = (id(farmers), len(farmers))
+        columns = {"step": np.full(len(farmers), step, dtype=np.int32),
+                   "agent_id": self._ids("agent_id", key, lambda: [farmer.agent_id for farmer in farmers]),
+                   "location_id": self._ids("location_id", key, lambda: [farmer.location_id for farmer in farmers])}
+        for field in AGENT_RESULT_FIELDS:
+            columns[field] = np.fromiter((getattr(farmer, field) for farmer in farmers), np.float64, len(farmers))
+        columns["num_farm_plots"] = np.fromiter((len(farmer.farm_plots) for farmer in farmers), np.int32, len(farmers))
+        self._append("agents", step, pd.DataFrame(columns))
+
+    def record_plots(self, engine: "SimulationEngine", step: int):
+        """Snapshots every PlotStateStore row of `engine` as the plots table's rows for `step`."""
+        store = engine.plot_store
+        plot_ids = self._ids("plot_id", (id(store), store.size), lambda: _plot_ids_by_row(engine))
+        columns = {"step": np.full(store.size, step, dtype=np.int32), "plot_id": plot_ids}
+        for name in PlotStateStore.COLUMNS:
+            columns[name] = store.column(name).copy()
+        self._append("plots", step, pd.DataFrame(columns))
+
+    def _ids(self, name: str, key: Tuple[int, int], values: Callable[[], list]) -> pd.Categorical:
+        """Per-row id column, built once per population (`key`); ids do not change during a run."""
+        cached = self._id_cache.get(name)
+        if cached is None or cached[0] != key:
+            cached = (key, pd.Categorical(values()))
+            self._id_cache[name] = cached
+        return cached[1]
+
+    def _append(self, table: str, step: int, frame: pd.DataFrame):
+        self._raise_writer_error()
+        if step <= self._last_step[table]:
+            return # Already recorded (e.g. the final snapshot of a run ending on an interval step)
+        self._last_step[table] = step
+        self._buffers[table].append(frame)
+        self._buffered_rows[table] += len(frame)
+        if self._buffered_rows[table] >= self.buffer_rows:
+            self._submit(table)
+
+    def _submit(self, table: str):
+        frames = self._buffers[table]
+        if not self._buffered_rows[table]:
+            self._buffers[table] = [] # Only empty snapshots (no farmers or plots); nothing to write
+            return
+        steps = sorted({int(frame["step"].iat[0]) for frame in frames if len(frame)})
+        frame = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        self._buffers[table], self._buffered_rows[table] = [], 0
+        self._queue.put((table, frame, steps)) # Blocks while max_pending_shards shards are waiting
+
+    def flush(self):
+        """Writes every buffered snapshot and waits until all of them are on disk."""
+        for table in RESULT_TABLES:
+            self._submit(table)
+        self._queue.join()
+        self._raise_writer_error()
+
+    def close(self):
+        """Flushes and stops the writer thread."""
+        if not self._writer.is_alive():
+            return
+        try:
+            self.flush()
+        finally:
+            self._queue.put(None)
+            self._writer.join()
+
+    def _write_shards(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                if self._error is None:
+                    self._write_shard(*item)
+            except BaseException as error: # Re-raised on the recording thread
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    def _write_shard(self, table: str, frame: pd.DataFrame, steps: List[int]):
+        entry = self._tables[table]
+        entry["columns"] = list(frame.columns)
+        os.makedirs(os.path.join(self.directory, table), exist_ok=True)
+        shard_file = os.path.join(table, f"part-{len(entry['shards']):05d}.{self.shard_format}")
+        shard_path = os.path.join(self.directory, shard_file)
+        if self.shard_format == "parquet":
+            pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), shard_path)
+        else:
+            np.savez(shard_path, **encode_frame_arrays(frame))
+        entry["shards"].append({"file": shard_file, "num_rows": len(frame), "steps": steps})
+        entry["num_rows"] += len(frame)
+        self._write_manifest()
+
+    def _write_manifest(self):
+        manifest = {"format_version": DATASET_FORMAT_VERSION, "shard_format": self.shard_format,
+                    "metadata": self.metadata, "tables": self._tables}
+        manifest_path = os.path.join(self.directory, DATASET_MANIFEST_FILE)
+        with open(f"{manifest_path}.tmp", "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(f"{manifest_path}.tmp", manifest_path) # Readers see the previous or the new manifest, never a partial one
+
+    def _raise_writer_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError(f"Writing results to {self.directory} failed.") from error
+
+    def __repr__(self):
+        shards = ", ".join(f"{table}={len(entry['shards'])}" for table, entry in self._tables.items())
+        return f"ResultsRecorder({self.directory!r}, {self.shard_format}, shards: {shards})"
+
+class ResultsReader:
+    """
+    Reads snapshots written by ResultsRecorder from a results directory, including the
+    per-worker parts of sharded runs. Only the shards holding the requested steps are
+    opened, and only the requested columns are loaded from them.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        part_dirs = [directory] + sorted(glob.glob(os.path.join(directory, f"{PART_PREFIX}*")))
+        self.parts: List[ColumnarDataset] = [ColumnarDataset.open(part) for part in part_dirs
+                                             if ColumnarDataset.is_dataset_directory(part)]
+
+    def steps(self, table: str) -> List[int]:
+        """Steps recorded in a table."""
+        return sorted({step for part in self.parts for shard in part.tables.get(table, {}).get("shards", [])
+                       for step in shard["steps"]})
+
+    def columns(self, table: str) -> List[str]:
+        for part in self.parts:
+            if part.tables.get(table, {}).get("columns"):
+                return part.columns(table)
+        return []
+
+    def iter_chunks(self, table: str, columns: Optional[Sequence[str]] = None,
+                    steps: Optional[Iterable[int]] = None) -> Iterable[pd.DataFrame]:
+        """Yields the rows of the requested steps (all if None) shard by shard, with `step` and the given columns."""
+        wanted = set(int(step) for step in steps) if steps is not None else None
+        read_columns = list(dict.fromkeys(["step", *columns])) if columns is not None else None
+        shard_filter = (lambda shard: not wanted.isdisjoint(shard["steps"])) if wanted is not None else None
+        for part in self.parts:
+            for chunk in part.iter_chunks(table, read_columns, shard_filter=shard_filter):
+                if wanted is not None and not wanted.issuperset(np.unique(chunk["step"]).tolist()):
+                    chunk = chunk[chunk["step"].isin(wanted)].reset_index(drop=True)
+                yield chunk
+
+    def read(self, table: str, columns: Optional[Sequence[str]] = None,
+             steps: Optional[Iterable[int]] = None) -> pd.DataFrame:
+        """The requested columns and steps of a table as one DataFrame."""
+        chunks = [chunk for chunk in self.iter_chunks(table, columns, steps) if len(chunk)]
+        if not chunks:
+            return pd.DataFrame(columns=list(dict.fromkeys(["step", *(columns if columns is not None else self.columns(table))])))
+        return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+    def __repr__(self):
+        return f"ResultsReader({self.directory!r}, parts={len(self.parts)})"
+
+def clear_results(directory: str, parts: bool = True):
+    """Removes results written by ResultsRecorder from `directory` (and its workers' parts); other files are kept."""
+    for name in (DATASET_MANIFEST_FILE, *RESULT_TABLES):
+        path = os.path.join(directory, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+    if parts:
+        for part in glob.glob(os.path.join(directory, f"{PART_PREFIX}*")):
+            if os.path.isdir(part):
+                shutil.rmtree(part)
+
+def _plot_ids_by_row(engine: "SimulationEngine") -> List[Optional[str]]:
+    plot_ids: List[Optional[str]] = [None] * engine.plot_store.size
+    for plot in engine.farm_plots_map.values():
+        plot_ids[plot.store_index] = plot.plot_id
+    return plot_ids
@@ -1,15 +1,32 @@
 from .engine import SimulationEngine
+from .scheduler import EventScheduler
+from .instrumentation import StepInstrumentation, SamplingProfiler
+from .sharded_engine import ShardedSimulationEngine, partition_by_admin_unit
+from .ensemble import EnsembleRunner
+from .sensitivity import SensitivityStudy, Parameter
 from .config import (
     get_default_config,
     load_config_from_json,
     merge_configs,
+    get_config_value,
+    set_config_value,
     DEFAULT_SIMULATION_CONFIG
 )
 
 __all__ = [
     "SimulationEngine",
+    "EventScheduler",
+    "StepInstrumentation",
+    "SamplingProfiler",
+    "ShardedSimulationEngine",
+    "partition_by_admin_unit",
+    "EnsembleRunner",
+    "SensitivityStudy",
+    "Parameter",
     "get_default_config",
     "load_config_from_json",
     "merge_configs",
+    "get_config_value",
+    "set_config_value",
     "DEFAULT_SIMULATION_CONFIG"
 ]
@@ -0,0 +1,248 @@
+import json
+import os
+import random
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+
+from agents.farmer_agent import FarmerAgent
+from agriculture.crops import Crop, RiceSeason
+from agriculture.farm_plot import FarmPlot
+from agriculture.plot_store import PlotStateStore
+from agriculture.variety_catalog import SEASONS
+from utils.logging_setup import get_logger
+
+if TYPE_CHECKING:
+    from .engine import SimulationEngine
+
+logger = get_logger(__name__)
+
+CHECKPOINT_FORMAT_VERSION = 5 # 2: PlotStateStore.harvest_t column; 3: climate forcing inputs; 4: crop growth columns;
+                              # 5: cultivation history stress columns
+
+# A checkpoint is a single uncompressed .npz archive of plain (non-object) arrays, so it
+# is written with one sequential pass and loads without pickle:
+#   meta                      JSON string: format version, step, config, Python `random` state
+#   numpy_random_*            numpy global RNG state
+#   store/<column>            every PlotStateStore column (rows in store order)
+#   farmer/<field>            one entry per farmer, in engine order
+#   farmer/plot_offsets       CSR offsets into farmer/plot_rows (plot rows in each farmer's order)
+#   plot/<field>              one entry per plot store row
+#   crop/<field>              one entry per plot with a standing crop
+#   history/<field>           cultivation history records of all plots, history/offsets per plot
+#   history/stress/<type>     one stress column per stress type of the history (NaN where not recorded)
+#   forcing/plot_station      weather station index of every plot store row (-1 for none)
+#   forcing/station_<var>     (step, station) station climate the plot forcing is computed from
+# Rarely used free-form dict fields (expected yields/prices, stress factors) are JSON strings.
+
+# field -> column kind ("str", "int" or "float")
+FARMER_FIELDS = {
+    "agent_id": "str", "household_id": "str", "capital_bdt": "float", "age": "int", "education_years": "int",
+    "farming_experience_years": "int", "risk_aversion_factor": "float", "land_holding_category": "str",
+    "location_id": "str", "num_farm_plots": "int", "current_debt_bdt": "float", "subsidy_received_bdt": "float",
+    "off_farm_income_bdt_per_year": "float",
+}
+PLOT_SOIL_FIELDS = {
+    "soil_type": "str", "organic_matter_percent": "float", "ph": "float", "available_nitrogen_kg_ha": "float",
+    "available_phosphorus_kg_ha": "float", "available_potassium_kg_ha": "float",
+}
+
+def save_checkpoint(engine: "SimulationEngine", path: str):
+    """Writes the engine's complete mutable state to `path` (atomically, via a temporary file)."""
+    arrays: Dict[str, np.ndarray] = {}
+    random_version, random_internal, random_gauss = random.getstate()
+    meta = {
+        "format_version": CHECKPOINT_FORMAT_VERSION,
+        "current_step": engine.current_step,
+        "config": engine.config,
+        "python_random": {"version": random_version, "gauss_next": random_gauss},
+    }
+    arrays["meta"] = np.array(json.dumps(meta, default=str))
+    arrays["python_random_internal"] = np.array(random_internal, dtype=np.uint64)
+    bit_generator, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+    arrays["numpy_random_keys"] = keys
+    arrays["numpy_random_scalars"] = np.array([pos, has_gauss, cached_gaussian], dtype=np.float64)
+
+    store = engine.plot_store
+    for name in PlotStateStore.COLUMNS:
+        arrays[f"store/{name}"] = store.column(name)
+
+    farmers = engine.farmer_agents
+    for field, kind in FARMER_FIELDS.items():
+        arrays[f"farmer/{field}"] = _column([getattr(farmer, field) for farmer in farmers], kind)
+    # Read without allocating the containers of farmers that never used them
+    arrays["farmer/expected_yields"] = _column([_json(farmer._expected_yields) for farmer in farmers])
+    arrays["farmer/expected_prices"] = _column([_json(farmer._expected_prices) for farmer in farmers])
+    arrays["farmer/plot_offsets"] = np.cumsum([0] + [len(farmer.farm_plots) for farmer in farmers], dtype=np.int64)
+    arrays["farmer/plot_rows"] = np.array([plot.store_index for farmer in farmers for plot in farmer.farm_plots],
+                                          dtype=np.int64)
+
+    plots = _plots_by_row(engine)
+    arrays["plot/plot_id"] = _column([plot.plot_id for plot in plots])
+    arrays["plot/owner_agent_id"] = _column([plot.owner_agent_id for plot in plots])
+    arrays["plot/irrigation_type"] = _column([plot.irrigation_type for plot in plots])
+    for field, kind in PLOT_SOIL_FIELDS.items():
+        arrays[f"plot/{field}"] = _column([getattr(plot.soil, field) for plot in plots], kind)
+
+    cropped = [plot for plot in plots if plot.current_crop is not None]
+    crops = [plot.current_crop for plot in cropped]
+    arrays["crop/row"] = np.array([plot.store_index for plot in cropped], dtype=np.int64)
+    arrays["crop/variety_id"] = _column([crop.variety.variety_id for crop in crops])
+    arrays["crop/planting_date"] = _column([crop.planting_date for crop in crops])
+    arrays["crop/harvest_date"] = _column([crop.harvest_date for crop in crops])
+    arrays["crop/current_growth_stage"] = _column([crop.current_growth_stage for crop in crops])
+    arrays["crop/health_status"] = np.array([crop.health_status for crop in crops], dtype=np.float64)
+    arrays["crop/actual_yield_t_ha"] = np.array(
+        [np.nan if crop.actual_yield_t_ha is None else crop.actual_yield_t_ha for crop in crops], dtype=np.float64)
+    arrays["crop/stress_factors"] = _column([_json(crop.stress_factors) for crop in crops])
+
+    history = store.history
+    records, arrays["history/offsets"] = history.ordered_records(store.size)
+    variety_ids = np.array([variety.variety_id for variety in engine.variety_catalog.varieties] or [""], dtype=str)
+    arrays["history/variety_id"] = variety_ids[history.variety_code[records]]
+    arrays["history/season"] = np.array([season.name for season in SEASONS], dtype=str)[history.season_code[records]]
+    arrays["history/planting_date"] = _column(history.strings(history.planting_date_code[records]))
+    arrays["history/harvest_date"] = _column(history.strings(history.harvest_date_code[records]))
+    arrays["history/yield_t_ha"] = history.yield_t_ha[records]
+    for name, column in history.stress.items():
+        arrays[f"history/stress/{name}"] = column[records]
+
+    forcing = engine._ensure_forcing()
+    arrays["forcing/plot_station"] = forcing.plot_station
+    for variable, values in forcing.station_climate.items():
+        arrays[f"forcing/station_{variable}"] = values
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as f: # A file object keeps np.savez from appending ".npz" to the temporary name
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+def load_checkpoint_meta(path: str) -> dict:
+    with np.load(path, allow_pickle=False) as arrays:
+        meta = json.loads(str(arrays["meta"]))
+    if meta.get("format_version") != CHECKPOINT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported checkpoint format in {path}: {meta.get('format_version')}")
+    return meta
+
+def restore_checkpoint(engine: "SimulationEngine", path: str):
+    """Rebuilds agents, plots, crops and RNG state of a freshly set-up engine from `path`."""
+    with np.load(path, allow_pickle=False) as archive:
+        arrays = {name: archive[name] for name in archive.files}
+    meta = json.loads(str(arrays["meta"]))
+    engine.current_step = meta["current_step"]
+    engine.event_log.current_step = engine.current_step
+    random.setstate((meta["python_random"]["version"], tuple(int(x) for x in arrays["python_random_internal"]),
+                     meta["python_random"]["gauss_next"]))
+    pos, has_gauss, cached_gaussian = arrays["numpy_random_scalars"]
+    np.random.set_state(("MT19937", arrays["numpy_random_keys"], int(pos), int(has_gauss), float(cached_gaussian)))
+
+    num_plots = len(arrays["plot/plot_id"])
+    store = PlotStateStore(capacity=num_plots, catalog=engine.variety_catalog,
+                           history_retention=engine.history_retention_seasons, event_log=engine.event_log,
+                           crop_model=engine.crop_model)
+    store.allocate(num_plots)
+    plots: List[FarmPlot] = []
+    plot_ids, owners = arrays["plot/plot_id"].tolist(), _values(arrays["plot/owner_agent_id"])
+    irrigation_types = _values(arrays["plot/irrigation_type"])
+    soil_values = {field: _values(arrays[f"plot/{field}"]) for field in PLOT_SOIL_FIELDS}
+    for row in range(num_plots):
+        plot = FarmPlot(plot_id=plot_ids[row], owner_agent_id=owners[row], size_ha=0.0, store=store, index=row)
+        plot.irrigation_type = irrigation_types[row]
+        for field in PLOT_SOIL_FIELDS:
+            setattr(plot.soil, field, soil_values[field][row])
+        plots.append(plot)
+    # Plot construction writes column defaults, so the saved columns are copied in afterwards
+    for name in PlotStateStore.COLUMNS:
+        getattr(store, name)[:num_plots] = arrays[f"store/{name}"]
+
+    history_offsets = arrays["history/offsets"]
+    for variety_id in np.unique(arrays["history/variety_id"]).tolist():
+        if variety_id not in engine.variety_catalog:
+            raise ValueError(f"Checkpoint history variety '{variety_id}' is not in the engine's variety catalog.")
+    stress_prefix = "history/stress/"
+    store.history.extend(
+        plot_rows=np.repeat(np.arange(num_plots), np.diff(history_offsets)),
+        variety_codes=np.array([engine.variety_catalog.code(variety_id) for variety_id in arrays["history/variety_id"].tolist()],
+                               dtype=np.int32),
+        season_codes=np.array([SEASONS.index(RiceSeason[name]) for name in arrays["history/season"].tolist()],
+                              dtype=np.int8),
+        planting_dates=_values(arrays["history/planting_date"]),
+        harvest_dates=_values(arrays["history/harvest_date"]),
+        yields_t_ha=arrays["history/yield_t_ha"],
+        stress={name[len(stress_prefix):]: values for name, values in arrays.items() if name.startswith(stress_prefix)}
+    )
+
+    planting, harvest = _values(arrays["crop/planting_date"]), _values(arrays["crop/harvest_date"])
+    stages, yields = _values(arrays["crop/current_growth_stage"]), arrays["crop/actual_yield_t_ha"]
+    for i, (row, variety_id) in enumerate(zip(arrays["crop/row"].tolist(), arrays["crop/variety_id"].tolist())):
+        if variety_id not in engine.variety_catalog:
+            raise ValueError(f"Checkpoint crop variety '{variety_id}' is not in the engine's variety catalog.")
+        crop = Crop(variety=engine.variety_catalog[variety_id], planting_date=planting[i], harvest_date=harvest[i],
+                    actual_yield_t_ha=None if np.isnan(yields[i]) else float(yields[i]), store=store, index=row)
+        crop.current_growth_stage = stages[i]
+        crop.health_status = float(arrays["crop/health_status"][i])
+        crop.stress_factors = json.loads(str(arrays["crop/stress_factors"][i]))
+        plots[row].current_crop = crop
+
+    engine.plot_store = store
+    engine.farm_plots_map = {plot.plot_id: plot for plot in plots}
+    farmer_values = {field: _values(arrays[f"farmer/{field}"]) for field in FARMER_FIELDS}
+    plot_offsets, plot_rows = arrays["farmer/plot_offsets"], arrays["farmer/plot_rows"]
+    engine.agents, engine.farmer_agents = [], []
+    for i in range(len(farmer_values["agent_id"])):
+        farmer = FarmerAgent(
+            agent_id=farmer_values["agent_id"][i],
+            household_id=farmer_values["household_id"][i],
+            initial_capital_bdt=farmer_values["capital_bdt"][i],
+            farm_plots=[plots[row] for row in plot_rows[plot_offsets[i]:plot_offsets[i + 1]].tolist()],
+            age=farmer_values["age"][i],
+            education_years=farmer_values["education_years"][i],
+            farming_experience_years=farmer_values["farming_experience_years"][i],
+            risk_aversion_factor=farmer_values["risk_aversion_factor"][i],
+            land_holding_category=farmer_values["land_holding_category"][i],
+            location_id=farmer_values["location_id"][i],
+            num_farm_plots=farmer_values["num_farm_plots"][i],
+            variety_catalog=engine.variety_catalog,
+            salinity_threshold_ds_m=engine.salinity_threshold_ds_m
+        )
+        farmer.current_debt_bdt = farmer_values["current_debt_bdt"][i]
+        farmer.subsidy_received_bdt = farmer_values["subsidy_received_bdt"][i]
+        farmer.off_farm_income_bdt_per_year = farmer_values["off_farm_income_bdt_per_year"][i]
+        farmer.expected_yields = json.loads(str(arrays["farmer/expected_yields"][i]))
+        farmer.expected_prices = json.loads(str(arrays["farmer/expected_prices"][i]))
+        engine.agents.append(farmer)
+        engine.farmer_agents.append(farmer)
+
+    prefix = "forcing/station_"
+    station_climate = {name[len(prefix):]: values for name, values in arrays.items() if name.startswith(prefix)}
+    engine.forcing = engine._build_forcing(station_climate, arrays["forcing/plot_station"])
+    if engine.scheduler is not None:
+        engine.scheduler.reset()
+
+def _plots_by_row(engine: "SimulationEngine") -> List[FarmPlot]:
+    plots: List[Optional[FarmPlot]] = [None] * engine.plot_store.size
+    for plot in engine.farm_plots_map.values():
+        plots[plot.store_index] = plot
+    if any(plot is None for plot in plots):
+        raise ValueError("Every PlotStateStore row must belong to a plot in farm_plots_map to checkpoint.")
+    return plots
+
+# Text columns are fixed-width unicode arrays in which None is written as "\x00";
+# numeric columns are float64/int64 arrays.
+_NONE_MARKER = "\x00"
+
+def _column(values: list, kind: str = "str") -> np.ndarray:
+    if kind == "float":
+        return np.array(values, dtype=np.float64)
+    if kind == "int":
+        return np.array(values, dtype=np.int64)
+    return np.array([_NONE_MARKER if value is None else value for value in values], dtype=str)
+
+def _values(column: np.ndarray) -> list:
+    values = column.tolist()
+    if column.dtype.kind == "U":
+        return [None if value == _NONE_MARKER else value for value in values]
+    return values
+
+def _json(value: dict) -> str:
+    return json.dumps(value) if value else "{}"
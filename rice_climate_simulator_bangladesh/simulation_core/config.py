@@ -1,4 +1,5 @@
 from typing import Dict, Any
+import copy
 import json
 import os
 
@@ -10,7 +11,10 @@ DEFAULT_SIMULATION_CONFIG = {
         "num_farmers": 200,
         "num_plots_per_farmer_avg": 2,
         "sim_duration_days": 365 * 10, # For weather generation, if daily steps
-        "random_seed": 42 # Separate seed for data generator if needed
+        "random_seed": 42, # Separate seed for data generator if needed
+        "generator_mode": "vectorized", # "vectorized" (columnar numpy draws) or "scalar" (one schema object per record)
+        "dataset_dir": None, # If set, inputs are streamed to this directory in chunks and opened lazily
+        "chunk_size": 100000 # Rows per chunk when streaming to dataset_dir
     },
     "data_loader_config": {
         "farmers_file": "data/real/farmers.csv",
@@ -18,15 +22,94 @@ DEFAULT_SIMULATION_CONFIG = {
         "weather_file": "data/real/historical_weather.csv",
         "market_price_file": "data/real/market_prices.csv"
     },
+    "input_cache_config": {
+        "enabled": False, # Reuse generated/loaded inputs across runs with the same data settings
+        "cache_dir": "data/cache/inputs",
+        "max_size_mb": 2048 # Least recently used entries are evicted above this size
+    },
+    "agriculture_config": {
+        "variety_catalog_path": None, # CSV/JSON variety list; None uses agriculture/data/rice_varieties.csv
+        "history_retention_seasons": 0 # Harvests kept in each plot's cultivation history; 0 keeps all
+    },
+    "geography_config": {
+        "admin_units_file": None, # CSV unit table (unit_id, name, scale, parent_id, aez_id); None groups the farmers' upazilas synthetically
+        "synthetic_upazilas_per_district": 3,
+        "synthetic_districts_per_division": 2,
+        "synthetic_num_aezs": 4
+    },
+    "crop_model_config": { # agriculture.crop_model.CropGrowthModel parameters
+        "base_temp_c": 8.0, # No development below this daily mean temperature
+        "optimum_temp_c": 30.0, # Development rate stops increasing above this temperature
+        "reference_temp_c": 28.0, # Temperature at which a variety matures in its maturity_days
+        "salinity_slope_per_ds_m": 0.12, # Yield share lost per dS/m above the variety's salinity tolerance
+        "default_salinity_tolerance_ds_m": 3.0 # Tolerance of varieties without a salinity_tolerance_ds_m attribute
+    },
+    "agent_config": {
+        "decision_mode": "batch", # "batch" (vectorized across farmers) or "per_agent"
+        "scheduling_mode": "step", # "step" (every agent every step) or "event" (only agents with due events)
+        "salinity_threshold_ds_m": 4.0 # Predicted salinity above which farmers choose salt-tolerant varieties
+    },
+    "sharding_config": {
+        "num_workers": 0, # Worker processes of ShardedSimulationEngine; 0 uses one per CPU
+        "start_method": None # multiprocessing start method ("fork", "spawn", ...); None uses the platform default
+    },
+    "ensemble_config": {
+        "num_replicates": 100, # Monte Carlo replicates run by EnsembleRunner
+        "first_seed": 1000, # Replicate i runs with random_seed = first_seed + i
+        "num_workers": 0, # Pool processes; 0 uses one per CPU
+        "quantiles": [0.05, 0.5, 0.95], # Ensemble quantiles estimated online
+        "stochastic_weather": False, # Give each replicate its own weather from a generator fitted to the historical weather
+        "start_method": None
+    },
+    "sensitivity_config": {
+        "method": "sobol", # "sobol" (Saltelli design, first-order and total indices) or "morris" (elementary effects)
+        "num_samples": 64, # Saltelli base samples (runs = num_samples * (parameters + 2)) or Morris trajectories
+        "num_levels": 4, # Morris grid levels
+        "seed": 0, # Seed of the design
+        "study_dir": None, # Directory for the design and completed runs, so interrupted studies resume
+        "num_workers": 0, # Pool processes; 0 uses one per CPU
+        "start_method": None
+    },
+    "logging_config": {
+        "verbosity": "summary", # "quiet", "summary" (one line per step) or "verbose" (per farmer/plot)
+        "event_log_path": None, # JSON-lines file for planted/harvested/... events; None keeps a ring buffer
+        "event_buffer_size": 10000, # Events buffered in memory between flushes
+        "event_ring_capacity": 100000 # Most recent events kept when no file is set
+    },
     "reporting_options": {
         "output_directory": "results",
-        "save_agent_data_interval": 10, # Save agent state every 10 steps
-        "save_plot_data_interval": 10
+        "save_agent_data_interval": 10, # Snapshot every farmer's state into output_directory every N steps (0 disables)
+        "save_plot_data_interval": 10, # Same for every plot's state
+        "results_format": None, # "parquet" or "npz" shards; None uses Parquet when pyarrow is installed
+        "results_buffer_rows": 1000000, # Snapshot rows buffered per table before they are written as one shard
+        "results_max_pending_shards": 4, # Shards queued for the background writer before a step waits
+        "checkpoint_interval": 0, # Write a resumable checkpoint every N steps (0 disables)
+        "checkpoint_file": "checkpoint.npz" # Inside output_directory; overwritten by each checkpoint
+    },
+    "aggregation_config": { # reporting_analytics.regional_aggregates.RegionalAggregator
+        "enabled": False, # Keep per-step production and welfare indicators by region
+        "scales": ["Upazila", "District", "Division", "AgroEcologicalZone"], # SpatialScale values or names
+        "poverty_line_bdt": 30000.0, # Farmers with less capital count as poor
+        "capital_quantiles": [0.1, 0.5, 0.9],
+        "output_file": "regional_kpis.csv" # Written to output_directory at the end of the run (None disables)
+    },
+    "instrumentation_config": { # simulation_core.instrumentation.StepInstrumentation
+        "enabled": False, # Time the phases of every step and export per-step metrics
+        "metrics_file": "metrics.jsonl", # One JSON line per step, inside output_directory (None disables)
+        "prometheus_file": "metrics.prom", # Latest step in Prometheus text format, inside output_directory (None disables)
+        "allocation_sample_interval": 0, # Trace the allocations of every Nth step with tracemalloc (0 disables)
+        "profile_steps": [], # Steps (0-based) to profile; profiles are written to output_directory
+        "profiler": "cprofile", # "cprofile" (.prof for pstats) or "sampling" (.folded stacks for flame graphs)
+        "profile_sample_interval_s": 0.005 # Stack sampling interval of the "sampling" profiler
     },
     "climate_model_config": {
         "historical_data_path": "data/climate/historical_weather.csv",
         "scenario_data_path": "data/climate/cmip6_rcp45_scenario.json",
-        "selected_scenario": "RCP4.5"
+        "selected_scenario": "RCP4.5",
+        "days_per_step": 122, # Weather days aggregated into one simulation step (one season)
+        "station_by_admin_unit": {}, # Admin unit id -> weather station id; other units get a station by stable hash
+        "forcing_window_steps": 0, # Steps of per-plot forcing computed at a time; 0 computes the whole run up front
+        "forcing_max_memory_mb": 1024 # Whole-run forcing larger than this is computed in windows instead
     },
     "economic_model_config": {
         "default_interest_rate": 0.08,
@@ -38,7 +121,7 @@ DEFAULT_SIMULATION_CONFIG = {
 
 def get_default_config() -> Dict[str, Any]:
     """Returns a copy of the default simulation configuration."""
-    return DEFAULT_SIMULATION_CONFIG.copy()
+    return copy.deepcopy(DEFAULT_SIMULATION_CONFIG) # Deep, so edits to nested sections never leak into the defaults
 
 def load_config_from_json(file_path: str) -> Dict[str, Any]:
     """Loads simulation configuration from a JSON file.
@@ -75,6 +158,22 @@ def merge_configs(base_config: Dict[str, Any], override_config: Dict[str, Any])
             merged[key] = value
     return merged
 
+def get_config_value(config: Dict[str, Any], key: str, default: Any = None) -> Any:
+    """Reads a nested value by dotted key, e.g. "economic_model_config.default_interest_rate"."""
+    value = config
+    for part in key.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return default
+        value = value[part]
+    return value
+
+def set_config_value(config: Dict[str, Any], key: str, value: Any) -> Dict[str, Any]:
+    """Returns a copy of `config` with the nested value at dotted `key` replaced (sections on the path are copied)."""
+    head, _, rest = key.partition(".")
+    updated = dict(config)
+    updated[head] = set_config_value(config.get(head) or {}, rest, value) if rest else value
+    return updated
+
 # Example usage:
 if __name__ == '__main__':
     default_conf = get_default_config()
@@ -1,38 +1,165 @@
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Sequence
+import os
 import time
-import random
+
+import numpy as np
+import pandas as pd
 
 from agents.base_agent import BaseAgent
 from agents.farmer_agent import FarmerAgent # Specific agent type
 from climate.climate_manager import ClimateManager
+from climate.forcing import ClimateForcing, FORCING_VARIABLES, station_for_admin_units
+from climate.weather_cube import WeatherCube
 from data_management.synthetic_data_generator import SyntheticDataGenerator
+from data_management.data_loaders import load_all_simulation_data
 from data_management.schemas import SimulationInputDataSchema
+from data_management.columnar import FRAME_COLUMNS, schema_to_frames
+from data_management.columnar_dataset import ColumnarDataset
+from data_management.input_cache import InputCache, file_fingerprint, input_cache_key
 from agriculture.farm_plot import FarmPlot # For type hinting
+from agriculture.plot_store import PlotStateStore
+from agriculture.variety_catalog import VarietyCatalog, DEFAULT_VARIETY_CATALOG
+from agriculture.crop_model import CropGrowthModel
+from geography.spatial_hierarchy import SpatialHierarchy, parse_scale
+from geography.spatial_units import SpatialScale
+from agents.variety_selection import VarietySelectionKernel, DEFAULT_SALINITY_THRESHOLD_DS_M
+from simulation_core.scheduler import EventScheduler, EventKind
+from simulation_core.instrumentation import StepInstrumentation
+from reporting_analytics.results_recorder import ResultsRecorder, ResultsReader
+from reporting_analytics.regional_aggregates import RegionalAggregator, kpi_frame
+from simulation_core.checkpoint import save_checkpoint, restore_checkpoint, load_checkpoint_meta
+from utils.event_log import EventLog, EventType
+from utils.logging_setup import configure_logging, get_logger
 # from ..economics.market_model import MarketModel # To be created
 
+logger = get_logger(__name__)
+
+AGENT_TABLES = ("farmers", "farm_plots") # Input tables agents and plots are built from
+
 class SimulationEngine:
     """
     Manages the overall simulation lifecycle, including setup, agent management,
     and stepping through simulation time.
     """
     def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self._setup(config)
+        self._initialize_components()
+
+    def _setup(self, config: Optional[Dict[str, Any]]):
+        """Sets up configuration-derived state; agents and plots are created separately."""
         self.config = config if config else {}
+        logging_config = self.config.get("logging_config", {})
+        configure_logging(logging_config.get("verbosity", "summary"))
+        self.event_log = EventLog(
+            file_path=logging_config.get("event_log_path"),
+            buffer_size=logging_config.get("event_buffer_size", 10000),
+            ring_capacity=logging_config.get("event_ring_capacity", 100000)
+        ) # Passed to the plot store, through which the engine's plots and farmers record
         self.current_step: int = 0
         self.max_steps: int = self.config.get("max_simulation_steps", 10) # Example: 10 years/seasons
+        self.random_seed: int = self.config.get("random_seed", 42)
+        self.decision_mode: str = self.config.get("agent_config", {}).get("decision_mode", "batch")
+        self.scheduling_mode: str = self.config.get("agent_config", {}).get("scheduling_mode", "step")
+        self.salinity_threshold_ds_m: float = self.config.get("agent_config", {}).get(
+            "salinity_threshold_ds_m", DEFAULT_SALINITY_THRESHOLD_DS_M)
         
         self.agents: List[BaseAgent] = []
         self.farmer_agents: List[FarmerAgent] = []
         self.farm_plots_map: Dict[str, FarmPlot] = {} # plot_id -> FarmPlot object
+        catalog_path = self.config.get("agriculture_config", {}).get("variety_catalog_path")
+        self.variety_catalog: VarietyCatalog = VarietyCatalog.load(catalog_path) if catalog_path else DEFAULT_VARIETY_CATALOG
+        self.variety_kernel = VarietySelectionKernel(self.variety_catalog, self.salinity_threshold_ds_m)
+        # Harvests kept in each plot's cultivation history; 0 keeps all of them
+        self.history_retention_seasons: int = self.config.get("agriculture_config", {}).get("history_retention_seasons", 0) or 0
+        self.crop_model = CropGrowthModel.from_config(self.variety_catalog, self.config.get("crop_model_config"))
+        self.plot_store: PlotStateStore = PlotStateStore(
+            catalog=self.variety_catalog, history_retention=self.history_retention_seasons,
+            event_log=self.event_log, crop_model=self.crop_model) # Columnar state behind every FarmPlot
+        self.days_per_step: int = self.config.get("climate_model_config", {}).get("days_per_step", 122)
+        # Administrative hierarchy and the integer unit codes of every farmer and plot, built on first use
+        self.spatial_hierarchy: Optional[SpatialHierarchy] = None
+        self._farmer_unit_codes: Optional[Dict[SpatialScale, np.ndarray]] = None
+        self._plot_unit_codes: Optional[Dict[SpatialScale, np.ndarray]] = None
+        self._plot_owners: Optional[np.ndarray] = None
+        # Event mode: only plots and farmers with due sowing, maturity or adaptation events are visited
+        self.scheduler: Optional[EventScheduler] = EventScheduler(self) if self.scheduling_mode == "event" else None
 
         self.climate_manager: Optional[ClimateManager] = None
+        self.forcing: Optional[ClimateForcing] = None # Per-plot forcing of every step, built before the first step
         # self.market_model: Optional[MarketModel] = None
         self.simulation_data: Optional[SimulationInputDataSchema] = None
-        
-        self._initialize_components()
+        self.input_frames: Optional[Dict[str, pd.DataFrame]] = None # Columnar inputs (data_management.columnar layout)
+        self.input_dataset: Optional[ColumnarDataset] = None # Same tables on disk, read lazily chunk by chunk
+
+        reporting_options = self.config.get("reporting_options", {})
+        self.checkpoint_interval: int = reporting_options.get("checkpoint_interval", 0) or 0 # Steps; 0 disables
+        self.output_directory: str = reporting_options.get("output_directory", "results")
+        self.checkpoint_path: str = os.path.join(self.output_directory,
+                                                 reporting_options.get("checkpoint_file", "checkpoint.npz"))
+        self.save_agent_data_interval: int = reporting_options.get("save_agent_data_interval", 0) or 0 # Steps; 0 disables
+        self.save_plot_data_interval: int = reporting_options.get("save_plot_data_interval", 0) or 0
+        self.results_recorder: Optional[ResultsRecorder] = None # Opened when stepping starts
+        self.results_directory: str = self.output_directory # Shard workers record into a subdirectory of it
+        self.last_step_aggregates: Optional[Dict[str, Any]] = None
+        # Regional indicators: state updated from each step's changes, and the indicator rows of every step
+        aggregation_config = self.config.get("aggregation_config", {})
+        self.regional_aggregation: bool = aggregation_config.get("enabled", False)
+        self.regional_aggregator: Optional[RegionalAggregator] = None # Built at the first step
+        self.regional_kpis: List[pd.DataFrame] = []
+        # Phase timers, counters and profiles per step (no-ops unless instrumentation_config.enabled)
+        self.instrumentation = StepInstrumentation.from_config(self.config.get("instrumentation_config"),
+                                                               self.output_directory)
+
+        # Set when this engine steps one shard of a larger run (see simulation_core.sharded_engine):
+        # the run-wide plot row of each local plot
+        self.shard_plot_rows: Optional[np.ndarray] = None
+
+    def save_checkpoint(self, path: str):
+        """
+        Saves the complete simulation state (agents, plots, crops, cultivation history,
+        step counter and RNG state) to a compact binary file. A run resumed from it with
+        SimulationEngine.from_checkpoint continues bit-identically.
+        """
+        start_time = time.perf_counter()
+        if self.results_recorder is not None:
+            self.results_recorder.flush() # Resumed runs append after the snapshots recorded so far
+        save_checkpoint(self, path)
+        logger.info("Checkpoint for step %d written to %s in %.4f seconds.", self.current_step, path,
+                    time.perf_counter() - start_time)
+
+    @classmethod
+    def from_checkpoint(cls, path: str, config: Optional[Dict[str, Any]] = None) -> "SimulationEngine":
+        """
+        Restores an engine saved with save_checkpoint. The configuration stored in the
+        checkpoint is used unless `config` is given (e.g. to change logging or max steps).
+        """
+        engine = cls.__new__(cls)
+        engine._setup(config if config is not None else load_checkpoint_meta(path)["config"])
+        restore_checkpoint(engine, path)
+        logger.info("Resumed from checkpoint %s at step %d.", path, engine.current_step)
+        return engine
+
+    @classmethod
+    def from_frames(cls, config: Optional[Dict[str, Any]], frames: Dict[str, pd.DataFrame]) -> "SimulationEngine":
+        """
+        Builds an engine over already prepared input tables (data_management.columnar
+        layout; the AGENT_TABLES are needed, "historical_weather" and an "admin_units"
+        unit table for the SpatialHierarchy are used if present)
+        instead of generating or loading them.
+        """
+        engine = cls.__new__(cls)
+        engine._setup(config)
+        engine.input_frames = frames
+        if "admin_units" in frames: # A unit table shared by every shard of a run
+            engine.spatial_hierarchy = SpatialHierarchy.from_frame(frames["admin_units"])
+        engine._create_agents_and_plots()
+        engine._initialize_climate()
+        engine.input_frames = None # Agents, plots and the climate manager hold everything the run needs
+        return engine
 
     def _initialize_components(self):
         """Initializes core components like climate manager, market model, and loads initial data."""
-        print("Initializing simulation components...")
+        logger.info("Initializing simulation components...")
         # Initialize ClimateManager (example with placeholder data path)
         # self.climate_manager = ClimateManager(historical_data_path="data/historical_weather.csv", 
         #                                     scenario_data_path="data/climate_scenarios.json")
@@ -40,154 +167,579 @@ class SimulationEngine:
         # self.market_model = MarketModel()
         
         # Load or generate initial simulation data
+        self._prepare_input_data()
+        self._create_agents_and_plots()
+        self._initialize_climate()
+        logger.info("Simulation components initialized.")
+
+    def _prepare_input_data(self):
+        """Generates or loads the simulation inputs, going through the input cache when it is enabled."""
         use_synthetic_data = self.config.get("use_synthetic_data", True)
+        data_gen_config = self.config.get("synthetic_data_config", {})
+        generator_args = dict(
+            num_farmers=data_gen_config.get("num_farmers", 50),
+            num_plots_per_farmer_avg=data_gen_config.get("num_plots_per_farmer_avg", 2),
+            sim_duration_days=data_gen_config.get("sim_duration_days", 365 * self.max_steps) # Match sim length
+        )
+        generator_mode = data_gen_config.get("generator_mode", "vectorized")
+        dataset_dir = data_gen_config.get("dataset_dir") if use_synthetic_data else None
+        data_loader_config = self.config.get("data_loader_config", {})
+
+        cache_config = self.config.get("input_cache_config", {})
+        cache, cache_key = None, None
+        if cache_config.get("enabled", False) and not dataset_dir: # A streamed dataset is already on disk
+            cache = InputCache(cache_config.get("cache_dir", "data/cache/inputs"),
+                               max_size_bytes=int(cache_config.get("max_size_mb", 2048) * 1024**2))
+            if use_synthetic_data:
+                data_config = {"use_synthetic_data": True, "generator_mode": generator_mode,
+                               "random_seed": data_gen_config.get("random_seed", 42), **generator_args}
+            else:
+                data_config = {"use_synthetic_data": False,
+                               **{name: file_fingerprint(path) for name, path in sorted(data_loader_config.items())}}
+            cache_key = input_cache_key(data_config)
+            self.input_dataset = cache.get(cache_key)
+            if self.input_dataset is not None:
+                logger.info("Loaded simulation inputs from cache entry %s.", cache_key[:12])
+                return
+
         if use_synthetic_data:
-            print("Generating synthetic data for simulation...")
-            data_gen_config = self.config.get("synthetic_data_config", {})
+            logger.info("Generating synthetic data for simulation...")
             generator = SyntheticDataGenerator(random_seed=data_gen_config.get("random_seed", 42))
-            self.simulation_data = generator.generate_initial_simulation_data(
-                num_farmers=data_gen_config.get("num_farmers", 50),
-                num_plots_per_farmer_avg=data_gen_config.get("num_plots_per_farmer_avg", 2),
-                sim_duration_days=data_gen_config.get("sim_duration_days", 365 * self.max_steps) # Match sim length
-            )
+            if dataset_dir and generator_mode == "vectorized":
+                # Stream the population to disk chunk by chunk and read it back lazily
+                self.input_dataset = generator.export_columnar_dataset(
+                    dataset_dir, chunk_size=data_gen_config.get("chunk_size", 100_000), **generator_args)
+            elif generator_mode == "vectorized":
+                self.input_frames = generator.generate_columnar_simulation_data(**generator_args)
+            elif generator_mode == "scalar":
+                self.simulation_data = generator.generate_initial_simulation_data(**generator_args)
+            else:
+                raise ValueError(f"Unknown synthetic_data_config.generator_mode '{generator_mode}'. "
+                                 "Expected 'vectorized' or 'scalar'.")
         else:
-            # Placeholder for loading real data using DataLoaders
-            # data_loader_config = self.config.get("data_loader_config", {})
-            # self.simulation_data = load_all_simulation_data(**data_loader_config)
-            print("ERROR: Real data loading not yet implemented. Configure to use synthetic data.")
-            raise NotImplementedError("Real data loading pathway is not yet implemented.")
+            logger.info("Loading simulation data from files...")
+            self.simulation_data = load_all_simulation_data(**data_loader_config)
 
-        self._create_agents_and_plots()
-        print("Simulation components initialized.")
+        if cache is not None:
+            if self.input_frames is None:
+                self.input_frames = schema_to_frames(self.simulation_data)
+            cache.put(cache_key, self.input_frames)
+            logger.info("Stored simulation inputs in cache entry %s.", cache_key[:12])
 
     def _create_agents_and_plots(self):
-        if not self.simulation_data:
-            print("Error: Simulation data not loaded or generated.")
+        if self.input_frames is None and self.input_dataset is None and self.simulation_data is not None:
+            self.input_frames = schema_to_frames(self.simulation_data)
+        if self.input_frames is None and self.input_dataset is None:
+            logger.error("Simulation data not loaded or generated.")
+            return
+
+        logger.info("Creating %d farmer agents...", self._input_num_rows("farmers"))
+        for farmers_df in self._input_chunks("farmers"):
+            self._create_farmers(farmers_df)
+
+        num_plots = self._input_num_rows("farm_plots")
+        logger.info("Creating and assigning %d farm plots...", num_plots)
+        # Reserve every row up front; plot objects are views over consecutive rows and the
+        # numeric soil/plot columns are filled one chunk at a time.
+        self.plot_store = PlotStateStore(capacity=num_plots, catalog=self.variety_catalog,
+                                         history_retention=self.history_retention_seasons, event_log=self.event_log,
+                                         crop_model=self.crop_model)
+        plot_assignment_map: Dict[str, List[FarmPlot]] = {farmer.agent_id: [] for farmer in self.farmer_agents}
+        for plots_df in self._input_chunks("farm_plots"):
+            self._create_plots(plots_df, plot_assignment_map)
+
+        for farmer in self.farmer_agents:
+            farmer.farm_plots = plot_assignment_map.get(farmer.agent_id, [])
+            if len(farmer.farm_plots) != farmer.num_farm_plots: # num_farm_plots from schema
+                 logger.warning("Farmer %s expected %d plots, got %d.", farmer.agent_id, farmer.num_farm_plots, len(farmer.farm_plots))
+
+        logger.info("Agents and plots created and assigned.")
+
+    def ensure_spatial_hierarchy(self) -> SpatialHierarchy:
+        """
+        The administrative hierarchy of the run: the unit table in
+        geography_config.admin_units_file or, without one, synthetic districts and
+        divisions over the farmers' upazilas (a flat national > upazila hierarchy for
+        loaded inputs).
+        """
+        if self.spatial_hierarchy is None:
+            self.spatial_hierarchy = self._build_spatial_hierarchy([farmer.location_id for farmer in self.farmer_agents])
+        return self.spatial_hierarchy
+
+    def _build_spatial_hierarchy(self, farmer_unit_ids: Sequence[Optional[str]]) -> SpatialHierarchy:
+        geography_config = self.config.get("geography_config", {})
+        if geography_config.get("admin_units_file"):
+            return SpatialHierarchy.from_csv(geography_config["admin_units_file"])
+        unit_ids = sorted({unit for unit in farmer_unit_ids if isinstance(unit, str)})
+        if not self.config.get("use_synthetic_data", True):
+            return SpatialHierarchy.from_leaf_units(unit_ids)
+        return SpatialHierarchy.from_frame(SyntheticDataGenerator().generate_admin_unit_columns(
+            unit_ids, upazilas_per_district=geography_config.get("synthetic_upazilas_per_district", 3),
+            districts_per_division=geography_config.get("synthetic_districts_per_division", 2),
+            num_aezs=geography_config.get("synthetic_num_aezs", 4)))
+
+    def farmer_unit_codes(self) -> Dict[SpatialScale, np.ndarray]:
+        """
+        Integer code of every farmer's unit (in farmer_agents order) at each
+        administrative level and AEZ (see SpatialHierarchy.all_codes; -1 where unknown).
+        """
+        if self._farmer_unit_codes is None:
+            hierarchy = self.ensure_spatial_hierarchy()
+            self._farmer_unit_codes = hierarchy.all_codes([farmer.location_id for farmer in self.farmer_agents])
+        return self._farmer_unit_codes
+
+    def plot_unit_codes(self) -> Dict[SpatialScale, np.ndarray]:
+        """Same codes for every plot store row, from the plot's owner (-1 for rows without one)."""
+        if self._plot_unit_codes is None:
+            plot_farmer = self.plot_owner_indices()
+            owned = plot_farmer >= 0
+            self._plot_unit_codes = {
+                scale: np.where(owned, codes[np.maximum(plot_farmer, 0)] if len(codes) else -1, -1).astype(np.int32)
+                for scale, codes in self.farmer_unit_codes().items()}
+        return self._plot_unit_codes
+
+    def plot_owner_indices(self) -> np.ndarray:
+        """Index in farmer_agents of the owner of every plot store row (-1 for rows without one)."""
+        if self._plot_owners is None:
+            self._plot_owners = np.full(self.plot_store.size, -1, dtype=np.int64)
+            for farmer_index, farmer in enumerate(self.farmer_agents):
+                for plot in farmer.farm_plots:
+                    self._plot_owners[plot.store_index] = farmer_index
+        return self._plot_owners
+
+    def _input_tables(self, tables: Sequence[str] = tuple(FRAME_COLUMNS)) -> Optional[Dict[str, pd.DataFrame]]:
+        """The prepared inputs as whole in-memory tables, however they were prepared (None if there are none)."""
+        if self.input_dataset is not None:
+            return self.input_dataset.to_frames(tables)
+        if self.input_frames is None and self.simulation_data is not None:
+            self.input_frames = schema_to_frames(self.simulation_data)
+        if self.input_frames is None:
+            return None
+        return {table: self.input_frames[table] for table in tables if table in self.input_frames}
+
+    def _initialize_climate(self):
+        """Sets up the ClimateManager from the historical weather inputs, if there are any."""
+        weather = (self._input_tables(("historical_weather",)) or {}).get("historical_weather")
+        if weather is None or len(weather) == 0:
             return
+        self.climate_manager = ClimateManager()
+        self.climate_manager.set_historical_weather(WeatherCube.from_frame(weather))
+        logger.info("Historical weather for %d stations over %d days loaded.",
+                    len(self.climate_manager.weather_cube.station_ids), self.climate_manager.weather_cube.num_days)
+
+    def _input_chunks(self, table: str):
+        """Input table as DataFrame chunks: shard by shard from an on-disk dataset, else the whole frame."""
+        if self.input_dataset is not None:
+            return self.input_dataset.iter_chunks(table)
+        return [self.input_frames[table]]
+
+    def _input_num_rows(self, table: str) -> int:
+        if self.input_dataset is not None:
+            return self.input_dataset.num_rows(table)
+        return len(self.input_frames[table])
 
-        print(f"Creating {len(self.simulation_data.farmers)} farmer agents...")
-        for farmer_schema in self.simulation_data.farmers:
+    def _create_farmers(self, farmers_df: pd.DataFrame):
+        for agent_id, household_id, capital, age, education, experience, risk_aversion, land_category, location_id, num_plots in zip(
+                farmers_df["agent_id"].tolist(), farmers_df["household_id"].tolist(),
+                farmers_df["initial_capital_bdt"].tolist(), farmers_df["age"].tolist(),
+                farmers_df["education_years"].tolist(), farmers_df["farming_experience_years"].tolist(),
+                farmers_df["risk_aversion_factor"].tolist(), farmers_df["land_holding_category"].tolist(),
+                farmers_df["location_admin_unit_id"].tolist(), farmers_df["num_farm_plots"].tolist()):
             farmer = FarmerAgent(
-                agent_id=farmer_schema.agent_id,
-                household_id=farmer_schema.household_id,
-                initial_capital_bdt=farmer_schema.initial_capital_bdt,
-                age=farmer_schema.age,
-                education_years=farmer_schema.education_years,
-                farming_experience_years=farmer_schema.farming_experience_years,
-                risk_aversion_factor=farmer_schema.risk_aversion_factor,
-                land_holding_category=farmer_schema.land_holding_category,
-                location_id=farmer_schema.location_admin_unit_id,
-                num_farm_plots=farmer_schema.num_farm_plots # Pass the expected number of plots
+                agent_id=agent_id,
+                household_id=household_id,
+                initial_capital_bdt=capital,
+                age=age,
+                education_years=education,
+                farming_experience_years=experience,
+                risk_aversion_factor=risk_aversion,
+                land_holding_category=land_category,
+                location_id=location_id,
+                num_farm_plots=num_plots, # Pass the expected number of plots
+                variety_catalog=self.variety_catalog,
+                salinity_threshold_ds_m=self.salinity_threshold_ds_m
             )
             self.agents.append(farmer)
             self.farmer_agents.append(farmer)
 
-        print(f"Creating and assigning {len(self.simulation_data.farm_plots)} farm plots...")
-        plot_assignment_map: Dict[str, List[FarmPlot]] = {farmer.agent_id: [] for farmer in self.farmer_agents}
-        
-        for plot_schema in self.simulation_data.farm_plots:
-            # Create FarmPlot instance (actual object, not just schema)
-            # Note: FarmPlot class from agriculture.farm_plot needs to be compatible or adapted
+    def _create_plots(self, plots_df: pd.DataFrame, plot_assignment_map: Dict[str, List[FarmPlot]]):
+        num_plots = len(plots_df)
+        first_index = self.plot_store.allocate(num_plots)
+        irrigation_types = plots_df["irrigation_type"].astype(object).where(plots_df["irrigation_type"].notna(), None)
+        for offset, (plot_id, owner_agent_id, soil_type, organic_matter, ph, irrigation_type) in enumerate(zip(
+                plots_df["plot_id"].tolist(), plots_df["owner_agent_id"].tolist(), plots_df["soil_type"].tolist(),
+                plots_df["organic_matter_percent"].tolist(), plots_df["ph"].tolist(), irrigation_types.tolist())):
             plot = FarmPlot(
-                plot_id=plot_schema.plot_id,
-                owner_agent_id=plot_schema.owner_agent_id, # This should match a farmer_agent_id
-                size_ha=plot_schema.size_ha,
-                # soil_properties can be more complex, need to instantiate SoilProperties from schema
-                initial_land_quality=plot_schema.initial_land_quality
+                plot_id=plot_id,
+                owner_agent_id=owner_agent_id, # This should match a farmer_agent_id
+                size_ha=0.0, # Set column-wise below
+                store=self.plot_store,
+                index=first_index + offset
             )
-            # For simplicity, assigning soil properties directly if schema matches class structure
-            # A more robust way would be: plot.soil = SoilProperties(**plot_schema.soil_properties.dict())
-            plot.soil.soil_type = plot_schema.soil_properties.soil_type
-            plot.soil.organic_matter_percent = plot_schema.soil_properties.organic_matter_percent
-            plot.soil.ph = plot_schema.soil_properties.ph
-            plot.soil.salinity_ds_m = plot_schema.soil_properties.salinity_ds_m
-            plot.soil.water_holding_capacity_mm = plot_schema.soil_properties.water_holding_capacity_mm
-            plot.is_irrigated = plot_schema.is_irrigated
-            plot.irrigation_type = plot_schema.irrigation_type
-            
+            plot.soil.soil_type = soil_type
+            plot.soil.organic_matter_percent = organic_matter
+            plot.soil.ph = ph
+            plot.irrigation_type = irrigation_type
+
             self.farm_plots_map[plot.plot_id] = plot
             if plot.owner_agent_id in plot_assignment_map:
                 plot_assignment_map[plot.owner_agent_id].append(plot)
             else:
-                print(f"Warning: Plot {plot.plot_id} has owner {plot.owner_agent_id} not in farmer list. Assigning to first farmer if available.")
+                logger.warning("Plot %s has owner %s not in farmer list. Assigning to first farmer if available.",
+                               plot.plot_id, plot.owner_agent_id)
+                self.event_log.record(EventType.OWNER_MISMATCH, None, plot.plot_id, detail=plot.owner_agent_id)
                 if self.farmer_agents:
                     plot.owner_agent_id = self.farmer_agents[0].agent_id
                     plot_assignment_map[self.farmer_agents[0].agent_id].append(plot)
 
-        for farmer in self.farmer_agents:
-            farmer.farm_plots = plot_assignment_map.get(farmer.agent_id, [])
-            if len(farmer.farm_plots) != farmer.num_farm_plots: # num_farm_plots from schema
-                 print(f"Warning: Farmer {farmer.agent_id} expected {farmer.num_farm_plots} plots, got {len(farmer.farm_plots)}.")
-
-        print("Agents and plots created and assigned.")
+        rows = slice(first_index, first_index + num_plots)
+        store = self.plot_store
+        store.size_ha[rows] = plots_df["size_ha"].to_numpy(np.float64)
+        store.land_quality[rows] = plots_df["initial_land_quality"].to_numpy(np.float64)
+        store.salinity_ds_m[rows] = plots_df["salinity_ds_m"].to_numpy(np.float64)
+        store.initial_salinity_ds_m[rows] = store.salinity_ds_m[rows]
+        store.water_holding_capacity_mm[rows] = plots_df["water_holding_capacity_mm"].to_numpy(np.float64)
+        store.is_irrigated[rows] = plots_df["is_irrigated"].to_numpy(bool)
 
     def run_step(self):
         """Runs a single step of the simulation."""
         if self.current_step >= self.max_steps:
-            print("Maximum simulation steps reached.")
+            logger.info("Maximum simulation steps reached.")
             return False # Indicate simulation should stop
 
-        print(f"\n--- Simulation Step {self.current_step + 1} / {self.max_steps} ---")
-        start_time = time.time()
+        logger.debug("--- Simulation Step %d / %d ---", self.current_step + 1, self.max_steps)
+        instrumentation = self.instrumentation
+        instrumentation.begin_step(self.current_step)
+        start_time = time.perf_counter()
+        self._open_results_recorder()
 
-        # 1. Get current climate conditions for the step
-        # climate_conditions_for_step = self.climate_manager.get_conditions_for_step(self.current_step)
-        climate_conditions_for_step = {
-            "general": {"avg_temp_c": 28, "total_rainfall_mm": 150, "avg_salinity_ds_m": 1.2},
-            "weather_for_plots": {plot_id: {"precipitation_mm": random.uniform(0,10)} for plot_id in self.farm_plots_map.keys() }, # Simplified
-            "hydrology_for_plots": {plot_id: {"salinity_change": random.uniform(-0.1,0.1)} for plot_id in self.farm_plots_map.keys() }
-        } # Placeholder
+        # 1. Get current climate and market conditions for the step
+        with instrumentation.phase("climate"):
+            climate_conditions_for_step = self._climate_conditions_for_step(self.current_step)
+        with instrumentation.phase("market"):
+            market_conditions_for_step = self._market_conditions_for_step(self.current_step, self.last_step_aggregates)
 
-        # 2. Get current market conditions
-        # market_conditions_for_step = self.market_model.get_market_state(self.current_step)
-        market_conditions_for_step = {
-            "rice_price_bdt_ton": {"brri_dhan28": 32000, "swarna": 28000, "default": 30000}
-        } # Placeholder
+        # 2. Agent actions (decision-making and execution)
+        self.last_step_aggregates = self._advance_agents(climate_conditions_for_step, market_conditions_for_step)
 
-        # 3. Agent actions (decision-making and execution)
-        for agent in self.agents:
-            agent.step(self.current_step, climate_conditions_for_step, market_conditions_for_step)
-        
-        # 4. Update environment (e.g., market clearing, aggregate environmental changes)
+        # 3. Update environment (e.g., market clearing, aggregate environmental changes)
         # self.market_model.clear_market(self.agents) # Example
         # self.climate_manager.update_environment_state() # Example
 
-        end_time = time.time()
-        print(f"Step {self.current_step + 1} completed in {end_time - start_time:.4f} seconds.")
+        self._log_step_summary(time.perf_counter() - start_time, self.last_step_aggregates["event_counts"])
         self.current_step += 1
+        with instrumentation.phase("recording"):
+            self._record_regional_kpis(self.last_step_aggregates)
+            self.record_results()
+        if self.checkpoint_interval and self.current_step % self.checkpoint_interval == 0:
+            with instrumentation.phase("checkpoint"):
+                os.makedirs(os.path.dirname(self.checkpoint_path) or ".", exist_ok=True)
+                self.save_checkpoint(self.checkpoint_path)
+        instrumentation.end_step(self.last_step_aggregates)
         return True # Indicate simulation can continue
 
+    def _climate_conditions_for_step(self, step: int) -> Dict[str, Any]:
+        """Regional climate conditions shared by every agent in a step."""
+        # return self.climate_manager.get_conditions_for_step(step)
+        return {
+            "general": {"avg_temp_c": 28, "total_rainfall_mm": 150, "avg_salinity_ds_m": 1.2}
+        } # Placeholder
+
+    def _market_conditions_for_step(self, step: int, previous_aggregates: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Market conditions for a step. `previous_aggregates` are the run-wide aggregates of
+        the previous step (see _advance_agents), from which prices can be cleared.
+        """
+        # return self.market_model.get_market_state(step, previous_aggregates)
+        return {
+            "rice_price_bdt_ton": {"brri_dhan28": 32000, "swarna": 28000, "default": 30000}
+        } # Placeholder
+
+    def _advance_agents(self, climate_conditions: Dict[str, Any], market_conditions: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Applies the step's plot conditions and steps every agent.
+
+        Returns the step's aggregates: event counts, cropped area (ha) per variety code
+        and tonnes harvested. They are additive, so the aggregates of several shards sum
+        to those of the whole population.
+        """
+        instrumentation = self.instrumentation
+        self.event_log.current_step = self.current_step
+        self.event_log.reset_counts()
+        with instrumentation.phase("climate"):
+            plot_weather, plot_hydrology = self._draw_plot_conditions(self.current_step)
+        with instrumentation.phase("environment"):
+            self.plot_store.column("harvest_t")[:] = 0.0
+            self.plot_store.update_all_plot_conditions(hydrology=plot_hydrology)
+
+        if self.scheduler is not None:
+            self._advance_scheduled_agents(plot_weather, climate_conditions, market_conditions)
+        else:
+            # Sowing decisions come first so that crops planted this step grow over its days
+            with instrumentation.phase("decisions"):
+                self._make_decisions(self.farmer_agents, climate_conditions, market_conditions)
+            with instrumentation.phase("crop_growth"):
+                self.crop_model.advance(self.plot_store, plot_weather["precipitation_mm"], plot_weather["mean_temp_c"],
+                                        self.days_per_step)
+            with instrumentation.phase("harvests"):
+                for agent in self.agents:
+                    if isinstance(agent, FarmerAgent):
+                        agent.step(self.current_step, climate_conditions, market_conditions, make_decisions=False)
+                    else:
+                        agent.step(self.current_step, climate_conditions, market_conditions)
+            instrumentation.count("farmers_stepped", len(self.farmer_agents))
+
+        with instrumentation.phase("aggregation"):
+            codes = self.plot_store.column("crop_variety_code")
+            cropped = codes >= 0
+            cropped_area = np.bincount(codes[cropped], weights=self.plot_store.column("size_ha")[cropped],
+                                       minlength=len(self.variety_catalog))
+            production = float(self.plot_store.column("harvest_t").sum())
+            aggregates = {"event_counts": self.event_log.counts(), "cropped_area_ha": cropped_area, "production_t": production}
+            if self.regional_aggregation:
+                aggregates["regional"] = self._update_regional_aggregates()
+        return aggregates
+
+    def _update_regional_aggregates(self) -> Dict[SpatialScale, Dict[str, np.ndarray]]:
+        """
+        Brings the regional state up to date with the step (from every plot and farmer
+        at the first step, then from the plots planted or harvested since) and returns
+        a copy of it.
+        """
+        farmers = self.farmer_agents
+        if self.regional_aggregator is None:
+            aggregation_config = self.config.get("aggregation_config", {})
+            hierarchy = self.ensure_spatial_hierarchy()
+            scales = [parse_scale(scale) for scale in aggregation_config.get("scales", ["Upazila", "District", "Division", "AgroEcologicalZone"])]
+            self.regional_aggregator = RegionalAggregator(
+                {scale: hierarchy.labels(scale) for scale in scales}, self.farmer_unit_codes(), self.plot_unit_codes(),
+                self.plot_owner_indices(), self.variety_catalog,
+                poverty_line_bdt=aggregation_config.get("poverty_line_bdt", 30000.0), scales=scales)
+            self.plot_store.track_changes()
+            self.regional_aggregator.rebuild(self.plot_store, np.array([farmer.capital_bdt for farmer in farmers]))
+        else:
+            self.regional_aggregator.update(self.plot_store, self.plot_store.take_changed_rows(),
+                                            lambda indices: [farmers[i].capital_bdt for i in indices])
+        return self.regional_aggregator.snapshot()
+
+    def _record_regional_kpis(self, aggregates: Dict[str, Any]):
+        """Derives the indicator rows of the step just completed from its regional state."""
+        if "regional" not in aggregates:
+            return
+        hierarchy = self.ensure_spatial_hierarchy()
+        quantiles = self.config.get("aggregation_config", {}).get("capital_quantiles", [0.1, 0.5, 0.9])
+        for scale, state in aggregates["regional"].items():
+            self.regional_kpis.append(kpi_frame(self.current_step, scale, state, hierarchy.labels(scale),
+                                                self.variety_catalog, quantiles))
+
+    def regional_kpi_table(self, scale: Optional[SpatialScale] = None) -> pd.DataFrame:
+        """
+        Indicators of every region and step so far (one scale's, or all), stamped with
+        the number of steps completed; see reporting_analytics.regional_aggregates.kpi_frame.
+        A run resumed from a checkpoint has the indicators of the steps since the resume.
+        """
+        frames = [frame for frame in self.regional_kpis if scale is None or frame["scale"].iat[0] == scale.value]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def _write_regional_kpis(self):
+        output_file = self.config.get("aggregation_config", {}).get("output_file", "regional_kpis.csv")
+        if not self.regional_kpis or not output_file:
+            return
+        path = os.path.join(self.output_directory, output_file)
+        os.makedirs(self.output_directory, exist_ok=True)
+        self.regional_kpi_table().to_csv(path, index=False)
+        logger.info("Regional indicators of %d steps written to %s", self.current_step, path)
+
+    def _advance_scheduled_agents(self, plot_weather: Dict[str, np.ndarray], climate_conditions: Dict[str, Any],
+                                  market_conditions: Dict[str, Any]):
+        """
+        Event-mode counterpart of the every-step agent loop: only farmers with plots due
+        for sowing decide, crops still grow in one vectorized pass, and only farmers
+        with matured crops (or all farmers on adaptation steps) are stepped. Other agents
+        are stepped every step.
+        """
+        scheduler, step, instrumentation = self.scheduler, self.current_step, self.instrumentation
+        with instrumentation.phase("scheduling"):
+            if scheduler.built_at_step is None:
+                scheduler.rebuild(step)
+            scheduler.pop_due(step)
+        with instrumentation.phase("decisions"):
+            if len(scheduler.due[EventKind.SOWING]):
+                self._make_decisions([self.farmer_agents[i] for i in scheduler.sowing_farmers()],
+                                     climate_conditions, market_conditions)
+            scheduler.after_sowing(step)
+        with instrumentation.phase("crop_growth"):
+            self.crop_model.advance(self.plot_store, plot_weather["precipitation_mm"], plot_weather["mean_temp_c"],
+                                    self.days_per_step)
+        with instrumentation.phase("harvests"):
+            woken = scheduler.woken_farmers(step)
+            for i in woken:
+                self.farmer_agents[i].step(step, climate_conditions, market_conditions, make_decisions=False)
+            scheduler.after_harvest(step)
+            for agent in scheduler.other_agents:
+                agent.step(step, climate_conditions, market_conditions)
+        instrumentation.count("farmers_stepped", len(woken))
+
+    def _make_decisions(self, farmers: List[FarmerAgent], climate_conditions: Dict[str, Any],
+                        market_conditions: Dict[str, Any]):
+        if self.decision_mode == "batch":
+            FarmerAgent.make_cultivation_decisions_batch(
+                farmers, self.current_step, climate_conditions, market_conditions, kernel=self.variety_kernel)
+        else:
+            for farmer in farmers:
+                farmer._make_cultivation_decisions(self.current_step, climate_conditions, market_conditions)
+
+    def _log_step_summary(self, elapsed_seconds: float, event_counts: Dict[EventType, int]):
+        logger.info("Step %d / %d completed in %.4f seconds: planted=%d, harvested=%d, unaffordable=%d, no_variety=%d.",
+                    self.current_step + 1, self.max_steps, elapsed_seconds,
+                    event_counts[EventType.PLANTED], event_counts[EventType.HARVESTED],
+                    event_counts[EventType.UNAFFORDABLE], event_counts[EventType.NO_SUITABLE_VARIETY])
+
+    def _draw_plot_conditions(self, step: int):
+        """Per-plot weather and hydrology arrays of a step: views into the precomputed forcing."""
+        forcing = self._ensure_forcing().step(step)
+        plot_weather = {"precipitation_mm": forcing["precipitation_mm"], "mean_temp_c": forcing["mean_temp_c"]}
+        plot_hydrology = {"salinity_change": forcing["salinity_change"]}
+        return plot_weather, plot_hydrology
+
+    def _ensure_forcing(self) -> ClimateForcing:
+        if self.forcing is None:
+            self.forcing = self._build_forcing()
+        return self.forcing
+
+    def _build_forcing(self, station_climate: Optional[Dict[str, np.ndarray]] = None,
+                       plot_station: Optional[np.ndarray] = None) -> ClimateForcing:
+        """
+        Computes the (step, plot) forcing of the run from the ClimateManager's station
+        climate, or from `station_climate`/`plot_station` when they are given (e.g. by a
+        checkpoint). Forcing larger than forcing_max_memory_mb is computed in windows.
+        """
+        climate_config = self.config.get("climate_model_config", {})
+        if station_climate is None and self.climate_manager is not None and self.climate_manager.weather_cube is not None:
+            station_climate = self.climate_manager.station_step_climate(
+                self.max_steps, self.days_per_step, climate_config.get("selected_scenario"))
+            plot_station = self._plot_stations(self.climate_manager.weather_cube.station_ids,
+                                               climate_config.get("station_by_admin_unit"))
+        num_plots = self.plot_store.size
+        window_steps = climate_config.get("forcing_window_steps") or 0
+        bytes_per_step = len(FORCING_VARIABLES) * np.dtype(np.float64).itemsize * max(num_plots, 1)
+        max_bytes = climate_config.get("forcing_max_memory_mb", 1024) * 2**20
+        if not window_steps and self.max_steps * bytes_per_step > max_bytes:
+            window_steps = max(1, int(max_bytes // bytes_per_step))
+            logger.info("Computing plot forcing in windows of %d steps to stay within %d MB.",
+                        window_steps, climate_config.get("forcing_max_memory_mb", 1024))
+        start_time = time.perf_counter()
+        forcing = ClimateForcing(self.random_seed, self.max_steps, num_plots, station_climate, plot_station,
+                                 window_steps=window_steps or None, plot_rows=self.shard_plot_rows)
+        logger.debug("Plot forcing (%d of %d steps, %.1f MiB) computed in %.4f seconds.", forcing.window_steps,
+                     self.max_steps, forcing.nbytes / 2**20, time.perf_counter() - start_time)
+        return forcing
+
+    def _plot_stations(self, station_ids: Sequence[str], station_by_admin_unit: Optional[Dict[str, str]]) -> np.ndarray:
+        """Weather station index of every plot store row, from its owner's admin unit (-1 if unknown)."""
+        plot_units = np.full(self.plot_store.size, -1, dtype=np.int64)
+        unit_codes: Dict[str, int] = {}
+        for farmer in self.farmer_agents:
+            code = unit_codes.setdefault(farmer.location_id, len(unit_codes))
+            for plot in farmer.farm_plots:
+                plot_units[plot.store_index] = code
+        unit_stations = station_for_admin_units(list(unit_codes), station_ids, station_by_admin_unit)
+        return np.where(plot_units >= 0, unit_stations[np.maximum(plot_units, 0)] if len(unit_stations) else -1, -1)
+
     def run_simulation(self):
         """Runs the full simulation until max_steps is reached or a stop condition is met."""
-        print("Starting simulation run...")
-        print(f"Configuration: Max steps = {self.max_steps}, Agents = {len(self.agents)}")
+        logger.info("Starting simulation run...")
+        logger.info("Configuration: Max steps = %d, Agents = %d", self.max_steps, len(self.agents))
         
-        self.current_step = 0
+        # Starts at step 0 for a new engine, or where a restored checkpoint left off
         while self.run_step():
             pass
         
-        print("\nSimulation run finished.")
-        self.collect_results() # Placeholder for results collection
+        self.close_results_recorder()
+        self._write_regional_kpis()
+        self.instrumentation.close()
+        self.event_log.close()
+        logger.info("Simulation run finished.")
+        self.collect_results()
+
+    def close(self):
+        """
+        Finishes a run stepped with run_step: writes the remaining results snapshots and
+        closes the metrics and event log files (run_simulation does this itself).
+        """
+        self.close_results_recorder()
+        self.instrumentation.close()
+        self.event_log.close()
 
-    def collect_results(self):
-        """Collects and summarizes results from the simulation."""
-        print("\n--- Collecting Simulation Results ---")
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _open_results_recorder(self):
+        """Opens the results recorder when agent or plot snapshots are configured; a resumed run appends to its results."""
+        if self.results_recorder is not None or not (self.save_agent_data_interval or self.save_plot_data_interval):
+            return
+        reporting_options = self.config.get("reporting_options", {})
+        self.results_recorder = ResultsRecorder(
+            self.results_directory,
+            shard_format=reporting_options.get("results_format"),
+            buffer_rows=reporting_options.get("results_buffer_rows", 1_000_000),
+            max_pending_shards=reporting_options.get("results_max_pending_shards", 4),
+            start_step=self.current_step,
+            metadata={"save_agent_data_interval": self.save_agent_data_interval,
+                      "save_plot_data_interval": self.save_plot_data_interval}
+        )
+
+    def record_results(self, final: bool = False):
+        """
+        Snapshots agents and plots after a step when their save interval divides the
+        number of completed steps, or always with `final` (the state the run ends in).
+        """
+        if self.results_recorder is None:
+            return
+        step = self.current_step
+        if self.save_agent_data_interval and (final or step % self.save_agent_data_interval == 0):
+            self.results_recorder.record_agents(self, step)
+        if self.save_plot_data_interval and (final or step % self.save_plot_data_interval == 0):
+            self.results_recorder.record_plots(self, step)
+
+    def close_results_recorder(self):
+        """Records the final state, writes the remaining snapshots and stops the recorder."""
+        if self.results_recorder is None:
+            return
+        self.record_results(final=True)
+        self.results_recorder.close()
+        self.results_recorder = None
+
+    def collect_results(self) -> Optional[ResultsReader]:
+        """
+        Logs a summary of the run's end state and returns a reader over the recorded
+        agent and plot snapshots (None when neither is saved).
+        """
+        logger.info("--- Collecting Simulation Results ---")
         total_capital = sum(fa.capital_bdt for fa in self.farmer_agents)
-        print(f"Total capital of all farmers at end: {total_capital:.2f} BDT")
-        
-        for i, farmer in enumerate(self.farmer_agents):
-            if i < 5: # Print details for first 5 farmers
-                print(f"  Farmer {farmer.agent_id}: Capital = {farmer.capital_bdt:.2f} BDT, Plots = {len(farmer.farm_plots)}")
-                for plot in farmer.farm_plots:
-                    print(f"    Plot {plot.plot_id}: Size = {plot.size_ha} ha, Soil Salinity = {plot.soil.salinity_ds_m:.2f} dS/m")
-                    if plot.cultivation_history:
-                        print(f"      Last cultivation: {plot.cultivation_history[-1]['variety_id']}, Yield: {plot.cultivation_history[-1]['yield_t_ha']:.2f} t/ha")
-        # Further results could include aggregate crop production, land use changes, economic indicators etc.
-        # These would typically be written to files (CSV, JSON) or a database.
+        logger.info("Total capital of all farmers at end: %.2f BDT", total_capital)
+        if self.farmer_agents:
+            capital = np.array([farmer.capital_bdt for farmer in self.farmer_agents])
+            logger.info("Capital per farmer: mean %.2f, median %.2f, min %.2f, max %.2f BDT",
+                        capital.mean(), np.median(capital), capital.min(), capital.max())
+        if self.plot_store.size:
+            logger.info("Plots: %d, mean soil salinity %.2f dS/m, %d with a standing crop", self.plot_store.size,
+                        self.plot_store.column("salinity_ds_m").mean(), int(self.plot_store.column("has_crop").sum()))
+        return self._results_reader()
+
+    def _results_reader(self) -> Optional[ResultsReader]:
+        if not (self.save_agent_data_interval or self.save_plot_data_interval):
+            return None
+        reader = ResultsReader(self.output_directory)
+        logger.info("Agent and plot snapshots of steps %s written to %s", reader.steps("agents") or reader.steps("plots"),
+                    self.output_directory)
+        return reader
 
 # Example usage (typically in main.py)
 if __name__ == '__main__':
-    import random # For placeholder in run_step
     sim_config = {
         "max_simulation_steps": 3, # Simulate 3 seasons/years for quick test
         "use_synthetic_data": True,
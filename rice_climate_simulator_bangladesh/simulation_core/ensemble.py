@@ -0,0 +1,181 @@
+import multiprocessing
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from climate.climate_manager import ClimateManager
+from climate.weather_cube import WeatherCube
+from climate.weather_generator import WeatherGenerator
+from data_management.columnar_dataset import decode_frame_arrays, encode_frame_arrays
+from utils.logging_setup import get_logger
+from utils.online_stats import OnlineSummary
+from utils.shared_arrays import SharedArrayBlock
+from .engine import AGENT_TABLES, SimulationEngine
+
+logger = get_logger(__name__)
+
+ENSEMBLE_METRICS = ("total_production_t", "total_capital_bdt", "mean_capital_bdt", "median_capital_bdt",
+                    "mean_salinity_ds_m")
+
+class EnsembleRunner:
+    """
+    Runs Monte Carlo replicates of one scenario (same inputs, different `random_seed`)
+    across a process pool.
+
+    The inputs are prepared once, as SimulationEngine would, and copied into a single
+    shared-memory block: the farmer and plot tables and the historical weather cube.
+    Workers attach to it once and build each replicate's engine from zero-copy views
+    (text columns such as ids are materialised per worker), so nothing large is
+    pickled per replicate. Each replicate returns only a small summary (see
+    _run_replicate); the parent folds the summaries, in seed order, into running
+    moments and P-squared quantile estimates of the ENSEMBLE_METRICS and of production
+    per step, without keeping the replicates.
+
+    With `ensemble_config.stochastic_weather`, a WeatherGenerator is fitted to the
+    historical weather once and every replicate runs on weather simulated from its own
+    seed instead of the observed record.
+    """
+    def __init__(self, config: Optional[Dict[str, Any]] = None, num_replicates: Optional[int] = None,
+                 num_workers: Optional[int] = None, seeds: Optional[Sequence[int]] = None):
+        self.config = config if config else {}
+        ensemble_config = self.config.get("ensemble_config", {})
+        if seeds is None:
+            first_seed = ensemble_config.get("first_seed", 1000)
+            seeds = range(first_seed, first_seed + (num_replicates or ensemble_config.get("num_replicates", 100)))
+        self.seeds: List[int] = list(seeds)
+        self.num_workers: int = num_workers or ensemble_config.get("num_workers") or os.cpu_count() or 1
+        self.start_method: Optional[str] = ensemble_config.get("start_method")
+        self.quantiles = tuple(ensemble_config.get("quantiles", (0.05, 0.5, 0.95)))
+        self.max_steps: int = self.config.get("max_simulation_steps", 10)
+        self.metrics: Dict[str, OnlineSummary] = {metric: OnlineSummary(self.quantiles) for metric in ENSEMBLE_METRICS}
+        self.production_by_step: List[OnlineSummary] = [OnlineSummary(self.quantiles) for _ in range(self.max_steps)]
+        self.completed: int = 0
+
+    def _share_inputs(self) -> Tuple[SharedArrayBlock, Dict[str, Any]]:
+        """Prepares the inputs and places them in shared memory; returns the block and how to rebuild them."""
+        preparer = SimulationEngine.__new__(SimulationEngine)
+        preparer._setup(self.config)
+        preparer._prepare_input_data()
+        frames = preparer._input_tables(AGENT_TABLES + ("historical_weather",))
+        if frames is None:
+            raise ValueError("Simulation data could not be loaded or generated.")
+        arrays, layout = {}, {"tables": {}, "weather": None}
+        for table in AGENT_TABLES:
+            layout["tables"][table] = list(frames[table].columns)
+            arrays.update({f"{table}/{name}": values for name, values in encode_frame_arrays(frames[table]).items()})
+        if len(frames["historical_weather"]):
+            cube = WeatherCube.from_frame(frames["historical_weather"])
+            layout["weather"] = {"station_ids": cube.station_ids, "start_date": cube.start_date,
+                                 "num_days": cube.num_days, "variables": cube.variables}
+            arrays.update({f"weather/{variable}": cube.data[variable] for variable in cube.variables})
+            if self.config.get("ensemble_config", {}).get("stochastic_weather"):
+                layout["weather_generator"] = WeatherGenerator.fit(cube)
+        preparer.close()
+        return SharedArrayBlock.create(arrays), layout
+
+    def run(self, on_replicate: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Runs every seed and returns the ensemble summary (see summary()).
+
+        `on_replicate` is called in the parent with each replicate's summary as it
+        arrives, e.g. to append it to a file.
+        """
+        start_time = time.perf_counter()
+        block, layout = self._share_inputs()
+        logger.info("Running %d replicates on %d workers (%.1f MiB of shared inputs)...",
+                    len(self.seeds), self.num_workers, block.nbytes / 2**20)
+        context = multiprocessing.get_context(self.start_method)
+        try:
+            with context.Pool(self.num_workers, initializer=_init_worker,
+                              initargs=(block.spec, layout, worker_run_config(self.config))) as pool:
+                for replicate in pool.imap(_run_replicate, self.seeds):
+                    self.add_replicate(replicate)
+                    if on_replicate is not None:
+                        on_replicate(replicate)
+                    logger.info("Replicate %d / %d (seed %d): production %.1f t, mean capital %.2f BDT.",
+                                self.completed, len(self.seeds), replicate["seed"],
+                                replicate["total_production_t"], replicate["mean_capital_bdt"])
+        finally:
+            block.unlink()
+        logger.info("Ensemble of %d replicates finished in %.2f seconds.", self.completed, time.perf_counter() - start_time)
+        return self.summary()
+
+    def add_replicate(self, replicate: Dict[str, Any]):
+        """Folds one replicate summary into the ensemble statistics."""
+        for metric, summary in self.metrics.items():
+            summary.add(replicate[metric])
+        for summary, production in zip(self.production_by_step, replicate["production_t_by_step"]):
+            summary.add(production)
+        self.completed += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Running statistics (count, mean, std, min, max, quantiles) of every metric and of production per step."""
+        return {
+            "replicates": self.completed,
+            "metrics": {metric: summary.summary() for metric, summary in self.metrics.items()},
+            "production_t_by_step": [summary.summary() for summary in self.production_by_step],
+        }
+
+def worker_run_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Config for runs inside pool workers: no event log file, checkpoints, results
+    snapshots, step metrics or regional indicators (every run would write the same paths) and no per-step summary lines unless verbose output is asked for.
+    """
+    logging_config = dict(config.get("logging_config", {}))
+    logging_config["event_log_path"] = None
+    if logging_config.get("verbosity", "summary") == "summary":
+        logging_config["verbosity"] = "quiet"
+    reporting_options = dict(config.get("reporting_options", {}), checkpoint_interval=0,
+                             save_agent_data_interval=0, save_plot_data_interval=0)
+    instrumentation_config = dict(config.get("instrumentation_config", {}), enabled=False)
+    aggregation_config = dict(config.get("aggregation_config", {}), enabled=False)
+    return {**config, "logging_config": logging_config, "reporting_options": reporting_options,
+            "instrumentation_config": instrumentation_config, "aggregation_config": aggregation_config}
+
+# Per-process state of pool workers, set once by _init_worker
+_worker_state: Dict[str, Any] = {}
+
+def _init_worker(spec, layout: Dict[str, Any], config: Dict[str, Any]):
+    block = SharedArrayBlock.attach(spec)
+    frames = {}
+    for table, columns in layout["tables"].items():
+        prefix = f"{table}/"
+        table_arrays = {name[len(prefix):]: values for name, values in block.arrays.items() if name.startswith(prefix)}
+        frames[table] = decode_frame_arrays(table_arrays, columns)
+    cube = None
+    if layout["weather"] is not None:
+        weather = layout["weather"]
+        cube = WeatherCube(weather["station_ids"], weather["start_date"], weather["num_days"], weather["variables"],
+                           data={variable: block.arrays[f"weather/{variable}"] for variable in weather["variables"]})
+    _worker_state.update(block=block, frames=frames, weather_cube=cube, config=config,
+                         weather_generator=layout.get("weather_generator"))
+
+def _run_replicate(seed: int) -> Dict[str, Any]:
+    """Runs one replicate and returns its seed and summarize_run summary."""
+    engine = SimulationEngine.from_frames(dict(_worker_state["config"], random_seed=seed), _worker_state["frames"])
+    cube, generator = _worker_state["weather_cube"], _worker_state["weather_generator"]
+    if generator is not None:
+        num_days = engine.max_steps * engine.days_per_step
+        cube = generator.weather_cube(generator.simulate(num_days, [seed]))
+    if cube is not None:
+        engine.climate_manager = ClimateManager()
+        engine.climate_manager.set_historical_weather(cube)
+    production = []
+    while engine.run_step():
+        production.append(engine.last_step_aggregates["production_t"])
+    engine.close()
+    return {"seed": seed, **summarize_run(engine, production)}
+
+def summarize_run(engine: SimulationEngine, production_by_step: Sequence[float]) -> Dict[str, Any]:
+    """Summary of a finished run: production per step and in total, farmer capital and final soil salinity."""
+    capital = np.array([farmer.capital_bdt for farmer in engine.farmer_agents], dtype=np.float64)
+    return {
+        "production_t_by_step": list(production_by_step),
+        "total_production_t": float(sum(production_by_step)),
+        "total_capital_bdt": float(capital.sum()),
+        "mean_capital_bdt": float(capital.mean()) if len(capital) else 0.0,
+        "median_capital_bdt": float(np.median(capital)) if len(capital) else 0.0,
+        "mean_salinity_ds_m": float(engine.plot_store.column("salinity_ds_m").mean()) if engine.plot_store.size else 0.0,
+    }
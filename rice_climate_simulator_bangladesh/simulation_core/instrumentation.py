@@ -0,0 +1,295 @@
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional
+
+from utils.event_log import EventType
+from utils.logging_setup import get_logger
+
+try:
+    import resource
+except ImportError: # Not available on Windows; peak RSS is then not reported
+    resource = None
+
+logger = get_logger(__name__)
+
+# Phases of a step timed by SimulationEngine.run_step, in the order they run ("shards" is the
+# workers' part of a ShardedSimulationEngine step)
+PHASES = ("climate", "market", "environment", "scheduling", "decisions", "crop_growth", "harvests", "shards",
+          "aggregation", "recording", "checkpoint")
+PROFILERS = ("cprofile", "sampling")
+METRIC_PREFIX = "rice_sim"
+
+class _NullPhase:
+    """Phase context of disabled instrumentation: does nothing."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_PHASE = _NullPhase()
+
+class _PhaseTimer:
+    """Adds the monotonic-clock time spent inside `with` blocks to one phase of the current step."""
+    __slots__ = ("_seconds", "_name", "_start")
+
+    def __init__(self, seconds: Dict[str, float], name: str):
+        self._seconds, self._name, self._start = seconds, name, 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._seconds[self._name] = self._seconds.get(self._name, 0.0) + time.perf_counter() - self._start
+        return False
+
+class SamplingProfiler:
+    """
+    Statistical profiler of one thread: a background thread samples the thread's
+    Python stack every `interval_s` seconds, and `write_folded` writes the sample
+    counts per stack in the folded format read by flame graph tools.
+    """
+    def __init__(self, interval_s: float = 0.005, thread_id: Optional[int] = None):
+        self.interval_s = interval_s
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="rice-sim-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def write_folded(self, path: str):
+        with open(path, "w") as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+class StepInstrumentation:
+    """
+    Per-step metrics of a SimulationEngine: phase timers, counters, allocation samples
+    and profiles of chosen steps.
+
+    The engine wraps each phase of a step (PHASES) in `with instrumentation.phase(name):`,
+    which adds its time.perf_counter() duration to the step's phase times, and reports
+    counts with `count(name, value)`; the step's event counts (planted, harvested,
+    unaffordable, ...) and production are added at `end_step`. Every
+    `allocation_interval` steps the step runs under tracemalloc and the bytes it left
+    allocated and its peak are recorded. Steps in `profile_steps` run under cProfile
+    (a `.prof` file for pstats/snakeviz) or the SamplingProfiler (a `.folded` file)
+    and the profile is written to `profile_directory`.
+
+    Each completed step is appended as one JSON line to `metrics_path`, and
+    `prometheus_path` is rewritten with the latest step's gauges and run totals in the
+    Prometheus text format (e.g. for node_exporter's textfile collector). A run resumed
+    at step k keeps the metrics lines of steps up to k. When disabled, `phase` returns
+    a shared no-op context and the other methods return at once, so the engine's hooks
+    cost next to nothing.
+    """
+    def __init__(self, enabled: bool = False, metrics_path: Optional[str] = None,
+                 prometheus_path: Optional[str] = None, allocation_interval: int = 0,
+                 profile_steps: Iterable[int] = (), profiler: str = "cprofile",
+                 profile_directory: str = ".", sample_interval_s: float = 0.005):
+        if profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler '{profiler}'. Expected one of {list(PROFILERS)}.")
+        self.enabled = enabled
+        self.metrics_path = metrics_path
+        self.prometheus_path = prometheus_path
+        self.allocation_interval = allocation_interval or 0
+        self.profile_steps = frozenset(profile_steps or ())
+        self.profiler = profiler
+        self.profile_directory = profile_directory
+        self.sample_interval_s = sample_interval_s
+
+        self.step: Optional[int] = None # Index of the step being measured (None between steps)
+        self.phase_seconds: Dict[str, float] = {}
+        self.counters: Dict[str, float] = {}
+        self.last_metrics: Optional[Dict[str, Any]] = None
+        self.totals: Dict[str, Dict[str, float]] = {"phase_seconds": {}, "counters": {}}
+        self._timers = {name: _PhaseTimer(self.phase_seconds, name) for name in PHASES}
+        self._step_start = 0.0
+        self._allocation_start: Optional[int] = None
+        self._started_tracemalloc = False
+        self._profile = None
+        self._metrics_file = None
+
+    @classmethod
+    def from_config(cls, instrumentation_config: Optional[Dict[str, Any]], output_directory: str) -> "StepInstrumentation":
+        """Instrumentation from the `instrumentation_config` section; files are placed in `output_directory`."""
+        config = instrumentation_config or {}
+        if not config.get("enabled", False):
+            return cls()
+        metrics_file, prometheus_file = config.get("metrics_file"), config.get("prometheus_file")
+        return cls(enabled=True,
+                   metrics_path=os.path.join(output_directory, metrics_file) if metrics_file else None,
+                   prometheus_path=os.path.join(output_directory, prometheus_file) if prometheus_file else None,
+                   allocation_interval=config.get("allocation_sample_interval", 0),
+                   profile_steps=config.get("profile_steps") or (),
+                   profiler=config.get("profiler", "cprofile"),
+                   profile_directory=output_directory,
+                   sample_interval_s=config.get("profile_sample_interval_s", 0.005))
+
+    def phase(self, name: str):
+        """Context manager adding the time spent inside it to phase `name` of the current step."""
+        if self.step is None:
+            return _NULL_PHASE
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = _PhaseTimer(self.phase_seconds, name)
+        return timer
+
+    def count(self, name: str, value: float = 1):
+        if self.step is not None:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def begin_step(self, step: int):
+        """Starts measuring step `step` (0-based index of the step about to run)."""
+        if not self.enabled:
+            return
+        self.step = step
+        self.phase_seconds.clear()
+        self.counters.clear()
+        if self.allocation_interval and step % self.allocation_interval == 0:
+            self._started_tracemalloc = not tracemalloc.is_tracing()
+            if self._started_tracemalloc:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._allocation_start = tracemalloc.get_traced_memory()[0]
+        if step in self.profile_steps:
+            if self.profiler == "cprofile":
+                self._profile = cProfile.Profile()
+                self._profile.enable()
+            else:
+                self._profile = SamplingProfiler(self.sample_interval_s)
+                self._profile.start()
+        self._step_start = time.perf_counter()
+
+    def end_step(self, aggregates: Optional[Dict[str, Any]] = None):
+        """Finishes the current step: adds the step aggregates' counts, then exports its metrics."""
+        if self.step is None:
+            return
+        wall_seconds = time.perf_counter() - self._step_start
+        step, self.step = self.step, None
+        if self._profile is not None:
+            self._write_profile(step)
+        for event_type, value in ((aggregates or {}).get("event_counts") or {}).items():
+            name = event_type.value if isinstance(event_type, EventType) else str(event_type)
+            self.counters[name] = self.counters.get(name, 0) + value
+
+        metrics: Dict[str, Any] = {"step": step + 1, "wall_s": wall_seconds, "phases_s": dict(self.phase_seconds),
+                                   "counters": dict(self.counters)}
+        if aggregates is not None and "production_t" in aggregates:
+            metrics["production_t"] = aggregates["production_t"]
+        if self._allocation_start is not None:
+            current, peak = tracemalloc.get_traced_memory()
+            metrics["alloc_net_bytes"] = current - self._allocation_start
+            metrics["alloc_peak_bytes"] = peak - self._allocation_start
+            self._allocation_start = None
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+        if resource is not None:
+            # ru_maxrss is in KiB on Linux and bytes on macOS
+            metrics["max_rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+        for group, values in (("phase_seconds", self.phase_seconds), ("counters", self.counters)):
+            totals = self.totals[group]
+            for name, value in values.items():
+                totals[name] = totals.get(name, 0) + value
+        self.last_metrics = metrics
+        if self.metrics_path:
+            self._append_metrics(metrics)
+        if self.prometheus_path:
+            self._write_prometheus(metrics)
+
+    def _write_profile(self, step: int):
+        os.makedirs(self.profile_directory, exist_ok=True)
+        if isinstance(self._profile, SamplingProfiler):
+            self._profile.stop()
+            path = os.path.join(self.profile_directory, f"profile-step-{step + 1:05d}.folded")
+            self._profile.write_folded(path)
+        else:
+            self._profile.disable()
+            path = os.path.join(self.profile_directory, f"profile-step-{step + 1:05d}.prof")
+            self._profile.dump_stats(path)
+        self._profile = None
+        logger.info("Profile of step %d written to %s", step + 1, path)
+
+    def _append_metrics(self, metrics: Dict[str, Any]):
+        if self._metrics_file is None:
+            os.makedirs(os.path.dirname(self.metrics_path) or ".", exist_ok=True)
+            kept = []
+            if os.path.exists(self.metrics_path): # Resumed run: keep the lines of the steps before it
+                with open(self.metrics_path) as f:
+                    kept = [line for line in f if line.strip() and json.loads(line)["step"] < metrics["step"]]
+            self._metrics_file = open(self.metrics_path, "w")
+            self._metrics_file.writelines(kept)
+        self._metrics_file.write(json.dumps(metrics) + "\n")
+        self._metrics_file.flush()
+
+    def _write_prometheus(self, metrics: Dict[str, Any]):
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str, samples):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{METRIC_PREFIX}_{name}{labels} {float(value):.9g}")
+
+        metric("steps_completed", "gauge", "Steps the run has completed.", [("", metrics["step"])])
+        metric("step_seconds", "gauge", "Wall time of the latest step.", [("", metrics["wall_s"])])
+        metric("phase_seconds", "gauge", "Wall time of each phase in the latest step.",
+               [(f'{{phase="{name}"}}', value) for name, value in metrics["phases_s"].items()])
+        metric("phase_seconds_total", "counter", "Wall time of each phase over the run.",
+               [(f'{{phase="{name}"}}', value) for name, value in self.totals["phase_seconds"].items()])
+        metric("step_count", "gauge", "Counts of the latest step.",
+               [(f'{{name="{name}"}}', value) for name, value in metrics["counters"].items()])
+        metric("count_total", "counter", "Counts over the run.",
+               [(f'{{name="{name}"}}', value) for name, value in self.totals["counters"].items()])
+        for key, name, help_text in (("production_t", "production_tonnes", "Rice harvested in the latest step."),
+                                     ("alloc_net_bytes", "step_allocated_bytes", "Bytes left allocated by the latest sampled step."),
+                                     ("alloc_peak_bytes", "step_peak_allocated_bytes", "Peak bytes allocated during the latest sampled step."),
+                                     ("max_rss_bytes", "max_rss_bytes", "Peak resident memory of the process.")):
+            if key in metrics:
+                metric(name, "gauge", help_text, [("", metrics[key])])
+
+        os.makedirs(os.path.dirname(self.prometheus_path) or ".", exist_ok=True)
+        temporary_path = f"{self.prometheus_path}.tmp"
+        with open(temporary_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(temporary_path, self.prometheus_path) # Scrapers never see a partial file
+
+    def close(self):
+        if self._metrics_file is not None:
+            self._metrics_file.close()
+            self._metrics_file = None
+
+    def __repr__(self):
+        return (f"StepInstrumentation(enabled={self.enabled}, metrics_path={self.metrics_path!r}, "
+                f"prometheus_path={self.prometheus_path!r}, allocation_interval={self.allocation_interval})")
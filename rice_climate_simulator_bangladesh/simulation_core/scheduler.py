@@ -0,0 +1,152 @@
+import heapq
+import itertools
+from enum import IntEnum
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from agents.base_agent import BaseAgent
+from agents.farmer_agent import FarmerAgent, season_for_step
+from agriculture.crop_model import MATURITY_CODE
+
+if TYPE_CHECKING:
+    from .engine import SimulationEngine
+
+ADAPTATION_INTERVAL = 10 # Steps between FarmerAgent._adapt_strategies calls (see FarmerAgent.step)
+
+class EventKind(IntEnum):
+    """Scheduled event kinds, in the order they are handled within a step."""
+    SOWING = 0 # Empty plots whose owner decides what to plant in the step's season
+    MATURITY = 1 # Crops that may have matured by the end of the step; mature ones are harvested
+    ADAPTATION = 2 # Every farmer runs its periodic strategy adaptation
+
+class EventScheduler:
+    """
+    Discrete-event schedule of plot and farmer activity for SimulationEngine's "event"
+    scheduling mode, so that a step only touches the plots and farmers with something due.
+
+    A heap holds (step, kind, sequence, plot rows) events; events of many plots due
+    together are one heap entry with an array of PlotStateStore rows. Empty plots get
+    a SOWING event at the next step whose RiceSeason has varieties in the catalog (a
+    sowing window); plots still empty after their owner's decision are rescheduled to
+    the following window. A planted crop gets a MATURITY event at the earliest step it
+    can mature, from its variety's maturity_days at the optimum temperature; at that
+    step it is harvested if the crop model has matured it, and checked again the next
+    step if not. ADAPTATION events every ADAPTATION_INTERVAL steps wake every farmer.
+
+    The plots, crops and farmers end each step as in the every-step mode; events for
+    attempts that cannot succeed (e.g. sowing in a season without varieties) are not
+    recorded. The schedule is rebuilt from plot state when the engine starts stepping,
+    so runs resumed from a checkpoint reschedule themselves.
+    """
+    def __init__(self, engine: "SimulationEngine"):
+        self.engine = engine
+        self._heap: List[Tuple[int, int, int, np.ndarray]] = []
+        self._sequence = itertools.count()
+        self.plot_owner = np.empty(0, dtype=np.int64) # Farmer index of every plot store row (-1: no farmer)
+        self.other_agents: List[BaseAgent] = [] # Agents other than farmers, stepped every step
+        self.due: Dict[EventKind, np.ndarray] = {}
+        self.woken_farmer_indices = np.empty(0, dtype=np.int64) # Farmers stepped in the latest step
+        self.built_at_step: Optional[int] = None
+
+    def __len__(self):
+        return len(self._heap)
+
+    def reset(self):
+        """Drops the schedule; it is rebuilt from plot state at the next step (e.g. after a checkpoint restore)."""
+        self._heap = []
+        self.due = {}
+        self.built_at_step = None
+
+    def rebuild(self, step: int):
+        """Schedules every plot from its current state, starting at `step`."""
+        engine, store = self.engine, self.engine.plot_store
+        self._heap = []
+        self.plot_owner = np.full(store.size, -1, dtype=np.int64)
+        for farmer_index, farmer in enumerate(engine.farmer_agents):
+            for plot in farmer.farm_plots:
+                self.plot_owner[plot.store_index] = farmer_index
+        self.other_agents = [agent for agent in engine.agents if not isinstance(agent, FarmerAgent)]
+        has_crop = store.column("has_crop")
+        self._schedule_sowing(np.flatnonzero(~has_crop), step)
+        self.push(step, EventKind.MATURITY, np.flatnonzero(has_crop))
+        self.push(-(-step // ADAPTATION_INTERVAL) * ADAPTATION_INTERVAL, EventKind.ADAPTATION, np.empty(0, dtype=np.int64))
+        self.built_at_step = step
+
+    def push(self, step: int, kind: EventKind, rows: np.ndarray):
+        if kind == EventKind.ADAPTATION or len(rows):
+            heapq.heappush(self._heap, (step, int(kind), next(self._sequence), rows))
+
+    def pop_due(self, step: int):
+        """Collects every event due at or before `step` into `due` (plot rows per kind)."""
+        collected: Dict[EventKind, List[np.ndarray]] = {kind: [] for kind in EventKind}
+        while self._heap and self._heap[0][0] <= step:
+            _, kind, _, rows = heapq.heappop(self._heap)
+            collected[EventKind(kind)].append(rows)
+        self.due = {kind: (np.unique(np.concatenate(rows)) if rows else np.empty(0, dtype=np.int64))
+                    for kind, rows in collected.items()}
+        if collected[EventKind.ADAPTATION]:
+            self.due[EventKind.ADAPTATION] = np.ones(1, dtype=np.int64) # Marker: adaptation is due
+
+    def sowing_farmers(self) -> np.ndarray:
+        """Indices (in engine order) of farmers with plots due for sowing this step."""
+        return self._owners(self.due[EventKind.SOWING])
+
+    def after_sowing(self, step: int):
+        """Schedules the maturity of crops planted this step and the next window of plots left empty."""
+        store = self.engine.plot_store
+        rows = self.due[EventKind.SOWING]
+        planted = rows[store.has_crop[rows]]
+        self._schedule_sowing(rows[~store.has_crop[rows]], step + 1)
+        if len(planted):
+            days = self.engine.crop_model.minimum_days_to_maturity(store.crop_variety_code[planted])
+            # Growth starts with the planting step's own days
+            steps = step + np.maximum(-(-days // max(self.engine.days_per_step, 1)) - 1, 0)
+            for maturity_step in np.unique(steps):
+                self.push(int(maturity_step), EventKind.MATURITY, planted[steps == maturity_step])
+
+    def woken_farmers(self, step: int) -> np.ndarray:
+        """
+        Indices of farmers to step after crop growth: owners of crops that matured
+        (to harvest them), or every farmer when adaptation is due.
+        """
+        store = self.engine.plot_store
+        rows = self.due[EventKind.MATURITY]
+        rows = rows[store.has_crop[rows]]
+        mature = store.growth_stage[rows] == MATURITY_CODE
+        self.due[EventKind.MATURITY] = rows[mature]
+        self.push(step + 1, EventKind.MATURITY, rows[~mature])
+        if len(self.due[EventKind.ADAPTATION]):
+            self.push(step + ADAPTATION_INTERVAL, EventKind.ADAPTATION, np.empty(0, dtype=np.int64))
+            self.woken_farmer_indices = np.arange(len(self.engine.farmer_agents))
+        else:
+            self.woken_farmer_indices = self._owners(rows[mature])
+        return self.woken_farmer_indices
+
+    def _owners(self, rows: np.ndarray) -> np.ndarray:
+        owners = np.unique(self.plot_owner[rows])
+        return owners[owners >= 0]
+
+    def after_harvest(self, step: int):
+        """Schedules harvested plots for the next sowing window."""
+        store = self.engine.plot_store
+        rows = self.due[EventKind.MATURITY]
+        self._schedule_sowing(rows[~store.has_crop[rows]], step + 1)
+        # Mature crops left standing (e.g. their owner was not stepped) are checked again
+        self.push(step + 1, EventKind.MATURITY, rows[store.has_crop[rows]])
+
+    def _schedule_sowing(self, rows: np.ndarray, from_step: int):
+        window = self.next_sowing_window(from_step)
+        if window is not None:
+            self.push(window, EventKind.SOWING, rows)
+
+    def next_sowing_window(self, from_step: int) -> Optional[int]:
+        """First step at or after `from_step` whose season has a variety to sow (None if no season has one)."""
+        catalog = self.engine.variety_catalog
+        for step in range(from_step, from_step + 3): # Seasons cycle every three steps
+            if catalog.best_in_season(season_for_step(step)) >= 0:
+                return step
+        return None
+
+    def __repr__(self):
+        return f"EventScheduler(events={len(self._heap)}, built_at_step={self.built_at_step})"
@@ -0,0 +1,325 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+try: # Optional: scrambled Sobol' sequences for Saltelli designs; uniform random samples otherwise
+    from scipy.stats import qmc
+except ImportError:
+    qmc = None
+
+from utils.logging_setup import get_logger
+from utils.online_stats import RunningMoments
+from .config import set_config_value
+from .engine import SimulationEngine
+from .ensemble import ENSEMBLE_METRICS, summarize_run, worker_run_config
+
+logger = get_logger(__name__)
+
+STUDY_FORMAT_VERSION = 1
+STUDY_FILE = "study.json" # Method, parameters and settings the design was built from
+DESIGN_FILE = "design.npy" # Unit-hypercube design, one row per simulation run
+POINTS_FILE = "points.jsonl" # Outputs of completed runs, appended as they finish
+INDICES_FILE = "indices.json" # Latest indices, rewritten whenever a design group completes
+SENSITIVITY_METHODS = ("morris", "sobol")
+
+class Parameter(NamedTuple):
+    """One uncertain input: a dotted config key and its range."""
+    name: str # e.g. "economic_model_config.default_interest_rate"
+    low: float
+    high: float
+    integer: bool = False # Round scaled values to whole numbers (e.g. counts)
+
+    def scale(self, unit_values: np.ndarray) -> np.ndarray:
+        """Maps values in [0, 1] onto the parameter's range."""
+        values = self.low + np.asarray(unit_values, dtype=np.float64) * (self.high - self.low)
+        return np.rint(values) if self.integer else values
+
+def parameters_from_ranges(ranges: Mapping[str, Sequence]) -> List[Parameter]:
+    """
+    Builds Parameters from {config key: (low, high)} or {config key: (low, high, "int")};
+    a range given with two ints is an integer parameter.
+    """
+    parameters = []
+    for name, bounds in ranges.items():
+        low, high = bounds[0], bounds[1]
+        integer = (len(bounds) > 2 and bounds[2] == "int") or (isinstance(low, int) and isinstance(high, int))
+        if not high > low:
+            raise ValueError(f"Parameter '{name}' needs low < high, got ({low}, {high}).")
+        parameters.append(Parameter(name, float(low), float(high), integer))
+    return parameters
+
+def morris_design(num_parameters: int, num_trajectories: int, num_levels: int = 4,
+                  rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """
+    Morris elementary-effects design: `num_trajectories` random one-at-a-time trajectories
+    of num_parameters + 1 points on a `num_levels` grid in the unit hypercube. Consecutive
+    points of a trajectory differ in exactly one parameter, by +/- delta = p / (2 (p - 1)).
+
+    Returns an array of shape (num_trajectories * (num_parameters + 1), num_parameters).
+    """
+    if num_levels < 2 or num_levels % 2:
+        raise ValueError(f"num_levels must be an even number >= 2, got {num_levels}.")
+    rng = rng if rng is not None else np.random.default_rng()
+    k = num_parameters
+    delta = num_levels / (2 * (num_levels - 1))
+    steps = np.tril(np.ones((k + 1, k)), -1) # Row i has the first i parameters moved
+    ones = np.ones((k + 1, k))
+    trajectories = []
+    for _ in range(num_trajectories):
+        base = rng.integers(0, num_levels // 2, size=k) / (num_levels - 1) # So that base + delta <= 1
+        directions = np.diag(rng.choice([-1.0, 1.0], size=k))
+        permutation = np.eye(k)[rng.permutation(k)]
+        trajectory = (ones * base + delta / 2 * ((2 * steps - ones) @ directions + ones)) @ permutation
+        trajectories.append(trajectory)
+    return np.vstack(trajectories) if trajectories else np.empty((0, k))
+
+def saltelli_design(num_parameters: int, num_samples: int, seed: Optional[int] = None) -> np.ndarray:
+    """
+    Saltelli design for first-order and total Sobol' indices: base matrices A and B of
+    `num_samples` rows and, for every parameter i, A with column i taken from B. Rows are
+    grouped per base sample as [A_j, B_j, AB_j^1, ..., AB_j^k], so each group of k + 2
+    runs can be analysed as soon as it completes.
+
+    A and B come from a scrambled Sobol' sequence when scipy is installed (num_samples
+    is best a power of two), else from uniform random numbers.
+    """
+    k = num_parameters
+    if qmc is not None:
+        base = qmc.Sobol(d=2 * k, scramble=True, seed=seed).random(num_samples)
+    else:
+        base = np.random.default_rng(seed).random((num_samples, 2 * k))
+    a, b = base[:, :k], base[:, k:]
+    design = np.empty((num_samples, k + 2, k))
+    design[:, 0] = a
+    design[:, 1] = b
+    for i in range(k):
+        design[:, i + 2] = a
+        design[:, i + 2, i] = b[:, i]
+    return design.reshape(num_samples * (k + 2), k)
+
+class MorrisIndices:
+    """Running Morris statistics per parameter: mean (mu), mean absolute (mu*) and std (sigma) of elementary effects."""
+    def __init__(self, num_parameters: int):
+        self.effects = [RunningMoments() for _ in range(num_parameters)]
+        self.absolute_effects = [RunningMoments() for _ in range(num_parameters)]
+
+    def add_group(self, unit_points: np.ndarray, outputs: np.ndarray):
+        """Adds the elementary effects of one complete trajectory (k + 1 points and their outputs)."""
+        for row in range(len(unit_points) - 1):
+            change = unit_points[row + 1] - unit_points[row]
+            parameter = int(np.argmax(np.abs(change)))
+            effect = (outputs[row + 1] - outputs[row]) / change[parameter]
+            self.effects[parameter].add(effect)
+            self.absolute_effects[parameter].add(abs(effect))
+
+    def results(self, names: Sequence[str]) -> Dict[str, Dict[str, float]]:
+        return {name: {"mu": effects.mean, "mu_star": absolute.mean, "sigma": effects.std, "num_effects": effects.count}
+                for name, effects, absolute in zip(names, self.effects, self.absolute_effects)}
+
+class SobolIndices:
+    """
+    Running first-order (Saltelli 2010) and total (Jansen 1999) Sobol' index estimates,
+    updated one base sample (group of k + 2 runs) at a time.
+    """
+    def __init__(self, num_parameters: int):
+        self.output = RunningMoments() # f(A) and f(B), for the output variance
+        self.first_order = [RunningMoments() for _ in range(num_parameters)] # f(B) (f(AB_i) - f(A))
+        self.total = [RunningMoments() for _ in range(num_parameters)] # (f(A) - f(AB_i))^2 / 2
+
+    def add_group(self, unit_points: np.ndarray, outputs: np.ndarray):
+        f_a, f_b, f_ab = outputs[0], outputs[1], outputs[2:]
+        self.output.add(f_a)
+        self.output.add(f_b)
+        for i, value in enumerate(f_ab):
+            self.first_order[i].add(f_b * (value - f_a))
+            self.total[i].add((f_a - value) ** 2 / 2)
+
+    def results(self, names: Sequence[str]) -> Dict[str, Dict[str, float]]:
+        variance = self.output.variance
+        usable = self.output.count > 2 and variance > 0
+        return {name: {"S1": first.mean / variance if usable else float("nan"),
+                       "ST": total.mean / variance if usable else float("nan"),
+                       "num_samples": first.count}
+                for name, first, total in zip(names, self.first_order, self.total)}
+
+class SensitivityStudy:
+    """
+    Global sensitivity analysis of simulation outputs to config parameters.
+
+    Builds a Morris or Saltelli (Sobol') design over `parameters`, runs one simulation
+    per design point on a process pool, and updates the indices of every output in
+    `outputs` (keys of ensemble.summarize_run) whenever a design group (a Morris
+    trajectory or a Saltelli base sample) has all its runs. All runs share the config's
+    `random_seed`, so differences between points come from the parameters alone.
+
+    With a `study_dir`, the design is saved there and every finished run is appended to
+    points.jsonl; running the same study again skips the completed points, so an
+    interrupted study resumes where it stopped. The latest indices are kept in
+    indices.json.
+    """
+    def __init__(self, parameters: Union[Sequence[Parameter], Mapping[str, Sequence]],
+                 config: Optional[Dict[str, Any]] = None, method: Optional[str] = None,
+                 num_samples: Optional[int] = None, study_dir: Optional[str] = None,
+                 num_workers: Optional[int] = None, outputs: Sequence[str] = ENSEMBLE_METRICS):
+        self.config = config if config else {}
+        sensitivity_config = self.config.get("sensitivity_config", {})
+        self.parameters: List[Parameter] = (parameters_from_ranges(parameters) if isinstance(parameters, Mapping)
+                                            else list(parameters))
+        self.method: str = method or sensitivity_config.get("method", "sobol")
+        if self.method not in SENSITIVITY_METHODS:
+            raise ValueError(f"Unknown sensitivity method '{self.method}'. Expected one of {SENSITIVITY_METHODS}.")
+        self.num_samples: int = num_samples or sensitivity_config.get("num_samples", 64)
+        self.num_levels: int = sensitivity_config.get("num_levels", 4)
+        self.seed: int = sensitivity_config.get("seed", 0)
+        self.study_dir: Optional[str] = study_dir if study_dir is not None else sensitivity_config.get("study_dir")
+        self.num_workers: int = num_workers or sensitivity_config.get("num_workers") or os.cpu_count() or 1
+        self.start_method: Optional[str] = sensitivity_config.get("start_method")
+        self.outputs = tuple(outputs)
+
+        k = len(self.parameters)
+        self.group_size = k + 1 if self.method == "morris" else k + 2
+        self.design: np.ndarray = self._load_or_build_design()
+        self.results: Dict[int, Dict[str, float]] = {} # Design row -> outputs
+        analyzer = MorrisIndices if self.method == "morris" else SobolIndices
+        self._analyzers = {output: analyzer(k) for output in self.outputs}
+        self._analyzed_groups: set = set()
+
+    @property
+    def num_runs(self) -> int:
+        return len(self.design)
+
+    def _study_spec(self) -> Dict[str, Any]:
+        config_hash = hashlib.sha256(json.dumps(self.config, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        return {"format_version": STUDY_FORMAT_VERSION, "method": self.method,
+                "parameters": [parameter._asdict() for parameter in self.parameters],
+                "num_samples": self.num_samples, "num_levels": self.num_levels, "seed": self.seed,
+                "outputs": list(self.outputs), "config_sha256": config_hash}
+
+    def _build_design(self) -> np.ndarray:
+        k = len(self.parameters)
+        if self.method == "morris":
+            return morris_design(k, self.num_samples, self.num_levels, np.random.default_rng(self.seed))
+        return saltelli_design(k, self.num_samples, self.seed)
+
+    def _load_or_build_design(self) -> np.ndarray:
+        if self.study_dir is None:
+            return self._build_design()
+        spec = self._study_spec()
+        study_path = os.path.join(self.study_dir, STUDY_FILE)
+        if os.path.isfile(study_path):
+            with open(study_path, "r") as f:
+                saved_spec = json.load(f)
+            if saved_spec != spec:
+                raise ValueError(f"{self.study_dir} holds a study with a different design or config; "
+                                 "use another study_dir to start a new study.")
+            return np.load(os.path.join(self.study_dir, DESIGN_FILE), allow_pickle=False)
+        os.makedirs(self.study_dir, exist_ok=True)
+        design = self._build_design()
+        np.save(os.path.join(self.study_dir, DESIGN_FILE), design)
+        with open(study_path, "w") as f:
+            json.dump(spec, f, indent=2)
+        return design
+
+    def point_values(self, row: int) -> Dict[str, float]:
+        """Config values of one design point, by config key."""
+        return {parameter.name: parameter.scale(self.design[row, i]).item() for i, parameter in enumerate(self.parameters)}
+
+    def point_config(self, row: int) -> Dict[str, Any]:
+        config = self.config
+        for name, value in self.point_values(row).items():
+            config = set_config_value(config, name, int(value) if self._parameter(name).integer else value)
+        return config
+
+    def _parameter(self, name: str) -> Parameter:
+        return next(parameter for parameter in self.parameters if parameter.name == name)
+
+    def _load_completed_points(self):
+        points_path = os.path.join(self.study_dir, POINTS_FILE)
+        if not os.path.isfile(points_path):
+            return
+        with open(points_path, "r") as f:
+            for line in f:
+                try:
+                    point = json.loads(line)
+                except json.JSONDecodeError:
+                    continue # A line cut short when a previous run was interrupted
+                self._record(point["row"], point["outputs"])
+
+    def _open_points_file(self):
+        """Opens points.jsonl for appending, first dropping a last line cut short by an interrupted run."""
+        points_path = os.path.join(self.study_dir, POINTS_FILE)
+        if os.path.isfile(points_path):
+            with open(points_path, "rb+") as f:
+                content = f.read()
+                if content and not content.endswith(b"\n"):
+                    f.truncate(content.rfind(b"\n") + 1)
+        return open(points_path, "a")
+
+    def _record(self, row: int, outputs: Dict[str, float]):
+        self.results[row] = outputs
+        group = row // self.group_size
+        rows = range(group * self.group_size, (group + 1) * self.group_size)
+        if group in self._analyzed_groups or any(r not in self.results for r in rows):
+            return
+        for output, analyzer in self._analyzers.items():
+            analyzer.add_group(self.design[rows.start:rows.stop], np.array([self.results[r][output] for r in rows]))
+        self._analyzed_groups.add(group)
+
+    def run(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Runs every design point that has no result yet and returns the indices (see indices())."""
+        start_time = time.perf_counter()
+        if self.study_dir is not None:
+            self._load_completed_points()
+        pending = [row for row in range(self.num_runs) if row not in self.results]
+        logger.info("Sensitivity study (%s, %d parameters): %d of %d runs done, %d to run on %d workers.",
+                    self.method, len(self.parameters), len(self.results), self.num_runs, len(pending), self.num_workers)
+        points_file = self._open_points_file() if self.study_dir is not None else None
+        context = multiprocessing.get_context(self.start_method)
+        try:
+            with context.Pool(self.num_workers) as pool:
+                tasks = ((row, worker_run_config(self.point_config(row)), self.outputs) for row in pending)
+                for row, outputs in pool.imap_unordered(_run_point, tasks):
+                    if points_file is not None:
+                        points_file.write(json.dumps({"row": row, "values": self.point_values(row), "outputs": outputs}) + "\n")
+                        points_file.flush()
+                    groups_before = len(self._analyzed_groups)
+                    self._record(row, outputs)
+                    if len(self._analyzed_groups) > groups_before:
+                        self._save_indices()
+                        logger.info("Run %d / %d; %d of %d design groups complete.", len(self.results), self.num_runs,
+                                    len(self._analyzed_groups), self.num_runs // self.group_size)
+        finally:
+            if points_file is not None:
+                points_file.close()
+        logger.info("Sensitivity study finished in %.2f seconds.", time.perf_counter() - start_time)
+        return self.indices()
+
+    def indices(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """{output: {parameter: indices}} from the design groups completed so far."""
+        names = [parameter.name for parameter in self.parameters]
+        return {output: analyzer.results(names) for output, analyzer in self._analyzers.items()}
+
+    def _save_indices(self):
+        if self.study_dir is None:
+            return
+        path = os.path.join(self.study_dir, INDICES_FILE)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump({"method": self.method, "groups_complete": len(self._analyzed_groups), "indices": self.indices()},
+                      f, indent=2)
+        os.replace(f"{path}.tmp", path)
+
+def _run_point(task: Tuple[int, Dict[str, Any], Sequence[str]]) -> Tuple[int, Dict[str, float]]:
+    """Runs the simulation of one design point and returns the requested outputs."""
+    row, config, outputs = task
+    engine = SimulationEngine(config)
+    production = []
+    while engine.run_step():
+        production.append(engine.last_step_aggregates["production_t"])
+    engine.close()
+    summary = summarize_run(engine, production)
+    return row, {output: summary[output] for output in outputs}
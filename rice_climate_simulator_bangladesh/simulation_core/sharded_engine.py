@@ -0,0 +1,293 @@
+import multiprocessing
+import os
+import time
+import traceback
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from reporting_analytics.results_recorder import PART_PREFIX, clear_results
+from reporting_analytics.regional_aggregates import combine_snapshots
+from utils.event_log import EventType
+from utils.logging_setup import get_logger
+from .engine import AGENT_TABLES, SimulationEngine
+
+logger = get_logger(__name__)
+
+def partition_by_admin_unit(farmers: pd.DataFrame, farm_plots: pd.DataFrame, num_shards: int,
+                            key: str = "location_admin_unit_id") -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Splits farmers and their plots into at most `num_shards` shards of whole admin units.
+
+    Units are weighted by their number of farmers plus plots and placed largest first on
+    the least loaded shard. Plots follow their owner; plots whose owner is not a farmer
+    go with the first farmer, who receives them in a serial run as well. Returns one
+    (farmer rows, plot rows) pair per non-empty shard, each in input order.
+    """
+    if len(farmers) == 0:
+        return []
+    unit_codes, units = pd.factorize(farmers[key], use_na_sentinel=False)
+    owner_rows = pd.Index(farmers["agent_id"]).get_indexer(farm_plots["owner_agent_id"])
+    owner_rows[owner_rows < 0] = 0
+    plot_units = unit_codes[owner_rows]
+    unit_load = (np.bincount(unit_codes, minlength=len(units)) + np.bincount(plot_units, minlength=len(units)))
+
+    shard_of_unit = np.empty(len(units), dtype=np.int64)
+    shard_load = np.zeros(num_shards, dtype=np.int64)
+    for unit in np.argsort(-unit_load, kind="stable"):
+        shard = int(np.argmin(shard_load))
+        shard_of_unit[unit] = shard
+        shard_load[shard] += unit_load[unit]
+
+    farmer_shards, plot_shards = shard_of_unit[unit_codes], shard_of_unit[plot_units]
+    return [(np.flatnonzero(farmer_shards == shard), np.flatnonzero(plot_shards == shard))
+            for shard in range(num_shards) if shard_load[shard] > 0]
+
+class ShardedSimulationEngine(SimulationEngine):
+    """
+    Runs the farmer population as shards of whole admin units (upazilas), one worker
+    process per shard.
+
+    The coordinator prepares the inputs exactly as SimulationEngine does, partitions
+    them with partition_by_admin_unit and starts the workers, each of which builds and
+    steps an ordinary SimulationEngine over its shard. Per step the coordinator sends
+    every worker the regional climate and market conditions, and waits for all of them
+    to return their additive step aggregates (event counts, cropped area per variety)
+    before the next step: a barrier per step, with only aggregates crossing process
+    boundaries. Per-plot forcing is drawn by run-wide plot row, so every farmer and plot
+    ends in the same state as in a serial run with the same seed.
+
+    Agents live in the workers; use gather_farmer_column / gather_plot_column to read
+    results. Call close() (or use the engine as a context manager) to stop the workers.
+
+    Checkpoints are not supported: the agents, their random streams and the scheduler
+    queues stay in the workers and are never gathered into one engine state. A
+    `checkpoint_interval` in the config is ignored with a warning, and save_checkpoint
+    raises RuntimeError; runs that must resume should use SimulationEngine.
+    """
+    def __init__(self, config: Optional[Dict[str, Any]] = None, num_workers: Optional[int] = None):
+        self._setup(config)
+        sharding_config = self.config.get("sharding_config", {})
+        self.num_workers: int = num_workers or sharding_config.get("num_workers") or os.cpu_count() or 1
+        self.start_method: Optional[str] = sharding_config.get("start_method")
+        if self.checkpoint_interval:
+            logger.warning("Checkpoints are not supported by the sharded engine; ignoring checkpoint_interval.")
+            self.checkpoint_interval = 0
+        if self.save_agent_data_interval or self.save_plot_data_interval:
+            clear_results(self.output_directory) # Workers record into shard-NN subdirectories
+        self.farmer_rows_by_shard: List[np.ndarray] = []
+        self.plot_rows_by_shard: List[np.ndarray] = []
+        self.num_farmers: int = 0
+        self.num_plots: int = 0
+        self._processes: List[multiprocessing.Process] = []
+        self._connections: list = []
+        self._initialize_components()
+
+    def _create_agents_and_plots(self):
+        frames = self._input_tables(AGENT_TABLES + ("historical_weather",))
+        if frames is None:
+            logger.error("Simulation data not loaded or generated.")
+            return
+        farmers, farm_plots = frames["farmers"], frames["farm_plots"]
+        self.num_farmers, self.num_plots = len(farmers), len(farm_plots)
+        shards = partition_by_admin_unit(farmers, farm_plots, self.num_workers)
+        self.farmer_rows_by_shard = [farmer_rows for farmer_rows, _ in shards]
+        self.plot_rows_by_shard = [plot_rows for _, plot_rows in shards]
+        logger.info("Starting %d shard workers for %d farmers and %d plots...", len(shards), self.num_farmers, self.num_plots)
+
+        # Every shard codes its farmers and plots against the run's whole hierarchy
+        self.spatial_hierarchy = self._build_spatial_hierarchy(farmers["location_admin_unit_id"].tolist())
+        admin_units = self.spatial_hierarchy.to_frame()
+        context = multiprocessing.get_context(self.start_method)
+        for shard, (farmer_rows, plot_rows) in enumerate(shards):
+            shard_frames = {"farmers": farmers.iloc[farmer_rows].reset_index(drop=True),
+                            "farm_plots": farm_plots.iloc[plot_rows].reset_index(drop=True)}
+            if "historical_weather" in frames:
+                shard_frames["historical_weather"] = frames["historical_weather"]
+            shard_frames["admin_units"] = admin_units
+            parent_connection, child_connection = context.Pipe()
+            process = context.Process(target=_shard_worker, daemon=True, name=f"rice-sim-shard-{shard}",
+                                      args=(child_connection, self._shard_config(shard), shard_frames,
+                                            plot_rows, f"{PART_PREFIX}{shard:02d}"))
+            process.start()
+            child_connection.close()
+            self._processes.append(process)
+            self._connections.append(parent_connection)
+        self.input_frames = None # The workers hold the agents; the coordinator keeps no copy of the inputs
+        for connection in self._connections:
+            self._receive(connection)
+        logger.info("Agents and plots created and assigned across %d shards.", len(shards))
+
+    def _shard_config(self, shard: int) -> Dict[str, Any]:
+        logging_config = dict(self.config.get("logging_config", {}))
+        if logging_config.get("event_log_path"):
+            logging_config["event_log_path"] = f"{logging_config['event_log_path']}.shard{shard}"
+        if logging_config.get("verbosity", "summary") == "summary":
+            logging_config["verbosity"] = "quiet" # The coordinator prints the run-wide step summary
+        # The coordinator instruments the run-wide steps; workers would all write the same metrics files
+        instrumentation_config = dict(self.config.get("instrumentation_config", {}), enabled=False)
+        return {**self.config, "logging_config": logging_config, "instrumentation_config": instrumentation_config}
+
+    def _receive(self, connection):
+        status, payload = connection.recv()
+        if status == "error":
+            self.close()
+            raise RuntimeError(f"Shard worker failed:\n{payload}")
+        return payload
+
+    def _broadcast(self, command: str, payload: Any = None) -> list:
+        """Sends a command to every worker and waits for all of their replies."""
+        for connection in self._connections:
+            connection.send((command, payload))
+        return [self._receive(connection) for connection in self._connections]
+
+    def run_step(self):
+        """Runs a single step on every shard, then combines their aggregates."""
+        if self.current_step >= self.max_steps:
+            logger.info("Maximum simulation steps reached.")
+            return False
+
+        logger.debug("--- Simulation Step %d / %d ---", self.current_step + 1, self.max_steps)
+        instrumentation = self.instrumentation
+        instrumentation.begin_step(self.current_step)
+        start_time = time.perf_counter()
+        with instrumentation.phase("climate"):
+            climate_conditions_for_step = self._climate_conditions_for_step(self.current_step)
+        with instrumentation.phase("market"):
+            market_conditions_for_step = self._market_conditions_for_step(self.current_step, self.last_step_aggregates)
+        with instrumentation.phase("shards"): # Every phase of the workers' steps, up to the slowest shard
+            shard_aggregates = self._broadcast("step", (self.current_step, climate_conditions_for_step, market_conditions_for_step))
+        with instrumentation.phase("aggregation"):
+            self.last_step_aggregates = combine_step_aggregates(shard_aggregates)
+        self._log_step_summary(time.perf_counter() - start_time, self.last_step_aggregates["event_counts"])
+        self.current_step += 1
+        with instrumentation.phase("recording"):
+            self._record_regional_kpis(self.last_step_aggregates)
+        instrumentation.end_step(self.last_step_aggregates)
+        return True
+
+    def run_simulation(self):
+        logger.info("Starting sharded simulation run...")
+        logger.info("Configuration: Max steps = %d, Agents = %d, Shards = %d",
+                    self.max_steps, self.num_farmers, len(self._connections))
+        while self.run_step():
+            pass
+        self._broadcast("flush")
+        self._write_regional_kpis()
+        self.instrumentation.close()
+        logger.info("Simulation run finished.")
+        self.collect_results()
+
+    def gather_farmer_column(self, field: str) -> np.ndarray:
+        """A FarmerAgent attribute of every farmer, in input (serial engine) order."""
+        return self._gather(self._broadcast("farmer_column", field), self.farmer_rows_by_shard, self.num_farmers)
+
+    def gather_plot_column(self, name: str) -> np.ndarray:
+        """A PlotStateStore column of every plot, in input (serial engine) order."""
+        return self._gather(self._broadcast("plot_column", name), self.plot_rows_by_shard, self.num_plots)
+
+    @staticmethod
+    def _gather(shard_values: List[np.ndarray], shard_rows: List[np.ndarray], num_rows: int) -> np.ndarray:
+        if not shard_values:
+            return np.empty(0)
+        dtype = object if shard_values[0].dtype.kind in "UO" else shard_values[0].dtype # Shards' string widths differ
+        result = np.empty(num_rows, dtype=dtype)
+        for values, rows in zip(shard_values, shard_rows):
+            result[rows] = values
+        return result
+
+    def collect_results(self):
+        """Logs a summary of the run's end state and returns a reader over the workers' recorded snapshots."""
+        logger.info("--- Collecting Simulation Results ---")
+        if not self._connections:
+            return None
+        capital = self.gather_farmer_column("capital_bdt")
+        total_capital = sum(capital.tolist()) # Same summation order as the serial engine
+        logger.info("Total capital of all farmers at end: %.2f BDT", total_capital)
+        if len(capital):
+            logger.info("Capital per farmer: mean %.2f, median %.2f, min %.2f, max %.2f BDT",
+                        capital.mean(), np.median(capital), capital.min(), capital.max())
+        return self._results_reader()
+
+    def save_checkpoint(self, path: str):
+        """Not supported; see the class docstring."""
+        raise RuntimeError(f"Cannot save a checkpoint to {path}: the sharded engine keeps the agents' state in its "
+                           "worker processes and does not gather it. Run SimulationEngine for resumable runs.")
+
+    def close(self):
+        """Stops the workers (flushing their event logs) and closes the coordinator's event log."""
+        connections, self._connections = self._connections, []
+        for connection in connections:
+            try:
+                connection.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        for connection in connections:
+            connection.close()
+        self._processes = []
+        self.event_log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def combine_step_aggregates(shard_aggregates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sums the step aggregates of several shards (see SimulationEngine._advance_agents)."""
+    event_counts = {event_type: 0 for event_type in EventType}
+    production = 0.0
+    cropped_area = np.zeros(max((len(aggregates["cropped_area_ha"]) for aggregates in shard_aggregates), default=0))
+    for aggregates in shard_aggregates:
+        for event_type, count in aggregates["event_counts"].items():
+            event_counts[event_type] += count
+        cropped_area[:len(aggregates["cropped_area_ha"])] += aggregates["cropped_area_ha"]
+        production += aggregates["production_t"]
+    combined = {"event_counts": event_counts, "cropped_area_ha": cropped_area, "production_t": production}
+    if all("regional" in aggregates for aggregates in shard_aggregates) and shard_aggregates:
+        combined["regional"] = combine_snapshots([aggregates["regional"] for aggregates in shard_aggregates])
+    return combined
+
+def _shard_worker(connection, config: Dict[str, Any], frames: Dict[str, pd.DataFrame],
+                  plot_rows: np.ndarray, results_part: str):
+    """Worker process: builds a SimulationEngine over one shard and serves coordinator commands."""
+    engine = None
+    try:
+        engine = SimulationEngine.from_frames(config, frames)
+        engine.shard_plot_rows = plot_rows
+        engine.results_directory = os.path.join(engine.output_directory, results_part)
+        connection.send(("ok", None))
+        while True:
+            command, payload = connection.recv()
+            if command == "step":
+                engine.current_step, climate_conditions, market_conditions = payload
+                engine._open_results_recorder()
+                aggregates = engine._advance_agents(climate_conditions, market_conditions)
+                engine.current_step += 1
+                engine.record_results()
+                connection.send(("ok", aggregates))
+            elif command == "farmer_column":
+                connection.send(("ok", np.array([getattr(farmer, payload) for farmer in engine.farmer_agents])))
+            elif command == "plot_column":
+                connection.send(("ok", engine.plot_store.column(payload).copy()))
+            elif command == "flush":
+                engine.event_log.flush()
+                engine.close_results_recorder()
+                connection.send(("ok", None))
+            elif command == "close":
+                break
+            else:
+                raise ValueError(f"Unknown shard worker command '{command}'.")
+    except (EOFError, KeyboardInterrupt):
+        pass
+    except Exception:
+        connection.send(("error", traceback.format_exc()))
+    finally:
+        if engine is not None:
+            engine.event_log.close()
+        connection.close()
@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+# Modules import each other from the package directory (e.g. `from agriculture.plot_store import ...`),
+# as when the simulator is run from it
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulation_core.config import get_default_config # noqa: E402
+
+@pytest.fixture
+def make_config(tmp_path):
+    """Builds a quiet default config writing into the test's temporary directory, with section overrides."""
+    def build(max_steps: int = 12, **sections):
+        config = get_default_config()
+        config["max_simulation_steps"] = max_steps
+        config["logging_config"] = dict(config["logging_config"], verbosity="quiet")
+        config["reporting_options"] = dict(config["reporting_options"], output_directory=str(tmp_path / "results"))
+        for section, overrides in sections.items():
+            config[section] = dict(config[section], **overrides)
+        return config
+    return build
@@ -0,0 +1,19 @@
+"""Shared assertions of the engine tests."""
+from typing import Dict
+
+import numpy as np
+
+from agriculture.plot_store import PlotStateStore
+
+def engine_state(engine) -> Dict[str, np.ndarray]:
+    """Every farmer's capital and every plot store column of a serial engine."""
+    state = {"capital_bdt": np.array([farmer.capital_bdt for farmer in engine.farmer_agents])}
+    for name in PlotStateStore.COLUMNS:
+        state[name] = engine.plot_store.column(name).copy()
+    return state
+
+def assert_same_state(actual: Dict[str, np.ndarray], expected: Dict[str, np.ndarray]):
+    """Bit-identical farmer and plot state (NaN where the other is NaN)."""
+    assert actual.keys() == expected.keys()
+    for name in expected:
+        np.testing.assert_array_equal(actual[name], expected[name], err_msg=name)
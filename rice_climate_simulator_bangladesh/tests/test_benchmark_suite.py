@@ -0,0 +1,24 @@
+import json
+
+from benchmarks import suite
+
+def test_suite_runs_the_smallest_tier_and_compares_with_a_baseline(tmp_path, monkeypatch):
+    monkeypatch.setattr(suite, "BASELINE_DIRECTORY", str(tmp_path / "baselines"))
+    results_path = str(tmp_path / "bench.json")
+    assert suite.main(["run", "--tiers", "1k", "--repeats", "1", "--output", results_path, "--save-baseline"]) == 0
+    with open(results_path) as f:
+        results = json.load(f)
+    assert set(results["results"]) == {f"{case}/1k" for case in suite.CASES}
+    for result in results["results"].values():
+        assert len(result["samples_s"]) == 1 and result["min_s"] >= 0.0
+
+    # Against the saved baseline of the same run nothing regressed
+    assert suite.main(["compare", results_path]) == 0
+    # Against a baseline where every case was ten times faster every case regressed
+    faster = {**results, "results": {key: {**result, "min_s": result["min_s"] / 10} for key, result in results["results"].items()}}
+    faster_path = tmp_path / "faster.json"
+    faster_path.write_text(json.dumps(faster))
+    assert suite.main(["compare", results_path, "--baseline", str(faster_path)]) == 1
+    assert suite.compare(results, faster, threshold=0.2) == list(results["results"])
+    # A missing baseline is its own status
+    assert suite.main(["compare", results_path, "--baseline", str(tmp_path / "missing.json")]) == 2
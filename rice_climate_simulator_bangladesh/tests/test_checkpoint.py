@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+from simulation_core.checkpoint import load_checkpoint_meta
+from simulation_core.engine import SimulationEngine
+
+from .helpers import assert_same_state, engine_state
+
+def histories(engine):
+    return {plot.plot_id: list(plot.cultivation_history) for farmer in engine.farmer_agents for plot in farmer.farm_plots}
+
+def crops(engine):
+    return {plot.plot_id: (plot.current_crop.variety.variety_id, plot.current_crop.planting_date) if plot.current_crop else None
+            for farmer in engine.farmer_agents for plot in farmer.farm_plots}
+
+def assert_same_run(resumed, uninterrupted):
+    assert resumed.current_step == uninterrupted.current_step
+    assert [farmer.agent_id for farmer in resumed.farmer_agents] == [farmer.agent_id for farmer in uninterrupted.farmer_agents]
+    assert_same_state(engine_state(resumed), engine_state(uninterrupted))
+    assert crops(resumed) == crops(uninterrupted)
+    assert histories(resumed) == histories(uninterrupted)
+
+@pytest.mark.parametrize("scheduling_mode", ["step", "event"])
+def test_resume_from_mid_run_checkpoint_is_bit_identical(make_config, tmp_path, scheduling_mode):
+    config = make_config(max_steps=10, agent_config={"scheduling_mode": scheduling_mode},
+                         reporting_options={"save_agent_data_interval": 0, "save_plot_data_interval": 0})
+    uninterrupted = SimulationEngine(config)
+    for _ in range(4):
+        uninterrupted.run_step()
+    path = str(tmp_path / "mid_run.npz")
+    uninterrupted.save_checkpoint(path)
+    uninterrupted.run_simulation()
+
+    resumed = SimulationEngine.from_checkpoint(path, config)
+    assert resumed.current_step == 4
+    resumed.run_simulation()
+    assert_same_run(resumed, uninterrupted)
+
+def test_checkpoint_interval_saves_periodically(make_config):
+    config = make_config(max_steps=10, reporting_options={"checkpoint_interval": 4, "save_agent_data_interval": 0,
+                                                          "save_plot_data_interval": 0})
+    uninterrupted = SimulationEngine(config)
+    saved_steps = []
+    while uninterrupted.run_step():
+        if os.path.exists(uninterrupted.checkpoint_path):
+            saved_steps.append(load_checkpoint_meta(uninterrupted.checkpoint_path)["current_step"])
+    # One file, overwritten by each checkpoint: written after steps 4 and 8 only
+    assert saved_steps == [4] * 4 + [8] * 3
+
+    resumed = SimulationEngine.from_checkpoint(uninterrupted.checkpoint_path, config)
+    assert resumed.current_step == 8
+    resumed.run_simulation()
+    assert_same_run(resumed, uninterrupted)
+
+def test_checkpoint_keeps_its_config_unless_one_is_given(make_config, tmp_path):
+    engine = SimulationEngine(make_config(max_steps=6))
+    engine.run_step()
+    path = str(tmp_path / "checkpoint.npz")
+    engine.save_checkpoint(path)
+    assert SimulationEngine.from_checkpoint(path).max_steps == 6
+    assert SimulationEngine.from_checkpoint(path, make_config(max_steps=9)).max_steps == 9
@@ -0,0 +1,22 @@
+import numpy as np
+
+from climate.forcing import ClimateForcing, counter_uniform, stream_key
+
+def test_counter_uniform_draws_rows_independently():
+    key = stream_key(42, 3, 0)
+    rows = np.array([7, 0, 99_999, 12, 12])
+    full = counter_uniform(key, np.arange(100_000), 0.0, 10.0)
+    np.testing.assert_array_equal(counter_uniform(key, rows, 0.0, 10.0), full[rows])
+    assert full.min() >= 0.0 and full.max() < 10.0
+    assert abs(full.mean() - 5.0) < 0.05
+    assert abs(np.corrcoef(full[:-1], full[1:])[0, 1]) < 0.01
+    assert not np.array_equal(full, counter_uniform(stream_key(42, 4, 0), np.arange(100_000), 0.0, 10.0))
+
+def test_shard_forcing_equals_serial_rows():
+    num_plots, steps = 5_000, 6
+    serial = ClimateForcing(7, steps, num_plots)
+    shard_rows = np.sort(np.random.default_rng(0).choice(num_plots, 700, replace=False))
+    shard = ClimateForcing(7, steps, len(shard_rows), plot_rows=shard_rows, window_steps=2)
+    for step in range(steps):
+        for variable in ("precipitation_mm", "salinity_change"):
+            np.testing.assert_array_equal(shard.step(step)[variable], serial.step(step)[variable][shard_rows])
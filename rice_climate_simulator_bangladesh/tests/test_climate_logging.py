@@ -0,0 +1,43 @@
+import builtins
+import logging
+
+import pytest
+
+from climate.climate_data import CMIP6Data, ClimateScenario
+from climate.climate_manager import ClimateManager
+from utils.logging_setup import ROOT_LOGGER_NAME
+
+def write_weather_csv(path):
+    path.write_text("date,station_id,max_temp_c,min_temp_c,precipitation_mm\n"
+                    "2020-01-01,S1,30.0,20.0,1.5\n2020-01-02,S1,31.0,21.0,0.0\n")
+    return str(path)
+
+@pytest.fixture
+def no_print(monkeypatch):
+    """Fails the test on any print(): output must go through the leveled loggers."""
+    def fail(*args, **kwargs):
+        raise AssertionError(f"print() called with {args}")
+    monkeypatch.setattr(builtins, "print", fail)
+
+def levels(caplog, text):
+    return [record.levelname for record in caplog.records if text in record.getMessage()]
+
+def test_climate_manager_logs_instead_of_printing(tmp_path, caplog, no_print):
+    with caplog.at_level(logging.INFO, logger=ROOT_LOGGER_NAME):
+        manager = ClimateManager(historical_weather_data_path=write_weather_csv(tmp_path / "weather.csv"),
+                                 climate_scenario_data_path=str(tmp_path / "scenarios.json"))
+        manager.add_cmip6_model_data("model", "ssp245", str(tmp_path / "model.csv"))
+        assert manager.get_weather_for_date("S1", manager.weather_cube.start_date, scenario_id="missing") is None
+    assert levels(caplog, "Loaded historical weather for 1 stations.") == ["INFO"]
+    assert levels(caplog, "Loading climate scenarios") == ["INFO"]
+    assert levels(caplog, "'ssp245' not defined") == ["WARNING"]
+    assert levels(caplog, "Scenario 'missing' not found.") == ["ERROR"]
+
+def test_cmip6_ingest_and_load_log_instead_of_printing(tmp_path, caplog, no_print):
+    data = CMIP6Data("model", ClimateScenario("ssp245", "SSP2-4.5", "Medium emissions"),
+                     write_weather_csv(tmp_path / "model.csv"), cube_dir=str(tmp_path / "cube"))
+    with caplog.at_level(logging.INFO, logger=ROOT_LOGGER_NAME):
+        frame = data.load_data()
+    assert len(frame) == 2
+    assert levels(caplog, "one-time ingest") == ["INFO"]
+    assert levels(caplog, "Loading data for model under SSP2-4.5") == ["INFO"]
@@ -0,0 +1,106 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_management import columnar_dataset
+from data_management.columnar import FRAME_COLUMNS
+from data_management.columnar_dataset import ColumnarDataset, ColumnarDatasetWriter, write_dataset
+from data_management.synthetic_data_generator import SyntheticDataGenerator
+
+SHARD_FORMATS = ["npz", pytest.param("parquet", marks=pytest.mark.skipif(columnar_dataset.pq is None,
+                                                                         reason="Parquet shards need pyarrow"))]
+SIZES = dict(num_farmers=250, num_weather_stations=2, sim_duration_days=40, chunk_size=100)
+
+def mixed_frame(first, num_rows):
+    """A chunk with every kind of column the encoders handle."""
+    rows = np.arange(first, first + num_rows)
+    return pd.DataFrame({
+        "id": [f"X{row}" for row in rows],
+        "note": [None if row % 3 == 0 else f"n{row}" for row in rows], # Strings with missing values
+        "kind": pd.Categorical(["a" if row % 2 else "b" for row in rows], categories=["a", "b"]),
+        "when": pd.to_datetime("2021-01-01") + pd.to_timedelta(rows, unit="D"),
+        "count": rows.astype(np.int64),
+        "flag": rows % 4 == 0,
+        "value": rows * 0.5,
+    })
+
+def expected_tables(chunks):
+    tables = {}
+    for table, frame in chunks:
+        tables.setdefault(table, []).append(frame)
+    return {table: pd.concat(frames, ignore_index=True) for table, frames in tables.items()}
+
+@pytest.mark.parametrize("shard_format", SHARD_FORMATS)
+def test_streaming_export_round_trip(tmp_path, shard_format):
+    dataset_dir = str(tmp_path / "dataset")
+    dataset = SyntheticDataGenerator(random_seed=3).export_columnar_dataset(dataset_dir, shard_format=shard_format, **SIZES)
+    expected = expected_tables(SyntheticDataGenerator(random_seed=3).iter_columnar_chunks(**SIZES))
+    assert dataset.shard_format == shard_format
+    assert dataset.metadata["num_farmers"] == 250 and dataset.metadata["chunk_size"] == 100
+    reopened = ColumnarDataset.open(dataset_dir)
+    for table, frame in expected.items():
+        assert dataset.num_rows(table) == len(frame)
+        pd.testing.assert_frame_equal(reopened.read_table(table), frame, obj=table)
+    assert len(reopened.tables["farmers"]["shards"]) == 3 # 100 + 100 + 50 farmers
+    assert os.listdir(tmp_path) == ["dataset"]
+
+@pytest.mark.parametrize("shard_format", SHARD_FORMATS)
+def test_column_kinds_round_trip(tmp_path, shard_format):
+    chunks = [("mixed", mixed_frame(0, 7)), ("mixed", mixed_frame(7, 5)), ("empty", mixed_frame(0, 0))]
+    dataset = write_dataset(str(tmp_path / "dataset"), chunks, shard_format=shard_format)
+    whole = pd.concat([mixed_frame(0, 7), mixed_frame(7, 5)], ignore_index=True)
+    pd.testing.assert_frame_equal(dataset.read_table("mixed"), whole)
+    pd.testing.assert_frame_equal(dataset.read_table("mixed", columns=["note", "count"]), whole[["note", "count"]])
+    assert dataset.num_rows("empty") == 0 and dataset.read_table("empty").columns.tolist() == list(whole.columns)
+    # Absent tables read as empty frames with the layout's columns
+    assert dataset.read_table("market_prices").columns.tolist() == list(FRAME_COLUMNS["market_prices"])
+
+def test_shard_filter_skips_shards(tmp_path, monkeypatch):
+    dataset = write_dataset(str(tmp_path / "dataset"), [("mixed", mixed_frame(10 * i, 10)) for i in range(4)],
+                            shard_format="npz")
+    shards = dataset.tables["mixed"]["shards"]
+    assert [shard["num_rows"] for shard in shards] == [10] * 4
+    opened = []
+    real_load = np.load
+    monkeypatch.setattr(columnar_dataset.np, "load", lambda path, **kwargs: opened.append(os.path.basename(path))
+                        or real_load(path, **kwargs))
+    wanted = {shards[1]["file"], shards[3]["file"]}
+    chunks = list(dataset.iter_chunks("mixed", columns=["count"], shard_filter=lambda shard: shard["file"] in wanted))
+    assert opened == ["part-00001.npz", "part-00003.npz"]
+    assert [chunk["count"].tolist() for chunk in chunks] == [list(range(10, 20)), list(range(30, 40))]
+
+def failing_chunks(fail_after):
+    for i in range(fail_after):
+        yield "mixed", mixed_frame(10 * i, 10)
+    raise RuntimeError("generator failed")
+
+def test_failed_write_leaves_nothing_behind(tmp_path):
+    dataset_dir = str(tmp_path / "dataset")
+    with pytest.raises(RuntimeError, match="generator failed"):
+        write_dataset(dataset_dir, failing_chunks(2), shard_format="npz")
+    assert os.listdir(tmp_path) == []
+
+    # A failed rewrite keeps the dataset already there
+    write_dataset(dataset_dir, [("mixed", mixed_frame(0, 3))], shard_format="npz")
+    with pytest.raises(RuntimeError, match="generator failed"):
+        write_dataset(dataset_dir, failing_chunks(1), shard_format="npz")
+    assert os.listdir(tmp_path) == ["dataset"]
+    pd.testing.assert_frame_equal(ColumnarDataset.open(dataset_dir).read_table("mixed"), mixed_frame(0, 3))
+
+    # A writer used as a context manager aborts on an exception
+    with pytest.raises(KeyError):
+        with ColumnarDatasetWriter(str(tmp_path / "other"), shard_format="npz") as writer:
+            writer.append("mixed", mixed_frame(0, 3))
+            raise KeyError("stop")
+    assert os.listdir(tmp_path) == ["dataset"]
+    writer.abort() # Aborting twice is harmless
+
+def test_unknown_or_unavailable_shard_formats_are_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unknown shard format 'csv'"):
+        ColumnarDatasetWriter(str(tmp_path / "dataset"), shard_format="csv")
+    if columnar_dataset.pq is None:
+        with pytest.raises(ImportError, match="need pyarrow"):
+            ColumnarDatasetWriter(str(tmp_path / "dataset"), shard_format="parquet")
+    assert os.listdir(tmp_path) == []
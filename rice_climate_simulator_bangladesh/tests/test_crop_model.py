@@ -0,0 +1,135 @@
+import numpy as np
+import pytest
+
+from agriculture.crop_model import MATURITY_CODE, CropGrowthModel
+from agriculture.crops import RiceSeason
+from agriculture.farm_plot import FarmPlot
+from agriculture.plot_store import PlotStateStore
+from agriculture.variety_catalog import DEFAULT_VARIETY_CATALOG
+from simulation_core.engine import SimulationEngine
+
+from .helpers import assert_same_state
+
+MODEL = CropGrowthModel(DEFAULT_VARIETY_CATALOG)
+REFERENCE_TEMP = np.float64(MODEL.reference_temp_c) # Maturity in exactly maturity_days days
+
+def planted_store(variety_ids, irrigated=True, salinity_ds_m=0.0, soil_moisture_mm=100.0):
+    """A store with one freshly planted crop per variety id, all on 1 ha plots."""
+    num_plots = len(variety_ids)
+    store = PlotStateStore(capacity=num_plots)
+    store.allocate(num_plots)
+    store.size_ha[:] = 1.0
+    store.is_irrigated[:] = irrigated
+    store.salinity_ds_m[:] = salinity_ds_m
+    store.soil_moisture_mm[:] = soil_moisture_mm
+    store.has_crop[:] = True
+    store.crop_variety_code[:] = [DEFAULT_VARIETY_CATALOG.code(variety_id) for variety_id in variety_ids]
+    store.growth_stage[:] = 0
+    return store
+
+def yields(store):
+    return MODEL.crop_yield_t_ha(store, np.arange(store.size))
+
+def test_unstressed_crop_matures_at_potential_yield():
+    variety_ids = ["brri_dhan28", "swarna", "pajam"]
+    store = planted_store(variety_ids)
+    variety = [DEFAULT_VARIETY_CATALOG[variety_id] for variety_id in variety_ids]
+    days = max(v.maturity_days for v in variety)
+    MODEL.advance(store, np.zeros(3), np.full(3, REFERENCE_TEMP), days)
+    assert (store.growth_stage[:3] == MATURITY_CODE).all()
+    np.testing.assert_allclose(yields(store), [v.potential_yield_t_ha for v in variety])
+    np.testing.assert_array_equal(store.crop_days[:3], [v.maturity_days for v in variety])
+    np.testing.assert_allclose(store.water_stress_sum[:3], 0.0, atol=1e-9)
+    np.testing.assert_array_equal(store.salinity_stress_sum[:3], 0.0)
+
+def test_water_stress_lowers_biomass_by_the_unmet_share_of_demand():
+    variety = DEFAULT_VARIETY_CATALOG["swarna"]
+    daily_demand = variety.water_requirement_mm / variety.maturity_days
+    store = planted_store(["swarna"] * 3, irrigated=False, soil_moisture_mm=0.0)
+    store.is_irrigated[2] = True # Irrigation tops up what rain leaves unmet
+    # Rain over the season meets all, half and (with irrigation) all of the demand
+    rain = np.array([1.0, 0.5, 0.5]) * daily_demand * variety.maturity_days
+    MODEL.advance(store, rain, np.full(3, REFERENCE_TEMP), variety.maturity_days)
+    assert (store.growth_stage[:3] == MATURITY_CODE).all()
+    np.testing.assert_allclose(yields(store), [variety.potential_yield_t_ha, 0.5 * variety.potential_yield_t_ha,
+                                               variety.potential_yield_t_ha])
+    thermal_time = store.thermal_time_cd[:3]
+    np.testing.assert_allclose(store.water_stress_sum[:3] / thermal_time, [0.0, 0.5, 0.0], atol=1e-9)
+
+@pytest.mark.parametrize("variety_id", ["swarna", "brri_dhan47"])
+def test_salinity_above_tolerance_loses_yield_linearly(variety_id):
+    tolerance = DEFAULT_VARIETY_CATALOG.salinity_tolerance_ds_m[DEFAULT_VARIETY_CATALOG.code(variety_id)] \
+        or MODEL.default_salinity_tolerance_ds_m
+    salinities = [tolerance - 1.0, tolerance, tolerance + 2.0, tolerance + 20.0]
+    store = planted_store([variety_id] * 4)
+    store.salinity_ds_m[:4] = salinities
+    variety = DEFAULT_VARIETY_CATALOG[variety_id]
+    MODEL.advance(store, np.zeros(4), np.full(4, REFERENCE_TEMP), variety.maturity_days)
+    # Maas-Hoffman: no loss up to the threshold, then salinity_slope_per_ds_m per dS/m until nothing is left
+    losses = np.array([0.0, 0.0, 2.0 * MODEL.salinity_slope_per_ds_m, 1.0])
+    np.testing.assert_allclose(yields(store), variety.potential_yield_t_ha * (1 - losses))
+    np.testing.assert_allclose(store.salinity_stress_sum[:4] / store.thermal_time_cd[:4], losses)
+
+def test_crop_matures_partway_through_a_block():
+    variety = DEFAULT_VARIETY_CATALOG["swarna"]
+    store = planted_store(["swarna"] * 2, irrigated=False, soil_moisture_mm=0.0)
+    # The second crop is 40 days in already, so it matures 40 days before the end of the next block
+    MODEL.advance(store, np.zeros(1), np.full(1, REFERENCE_TEMP), 40, rows=np.array([1]))
+    block_days = variety.maturity_days
+    daily_rain = 0.25 * variety.water_requirement_mm / variety.maturity_days # A quarter of the daily demand
+    MODEL.advance(store, np.full(2, daily_rain * block_days), np.full(2, REFERENCE_TEMP), block_days)
+    assert (store.growth_stage[:2] == MATURITY_CODE).all()
+    np.testing.assert_array_equal(store.crop_days[:2], [variety.maturity_days, variety.maturity_days])
+    # A growing crop takes up all the rain; after maturity the second plot's soil keeps its last 40 days of rain
+    np.testing.assert_allclose(store.soil_moisture_mm[:2], [0.0, 40 * daily_rain], atol=1e-9)
+    # The second crop had no water at all in its first 40 days and a quarter of its demand after
+    days = variety.maturity_days
+    np.testing.assert_allclose(store.water_stress_sum[:2] / store.thermal_time_cd[:2], [0.75, (40 + 0.75 * (days - 40)) / days])
+    # A mature crop no longer grows
+    biomass = store.biomass_t_ha[:2].copy()
+    MODEL.advance(store, np.full(2, 100.0), np.full(2, REFERENCE_TEMP), 30)
+    np.testing.assert_array_equal(store.biomass_t_ha[:2], biomass)
+    np.testing.assert_array_equal(store.crop_days[:2], [variety.maturity_days, variety.maturity_days])
+
+def test_advancing_rows_matches_advancing_the_whole_store():
+    rng = np.random.default_rng(7)
+    num_plots = 500
+    whole = planted_store(list(DEFAULT_VARIETY_CATALOG) * (num_plots // len(DEFAULT_VARIETY_CATALOG)))
+    whole.is_irrigated[:] = rng.random(num_plots) < 0.5
+    whole.water_source_reliability[:] = rng.uniform(0.3, 1.0, num_plots)
+    whole.salinity_ds_m[:] = rng.uniform(0.0, 10.0, num_plots)
+    whole.has_crop[:] = rng.random(num_plots) < 0.8 # Some plots idle
+    whole.crop_variety_code[~whole.has_crop] = -1
+    by_rows = PlotStateStore(capacity=num_plots)
+    by_rows.allocate(num_plots)
+    for name in PlotStateStore.COLUMNS:
+        by_rows.column(name)[:] = whole.column(name)
+    for _ in range(4):
+        precipitation = rng.gamma(2.0, 300.0, num_plots)
+        temperature = rng.normal(27.0, 3.0, num_plots)
+        precipitation[rng.random(num_plots) < 0.05] = np.nan
+        MODEL.advance(whole, precipitation, temperature, 45)
+        # The same block, advanced in two interleaved halves
+        order = rng.permutation(num_plots)
+        for rows in np.array_split(order, 2):
+            MODEL.advance(by_rows, precipitation[rows], temperature[rows], 45, rows=rows)
+    state = lambda store: {name: store.column(name).copy() for name in PlotStateStore.COLUMNS}
+    assert_same_state(state(by_rows), state(whole))
+    assert (whole.growth_stage[:num_plots] == MATURITY_CODE).any()
+
+def test_per_plot_growth_reuses_one_model():
+    store = PlotStateStore()
+    plots = [FarmPlot(f"P{i}", "F0", 1.0, store=store) for i in range(2)]
+    for plot in plots:
+        plot.plant_crop(DEFAULT_VARIETY_CATALOG["swarna"], "Day 0", RiceSeason.AMAN)
+        plot.update_plot_conditions({"precipitation_mm": 5.0, "mean_temp_c": 28.0}, None)
+    model = store.crop_model # Built by the first plot's growth and reused by the second
+    assert isinstance(model, CropGrowthModel) and store.growth_model() is model
+    np.testing.assert_array_equal(store.crop_days[:2], [1, 1])
+
+def test_engine_store_uses_the_engine_crop_model(make_config):
+    engine = SimulationEngine(make_config(max_steps=1, crop_model_config={"base_temp_c": 9.0}))
+    engine.run_step()
+    assert engine.plot_store.growth_model() is engine.crop_model
+    assert engine.crop_model.base_temp_c == 9.0
+    engine.close()
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from agriculture.crops import RiceSeason
+from agriculture.farm_plot import FarmPlot
+from agriculture.plot_store import PlotStateStore
+from agriculture.variety_catalog import DEFAULT_VARIETY_CATALOG
+from simulation_core.engine import SimulationEngine
+
+SEASON_VARIETIES = [(RiceSeason.BORO, "brri_dhan28"), (RiceSeason.AMAN, "swarna"), (RiceSeason.BORO, "brri_dhan47"),
+                    (RiceSeason.AMAN, "pajam"), (RiceSeason.BORO, "brri_dhan29")]
+
+def grow_and_harvest(plot, season, variety_id, cycle, extra_stress=None):
+    """Plants and harvests one crop; returns the record the plot used to append to its list of dicts."""
+    assert plot.plant_crop(DEFAULT_VARIETY_CATALOG[variety_id], f"Day {cycle * 10}", season)
+    if extra_stress:
+        plot.current_crop.apply_stress(*extra_stress)
+    crop = plot.harvest_crop(f"Day {cycle * 10 + 120}", 4.0 + cycle * 0.25)
+    return {
+        'variety_id': crop.variety.variety_id,
+        'season': crop.variety.season.name,
+        'planting_date': crop.planting_date,
+        'harvest_date': f"Day {cycle * 10 + 120}",
+        'yield_t_ha': 4.0 + cycle * 0.25,
+        'stress_factors': {'water_stress': crop.water_stress, 'salinity_stress': crop.salinity_stress, **crop.stress_factors},
+    }
+
+def test_history_reads_as_the_old_list_of_dicts():
+    store = PlotStateStore()
+    plots = [FarmPlot(f"P{i}", "F0", 1.0, store=store) for i in range(3)]
+    expected = {plot.plot_id: [] for plot in plots}
+    for cycle, (season, variety_id) in enumerate(SEASON_VARIETIES):
+        for plot in plots[:cycle % 3 + 1]:
+            stress = ("flood_stress", 0.5) if plot.plot_id == "P1" and cycle == 2 else None
+            expected[plot.plot_id].append(grow_and_harvest(plot, season, variety_id, cycle, stress))
+    for plot in plots:
+        history = plot.cultivation_history
+        assert len(history) == len(expected[plot.plot_id])
+        assert history == expected[plot.plot_id]
+        assert list(history) == expected[plot.plot_id]
+        assert history[-1] == expected[plot.plot_id][-1]
+        assert history[0] == expected[plot.plot_id][0]
+        assert history[1:] == expected[plot.plot_id][1:]
+    # P1 was harvested in cycles 1, 2 and 4; only the crop of cycle 2 had flood stress
+    assert plots[1].cultivation_history[1]["stress_factors"]["flood_stress"] == 0.5
+    assert "flood_stress" not in plots[1].cultivation_history[0]["stress_factors"]
+    with pytest.raises(IndexError):
+        plots[2].cultivation_history[len(expected["P2"])]
+
+def test_history_can_be_appended_to_and_replaced():
+    plot = FarmPlot("P0", "F0", 1.0)
+    records = [grow_and_harvest(plot, season, variety_id, cycle) for cycle, (season, variety_id) in enumerate(SEASON_VARIETIES[:2])]
+    plot.cultivation_history.append(records[0])
+    assert plot.cultivation_history == records + records[:1]
+    plot.cultivation_history = records[::-1]
+    assert plot.cultivation_history == records[::-1]
+    plot.cultivation_history = []
+    assert len(plot.cultivation_history) == 0
+
+@pytest.mark.parametrize("retention", [1, 2, 3])
+def test_retention_keeps_only_the_last_records_of_each_plot(retention):
+    store = PlotStateStore(history_retention=retention)
+    plots = [FarmPlot(f"P{i}", "F0", 1.0, store=store) for i in range(4)]
+    expected = {plot.plot_id: [] for plot in plots}
+    # Enough harvests that the log fills and reclaims rows many times
+    for cycle in range(200):
+        season, variety_id = SEASON_VARIETIES[cycle % len(SEASON_VARIETIES)]
+        for plot in plots[:1 + cycle % len(plots)]:
+            expected[plot.plot_id].append(grow_and_harvest(plot, season, variety_id, cycle))
+    for plot in plots:
+        assert plot.cultivation_history == expected[plot.plot_id][-retention:]
+    assert len(store.history) == sum(min(len(records), retention) for records in expected.values())
+    # Dropped rows are reclaimed, so the log stays within a few retention windows per plot
+    assert store.history.size <= 4 * retention * len(plots)
+
+def test_engine_retention_matches_tail_of_full_history(make_config):
+    histories = {}
+    for retention in (0, 2):
+        engine = SimulationEngine(make_config(max_steps=15, agriculture_config={"history_retention_seasons": retention}))
+        engine.run_simulation()
+        histories[retention] = {plot.plot_id: list(plot.cultivation_history)
+                                for farmer in engine.farmer_agents for plot in farmer.farm_plots}
+    assert max(len(records) for records in histories[0].values()) > 2
+    for plot_id, records in histories[0].items():
+        assert histories[2][plot_id] == records[-2:]
+    assert all(np.isfinite(record["yield_t_ha"]) for records in histories[2].values() for record in records)
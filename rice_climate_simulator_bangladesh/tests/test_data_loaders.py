@@ -0,0 +1,138 @@
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_management import columnar
+from data_management.columnar import SchemaRecords
+from data_management.data_loaders import (FARMER_RULES, load_all_simulation_data, load_farm_plots_from_json,
+                                          load_farmers_from_csv, load_weather_data_from_csv)
+from data_management.schemas import FarmerProfileSchema, FarmPlotSchema
+from data_management.validation import DataValidationError
+from utils.logging_setup import ROOT_LOGGER_NAME
+
+FARMERS_CSV = """agent_id,household_id,initial_capital_bdt,age,education_years,farming_experience_years,risk_aversion_factor,land_holding_category,location_admin_unit_id,num_farm_plots
+F0,H0,50000,40,5,20,0.5,small,upz_1,2
+F1,H1,60000,0,5,20,0.5,small,upz_1,1
+F2,H2,70000,35,4,10,1.5,marginal,upz_2,1
+F3,H3,-5,50,8,30,0.2,medium,upz_2,3
+F4,,80000,45,6,25,0.4,small,upz_1,1
+F5,H5,90000,38,abc,15,0.3,large,upz_3,2
+F6,H6,10000,30.5,2,5,0.9,marginal,upz_3,1
+F7,H7,20000,60,0,40,0.1,small,,
+"""
+# (row, column, message) of every violation above; rows are 0-based data rows
+FARMER_ERRORS = [
+    (1, "age", "must be > 0"),
+    (2, "risk_aversion_factor", "must be <= 1"),
+    (3, "initial_capital_bdt", "must be >= 0"),
+    (4, "household_id", "required value is missing"),
+    (5, "education_years", "not a valid int"),
+    (6, "age", "not a whole number"),
+]
+
+PLOTS = [
+    {"plot_id": "P0", "owner_agent_id": "F0", "size_ha": 1.5, "is_irrigated": "yes",
+     "soil_properties": {"soil_type": "Clay", "salinity_ds_m": 4.0}},
+    {"plot_id": "P1", "owner_agent_id": "F0", "size_ha": 0.0},
+    {"plot_id": "P2", "size_ha": 0.8, "initial_land_quality": 1.2},
+    {"owner_agent_id": "F7", "size_ha": 0.4, "soil_type": "Sandy"},
+    {"plot_id": "P4", "owner_agent_id": "F7", "size_ha": 0.6, "is_irrigated": False, "salinity_ds_m": 2.5},
+]
+
+@pytest.fixture
+def farmers_file(tmp_path):
+    path = tmp_path / "farmers.csv"
+    path.write_text(FARMERS_CSV)
+    return str(path)
+
+@pytest.fixture
+def plots_file(tmp_path):
+    path = tmp_path / "plots.json"
+    path.write_text(json.dumps(PLOTS))
+    return str(path)
+
+def test_schema_bounds_become_column_rules():
+    assert FARMER_RULES["risk_aversion_factor"].bounds == (("ge", 0), ("le", 1))
+    assert FARMER_RULES["age"].kind == "int" and FARMER_RULES["age"].bounds == (("gt", 0),)
+    assert FARMER_RULES["location_admin_unit_id"].nullable and not FARMER_RULES["location_admin_unit_id"].required
+    assert FARMER_RULES["num_farm_plots"].default == 0
+    assert "attributes" not in FARMER_RULES # Container fields are not columns
+
+def test_raise_mode_reports_every_violating_row(farmers_file):
+    with pytest.raises(DataValidationError, match="6 constraint violation") as excinfo:
+        load_farmers_from_csv(farmers_file)
+    errors = excinfo.value.errors
+    assert list(errors.columns) == ["row", "column", "value", "message"]
+    assert list(errors[["row", "column", "message"]].itertuples(index=False, name=None)) == FARMER_ERRORS
+    assert errors.loc[errors["column"] == "education_years", "value"].tolist() == ["abc"]
+    assert "row 3: initial_capital_bdt=-5 must be >= 0" in str(excinfo.value)
+
+def test_drop_mode_keeps_valid_rows_typed(farmers_file, caplog):
+    with caplog.at_level(logging.WARNING, logger=ROOT_LOGGER_NAME):
+        records = load_farmers_from_csv(farmers_file, on_error="drop")
+    assert "Dropping the invalid rows" in caplog.text
+    frame = records.frame
+    assert frame["agent_id"].tolist() == ["F0", "F7"]
+    assert list(frame.columns) == list(columnar.FARMER_COLUMNS)
+    assert frame["age"].dtype == np.int64 and frame["initial_capital_bdt"].dtype == np.float64
+    assert isinstance(frame["land_holding_category"].dtype, pd.CategoricalDtype)
+    # Missing optional values: the schema default, or None without one
+    assert frame["num_farm_plots"].tolist() == [2, 0]
+    assert pd.isna(frame["location_admin_unit_id"].iloc[1])
+
+def test_unknown_error_mode_and_missing_columns_are_rejected(farmers_file, tmp_path):
+    with pytest.raises(ValueError, match="Unknown on_error"):
+        load_farmers_from_csv(farmers_file, on_error="ignore")
+    path = tmp_path / "no_age.csv"
+    pd.read_csv(farmers_file).drop(columns="age").to_csv(path, index=False)
+    with pytest.raises(DataValidationError, match=r"missing required column\(s\) \['age'\]"):
+        load_farmers_from_csv(str(path), on_error="drop")
+
+def test_plots_parse_nested_and_flat_soil(plots_file):
+    with pytest.raises(DataValidationError) as excinfo:
+        load_farm_plots_from_json(plots_file)
+    assert list(excinfo.value.errors[["row", "column", "message"]].itertuples(index=False, name=None)) == [
+        (1, "size_ha", "must be > 0"), (2, "initial_land_quality", "must be <= 1"), (3, "plot_id", "required value is missing")]
+    records = load_farm_plots_from_json(plots_file, on_error="drop")
+    assert len(records) == 2
+    first, last = records[0], records[-1]
+    assert isinstance(first, FarmPlotSchema)
+    assert first.is_irrigated is True and first.soil_properties.soil_type == "Clay"
+    assert first.soil_properties.salinity_ds_m == 4.0
+    assert first.soil_properties.ph == 6.5 # Schema default where the file has none
+    assert last.plot_id == "P4" and last.is_irrigated is False and last.soil_properties.salinity_ds_m == 2.5
+
+def test_weather_dates_are_parsed_and_checked(tmp_path):
+    path = tmp_path / "weather.csv"
+    path.write_text("date,station_id,max_temp_c,precipitation_mm\n2020-01-01,S1,30.5,0\n2020-13-45,S1,31,2\n2020-01-03,S2,,5\n")
+    with pytest.raises(DataValidationError) as excinfo:
+        load_weather_data_from_csv(str(path))
+    assert excinfo.value.errors[["row", "column", "message"]].values.tolist() == [[1, "record_date", "not a valid date"]]
+    records = load_weather_data_from_csv(str(path), on_error="drop")
+    assert [record.record_date.isoformat() for record in records] == ["2020-01-01", "2020-01-03"]
+    assert records[1].max_temp_c is None
+
+def test_schema_records_build_objects_only_when_accessed(farmers_file, monkeypatch):
+    built = []
+    class CountingSchema(FarmerProfileSchema):
+        def __init__(self, **data):
+            built.append(data["agent_id"])
+            super().__init__(**data)
+    monkeypatch.setitem(columnar.TABLE_SCHEMAS, "farmers", CountingSchema)
+    records = load_farmers_from_csv(farmers_file, on_error="drop")
+    assert isinstance(records, SchemaRecords) and len(records) == 2 and built == []
+    assert records[-1].agent_id == "F7" and built == ["F7"]
+    assert [record.agent_id for record in records[:1]] == ["F0"]
+    with pytest.raises(IndexError):
+        records[2]
+    assert [record.age for record in records] == [40, 60]
+    assert built == ["F7", "F0", "F0", "F7"]
+
+def test_load_all_fills_absent_tables(farmers_file, plots_file):
+    data = load_all_simulation_data(farmers_file=farmers_file, plots_file=plots_file, on_error="drop")
+    assert len(data.farmers) == 2 and len(data.farm_plots) == 2
+    assert isinstance(data.historical_weather, SchemaRecords) and len(data.historical_weather) == 0
+    assert list(data.market_prices.frame.columns) == list(columnar.FRAME_COLUMNS["market_prices"])
@@ -0,0 +1,33 @@
+import pytest
+
+from simulation_core.engine import SimulationEngine
+from simulation_core.ensemble import ENSEMBLE_METRICS, EnsembleRunner, summarize_run
+
+SEEDS = [5, 6, 7]
+
+def serial_summary(config, seed):
+    engine = SimulationEngine(dict(config, random_seed=seed))
+    production = []
+    while engine.run_step():
+        production.append(engine.last_step_aggregates["production_t"])
+    engine.close()
+    return summarize_run(engine, production)
+
+def test_pool_replicates_match_serial_runs(make_config):
+    config = make_config(max_steps=6, reporting_options={"save_agent_data_interval": 0, "save_plot_data_interval": 0})
+    runner = EnsembleRunner(config, num_workers=2, seeds=SEEDS)
+    replicates = []
+    summary = runner.run(on_replicate=replicates.append)
+    assert [replicate["seed"] for replicate in replicates] == SEEDS # In seed order, whichever worker ran them
+    for replicate in replicates:
+        expected = serial_summary(config, replicate["seed"])
+        assert {key: value for key, value in replicate.items() if key != "seed"} == expected
+    # The seeds change the runs, and the ensemble statistics are folded from the replicates
+    assert len({replicate["total_production_t"] for replicate in replicates}) == len(SEEDS)
+    assert summary["replicates"] == len(SEEDS) and len(summary["production_t_by_step"]) == 6
+    for metric in ENSEMBLE_METRICS:
+        values = [replicate[metric] for replicate in replicates]
+        statistics = summary["metrics"][metric]
+        assert statistics["count"] == len(SEEDS)
+        assert statistics["mean"] == pytest.approx(sum(values) / len(values))
+        assert (statistics["min"], statistics["max"]) == (min(values), max(values))
@@ -0,0 +1,30 @@
+import json
+
+from simulation_core.engine import SimulationEngine
+from utils.event_log import EventType, get_event_log
+
+def test_engines_in_one_process_keep_their_own_event_logs(make_config):
+    default_events = len(get_event_log().recent_events())
+    first = SimulationEngine(make_config(max_steps=3))
+    second = SimulationEngine(make_config(max_steps=3))
+    first.run_simulation()
+    assert any(event["type"] == EventType.PLANTED.value for event in first.event_log.recent_events())
+    assert second.event_log.recent_events() == []
+    second.run_simulation()
+    assert len(second.event_log.recent_events()) == len(first.event_log.recent_events())
+    assert len(get_event_log().recent_events()) == default_events
+
+def test_run_simulation_closes_file_backed_event_log(make_config, tmp_path):
+    path = tmp_path / "events.jsonl"
+    engine = SimulationEngine(make_config(max_steps=3, logging_config={"event_log_path": str(path)}))
+    engine.run_simulation()
+    assert engine.event_log._file is None
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert {event["type"] for event in events} >= {EventType.PLANTED.value, EventType.HARVESTED.value}
+
+def test_engine_context_manager_closes_event_log(make_config, tmp_path):
+    path = tmp_path / "events.jsonl"
+    with SimulationEngine(make_config(max_steps=3, logging_config={"event_log_path": str(path)})) as engine:
+        engine.run_step()
+    assert engine.event_log._file is None
+    assert path.read_text().count("\n") == sum(engine.event_log.counts().values()) > 0
@@ -0,0 +1,121 @@
+import multiprocessing
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_management import columnar_dataset
+from data_management.columnar_dataset import ColumnarDatasetWriter
+from data_management.input_cache import InputCache, input_cache_key
+
+def make_frames(seed: int, num_rows: int = 50):
+    rng = np.random.default_rng(seed)
+    return {"farmers": pd.DataFrame({"agent_id": [f"F{seed}_{i}" for i in range(num_rows)],
+                                     "initial_capital_bdt": rng.uniform(1e4, 1e5, num_rows)})}
+
+def assert_same_frames(dataset, frames):
+    for table, frame in frames.items():
+        pd.testing.assert_frame_equal(dataset.read_table(table), frame, check_dtype=False)
+
+def test_key_is_stable_and_covers_the_config():
+    config = {"use_synthetic_data": True, "random_seed": 42, "num_farmers": 100}
+    reordered = {"num_farmers": 100, "random_seed": 42, "use_synthetic_data": True}
+    assert input_cache_key(config) == input_cache_key(reordered) == input_cache_key(dict(config))
+    assert len(input_cache_key(config)) == 64
+    assert input_cache_key(dict(config, random_seed=43)) != input_cache_key(config)
+    assert input_cache_key(dict(config, num_farmers=101)) != input_cache_key(config)
+
+def test_get_misses_then_hits_after_put(tmp_path):
+    cache = InputCache(str(tmp_path / "cache"))
+    frames = make_frames(0)
+    assert cache.get("a" * 64) is None
+    stored = cache.put("a" * 64, frames, metadata={"note": "test"})
+    assert stored.metadata == {"note": "test", "cache_key": "a" * 64}
+    hit = cache.get("a" * 64)
+    assert hit is not None
+    assert_same_frames(hit, frames)
+    assert [key for key, _, _ in cache.entries()] == ["a" * 64]
+    assert cache.get("b" * 64) is None
+
+def test_eviction_removes_least_recently_used_entries(tmp_path):
+    cache = InputCache(str(tmp_path / "cache"))
+    for i, key in enumerate(("old", "used", "new")):
+        cache.put(key, make_frames(i))
+        os.utime(cache._entry_dir(key), (1_000_000 + i, 1_000_000 + i)) # Distinct use times despite mtime resolution
+    assert cache.get("used") is not None # Touched now: the most recently used
+    entry_size = max(size for _, _, size in cache.entries())
+    cache.max_size_bytes = 2 * entry_size
+    cache.evict()
+    assert sorted(key for key, _, _ in cache.entries()) == ["new", "used"]
+    # An entry just put is kept even when it alone exceeds the limit
+    cache.max_size_bytes = 1
+    cache.put("newest", make_frames(3))
+    assert [key for key, _, _ in cache.entries()] == ["newest"]
+
+def test_writer_publishing_second_returns_the_first_dataset(tmp_path):
+    dataset_dir = str(tmp_path / "entry")
+    first = ColumnarDatasetWriter(dataset_dir, shard_format="npz", replace=False)
+    second = ColumnarDatasetWriter(dataset_dir, shard_format="npz", replace=False)
+    first.append("farmers", make_frames(1)["farmers"])
+    second.append("farmers", make_frames(2)["farmers"])
+    first.close()
+    assert_same_frames(second.close(), make_frames(1))
+    assert os.listdir(tmp_path) == ["entry"] # The second writer's shards are gone
+
+def test_writer_losing_the_publish_race_returns_the_winner(tmp_path, monkeypatch):
+    # The other writer publishes between this writer's check for an existing entry and its rename
+    dataset_dir = str(tmp_path / "entry")
+    winner = ColumnarDatasetWriter(dataset_dir, shard_format="npz", replace=False)
+    loser = ColumnarDatasetWriter(dataset_dir, shard_format="npz", replace=False)
+    winner.append("farmers", make_frames(1)["farmers"])
+    loser.append("farmers", make_frames(2)["farmers"])
+    real_replace = os.replace
+    def replace_after_winner(src, dst):
+        if src == loser._tmp_dir:
+            monkeypatch.setattr(columnar_dataset.os, "replace", real_replace)
+            winner.close()
+        real_replace(src, dst)
+    monkeypatch.setattr(columnar_dataset.os, "replace", replace_after_winner)
+    assert_same_frames(loser.close(), make_frames(1))
+    assert os.listdir(tmp_path) == ["entry"]
+
+def test_eviction_skips_entries_still_being_written(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    writer = ColumnarDatasetWriter(os.path.join(cache_dir, "pending"), shard_format="npz", replace=False)
+    writer.append("farmers", make_frames(1)["farmers"])
+    real_replace = os.replace
+    def evict_before_publishing(src, dst):
+        # The writer's directory already holds its manifest; another process evicts everything it can
+        cache = InputCache(cache_dir, max_size_bytes=0)
+        assert cache.entries() == []
+        cache.evict()
+        real_replace(src, dst)
+    monkeypatch.setattr(columnar_dataset.os, "replace", evict_before_publishing)
+    assert_same_frames(writer.close(), make_frames(1))
+    assert [key for key, _, _ in InputCache(cache_dir).entries()] == ["pending"]
+
+def put_when_ready(cache_dir, key, seed, barrier, results):
+    frames = make_frames(seed, num_rows=20_000)
+    barrier.wait()
+    dataset = InputCache(cache_dir).put(key, frames)
+    results.put(dataset.read_table("farmers")["agent_id"].iloc[0])
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs the fork start method")
+def test_concurrent_puts_of_one_key_share_the_first_entry(tmp_path):
+    context = multiprocessing.get_context("fork")
+    cache_dir = str(tmp_path / "cache")
+    for attempt in range(5):
+        key = f"key{attempt}"
+        barrier, results = context.Barrier(2), context.Queue()
+        workers = [context.Process(target=put_when_ready, args=(cache_dir, key, seed, barrier, results)) for seed in (1, 2)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=60)
+        assert [worker.exitcode for worker in workers] == [0, 0]
+        first_ids = {results.get(timeout=10), results.get(timeout=10)}
+        # Both writers got the one published entry, whichever won
+        assert len(first_ids) == 1
+        assert InputCache(cache_dir).get(key).read_table("farmers")["agent_id"].iloc[0] in first_ids
+    assert sorted(os.listdir(cache_dir)) == [f"key{attempt}" for attempt in range(5)]
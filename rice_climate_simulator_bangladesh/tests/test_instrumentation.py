@@ -0,0 +1,129 @@
+import json
+import os
+import re
+
+import pytest
+
+from simulation_core import instrumentation
+from simulation_core.engine import SimulationEngine
+from simulation_core.instrumentation import _NULL_PHASE, PHASES, StepInstrumentation
+from utils.event_log import EventType
+
+SAMPLE_LINE = re.compile(r'^(rice_sim_[a-z_]+)(\{[a-z]+="[a-z_]+"\})? (-?[0-9.]+(e[+-][0-9]+)?)$')
+
+def read_metrics(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+def parse_prometheus(path):
+    """{metric name: (type, {labels: value})}, checking that every sample follows its HELP and TYPE lines."""
+    metrics, name = {}, None
+    with open(path) as f:
+        lines = f.read().splitlines()
+    for line in lines:
+        if line.startswith("# HELP "):
+            name = line.split()[2]
+            assert name not in metrics, f"{name} exported twice"
+        elif line.startswith("# TYPE "):
+            _, _, type_name, kind = line.split()
+            assert type_name == name and kind in ("gauge", "counter")
+            metrics[name] = (kind, {})
+        else:
+            match = SAMPLE_LINE.match(line)
+            assert match and match.group(1) == name, line
+            metrics[name][1][match.group(2) or ""] = float(match.group(3))
+    return metrics
+
+def test_phase_times_and_counters_are_exported(tmp_path, monkeypatch):
+    clock = iter([0.0, # Step start
+                  1.0, 1.5, # climate
+                  2.0, 4.0, # decisions
+                  5.0, 5.25, # climate again
+                  10.0]) # Step end
+    monkeypatch.setattr(instrumentation.time, "perf_counter", lambda: next(clock))
+    metrics_path, prometheus_path = str(tmp_path / "metrics.jsonl"), str(tmp_path / "metrics.prom")
+    instrumented = StepInstrumentation(enabled=True, metrics_path=metrics_path, prometheus_path=prometheus_path)
+    instrumented.begin_step(0)
+    for name in ("climate", "decisions", "climate"):
+        with instrumented.phase(name):
+            pass
+    instrumented.count("farmers_stepped", 3)
+    instrumented.count("farmers_stepped", 2)
+    instrumented.end_step({"event_counts": {EventType.PLANTED: 4, "custom": 1}, "production_t": 12.5})
+    instrumented.close()
+
+    [metrics] = read_metrics(metrics_path)
+    assert metrics["step"] == 1 and metrics["wall_s"] == 10.0
+    assert metrics["phases_s"] == {"climate": 0.75, "decisions": 2.0}
+    assert metrics["counters"] == {"farmers_stepped": 5, "planted": 4, "custom": 1}
+    assert metrics["production_t"] == 12.5
+
+    exported = parse_prometheus(prometheus_path)
+    assert not os.path.exists(f"{prometheus_path}.tmp")
+    assert exported["rice_sim_steps_completed"] == ("gauge", {"": 1.0})
+    assert exported["rice_sim_phase_seconds"] == ("gauge", {'{phase="climate"}': 0.75, '{phase="decisions"}': 2.0})
+    assert exported["rice_sim_count_total"][0] == "counter"
+    assert exported["rice_sim_count_total"][1]['{name="farmers_stepped"}'] == 5.0
+    assert exported["rice_sim_production_tonnes"] == ("gauge", {"": 12.5})
+
+def test_engine_run_writes_well_formed_metrics(make_config):
+    config = make_config(max_steps=3, instrumentation_config={"enabled": True, "allocation_sample_interval": 2},
+                         reporting_options={"save_agent_data_interval": 0, "save_plot_data_interval": 0})
+    engine = SimulationEngine(config)
+    engine.run_simulation()
+    lines = read_metrics(os.path.join(engine.output_directory, "metrics.jsonl"))
+    assert [metrics["step"] for metrics in lines] == [1, 2, 3]
+    for metrics in lines:
+        assert set(metrics["phases_s"]) <= set(PHASES)
+        assert {"climate", "decisions", "crop_growth", "aggregation"} <= set(metrics["phases_s"])
+        assert all(seconds >= 0 for seconds in metrics["phases_s"].values())
+        assert sum(metrics["phases_s"].values()) <= metrics["wall_s"]
+        assert metrics["counters"]["farmers_stepped"] == len(engine.farmer_agents)
+    # Allocations are traced on steps 0 and 2 only
+    assert ["alloc_peak_bytes" in metrics for metrics in lines] == [True, False, True]
+
+    exported = parse_prometheus(os.path.join(engine.output_directory, "metrics.prom"))
+    assert exported["rice_sim_steps_completed"][1] == {"": 3.0}
+    totals = exported["rice_sim_phase_seconds_total"]
+    assert totals[0] == "counter"
+    assert totals[1]['{phase="decisions"}'] == pytest.approx(sum(metrics["phases_s"]["decisions"] for metrics in lines))
+    assert exported["rice_sim_count_total"][1]['{name="farmers_stepped"}'] == 3 * len(engine.farmer_agents)
+
+def test_resumed_run_replaces_the_metrics_of_rerun_steps(make_config):
+    config = make_config(max_steps=5, instrumentation_config={"enabled": True},
+                         reporting_options={"checkpoint_interval": 3, "save_agent_data_interval": 0,
+                                            "save_plot_data_interval": 0})
+    engine = SimulationEngine(config)
+    engine.run_simulation()
+    metrics_path = os.path.join(engine.output_directory, "metrics.jsonl")
+    first_run = read_metrics(metrics_path)
+    assert [metrics["step"] for metrics in first_run] == [1, 2, 3, 4, 5]
+
+    resumed = SimulationEngine.from_checkpoint(engine.checkpoint_path, config)
+    assert resumed.current_step == 3
+    resumed.run_simulation()
+    second_run = read_metrics(metrics_path)
+    assert [metrics["step"] for metrics in second_run] == [1, 2, 3, 4, 5]
+    assert second_run[:3] == first_run[:3] # Kept from the interrupted run
+    assert second_run[3:] != first_run[3:] # Measured again
+
+def test_disabled_instrumentation_does_nothing(make_config, tmp_path):
+    disabled = StepInstrumentation(metrics_path=str(tmp_path / "metrics.jsonl"), prometheus_path=str(tmp_path / "metrics.prom"))
+    disabled.begin_step(0)
+    assert disabled.phase("climate") is _NULL_PHASE and disabled.phase("anything") is _NULL_PHASE
+    with disabled.phase("climate"):
+        disabled.count("farmers_stepped")
+    disabled.end_step({"production_t": 1.0})
+    assert disabled.counters == {} and disabled.phase_seconds == {} and disabled.last_metrics is None
+    assert os.listdir(tmp_path) == []
+
+    engine = SimulationEngine(make_config(max_steps=1))
+    assert not engine.instrumentation.enabled
+    engine.run_step()
+    assert engine.instrumentation.phase("decisions") is _NULL_PHASE
+    assert not os.path.exists(os.path.join(engine.output_directory, "metrics.jsonl"))
+    engine.close()
+
+def test_unknown_profiler_is_rejected():
+    with pytest.raises(ValueError, match="Unknown profiler 'perf'"):
+        StepInstrumentation(enabled=True, profiler="perf")
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from utils.online_stats import OnlineSummary, P2Quantile, RunningMoments
+
+def test_running_moments_match_numpy():
+    # A large offset, where the naive sum-of-squares variance loses every digit
+    values = 1e9 + np.random.default_rng(4).normal(0.0, 2.0, 5000)
+    moments = RunningMoments()
+    for value in values:
+        moments.add(value)
+    assert moments.count == len(values)
+    assert moments.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert moments.variance == pytest.approx(values.var(ddof=1), rel=1e-6)
+    assert moments.std == pytest.approx(values.std(ddof=1), rel=1e-6)
+    assert (moments.min, moments.max) == (values.min(), values.max())
+
+def test_running_moments_of_fewer_than_two_values():
+    moments = RunningMoments()
+    assert moments.count == 0 and np.isnan(moments.variance) and np.isnan(moments.std)
+    moments.add(3.0)
+    assert moments.mean == 3.0 and np.isnan(moments.std)
+
+@pytest.mark.parametrize("p", [0.05, 0.25, 0.5, 0.9, 0.99])
+def test_p2_quantile_tracks_numpy_quantile(p):
+    rng = np.random.default_rng(8)
+    values = np.concatenate([rng.lognormal(0.0, 0.5, 6000), rng.normal(10.0, 1.0, 4000)]) # Skewed and bimodal
+    rng.shuffle(values)
+    estimator = P2Quantile(p)
+    for value in values:
+        estimator.add(value)
+    assert estimator.count == len(values)
+    # The estimate lies within one percentile rank of the exact quantile
+    assert np.quantile(values, max(p - 0.01, 0.0)) <= estimator.value <= np.quantile(values, min(p + 0.01, 1.0))
+
+def test_p2_quantile_is_exact_for_the_first_values():
+    values = [4.0, 1.0, 3.0, 9.0]
+    for p in (0.0, 0.3, 0.5, 1.0):
+        estimator = P2Quantile(p)
+        assert np.isnan(estimator.value)
+        for count, value in enumerate(values, 1):
+            estimator.add(value)
+            assert estimator.value == pytest.approx(np.quantile(values[:count], p))
+    with pytest.raises(ValueError, match="Quantile must be in"):
+        P2Quantile(1.5)
+
+def test_online_summary_keys():
+    summary = OnlineSummary((0.05, 0.5, 0.95))
+    assert np.isnan(summary.summary()["mean"])
+    for value in range(1, 101):
+        summary.add(float(value))
+    result = summary.summary()
+    assert list(result) == ["count", "mean", "std", "min", "max", "q05", "q50", "q95"]
+    assert (result["count"], result["mean"], result["min"], result["max"]) == (100, 50.5, 1.0, 100.0)
+    assert result["q50"] == pytest.approx(50.5, abs=1.0)
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from agriculture.plot_store import PlotStateStore
+from agriculture.variety_catalog import DEFAULT_VARIETY_CATALOG
+from geography.spatial_units import SpatialScale
+from reporting_analytics.regional_aggregates import (CAPITAL_BIN_EDGES, RegionalAggregator, capital_bins,
+                                                     combine_snapshots, histogram_quantiles)
+from simulation_core.engine import SimulationEngine
+from simulation_core.sharded_engine import ShardedSimulationEngine
+
+SCALES = (SpatialScale.UPAZILA, SpatialScale.DISTRICT)
+
+def assert_same_regional_state(actual, expected):
+    assert actual.keys() == expected.keys()
+    for scale in expected:
+        assert actual[scale].keys() == expected[scale].keys()
+        for name, values in expected[scale].items():
+            # Incremental area and capital sums differ from a rebuild by rounding only
+            np.testing.assert_allclose(actual[scale][name], values, rtol=1e-9, atol=1e-6, err_msg=f"{scale.value} {name}")
+
+def rebuilt_state(engine):
+    aggregator = engine.regional_aggregator
+    fresh = RegionalAggregator(aggregator.region_labels, engine.farmer_unit_codes(), engine.plot_unit_codes(),
+                               engine.plot_owner_indices(), engine.variety_catalog,
+                               poverty_line_bdt=aggregator.poverty_line_bdt, scales=aggregator.scales)
+    fresh.rebuild(engine.plot_store, np.array([farmer.capital_bdt for farmer in engine.farmer_agents]))
+    return fresh.snapshot()
+
+@pytest.mark.parametrize("scheduling_mode", ["step", "event"])
+def test_incremental_updates_match_a_rebuild_every_step(make_config, scheduling_mode):
+    engine = SimulationEngine(make_config(agent_config={"scheduling_mode": scheduling_mode},
+                                          aggregation_config={"enabled": True, "output_file": None}))
+    cropped_area = []
+    for _ in range(12):
+        engine.run_step()
+        regional = engine.last_step_aggregates["regional"]
+        assert_same_regional_state(regional, rebuilt_state(engine))
+        cropped_area.append(regional[SpatialScale.DIVISION]["area_ha"].sum())
+    # Crops were planted and harvested after the first step, so the updates did something
+    assert len(np.unique(np.round(cropped_area, 6))) > 2
+    production = engine.regional_kpi_table(SpatialScale.DIVISION)["production_t"]
+    assert production.sum() > 0
+    engine.close()
+
+def test_histogram_quantiles_match_numpy_within_a_bin():
+    rng = np.random.default_rng(11)
+    regions = [rng.lognormal(11.0, 1.0, 5000), rng.uniform(5e3, 5e5, 800), rng.lognormal(9.0, 0.3, 40), np.empty(0)]
+    histogram = np.zeros((len(regions), len(CAPITAL_BIN_EDGES) + 1), dtype=np.int64)
+    for i, capital in enumerate(regions):
+        np.add.at(histogram[i], capital_bins(capital), 1)
+    quantiles = [0.1, 0.25, 0.5, 0.9, 0.99]
+    estimates = histogram_quantiles(histogram, quantiles)
+    for capital, estimate in zip(regions[:-1], estimates):
+        exact = np.quantile(capital, quantiles)
+        bins = capital_bins(exact)
+        bin_width = CAPITAL_BIN_EDGES[bins] - CAPITAL_BIN_EDGES[bins - 1]
+        assert np.all(np.abs(estimate - exact) <= bin_width), (estimate, exact)
+    assert np.isnan(estimates[-1]).all()
+
+def test_shard_snapshots_sum_to_the_whole():
+    rng = np.random.default_rng(5)
+    num_farmers, num_plots = 300, 700
+    labels = {SpatialScale.UPAZILA: [f"u{i}" for i in range(12)], SpatialScale.DISTRICT: [f"d{i}" for i in range(3)]}
+    upazila = rng.integers(-1, 12, num_farmers) # Some farmers outside every known unit
+    farmer_codes = {SpatialScale.UPAZILA: upazila, SpatialScale.DISTRICT: np.where(upazila >= 0, upazila % 3, -1)}
+    owners = rng.integers(num_farmers, size=num_plots)
+    store = PlotStateStore(capacity=num_plots)
+    store.allocate(num_plots)
+    store.size_ha[:] = rng.uniform(0.1, 2.0, num_plots)
+    store.crop_variety_code[:] = rng.integers(-1, len(DEFAULT_VARIETY_CATALOG), num_plots)
+    store.harvest_t[:] = rng.uniform(0.0, 5.0, num_plots)
+    capital = rng.lognormal(10.5, 1.0, num_farmers)
+
+    def aggregator_of(farmers, plots):
+        """An aggregator over some farmers and their plots, with local farmer indices as a shard has."""
+        local = np.full(num_farmers, -1)
+        local[farmers] = np.arange(len(farmers))
+        shard_store = PlotStateStore(capacity=len(plots))
+        shard_store.allocate(len(plots))
+        for name in PlotStateStore.COLUMNS:
+            shard_store.column(name)[:] = store.column(name)[plots]
+        aggregator = RegionalAggregator(labels, {scale: codes[farmers] for scale, codes in farmer_codes.items()},
+                                        {scale: codes[owners[plots]] for scale, codes in farmer_codes.items()},
+                                        local[owners[plots]], DEFAULT_VARIETY_CATALOG, scales=SCALES)
+        aggregator.rebuild(shard_store, capital[farmers])
+        return aggregator
+
+    whole = aggregator_of(np.arange(num_farmers), np.arange(num_plots))
+    shard_of_farmer = rng.integers(3, size=num_farmers)
+    shards = [aggregator_of(np.flatnonzero(shard_of_farmer == shard), np.flatnonzero(shard_of_farmer[owners] == shard))
+              for shard in range(3)]
+    snapshots = [shard.snapshot() for shard in shards]
+    # As if one shard's catalog had gained a variety not yet planted: the others' area arrays are padded
+    for state in snapshots[1].values():
+        state["area_ha"] = np.pad(state["area_ha"], ((0, 0), (0, 1)))
+    combined = combine_snapshots(snapshots)
+    expected = whole.snapshot()
+    for state in expected.values():
+        state["area_ha"] = np.pad(state["area_ha"], ((0, 0), (0, 1)))
+    assert_same_regional_state(combined, expected)
+
+def test_sharded_run_indicators_match_serial_run(make_config):
+    config = make_config(max_steps=8, aggregation_config={"enabled": True, "output_file": None},
+                         reporting_options={"save_agent_data_interval": 0, "save_plot_data_interval": 0})
+    serial = SimulationEngine(config)
+    serial.run_simulation()
+    with ShardedSimulationEngine(config, num_workers=2) as sharded:
+        sharded.run_simulation()
+        assert_same_regional_state(sharded.last_step_aggregates["regional"], serial.last_step_aggregates["regional"])
+        pd.testing.assert_frame_equal(sharded.regional_kpi_table(), serial.regional_kpi_table(), rtol=1e-9)
@@ -0,0 +1,92 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from data_management import columnar_dataset
+from reporting_analytics.results_recorder import ResultsReader, ResultsRecorder
+from simulation_core.engine import SimulationEngine
+
+@pytest.fixture
+def engine(make_config):
+    """A small engine, stepped once, to take snapshots of."""
+    engine = SimulationEngine(make_config(reporting_options={"save_agent_data_interval": 0, "save_plot_data_interval": 0}))
+    engine.run_step()
+    yield engine
+    engine.close()
+
+def test_run_records_snapshots_at_intervals_and_the_final_step(make_config, monkeypatch):
+    config = make_config(max_steps=10, reporting_options={"save_agent_data_interval": 3, "save_plot_data_interval": 4,
+                                                          "results_format": "npz", "results_buffer_rows": 500})
+    engine = SimulationEngine(config)
+    engine.run_simulation()
+    reader = ResultsReader(engine.output_directory)
+    assert reader.steps("agents") == [3, 6, 9, 10]
+    assert reader.steps("plots") == [4, 8, 10]
+    agents = reader.read("agents")
+    assert len(agents) == 4 * len(engine.farmer_agents)
+    final = agents[agents["step"] == 10]
+    np.testing.assert_array_equal(final["capital_bdt"], [farmer.capital_bdt for farmer in engine.farmer_agents])
+    assert final["agent_id"].astype(str).tolist() == [farmer.agent_id for farmer in engine.farmer_agents]
+    # Small buffers: several shards per table, each listing the steps it holds
+    shards = reader.parts[0].tables["plots"]["shards"]
+    assert len(shards) > 1 and sorted(step for shard in shards for step in shard["steps"]) == [4, 8, 10]
+
+    # A column- and step-selective read only opens the shards holding the steps
+    opened = []
+    real_load = np.load
+    monkeypatch.setattr(columnar_dataset.np, "load", lambda path, **kwargs: opened.append(path) or real_load(path, **kwargs))
+    plots = reader.read("plots", columns=["harvest_t", "crop_variety_code"], steps=[8])
+    assert list(plots.columns) == ["step", "harvest_t", "crop_variety_code"]
+    assert (plots["step"] == 8).all() and len(plots) == engine.plot_store.size
+    assert len(opened) == sum(8 in shard["steps"] for shard in shards) < len(shards)
+    assert reader.read("plots", columns=["harvest_t"], steps=[5]).columns.tolist() == ["step", "harvest_t"]
+    engine.close()
+
+def test_resume_drops_shards_past_the_start_step(engine, tmp_path):
+    directory = str(tmp_path / "results")
+    recorder = ResultsRecorder(directory, shard_format="npz", buffer_rows=1) # One shard per snapshot
+    for step in range(1, 7):
+        recorder.record_agents(engine, step)
+    recorder.close()
+    assert ResultsReader(directory).steps("agents") == [1, 2, 3, 4, 5, 6]
+
+    # Resumed from a checkpoint of step 4: steps 5 and 6 are recorded again
+    farmer = engine.farmer_agents[0]
+    farmer.capital_bdt += 1000.0
+    resumed = ResultsRecorder(directory, shard_format="npz", buffer_rows=1, start_step=4)
+    for step in (5, 6, 7):
+        resumed.record_agents(engine, step)
+    resumed.close()
+    agents = ResultsReader(directory).read("agents", columns=["agent_id", "capital_bdt"])
+    assert sorted(set(agents["step"])) == [1, 2, 3, 4, 5, 6, 7]
+    assert len(agents) == 7 * len(engine.farmer_agents)
+    first = agents[agents["agent_id"] == farmer.agent_id].set_index("step")["capital_bdt"]
+    assert (first.loc[5:] == farmer.capital_bdt).all() and (first.loc[:4] == farmer.capital_bdt - 1000.0).all()
+
+    # A run from step 0 starts over, and another shard format cannot be appended to
+    ResultsRecorder(directory, shard_format="npz", buffer_rows=1).close()
+    assert ResultsReader(directory).steps("agents") == []
+    recorder = ResultsRecorder(directory, shard_format="npz", buffer_rows=1)
+    recorder.record_agents(engine, 1)
+    recorder.close()
+    manifest_path = os.path.join(directory, "manifest.json")
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    with open(manifest_path, "w") as f:
+        json.dump(dict(manifest, shard_format="parquet"), f)
+    with pytest.raises(ValueError, match="cannot append npz shards"):
+        ResultsRecorder(directory, shard_format="npz", start_step=1)
+
+def test_writer_errors_are_raised_on_the_recording_thread(engine, tmp_path, monkeypatch):
+    recorder = ResultsRecorder(str(tmp_path / "results"), shard_format="npz", buffer_rows=1)
+    def fail(table, frame, steps):
+        raise OSError("disk full")
+    monkeypatch.setattr(recorder, "_write_shard", fail)
+    recorder.record_agents(engine, 1) # Handed to the writer thread, which fails
+    with pytest.raises(RuntimeError, match="Writing results to") as excinfo:
+        recorder.flush()
+    assert isinstance(excinfo.value.__cause__, OSError)
+    recorder.close() # The error was reported once; the writer still stops
+    assert not recorder._writer.is_alive()
@@ -0,0 +1,83 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from simulation_core.sensitivity import (POINTS_FILE, MorrisIndices, Parameter, SensitivityStudy, SobolIndices,
+                                         morris_design, saltelli_design)
+
+RANGES = {"synthetic_data_config.num_plots_per_farmer_avg": (1, 4), "agent_config.salinity_threshold_ds_m": (2.0, 8.0)}
+OUTPUTS = ("total_production_t", "mean_capital_bdt")
+
+def ishigami(x, a=7.0, b=0.1):
+    return np.sin(x[:, 0]) + a * np.sin(x[:, 1]) ** 2 + b * x[:, 2] ** 4 * np.sin(x[:, 0])
+
+def test_sobol_indices_of_the_ishigami_function():
+    parameters = [Parameter(f"x{i}", -np.pi, np.pi) for i in range(3)]
+    design = saltelli_design(3, 2 ** 13, seed=3)
+    outputs = ishigami(np.column_stack([parameter.scale(design[:, i]) for i, parameter in enumerate(parameters)]))
+    indices = SobolIndices(3)
+    group_size = 3 + 2
+    for start in range(0, len(design), group_size):
+        indices.add_group(design[start:start + group_size], outputs[start:start + group_size])
+    results = indices.results(["x1", "x2", "x3"])
+    # Analytic values for a = 7, b = 0.1
+    np.testing.assert_allclose([results[name]["S1"] for name in ("x1", "x2", "x3")], [0.3139, 0.4424, 0.0], atol=0.04)
+    np.testing.assert_allclose([results[name]["ST"] for name in ("x1", "x2", "x3")], [0.5576, 0.4424, 0.2437], atol=0.04)
+    assert results["x1"]["num_samples"] == 2 ** 13
+
+def test_morris_effects_of_a_linear_function_are_its_slopes():
+    slopes = np.array([2.0, -3.0, 0.0])
+    design = morris_design(3, 10, rng=np.random.default_rng(1))
+    outputs = design @ slopes
+    indices = MorrisIndices(3)
+    for start in range(0, len(design), 3 + 1):
+        indices.add_group(design[start:start + 4], outputs[start:start + 4])
+    results = indices.results(["a", "b", "c"])
+    np.testing.assert_allclose([results[name]["mu"] for name in "abc"], slopes)
+    np.testing.assert_allclose([results[name]["mu_star"] for name in "abc"], np.abs(slopes))
+    np.testing.assert_allclose([results[name]["sigma"] for name in "abc"], 0.0, atol=1e-9)
+    assert all(results[name]["num_effects"] == 10 for name in "abc")
+
+def make_study(config, study_dir, **kwargs):
+    return SensitivityStudy(RANGES, config, **dict(dict(method="morris", num_samples=2, study_dir=study_dir,
+                                                        num_workers=1, outputs=OUTPUTS), **kwargs))
+
+def point_rows(study_dir):
+    with open(os.path.join(study_dir, POINTS_FILE)) as f:
+        return [json.loads(line)["row"] for line in f]
+
+def test_interrupted_study_resumes_without_rerunning_completed_points(make_config, tmp_path):
+    config = make_config(max_steps=3)
+    complete = make_study(config, str(tmp_path / "complete")).run()
+
+    study_dir = str(tmp_path / "study")
+    study = make_study(config, study_dir)
+    assert study.num_runs == 2 * (len(RANGES) + 1)
+    study.run()
+    # Interrupted after four runs, while the fifth was being written
+    points_path = os.path.join(study_dir, POINTS_FILE)
+    with open(points_path) as f:
+        lines = f.readlines()
+    with open(points_path, "w") as f:
+        f.writelines(lines[:4])
+        f.write(lines[4][:len(lines[4]) // 2])
+
+    resumed = make_study(config, study_dir)
+    indices = resumed.run()
+    assert point_rows(study_dir) == [0, 1, 2, 3, 4, 5] # The two missing runs only, on a line of their own
+    assert indices == complete
+    # Nothing left to run
+    assert make_study(config, study_dir).run() == complete
+    assert len(point_rows(study_dir)) == 6
+
+def test_a_study_dir_only_resumes_the_same_study(make_config, tmp_path):
+    study_dir = str(tmp_path / "study")
+    config = make_config(max_steps=3)
+    design = make_study(config, study_dir).design
+    np.testing.assert_array_equal(make_study(config, study_dir).design, design)
+    for other_config, kwargs in [(config, {"num_samples": 3}), (config, {"method": "sobol"}),
+                                 (config, {"outputs": OUTPUTS[:1]}), (make_config(max_steps=4), {})]:
+        with pytest.raises(ValueError, match="holds a study with a different design or config"):
+            make_study(other_config, study_dir, **kwargs)
@@ -0,0 +1,75 @@
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agriculture.plot_store import PlotStateStore
+from simulation_core.engine import SimulationEngine
+from simulation_core.sharded_engine import ShardedSimulationEngine, partition_by_admin_unit
+from utils.logging_setup import ROOT_LOGGER_NAME
+
+def farmer_table(units):
+    return pd.DataFrame({"agent_id": [f"F{i}" for i in range(len(units))], "location_admin_unit_id": units})
+
+def test_partition_keeps_units_whole_and_plots_with_owners():
+    farmers = farmer_table(["u1", "u2", "u1", "u3", "u2", "u1", "u4"])
+    plots = pd.DataFrame({"owner_agent_id": ["F0", "F1", "F1", "F3", "F6", "F2", "F5", "F4"]})
+    shards = partition_by_admin_unit(farmers, plots, 3)
+    assert len(shards) == 3
+    farmer_rows = np.concatenate([rows for rows, _ in shards])
+    plot_rows = np.concatenate([rows for _, rows in shards])
+    assert sorted(farmer_rows) == list(range(len(farmers)))
+    assert sorted(plot_rows) == list(range(len(plots)))
+    for rows, owned in shards:
+        assert list(rows) == sorted(rows) and list(owned) == sorted(owned)
+        units = set(farmers["location_admin_unit_id"].iloc[rows])
+        assert set(np.flatnonzero(farmers["location_admin_unit_id"].isin(units))) == set(rows)
+        assert set(plots["owner_agent_id"].iloc[owned]) <= set(farmers["agent_id"].iloc[rows])
+    # u1 (3 farmers + 3 plots) is the heaviest unit and gets a shard of its own
+    assert [list(rows) for rows, _ in shards if 0 in rows] == [[0, 2, 5]]
+
+def test_partition_sends_plots_of_unknown_owners_with_the_first_farmer():
+    farmers = farmer_table(["u1", "u2", "u2"])
+    plots = pd.DataFrame({"owner_agent_id": ["F1", "nobody", "F0", "F2", None]})
+    shards = partition_by_admin_unit(farmers, plots, 2)
+    shard_of_first = next(owned for rows, owned in shards if 0 in rows)
+    assert list(shard_of_first) == [1, 2, 4]
+
+def test_partition_never_returns_empty_shards():
+    farmers = farmer_table(["u1", "u1", "u2"])
+    plots = pd.DataFrame({"owner_agent_id": ["F0", "F2"]})
+    shards = partition_by_admin_unit(farmers, plots, 8)
+    assert len(shards) == 2
+    assert all(len(rows) for rows, _ in shards)
+    assert partition_by_admin_unit(farmers.iloc[:0], plots.iloc[:0], 4) == []
+
+@pytest.mark.parametrize("num_workers", [2, 3])
+def test_sharded_run_matches_serial_run(make_config, num_workers):
+    config = make_config(max_steps=10, reporting_options={"save_agent_data_interval": 0, "save_plot_data_interval": 0})
+    serial = SimulationEngine(config)
+    serial.run_simulation()
+    with ShardedSimulationEngine(config, num_workers=num_workers) as sharded:
+        sharded.run_simulation()
+        assert len(sharded.farmer_rows_by_shard) == num_workers
+        np.testing.assert_array_equal(sharded.gather_farmer_column("agent_id"),
+                                      [farmer.agent_id for farmer in serial.farmer_agents])
+        np.testing.assert_array_equal(sharded.gather_farmer_column("capital_bdt"),
+                                      [farmer.capital_bdt for farmer in serial.farmer_agents])
+        for name in PlotStateStore.COLUMNS:
+            np.testing.assert_array_equal(sharded.gather_plot_column(name), serial.plot_store.column(name), err_msg=name)
+        assert sharded.last_step_aggregates["production_t"] == pytest.approx(serial.last_step_aggregates["production_t"])
+
+def test_checkpoints_are_refused(make_config, tmp_path, caplog):
+    config = make_config(max_steps=2, reporting_options={"checkpoint_interval": 1, "save_agent_data_interval": 0,
+                                                         "save_plot_data_interval": 0})
+    with caplog.at_level(logging.WARNING, logger=ROOT_LOGGER_NAME):
+        sharded = ShardedSimulationEngine(config, num_workers=2)
+    with sharded:
+        assert "ignoring checkpoint_interval" in caplog.text and sharded.checkpoint_interval == 0
+        sharded.run_simulation()
+        assert not os.path.exists(sharded.checkpoint_path)
+        with pytest.raises(RuntimeError, match="Cannot save a checkpoint to .*Run SimulationEngine"):
+            sharded.save_checkpoint(str(tmp_path / "checkpoint.npz"))
+        assert not os.path.exists(tmp_path / "checkpoint.npz")
@@ -0,0 +1,57 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from utils.shared_arrays import SharedArrayBlock
+
+ARRAYS = {
+    "ids": np.array([b"F0", b"F12", b"F7"]),
+    "capital": np.array([1.5, -2.0, 3e6]),
+    "codes": np.arange(7, dtype=np.int8), # Odd sizes: the next array starts on an aligned offset
+    "grid": np.arange(12, dtype=np.float32).reshape(3, 4),
+    "empty": np.empty(0, dtype=np.int64),
+}
+
+def _read_in_child(spec, queue):
+    block = SharedArrayBlock.attach(spec)
+    queue.put({name: values.tolist() for name, values in block.arrays.items()})
+    block.close()
+
+def assert_same_arrays(actual):
+    assert list(actual) == list(ARRAYS)
+    for name, expected in ARRAYS.items():
+        np.testing.assert_array_equal(actual[name], expected, err_msg=name)
+        assert actual[name].dtype == expected.dtype and actual[name].shape == expected.shape
+
+def test_create_and_attach_round_trip():
+    block = SharedArrayBlock.create(ARRAYS)
+    try:
+        assert block.owner and block.nbytes >= sum(values.nbytes for values in ARRAYS.values())
+        assert_same_arrays(block.arrays)
+        assert all(offset % 64 == 0 for _, _, _, offset in block.layout)
+        attached = SharedArrayBlock.attach(block.spec)
+        assert not attached.owner
+        assert_same_arrays(attached.arrays)
+        with pytest.raises(ValueError, match="read-only"):
+            attached.arrays["capital"][0] = 0.0
+        attached.close()
+
+        # Another process sees the same values through the spec alone
+        context = multiprocessing.get_context("fork")
+        queue = context.Queue()
+        child = context.Process(target=_read_in_child, args=(block.spec, queue))
+        child.start()
+        received = queue.get(timeout=30)
+        child.join(timeout=30)
+        assert child.exitcode == 0
+        assert_same_arrays({name: np.array(values, dtype=ARRAYS[name].dtype).reshape(ARRAYS[name].shape)
+                            for name, values in received.items()})
+    finally:
+        block.unlink()
+    with pytest.raises(FileNotFoundError):
+        SharedArrayBlock.attach(block.spec)
+
+def test_object_arrays_are_rejected():
+    with pytest.raises(TypeError, match="'ids' has an object dtype"):
+        SharedArrayBlock.create({"ids": np.array(["F0", None], dtype=object)})
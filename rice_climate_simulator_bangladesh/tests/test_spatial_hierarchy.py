@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from geography.spatial_hierarchy import ADMIN_LEVELS, SpatialHierarchy, parse_scale
+from geography.spatial_units import SpatialScale
+
+# Children are listed before their parents in places, so table order is not tour order
+UNITS = pd.DataFrame([
+    ("BD", "Bangladesh", "National", "", ""),
+    ("dhaka", "Dhaka", "Division", "BD", "aez1"),
+    ("khulna", "Khulna", "Division", "BD", "aez2"),
+    ("upz_a", "Upazila A", "Upazila", "dist_x", ""),
+    ("dist_x", "District X", "District", "dhaka", ""),
+    ("dist_y", "District Y", "District", "dhaka", "aez3"), # Own AEZ inside its division's
+    ("dist_z", "District Z", "District", "khulna", ""),
+    ("upz_b", "Upazila B", "Upazila", "dist_y", ""),
+    ("upz_c", "Upazila C", "Upazila", "dist_x", ""),
+    ("upz_d", "Upazila D", "Upazila", "dist_z", ""),
+    ("vil_1", "Village 1", "Village", "upz_a", ""),
+], columns=["unit_id", "name", "scale", "parent_id", "aez_id"])
+
+@pytest.fixture
+def hierarchy():
+    return SpatialHierarchy.from_frame(UNITS)
+
+def path_to_root(unit_id):
+    parents = dict(zip(UNITS["unit_id"], UNITS["parent_id"]))
+    path = [unit_id]
+    while parents[path[-1]]:
+        path.append(parents[path[-1]])
+    return path
+
+def test_containment_matches_parent_links(hierarchy):
+    for unit_id in UNITS["unit_id"]:
+        ancestors = path_to_root(unit_id)
+        for container_id in UNITS["unit_id"]:
+            assert hierarchy.is_within(unit_id, container_id) == (container_id in ancestors), (unit_id, container_id)
+    assert hierarchy.ancestor("vil_1", SpatialScale.DIVISION) == "dhaka"
+    assert hierarchy.ancestor("upz_d", SpatialScale.UPAZILA) == "upz_d"
+    assert hierarchy.ancestor("dist_x", SpatialScale.UPAZILA) is None
+    assert hierarchy.depths[hierarchy.index("vil_1")] == 4
+
+def test_codes_follow_the_tour_and_ranges_are_consecutive(hierarchy):
+    assert hierarchy.labels(SpatialScale.DISTRICT) == ["dist_x", "dist_y", "dist_z"]
+    assert hierarchy.labels(SpatialScale.UPAZILA) == ["upz_a", "upz_c", "upz_b", "upz_d"]
+    assert hierarchy.code_range("dhaka", SpatialScale.UPAZILA) == (0, 3)
+    assert hierarchy.code_range("khulna", SpatialScale.UPAZILA) == (3, 4)
+    assert hierarchy.descendants("dhaka", SpatialScale.UPAZILA) == ["upz_a", "upz_c", "upz_b"]
+    assert hierarchy.descendants("BD", SpatialScale.DISTRICT) == ["dist_x", "dist_y", "dist_z"]
+    assert hierarchy.descendants("dist_y", SpatialScale.DISTRICT) == ["dist_y"]
+    assert hierarchy.descendants("upz_a", SpatialScale.DISTRICT) == []
+    # Every container's range holds exactly the units inside it
+    for container_id in UNITS["unit_id"]:
+        for scale in ADMIN_LEVELS:
+            inside = [unit_id for unit_id in hierarchy.labels(scale) if hierarchy.is_within(unit_id, container_id)]
+            assert hierarchy.descendants(container_id, scale) == inside
+
+def test_codes_of_entity_ids(hierarchy):
+    ids = ["upz_b", "unknown", None, "vil_1", "BD"]
+    assert hierarchy.codes(ids, SpatialScale.DISTRICT).tolist() == [1, -1, -1, 0, -1]
+    assert hierarchy.codes(ids, SpatialScale.UPAZILA).tolist() == [2, -1, -1, 0, -1]
+    categorical = pd.Series(ids * 2, dtype="category")
+    np.testing.assert_array_equal(hierarchy.codes(categorical, SpatialScale.DIVISION),
+                                  hierarchy.codes(ids * 2, SpatialScale.DIVISION))
+    codes = hierarchy.all_codes(np.array(ids, dtype=object))
+    assert set(codes) == set(ADMIN_LEVELS) | {SpatialScale.AEZ}
+    assert codes[SpatialScale.NATIONAL].tolist() == [0, -1, -1, 0, 0]
+
+def test_aez_is_own_or_inherited(hierarchy):
+    assert hierarchy.labels(SpatialScale.AEZ) == ["aez1", "aez3", "aez2"]
+    aez = dict(zip(["upz_a", "upz_b", "upz_c", "upz_d", "vil_1", "dist_y", "khulna", "BD"],
+                   hierarchy.codes(["upz_a", "upz_b", "upz_c", "upz_d", "vil_1", "dist_y", "khulna", "BD"], SpatialScale.AEZ)))
+    labels = hierarchy.labels(SpatialScale.AEZ)
+    assert {unit: labels[code] if code >= 0 else None for unit, code in aez.items()} == {
+        "upz_a": "aez1", "upz_b": "aez3", "upz_c": "aez1", "upz_d": "aez2", "vil_1": "aez1", "dist_y": "aez3",
+        "khulna": "aez2", "BD": None}
+    assert hierarchy.num_units(SpatialScale.AEZ) == 3
+
+def test_frame_round_trip(hierarchy, tmp_path):
+    frame = hierarchy.to_frame()
+    pd.testing.assert_frame_equal(frame, UNITS.astype(object), check_dtype=False)
+    path = tmp_path / "units.csv"
+    frame.to_csv(path, index=False)
+    rebuilt = SpatialHierarchy.from_csv(str(path))
+    pd.testing.assert_frame_equal(rebuilt.to_frame(), frame)
+    for name in ("tin", "tout", "level_codes", "aez_codes", "parents"):
+        np.testing.assert_array_equal(getattr(rebuilt, name), getattr(hierarchy, name), err_msg=name)
+
+@pytest.mark.parametrize("rows, message", [
+    ([("BD", "National", ""), ("a", "Division", "b"), ("b", "Division", "a")], "cycle"),
+    ([("BD", "National", ""), ("a", "Division", "BD"), ("a", "District", "BD")], "Duplicate unit ids"),
+    ([("BD", "National", ""), ("u", "Upazila", "BD"), ("d", "District", "u")], "is not below its parent"),
+    ([("BD", "National", ""), ("x", "District", "nowhere")], "Parent ids not in the unit table"),
+    ([("BD", "National", ""), ("z", "AgroEcologicalZone", "BD")], "is not an administrative level"),
+    ([("BD", "Planet", "")], "Unknown spatial scale"),
+])
+def test_invalid_unit_tables_are_rejected(rows, message):
+    table = pd.DataFrame(rows, columns=["unit_id", "scale", "parent_id"])
+    with pytest.raises(ValueError, match=message):
+        SpatialHierarchy.from_frame(table)
+    with pytest.raises(ValueError, match="missing columns"):
+        SpatialHierarchy.from_frame(table.drop(columns="parent_id"))
+
+def test_parse_scale_accepts_values_and_names():
+    assert parse_scale("Upazila") is parse_scale("upazila") is parse_scale(SpatialScale.UPAZILA) is SpatialScale.UPAZILA
+    assert parse_scale("AgroEcologicalZone") is parse_scale("aez") is SpatialScale.AEZ
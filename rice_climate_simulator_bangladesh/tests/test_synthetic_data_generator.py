@@ -0,0 +1,51 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from data_management.columnar import FRAME_COLUMNS
+from data_management.data_loaders import FARMER_RULES, MARKET_PRICE_RULES, PLOT_RULES, SOIL_RULES, WEATHER_RULES
+from data_management.synthetic_data_generator import SyntheticDataGenerator
+from data_management.validation import validate_frame
+
+TABLE_RULES = {"farmers": FARMER_RULES, "farm_plots": {**PLOT_RULES, **SOIL_RULES},
+               "historical_weather": WEATHER_RULES, "market_prices": MARKET_PRICE_RULES}
+SIZES = dict(num_farmers=400, num_plots_per_farmer_avg=2, num_weather_stations=3, sim_start_date=date(2021, 6, 1),
+             sim_duration_days=90)
+
+def generate(seed):
+    return SyntheticDataGenerator(random_seed=seed).generate_columnar_simulation_data(**SIZES)
+
+def test_generation_is_deterministic_for_a_seed():
+    frames = generate(7)
+    assert list(frames) == list(TABLE_RULES)
+    for table, frame in generate(7).items():
+        pd.testing.assert_frame_equal(frame, frames[table], obj=table)
+    other = generate(8)
+    for table in TABLE_RULES:
+        assert not frames[table].equals(other[table]), table
+    # The streaming form is deterministic too, for a given chunk size
+    stream = lambda: list(SyntheticDataGenerator(random_seed=7).iter_columnar_chunks(**SIZES, chunk_size=150))
+    for (table, frame), (same_table, same_frame) in zip(stream(), stream()):
+        assert table == same_table
+        pd.testing.assert_frame_equal(frame, same_frame)
+
+@pytest.mark.parametrize("seed", [0, 7, 123])
+def test_generated_frames_pass_the_loader_checks(seed):
+    frames = generate(seed)
+    for table, rules in TABLE_RULES.items():
+        frame = frames[table]
+        assert list(frame.columns) == list(FRAME_COLUMNS[table])
+        assert set(rules) <= set(frame.columns), table
+        _, errors = validate_frame(frame, rules, source=table)
+        assert errors.empty, f"{table}:\n{errors.head()}"
+
+    farmers, plots, weather = frames["farmers"], frames["farm_plots"], frames["historical_weather"]
+    assert farmers["agent_id"].is_unique and plots["plot_id"].is_unique
+    # Every farmer owns exactly num_farm_plots plots
+    owned = plots["owner_agent_id"].value_counts().reindex(farmers["agent_id"], fill_value=0)
+    assert owned.tolist() == farmers["num_farm_plots"].tolist()
+    # One weather record per station and day, with minimum below maximum
+    assert len(weather) == SIZES["num_weather_stations"] * SIZES["sim_duration_days"]
+    assert not weather.duplicated(["record_date", "station_id"]).any()
+    assert (weather["min_temp_c"] <= weather["max_temp_c"]).all()
@@ -0,0 +1,47 @@
+import pytest
+
+from agriculture.crops import RiceSeason, RiceVariety
+from agriculture.plot_store import PlotStateStore
+from agriculture.variety_catalog import DEFAULT_VARIETY_CATALOG, VARIETIES_DATA
+
+def extra_variety(**overrides) -> RiceVariety:
+    return RiceVariety(**{"variety_id": "test_variety", "name": "Test", "season": RiceSeason.AUS, **overrides})
+
+def test_store_variety_code_looks_up_catalog_varieties():
+    store = PlotStateStore()
+    for code, variety in enumerate(DEFAULT_VARIETY_CATALOG.varieties):
+        assert store.variety_code(variety) == code
+
+def test_store_variety_code_rejects_unknown_variety_without_changing_default_catalog():
+    size = len(DEFAULT_VARIETY_CATALOG)
+    with pytest.raises(KeyError):
+        PlotStateStore().variety_code(extra_variety())
+    assert len(DEFAULT_VARIETY_CATALOG) == size
+    assert "test_variety" not in DEFAULT_VARIETY_CATALOG
+
+def test_store_variety_code_rejects_changed_parameters():
+    known = DEFAULT_VARIETY_CATALOG.variety(0)
+    changed = RiceVariety(known.variety_id, known.name, known.season, potential_yield_t_ha=known.potential_yield_t_ha + 1)
+    with pytest.raises(ValueError):
+        PlotStateStore().variety_code(changed)
+
+def test_default_catalog_is_not_extended_in_place():
+    with pytest.raises(ValueError):
+        DEFAULT_VARIETY_CATALOG.add(extra_variety())
+
+def test_copy_holds_extra_varieties():
+    catalog = DEFAULT_VARIETY_CATALOG.copy([extra_variety()])
+    store = PlotStateStore(catalog=catalog)
+    assert store.variety_code(extra_variety()) == len(DEFAULT_VARIETY_CATALOG)
+    assert RiceSeason.AUS in [catalog.variety(code).season for code in catalog.by_season(RiceSeason.AUS)]
+    assert catalog.add(extra_variety()) == len(DEFAULT_VARIETY_CATALOG)
+    with pytest.raises(ValueError):
+        catalog.add(extra_variety(maturity_days=90))
+    assert "test_variety" not in DEFAULT_VARIETY_CATALOG
+
+def test_varieties_data_is_the_read_only_default_catalog():
+    assert VARIETIES_DATA is DEFAULT_VARIETY_CATALOG
+    assert VARIETIES_DATA["brri_dhan29"].potential_yield_t_ha == 7.0
+    with pytest.raises(TypeError, match="copy"):
+        VARIETIES_DATA["test_variety"] = extra_variety()
+    assert not hasattr(VARIETIES_DATA, "update")
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from agents.farmer_agent import FarmerAgent, season_for_step
+from agents.variety_selection import VarietySelectionKernel
+from agriculture.crops import RiceSeason
+from agriculture.farm_plot import FarmPlot
+from agriculture.plot_store import PlotStateStore
+from agriculture.variety_catalog import DEFAULT_VARIETY_CATALOG
+from simulation_core.engine import SimulationEngine
+
+from .helpers import assert_same_state, engine_state
+
+STEP_OF_SEASON = {season_for_step(step): step for step in range(3)}
+
+def build_farmers(capital_and_sizes):
+    """Farmers with the given capital and plot sizes, all plots in one store."""
+    store = PlotStateStore()
+    farmers = []
+    for i, (capital, sizes) in enumerate(capital_and_sizes):
+        farmer = FarmerAgent(agent_id=f"F{i}", initial_capital_bdt=capital)
+        for j, size in enumerate(sizes):
+            farmer.add_farm_plot(FarmPlot(f"F{i}_P{j}", farmer.agent_id, size, store=store))
+        farmers.append(farmer)
+    return farmers
+
+def decide(farmers, season, salinity_by_plot, batch):
+    climate = {plot.plot_id: {"avg_salinity_ds_m": salinity_by_plot.get(plot.plot_id, 0.0)}
+               for farmer in farmers for plot in farmer.farm_plots}
+    step = STEP_OF_SEASON[season]
+    if batch:
+        FarmerAgent.make_cultivation_decisions_batch(farmers, step, climate, {})
+    else:
+        for farmer in farmers:
+            farmer._make_cultivation_decisions(step, climate, {})
+    return ([[plot.current_crop.variety.variety_id if plot.current_crop else None for plot in farmer.farm_plots]
+             for farmer in farmers], [farmer.capital_bdt for farmer in farmers])
+
+def decide_both(capital_and_sizes, season, salinity_by_plot=None):
+    salinity_by_plot = salinity_by_plot or {}
+    per_agent = decide(build_farmers(capital_and_sizes), season, salinity_by_plot, batch=False)
+    batch = decide(build_farmers(capital_and_sizes), season, salinity_by_plot, batch=True)
+    assert batch == per_agent
+    return per_agent
+
+def test_batch_decisions_match_per_agent_run(make_config):
+    states, harvests = {}, {}
+    for mode in ("per_agent", "batch"):
+        engine = SimulationEngine(make_config(max_steps=12, agent_config={"decision_mode": mode}))
+        engine.run_simulation()
+        states[mode] = engine_state(engine)
+        harvests[mode] = [list(plot.cultivation_history) for farmer in engine.farmer_agents for plot in farmer.farm_plots]
+    assert any(harvests["batch"])
+    assert harvests["batch"] == harvests["per_agent"]
+    assert_same_state(states["batch"], states["per_agent"])
+
+@pytest.mark.parametrize("season", list(RiceSeason))
+def test_kernel_matches_per_plot_rule(season):
+    farmer = build_farmers([(0.0, [1.0, 1.0])])[0]
+    kernel = VarietySelectionKernel(DEFAULT_VARIETY_CATALOG)
+    salinity = np.array([0.0, 3.9, 4.0, 4.1, 8.0, 8.1, 20.0])
+    capital = np.array([0.0, 19999.0, 20000.0, 40000.0, 1e6])
+    grid_salinity, grid_capital = (values.ravel() for values in np.meshgrid(salinity, capital))
+    choices = kernel.select(season, grid_salinity, grid_capital / len(farmer.farm_plots))
+    for choice, outlook, funds in zip(choices, grid_salinity, grid_capital):
+        farmer.capital_bdt = funds
+        expected = farmer._select_rice_variety(farmer.farm_plots[0], season, {"avg_salinity_ds_m": outlook}, {})
+        assert (kernel.varieties[choice] if choice >= 0 else None) is expected
+
+def test_season_without_varieties_plants_nothing():
+    assert len(DEFAULT_VARIETY_CATALOG.by_season(RiceSeason.AUS)) == 0
+    planted, capital = decide_both([(1e6, [1.0, 0.5]), (5e4, [2.0])], RiceSeason.AUS, {"F0_P0": 9.0})
+    assert planted == [[None, None], [None]]
+    assert capital == [1e6, 5e4]
+    assert (VarietySelectionKernel(DEFAULT_VARIETY_CATALOG).select(RiceSeason.AUS, [0.0, 9.0], [1e6, 1e6]) == -1).all()
+
+def test_salinity_threshold_selects_salt_tolerant_variety():
+    # brri_dhan47 is the only salt-tolerant Boro variety (tolerates 8 dS/m); the threshold is 4 dS/m
+    salinity = {"F0_P0": 4.0, "F1_P0": 4.1, "F2_P0": 8.0, "F3_P0": 8.5}
+    planted, _ = decide_both([(1e6, [1.0])] * 4, RiceSeason.BORO, salinity)
+    assert planted == [["brri_dhan29"], ["brri_dhan47"], ["brri_dhan47"], ["brri_dhan29"]]
+    # No Aman variety is salt-tolerant, so saline Aman plots get the best HYV
+    planted, _ = decide_both([(1e6, [1.0])], RiceSeason.AMAN, {"F0_P0": 10.0})
+    assert planted == [["swarna"]]
+
+def test_threshold_is_per_farmer():
+    farmers = build_farmers([(1e6, [1.0])])
+    farmers[0].salinity_threshold_ds_m = 2.0
+    planted, _ = decide(farmers, RiceSeason.BORO, {"F0_P0": 3.0}, batch=True)
+    assert planted == [["brri_dhan47"]]
+
+def test_insufficient_capital_leaves_plots_empty():
+    # Input costs are 20000 BDT/ha: F0 cannot afford its plot; F1 can afford its first
+    # plot only, after which its capital is too low for the second
+    planted, capital = decide_both([(15000.0, [1.0]), (30000.0, [1.0, 1.0]), (19999.0, [0.5, 0.5])], RiceSeason.BORO)
+    assert planted == [[None], ["brri_dhan29", None], ["brri_dhan29", None]]
+    assert capital == pytest.approx([15000.0, 10000.0, 9999.0])
+
+def test_planted_plots_are_left_alone():
+    farmers = build_farmers([(1e6, [1.0, 1.0])])
+    decide(farmers, RiceSeason.BORO, {}, batch=True)
+    before = farmers[0].capital_bdt
+    planted, capital = decide(farmers, RiceSeason.BORO, {}, batch=True)
+    assert planted == [["brri_dhan29", "brri_dhan29"]]
+    assert capital == [before]
@@ -1 +1,18 @@
+from .event_log import EventType, EventLog, get_event_log, set_event_log
+from .logging_setup import configure_logging, get_logger, VERBOSITY_LEVELS
+from .online_stats import RunningMoments, P2Quantile, OnlineSummary
+from .shared_arrays import SharedArrayBlock
 
+__all__ = [
+    "EventType",
+    "EventLog",
+    "get_event_log",
+    "set_event_log",
+    "configure_logging",
+    "get_logger",
+    "VERBOSITY_LEVELS",
+    "RunningMoments",
+    "P2Quantile",
+    "OnlineSummary",
+    "SharedArrayBlock"
+]
@@ -0,0 +1,95 @@
+from collections import deque
+from enum import Enum
+import json
+import math
+from typing import Deque, Dict, List, Optional, Tuple
+
+class EventType(Enum):
+    PLANTED = "planted"
+    HARVESTED = "harvested"
+    UNAFFORDABLE = "unaffordable"
+    NO_SUITABLE_VARIETY = "no_suitable_variety"
+    OWNER_MISMATCH = "owner_mismatch"
+
+# (step, event type, agent id, plot id, value, detail)
+Event = Tuple[int, EventType, Optional[str], Optional[str], float, Optional[str]]
+
+class EventLog:
+    """
+    Buffered log of typed simulation events.
+
+    Events are appended to an in-memory buffer as plain tuples and flushed in batches,
+    either as JSON lines to `file_path` or, without a file, into a bounded ring buffer
+    that keeps only the most recent `ring_capacity` events. Per-type counts since the
+    last `reset_counts()` feed the per-step summaries.
+    """
+    def __init__(self, file_path: Optional[str] = None, buffer_size: int = 10000, ring_capacity: int = 100000):
+        self.file_path = file_path
+        self.buffer_size = buffer_size
+        self.current_step: int = 0 # Stamped onto recorded events; set by the engine
+        self._buffer: List[Event] = []
+        self._ring: Deque[Event] = deque(maxlen=ring_capacity)
+        self._file = open(file_path, "a") if file_path else None
+        self._counts: Dict[EventType, int] = {event_type: 0 for event_type in EventType}
+
+    def record(self, event_type: EventType, agent_id: Optional[str] = None, plot_id: Optional[str] = None,
+               value: float = math.nan, detail: Optional[str] = None):
+        self._buffer.append((self.current_step, event_type, agent_id, plot_id, value, detail))
+        self._counts[event_type] += 1
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Writes buffered events to the file, or moves them into the ring buffer."""
+        if not self._buffer:
+            return
+        if self._file:
+            self._file.write("".join(json.dumps(_event_to_dict(event)) + "\n" for event in self._buffer))
+            self._file.flush()
+        else:
+            self._ring.extend(self._buffer)
+        self._buffer = []
+
+    def recent_events(self) -> List[dict]:
+        """Events held in the ring buffer (after flushing pending ones); empty when writing to a file."""
+        self.flush()
+        return [_event_to_dict(event) for event in self._ring]
+
+    def counts(self) -> Dict[EventType, int]:
+        return dict(self._counts)
+
+    def reset_counts(self):
+        for event_type in self._counts:
+            self._counts[event_type] = 0
+
+    def close(self):
+        self.flush()
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def __repr__(self):
+        return f"EventLog(file_path={self.file_path!r}, pending={len(self._buffer)})"
+
+def _event_to_dict(event: Event) -> dict:
+    step, event_type, agent_id, plot_id, value, detail = event
+    record = {"step": step, "type": event_type.value, "agent_id": agent_id, "plot_id": plot_id}
+    if not math.isnan(value):
+        record["value"] = value
+    if detail is not None:
+        record["detail"] = detail
+    return record
+
+_event_log = EventLog()
+
+def get_event_log() -> EventLog:
+    """
+    Default event log, for plots (and their farmers) whose PlotStateStore has no log
+    of its own. An engine's plots record into the engine's event_log instead.
+    """
+    return _event_log
+
+def set_event_log(event_log: EventLog):
+    """Replaces the default event log."""
+    global _event_log
+    _event_log = event_log
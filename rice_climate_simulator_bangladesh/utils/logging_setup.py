@@ -0,0 +1,34 @@
+import logging
+import sys
+
+ROOT_LOGGER_NAME = "rice_sim"
+
+# verbosity setting -> logging level of the simulator's loggers
+VERBOSITY_LEVELS = {
+    "quiet": logging.WARNING,   # Warnings and errors only
+    "summary": logging.INFO,    # Set-up messages and one summary line per step (production default)
+    "verbose": logging.DEBUG,   # Per-farmer and per-plot messages as well
+}
+
+def get_logger(name: str) -> logging.Logger:
+    """Returns a logger under the simulator's logger hierarchy, e.g. get_logger(__name__)."""
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+def configure_logging(verbosity: str = "summary") -> logging.Logger:
+    """
+    Sets the level of all simulator loggers from a verbosity name and makes sure
+    messages reach stdout. Calling it again only changes the level.
+
+    Raises:
+        ValueError: If the verbosity name is unknown.
+    """
+    if verbosity not in VERBOSITY_LEVELS:
+        raise ValueError(f"Unknown verbosity '{verbosity}'. Expected one of {sorted(VERBOSITY_LEVELS)}.")
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    root.setLevel(VERBOSITY_LEVELS[verbosity])
+    if not root.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        root.addHandler(handler)
+        root.propagate = False
+    return root
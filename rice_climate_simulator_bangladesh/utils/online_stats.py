@@ -0,0 +1,117 @@
+import math
+from typing import Dict, List, Sequence
+
+class RunningMoments:
+    """Count, mean, variance (Welford's algorithm), minimum and maximum of a stream of values."""
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (NaN for fewer than two values)."""
+        return self._m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance) if self.count > 1 else math.nan
+
+class P2Quantile:
+    """
+    Streaming estimate of one quantile with the P-squared algorithm (Jain & Chlamtac, 1985).
+
+    Keeps five markers whatever the number of values; exact for the first five values,
+    then adjusted by piecewise-parabolic interpolation as values arrive.
+    """
+    def __init__(self, p: float):
+        if not 0 <= p <= 1:
+            raise ValueError(f"Quantile must be in [0, 1], got {p}.")
+        self.p = p
+        self.count = 0
+        self._heights: List[float] = [] # Marker heights; the first five values until initialised
+        self._positions = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self._desired = [1.0, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5.0]
+        self._increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, value: float):
+        self.count += 1
+        heights = self._heights
+        if self.count <= 5:
+            heights.append(value)
+            if self.count == 5:
+                heights.sort()
+            return
+
+        positions = self._positions
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = next(i for i in range(4) if heights[i] <= value < heights[i + 1])
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        for i in (1, 2, 3):
+            offset = self._desired[i] - positions[i]
+            if (offset >= 1 and positions[i + 1] - positions[i] > 1) or (offset <= -1 and positions[i - 1] - positions[i] < -1):
+                step = 1 if offset > 0 else -1
+                candidate = self._parabolic(i, step)
+                if not heights[i - 1] < candidate < heights[i + 1]:
+                    candidate = heights[i] + step * (heights[i + step] - heights[i]) / (positions[i + step] - positions[i])
+                heights[i] = candidate
+                positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+    @property
+    def value(self) -> float:
+        """Current estimate (NaN before any value)."""
+        if self.count == 0:
+            return math.nan
+        if self.count < 5:
+            ordered = sorted(self._heights)
+            rank = self.p * (len(ordered) - 1)
+            lower = math.floor(rank)
+            upper = min(lower + 1, len(ordered) - 1)
+            return ordered[lower] + (rank - lower) * (ordered[upper] - ordered[lower])
+        return self._heights[2]
+
+class OnlineSummary:
+    """Running moments plus P-squared estimates of several quantiles of one stream of values."""
+    def __init__(self, quantiles: Sequence[float] = (0.05, 0.5, 0.95)):
+        self.moments = RunningMoments()
+        self.quantiles = {p: P2Quantile(p) for p in quantiles}
+
+    def add(self, value: float):
+        self.moments.add(value)
+        for estimator in self.quantiles.values():
+            estimator.add(value)
+
+    def summary(self) -> Dict[str, float]:
+        """{"count", "mean", "std", "min", "max", "q05", "q50", ...} for the values so far."""
+        moments = self.moments
+        result = {"count": moments.count, "mean": moments.mean if moments.count else math.nan, "std": moments.std,
+                  "min": moments.min if moments.count else math.nan, "max": moments.max if moments.count else math.nan}
+        for p, estimator in self.quantiles.items():
+            result[f"q{round(p * 100):02d}"] = estimator.value
+        return result
@@ -0,0 +1,76 @@
+from multiprocessing import shared_memory
+from typing import Dict, List, Mapping, Tuple
+
+import numpy as np
+
+# (name, dtype string, shape, byte offset) of each array in a block
+ArrayLayout = List[Tuple[str, str, Tuple[int, ...], int]]
+
+_ALIGNMENT = 64
+
+class SharedArrayBlock:
+    """
+    Named numpy arrays copied once into a single shared-memory segment.
+
+    The creating process calls `SharedArrayBlock.create(arrays)` and hands `spec` (a
+    small picklable tuple) to worker processes, which `attach` to the same memory and
+    get read-only array views without copying or unpickling the data. Arrays must be
+    plain (non-object) dtypes. The creator calls `unlink()` when the workers are done.
+    """
+    def __init__(self, shm: shared_memory.SharedMemory, layout: ArrayLayout, owner: bool):
+        self._shm = shm
+        self.layout = layout
+        self.owner = owner
+        self.arrays: Dict[str, np.ndarray] = {}
+        for name, dtype, shape, offset in layout:
+            array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            array.flags.writeable = False
+            self.arrays[name] = array
+
+    @classmethod
+    def create(cls, arrays: Mapping[str, np.ndarray]) -> "SharedArrayBlock":
+        layout: ArrayLayout = []
+        size = 0
+        for name, array in arrays.items():
+            array = np.asarray(array)
+            if array.dtype.hasobject:
+                raise TypeError(f"Array '{name}' has an object dtype and cannot be placed in shared memory.")
+            size = -(-size // _ALIGNMENT) * _ALIGNMENT
+            layout.append((name, array.dtype.str, array.shape, size))
+            size += array.nbytes
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for (name, dtype, shape, offset), array in zip(layout, arrays.values()):
+            np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)[...] = array
+        return cls(shm, layout, owner=True)
+
+    @property
+    def spec(self) -> Tuple[str, ArrayLayout]:
+        return self._shm.name, self.layout
+
+    @classmethod
+    def attach(cls, spec: Tuple[str, ArrayLayout]) -> "SharedArrayBlock":
+        name, layout = spec
+        # Processes started by multiprocessing share the creator's resource tracker, so
+        # attaching adds no cleanup of its own; the creator unlinks the segment.
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, layout, owner=False)
+
+    @property
+    def nbytes(self) -> int:
+        return self._shm.size
+
+    def close(self):
+        self.arrays = {}
+        try:
+            self._shm.close()
+        except BufferError:
+            pass # Views handed out are still alive; the mapping goes away with them
+
+    def unlink(self):
+        """Closes the block and, in the creating process, frees the shared memory."""
+        self.close()
+        if self.owner:
+            self._shm.unlink()
+
+    def __repr__(self):
+        return f"SharedArrayBlock({self._shm.name!r}, arrays={len(self.layout)}, bytes={self.nbytes})"